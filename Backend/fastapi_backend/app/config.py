@@ -14,11 +14,102 @@ class Settings(BaseSettings):
     twilio_auth_token: str | None = Field(default=None, env="TWILIO_AUTH_TOKEN")
     twilio_from_number: str | None = Field(default=None, env="TWILIO_FROM_NUMBER")
     twilio_dry_run: bool = Field(default=True, env="TWILIO_DRY_RUN")
+    twilio_api_base: str = Field(default="https://api.twilio.com", env="TWILIO_API_BASE")
+    twilio_max_concurrency: int = Field(default=20, env="TWILIO_MAX_CONCURRENCY")
+    twilio_rate_per_sec: float = Field(default=50.0, env="TWILIO_RATE_PER_SEC")
+    twilio_timeout: float = Field(default=10.0, env="TWILIO_TIMEOUT")
+    # Sends are only retried when they cannot have reached Twilio (no duplicate SMS)
+    twilio_max_retries: int = Field(default=2, env="TWILIO_MAX_RETRIES")
 
     # OpenAI
     openai_api_key: str | None = Field(default=None, env="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o-mini", env="OPENAI_MODEL")
     openai_dry_run: bool = Field(default=True, env="OPENAI_DRY_RUN")
+    openai_api_base: str = Field(default="https://api.openai.com", env="OPENAI_API_BASE")
+    openai_timeout: float = Field(default=20.0, env="OPENAI_TIMEOUT")
+    openai_max_connections: int = Field(default=50, env="OPENAI_MAX_CONNECTIONS")
+    openai_max_keepalive: int = Field(default=20, env="OPENAI_MAX_KEEPALIVE")
+    openai_max_retries: int = Field(default=2, env="OPENAI_MAX_RETRIES")
+    advisory_cache_size: int = Field(default=512, env="ADVISORY_CACHE_SIZE")
+    advisory_cache_ttl: float = Field(default=300.0, env="ADVISORY_CACHE_TTL")
+    advisory_batch_concurrency: int = Field(default=16, env="ADVISORY_BATCH_CONCURRENCY")
+    advisory_batch_timeout: float = Field(default=30.0, env="ADVISORY_BATCH_TIMEOUT")
+
+    # Outbound HTTP (shared by the pooled Twilio/OpenAI clients)
+    http_connect_timeout: float = Field(default=5.0, env="HTTP_CONNECT_TIMEOUT")
+    http_keepalive_expiry: float = Field(default=30.0, env="HTTP_KEEPALIVE_EXPIRY")
+    # Requires the optional `h2` package; ignored without it
+    http2: bool = Field(default=False, env="HTTP2")
+    http_retry_backoff_base: float = Field(default=0.2, env="HTTP_RETRY_BACKOFF_BASE")
+    http_retry_backoff_max: float = Field(default=5.0, env="HTTP_RETRY_BACKOFF_MAX")
+    # Consecutive failures that open a provider's circuit breaker, and how long it stays open
+    http_breaker_failures: int = Field(default=5, env="HTTP_BREAKER_FAILURES")
+    http_breaker_reset: float = Field(default=30.0, env="HTTP_BREAKER_RESET")
+
+    # Actions store (SQLite file path, or ":memory:" for an ephemeral store)
+    actions_db_path: str = Field(default="actions.db", env="ACTIONS_DB_PATH")
+
+    # Delivery queue (SQLite file path, or ":memory:") and its worker pool
+    delivery_db_path: str = Field(default="delivery.db", env="DELIVERY_DB_PATH")
+    delivery_workers: int = Field(default=4, env="DELIVERY_WORKERS")
+    delivery_batch_size: int = Field(default=50, env="DELIVERY_BATCH_SIZE")
+    delivery_max_attempts: int = Field(default=5, env="DELIVERY_MAX_ATTEMPTS")
+    delivery_backoff_base: float = Field(default=2.0, env="DELIVERY_BACKOFF_BASE")
+    delivery_backoff_max: float = Field(default=300.0, env="DELIVERY_BACKOFF_MAX")
+    delivery_poll_interval: float = Field(default=1.0, env="DELIVERY_POLL_INTERVAL")
+
+    # Occupancy ingestion micro-batching
+    ingest_batch_size: int = Field(default=2000, env="INGEST_BATCH_SIZE")
+    ingest_max_delay: float = Field(default=0.05, env="INGEST_MAX_DELAY")
+    ingest_max_pending: int = Field(default=100_000, env="INGEST_MAX_PENDING")
+
+    # Occupancy history (directory of memory-mapped series, or ":memory:")
+    history_dir: str = Field(default="history", env="HISTORY_DIR")
+    history_interval: int = Field(default=60, env="HISTORY_INTERVAL")
+    history_max_points: int = Field(default=10_000, env="HISTORY_MAX_POINTS")
+    # Days kept per hospital (older buckets are discarded), and how far past the
+    # receive time an update's observed_at may be
+    history_retention_days: int = Field(default=60, env="HISTORY_RETENTION_DAYS")
+    history_max_skew: float = Field(default=300.0, env="HISTORY_MAX_SKEW")
+
+    # Surge forecasting
+    forecast_lookback_days: int = Field(default=56, env="FORECAST_LOOKBACK_DAYS")
+    forecast_surge_threshold: float = Field(default=0.9, env="FORECAST_SURGE_THRESHOLD")
+    forecast_surge_horizon: int = Field(default=7, env="FORECAST_SURGE_HORIZON")
+    # Minimum forecast error, and the error assumed without history (fractions of capacity)
+    forecast_sigma_floor: float = Field(default=0.03, env="FORECAST_SIGMA_FLOOR")
+    forecast_sigma_cold: float = Field(default=0.10, env="FORECAST_SIGMA_COLD")
+    # Comma-separated ISO dates (e.g. festival days) with their own demand effect
+    forecast_holidays: str = Field(default="", env="FORECAST_HOLIDAYS")
+    # While occupancy changes, recompute the forecast (in the background) at most
+    # this often, in seconds; 0 recomputes on the next read after every change
+    forecast_refresh_interval: float = Field(default=60.0, env="FORECAST_REFRESH_INTERVAL")
+
+    # Surge diffusion over the hospital k-nearest-neighbour graph
+    graph_k: int = Field(default=8, env="GRAPH_K")
+    # Edge weight distance scale; 0 uses the median neighbour distance
+    graph_kernel_km: float = Field(default=0.0, env="GRAPH_KERNEL_KM")
+    graph_diffusion_alpha: float = Field(default=0.5, env="GRAPH_DIFFUSION_ALPHA")
+    graph_diffusion_max_iter: int = Field(default=50, env="GRAPH_DIFFUSION_MAX_ITER")
+    graph_diffusion_tol: float = Field(default=1e-4, env="GRAPH_DIFFUSION_TOL")
+
+    # Transfer/allocation optimizer
+    optimizer_max_transfer_km: float = Field(default=150.0, env="OPTIMIZER_MAX_TRANSFER_KM")
+    # Entropic regularization as a fraction of the unmet-demand penalty
+    optimizer_epsilon: float = Field(default=0.01, env="OPTIMIZER_EPSILON")
+    optimizer_max_iter: int = Field(default=3000, env="OPTIMIZER_MAX_ITER")
+    optimizer_tol: float = Field(default=1e-3, env="OPTIMIZER_TOL")
+    # Share of a hospital's staff/oxygen need that is short (or spare) at HIGH/LOW levels
+    optimizer_resource_share: float = Field(default=0.2, env="OPTIMIZER_RESOURCE_SHARE")
+    optimizer_patients_per_nurse: float = Field(default=2.0, env="OPTIMIZER_PATIENTS_PER_NURSE")
+    optimizer_oxygen_per_patient: float = Field(default=2.0, env="OPTIMIZER_OXYGEN_PER_PATIENT")
+    # Comma-separated phone numbers for optimizer actions; none are published while unset
+    optimizer_recipients: str = Field(default="", env="OPTIMIZER_RECIPIENTS")
+
+    # Live stream (SSE)
+    stream_poll_interval: float = Field(default=1.0, env="STREAM_POLL_INTERVAL")
+    stream_heartbeat_interval: float = Field(default=15.0, env="STREAM_HEARTBEAT_INTERVAL")
+    stream_queue_size: int = Field(default=256, env="STREAM_QUEUE_SIZE")
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,85 @@
+"""
+HTTP conditional-request helpers shared by the read-heavy routers.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.types import Receive, Scope, Send
+
+# Clients may cache, but must revalidate with If-None-Match before reuse.
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+# Bodies above this size (~17k hospitals) are sent in STREAM_CHUNK-sized
+# pieces; smaller ones are cheaper to hand to the server in one message.
+STREAM_THRESHOLD = 4 * 1024 * 1024
+STREAM_CHUNK = 256 * 1024
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against `etag` (weak comparison, as
+    RFC 9110 requires for If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    media_type: str = "application/json",
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> Response:
+    """
+    Return `304 Not Modified` (no body) when the client already holds `etag`,
+    otherwise the full body. Both carry ETag and Cache-Control headers.
+
+    Bodies larger than STREAM_THRESHOLD (e.g. tens of thousands of
+    hospitals) go out as a ChunkedResponse.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if len(body) > STREAM_THRESHOLD:
+        return ChunkedResponse(content=body, media_type=media_type, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+class ChunkedResponse(Response):
+    """
+    A Response whose (already serialized) body is sent as successive
+    STREAM_CHUNK-sized messages rather than one. Each message body is a
+    `bytes` slice, as ASGI requires; only one chunk is copied at a time.
+
+    The server applies backpressure between messages, so its write buffer
+    holds about one chunk per response instead of a copy of the whole body
+    for every slow client. Content-Length is still sent, and unlike
+    StreamingResponse there is no per-response iterator or disconnect
+    listener task.
+    """
+
+    chunk_size = STREAM_CHUNK
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        body = self.body
+        size = self.chunk_size
+        for start in range(0, len(body), size):
+            await send({"type": "http.response.body", "body": body[start : start + size], "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        if self.background is not None:
+            await self.background()
@@ -1,9 +1,36 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import actions, advisory, dashboard, hospitals
+from app import metrics
+
+from app.routers import actions, advisory, allocation, dashboard, forecast, graph, hospitals, stream
+from app.services import history_service, http_clients
+from app.services.delivery_worker import dispatcher
+from app.services.occupancy_ingestor import ingestor
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Pooled outbound HTTP clients live for the whole process.
+    await http_clients.open_clients()
+    # Background workers draining the notification delivery queue.
+    dispatcher.start()
+    # Micro-batching writer for live occupancy updates.
+    ingestor.start()
+    try:
+        yield
+    finally:
+        await ingestor.stop()
+        # Occupancy history is memory-mapped; push dirty pages to disk.
+        history_service.get_store().flush()
+        await dispatcher.stop()
+        await http_clients.close_clients()
 
-app = FastAPI(title="SurgeGuard Backend", version="0.1.0")
+
+app = FastAPI(title="SurgeGuard Backend", version="0.1.0", lifespan=lifespan)
 
 # CORS for frontend integration (Vite dev on localhost:5173 by default)
 origins = [
@@ -16,7 +43,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count", "X-Next-Cursor"],
 )
+# Outermost, so latency includes CORS handling and every response is counted.
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 @app.get("/health")
@@ -24,11 +54,23 @@ def health_check() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint() -> Response:
+    """
+    Prometheus scrape endpoint (text exposition format).
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Register API routers
 app.include_router(dashboard.router)
 app.include_router(hospitals.router)
 app.include_router(actions.router)
+app.include_router(allocation.router)
 app.include_router(advisory.router)
+app.include_router(forecast.router)
+app.include_router(graph.router)
+app.include_router(stream.router)
 
 
 # Optional: enable `python -m app.main` style running
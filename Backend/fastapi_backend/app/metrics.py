@@ -0,0 +1,289 @@
+"""
+In-process metrics with Prometheus text exposition (served at /metrics).
+
+Writers never take a lock: every metric keeps one value array per thread
+(the event loop, each threadpool worker) and only that thread writes to it;
+a scrape sums the arrays. An observation is a dict lookup, a bisect and a
+few list additions, so instrumentation stays cheap on hot paths.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS: Tuple[float, ...] = tuple(float(4 ** i) for i in range(3, 13))  # 64 B .. 16 MiB
+
+
+class _Shards:
+    """
+    Per-thread value arrays of a fixed width, summed on read.
+    """
+
+    def __init__(self, width: int) -> None:
+        self._width = width
+        self._local = threading.local()
+        self._lock = threading.Lock()  # only taken when a thread first writes
+        self._arrays: List[List[float]] = []
+
+    def mine(self) -> List[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0.0] * self._width
+            with self._lock:
+                self._arrays.append(values)
+            self._local.values = values
+            return values
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            arrays = list(self._arrays)
+        return [sum(column) for column in zip(*arrays)] if arrays else [0.0] * self._width
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        # Rendered label sets, per child and extra label; they never change.
+        self._label_texts: Dict[Tuple[Tuple[str, ...], Optional[Tuple[str, str]]], str] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_text(self, values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        text = self._label_texts.get((values, extra))
+        if text is None:
+            pairs = list(zip(self.labelnames, values))
+            if extra is not None:
+                pairs.append(extra)
+            text = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+            self._label_texts[(values, extra)] = text
+        return text
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+
+class _Value:
+    __slots__ = ("_shards",)
+
+    def __init__(self) -> None:
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shards.mine()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._shards.mine()[0] -= amount
+
+    @property
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._items():
+            yield f"{self.name}{self._label_text(values)} {_number(child.value)}"
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge (inc/dec only, e.g. requests in flight).
+    """
+
+    kind = "gauge"
+
+
+class _HistogramValue:
+    __slots__ = ("_bounds", "_shards")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self._bounds = bounds
+        # [per-bucket counts..., +Inf count, sum, count]
+        self._shards = _Shards(len(bounds) + 3)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.mine()
+        values[bisect_left(self._bounds, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def totals(self) -> List[float]:
+        return self._shards.totals()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _samples(self) -> Iterable[str]:
+        les = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for values, child in self._items():
+            totals = child.totals()
+            cumulative = 0.0
+            for le, count in zip(les, totals):
+                cumulative += count
+                yield f"{self.name}_bucket{self._label_text(values, ('le', le))} {_number(cumulative)}"
+            yield f"{self.name}_sum{self._label_text(values)} {_number(totals[-2])}"
+            yield f"{self.name}_count{self._label_text(values)} {_number(totals[-1])}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render() -> bytes:
+    """
+    Every registered metric in Prometheus text format.
+    """
+    return ("\n".join(metric.render() for metric in REGISTRY) + "\n").encode("utf-8")
+
+
+# HTTP server (recorded by MetricsMiddleware)
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to the end of the response body", ("method", "route")
+)
+HTTP_REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "Request body size", ("method", "route"), buckets=SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), buckets=SIZE_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled", ("method",))
+
+# Services
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Snapshot cache lookups (hit = served without reloading/rebuilding)", ("cache", "result")
+)
+TWILIO_MESSAGES = Counter("twilio_messages_total", "Twilio sends by result status", ("status",))
+OPENAI_LATENCY = Histogram(
+    "openai_request_duration_seconds", "OpenAI chat-completions latency", ("operation", "outcome")
+)
+OPENAI_TOKENS = Counter("openai_tokens_total", "OpenAI tokens used", ("kind",))
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_openai_usage(usage: Optional[dict]) -> None:
+    if not isinstance(usage, dict):
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        count = usage.get(kind)
+        if isinstance(count, (int, float)):
+            OPENAI_TOKENS.labels(kind[: -len("_tokens")]).inc(count)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, request/response body
+    sizes, status counts and in-flight requests.
+
+    Routes are labelled by their path template (e.g. /api/hospitals/{id}),
+    not the raw path, to keep label cardinality bounded; requests that match
+    no route are labelled "unmatched". Latency runs until the last body
+    chunk is sent, so streamed responses count their full duration.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        start = time.perf_counter()
+        received = 0
+        sent = 0
+        status = 500
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+
+        async def receive_wrapper():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message) -> None:
+            nonlocal sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.labels(method, template, str(status)).inc()
+            HTTP_LATENCY.labels(method, template).observe(time.perf_counter() - start)
+            HTTP_REQUEST_SIZE.labels(method, template).observe(received)
+            HTTP_RESPONSE_SIZE.labels(method, template).observe(sent)
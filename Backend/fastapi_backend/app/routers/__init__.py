@@ -1,3 +1,3 @@
-from . import actions, advisory, dashboard, hospitals
+from . import actions, advisory, allocation, dashboard, forecast, graph, hospitals, stream
 
-__all__ = ["actions", "advisory", "dashboard", "hospitals"]
+__all__ = ["actions", "advisory", "allocation", "dashboard", "forecast", "graph", "hospitals", "stream"]
@@ -1,45 +1,115 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 
 from app.schemas import (
     ActionApproveRequest,
+    ActionBulkRequest,
+    ActionBulkResponse,
+    ActionDeliveryReport,
     ActionItem,
     ActionRejectRequest,
 )
+from app.schemas.actions import ActionChannel, ActionTarget, ActionType
 from app.services import actions_service
 
 router = APIRouter(prefix="/api/actions", tags=["actions"])
 
+# Page size when a `cursor` is passed without a `limit`.
+DEFAULT_PAGE_SIZE = 100
+
 
 @router.get("/pending", response_model=List[ActionItem])
-def list_pending_actions() -> List[ActionItem]:
+def list_pending_actions(
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from X-Next-Cursor"),
+    type: Optional[ActionType] = None,
+    target: Optional[ActionTarget] = None,
+    channel: Optional[ActionChannel] = None,
+    recipient_prefix: Optional[str] = Query(default=None, min_length=1),
+) -> Response:
+    """
+    Return actions in PENDING status, oldest first.
+
+    Without `limit` or `cursor`, every matching action is returned, as before
+    pagination existed. Pagination is keyset-based: pass `limit`, then the
+    `X-Next-Cursor` response header back as `cursor` to get the next page
+    (absent on the last page).
+    `X-Total-Count` is the number of matching actions across all pages.
+
+    The page is returned as pre-serialized JSON; `response_model` only
+    documents its shape.
+    """
+    if limit is None and cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        page = actions_service.query_pending_json(
+            limit,
+            cursor=cursor,
+            type=type,
+            target=target,
+            channel=channel,
+            recipient_prefix=recipient_prefix,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    headers = {"X-Total-Count": str(page.total)}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
+@router.post("/bulk", response_model=ActionBulkResponse)
+def bulk_decide_actions(req: ActionBulkRequest) -> ActionBulkResponse:
     """
-    Return all actions currently in PENDING status.
+    Approve and/or reject many PENDING actions in one request.
+
+    Transitions are applied in a single transaction; approved actions'
+    notifications are queued together for background delivery. Each item
+    gets its own result, so one bad id does not fail the whole batch.
     """
-    return actions_service.list_pending()
+    return actions_service.bulk_decide(req.items)
 
 
 @router.post("/{action_id}/approve", response_model=ActionItem)
 async def approve_action(action_id: str, req: ActionApproveRequest) -> ActionItem:
     """
-    Approve an action, optionally overriding the final message text, and attempt
-    to notify recipients via Twilio through the service layer.
+    Approve an action, optionally overriding the final message text, and queue
+    notifications to its recipients. Returns immediately with status APPROVED;
+    delivery progress is available from `GET /{action_id}/deliveries`.
+    Only PENDING actions can be approved (409 otherwise).
     """
     try:
         return await actions_service.approve_and_notify(action_id, req.message_override)
     except KeyError:
         raise HTTPException(status_code=404, detail="Action not found")
+    except actions_service.ActionStateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
 
 
 @router.post("/{action_id}/reject", response_model=ActionItem)
 def reject_action(action_id: str, _: ActionRejectRequest) -> ActionItem:
     """
     Reject an action. Reason is accepted but currently only used for logging/audit (not stored).
+    Only PENDING actions can be rejected (409 otherwise).
     """
     try:
         return actions_service.reject(action_id)
     except KeyError:
         raise HTTPException(status_code=404, detail="Action not found")
+    except actions_service.ActionStateError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+@router.get("/{action_id}/deliveries", response_model=ActionDeliveryReport)
+def get_action_deliveries(action_id: str) -> ActionDeliveryReport:
+    """
+    Delivery progress for an action: job counts by status and the
+    per-recipient attempt log.
+    """
+    try:
+        return actions_service.delivery_report(action_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Action not found")
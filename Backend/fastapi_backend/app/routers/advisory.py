@@ -1,7 +1,18 @@
+import json
+from typing import AsyncIterator
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
-from app.schemas import AdvisoryDraftResponse, AdvisoryGenerateRequest
+from app.schemas import (
+    AdvisoryBatchRequest,
+    AdvisoryBatchResult,
+    AdvisoryCacheStats,
+    AdvisoryDraftResponse,
+    AdvisoryGenerateRequest,
+)
 from app.services import advisory_service
+from app.sse import SSE_HEADERS, format_sse
 
 router = APIRouter(prefix="/api/advisory", tags=["advisory"])
 
@@ -15,3 +26,65 @@ async def generate_advisory(request: AdvisoryGenerateRequest) -> AdvisoryDraftRe
     return a deterministic mock (dry-run) or call the real OpenAI API.
     """
     return await advisory_service.generate_draft(request)
+
+
+async def _draft_events(request: AdvisoryGenerateRequest) -> AsyncIterator[bytes]:
+    parts = []
+    try:
+        async for delta in advisory_service.stream_draft(request):
+            parts.append(delta)
+            yield format_sse(json.dumps({"delta": delta}).encode("utf-8"), event="token")
+    except Exception as exc:
+        yield format_sse(json.dumps({"detail": str(exc) or type(exc).__name__}).encode("utf-8"), event="error")
+        return
+    yield format_sse(json.dumps({"draft": "".join(parts)}).encode("utf-8"), event="done")
+
+
+@router.post("/generate/stream")
+async def stream_advisory(request: AdvisoryGenerateRequest) -> StreamingResponse:
+    """
+    Stream an advisory draft as Server-Sent Events.
+
+    Emits `token` events (`{"delta": "..."}`) as soon as the model produces
+    them, then a final `done` event with the full draft, or an `error`
+    event if the upstream call fails mid-stream.
+    """
+    return StreamingResponse(
+        _draft_events(request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+async def _batch_lines(request: AdvisoryBatchRequest) -> AsyncIterator[bytes]:
+    async for result in advisory_service.generate_batch(
+        request.items, max_concurrency=request.max_concurrency, timeout=request.timeout_seconds
+    ):
+        yield result.model_dump_json().encode("utf-8") + b"\n"
+
+
+@router.post(
+    "/generate:batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {"schema": AdvisoryBatchResult.model_json_schema()}}}},
+)
+async def generate_advisory_batch(request: AdvisoryBatchRequest) -> StreamingResponse:
+    """
+    Generate drafts for many prompt/context pairs at once (e.g. one per
+    affected ward or hospital).
+
+    Items run concurrently under a concurrency cap with a per-item timeout.
+    The response is NDJSON: one AdvisoryBatchResult line per item, written
+    as each finishes, so the batch takes roughly as long as its slowest
+    items rather than the sum of all of them. Failed or timed-out items are
+    reported in their own line and don't affect the rest.
+    """
+    return StreamingResponse(_batch_lines(request), media_type="application/x-ndjson")
+
+
+@router.get("/cache", response_model=AdvisoryCacheStats)
+def get_advisory_cache_stats() -> AdvisoryCacheStats:
+    """
+    Hit/miss/coalescing counters for the advisory draft cache.
+    """
+    return advisory_service.cache_stats()
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException
+
+from app.schemas import AllocationPlan, AllocationTransfer
+from app.services import allocation_service
+from app.services.allocation_service import AllocationResult
+
+router = APIRouter(prefix="/api/allocation", tags=["allocation"])
+
+
+def _plan(result: AllocationResult) -> AllocationPlan:
+    return AllocationPlan(
+        generated_at=result.generated_at,
+        transfers=[AllocationTransfer(**t.__dict__) for t in result.transfers],
+        unmet=result.unmet,
+        iterations=result.iterations,
+        warm_started=result.warm_started,
+        actions_written=result.actions_written,
+    )
+
+
+@router.post("/solve", response_model=AllocationPlan)
+def solve_allocation() -> AllocationPlan:
+    """
+    Re-plan patient, staff and oxygen transfers between hospitals from the
+    current forecast and publish them as PENDING actions for approval
+    (addressed to OPTIMIZER_RECIPIENTS; without it nothing is published).
+
+    Each re-solve is warm-started from the previous one, so re-running it
+    after small changes is cheap; pending recommendations that are no
+    longer part of the plan are superseded.
+    """
+    try:
+        result = allocation_service.solve()
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return _plan(result)
+
+
+@router.get("", response_model=AllocationPlan)
+def last_allocation() -> AllocationPlan:
+    """
+    The most recent plan, without re-solving.
+    """
+    result = allocation_service.last()
+    if result is None:
+        raise HTTPException(status_code=404, detail="No allocation plan yet")
+    return _plan(result)
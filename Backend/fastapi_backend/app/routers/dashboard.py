@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
+from app.http_cache import conditional_response
 from app.schemas import KPIMetrics
 from app.services import kpi_service
 
@@ -7,8 +8,9 @@ router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
 @router.get("/kpi", response_model=KPIMetrics)
-def get_kpi_metrics() -> KPIMetrics:
+def get_kpi_metrics(request: Request) -> Response:
     try:
-        return kpi_service.get_kpi()
+        snapshot = kpi_service.get_snapshot()
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return conditional_response(request, snapshot.body, snapshot.etag)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.http_cache import conditional_response
+from app.schemas import ForecastResponse
+from app.services import forecast_service
+
+router = APIRouter(prefix="/api/forecast", tags=["forecast"])
+
+
+@router.get("", response_model=ForecastResponse)
+def get_forecast(
+    request: Request,
+    horizon: int = Query(
+        default=7,
+        ge=forecast_service.MIN_HORIZON,
+        le=forecast_service.MAX_HORIZON,
+        description="Days ahead to forecast",
+    ),
+) -> Response:
+    """
+    Daily ICU/ward demand forecasts for every hospital, plus the network
+    surge probability that feeds the dashboard's `surge_confidence`.
+
+    All hospitals are forecast in one vectorized batch from their recorded
+    occupancy history; the result is cached until hospital data changes or
+    the UTC day rolls over, and supports If-None-Match.
+    """
+    try:
+        snapshot = forecast_service.get_snapshot(horizon)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return conditional_response(request, snapshot.body, snapshot.etag)
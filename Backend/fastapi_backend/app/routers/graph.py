@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.http_cache import conditional_response
+from app.schemas import DiffusionResponse
+from app.services import graph_service
+
+router = APIRouter(prefix="/api/graph", tags=["graph"])
+
+
+@router.get("/diffusion", response_model=DiffusionResponse)
+def get_diffusion(
+    request: Request,
+    include_edges: bool = Query(default=False, description="Include the k-NN graph edges"),
+) -> Response:
+    """
+    Forecast surge probabilities diffused across each hospital's nearest
+    neighbours, so the map shows regional pressure rather than isolated
+    spikes.
+
+    The graph is updated incrementally as hospitals are added and rebuilt
+    when they move; scores are cached until the layout or the forecast
+    changes, and support If-None-Match.
+    """
+    try:
+        snapshot = graph_service.get_snapshot(include_edges)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return conditional_response(request, snapshot.body, snapshot.etag)
@@ -1,22 +1,187 @@
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
 
-from app.schemas import HospitalNode
-from app.services import hospital_service
+from app.http_cache import conditional_response
+from app.schemas import (
+    HospitalCluster,
+    HospitalHistory,
+    HospitalNode,
+    HospitalOccupancyUpdate,
+    NearestHospital,
+    OccupancyIngestResponse,
+)
+from app.services import history_service, hospital_service, hospital_views
+from app.services.cluster_index import parse_bbox
+from app.schemas.hospital import ResourceLevel
+from app.services.occupancy_ingestor import IngestQueueFull, ingestor, parse_updates
 
 router = APIRouter(prefix="/api", tags=["hospitals"])
 
 
 @router.get("/hospitals", response_model=List[HospitalNode])
-def list_hospitals() -> List[HospitalNode]:
+def list_hospitals(
+    request: Request,
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated fields to return, e.g. id,lat,lng,status or occupancy.icu_beds_used",
+    ),
+    format: hospital_views.Encoding = Query(
+        default="json",
+        description="json (array of objects), columns (struct-of-arrays JSON) or msgpack (columns, binary)",
+    ),
+) -> Response:
     """
     List hospitals from the backing service (currently mock JSON-backed).
 
-    Later, hospital_service.list_hospitals() can be updated to pull from a
-    real database or enriched state without changing this router.
+    The body is the snapshot's pre-serialized JSON, so no per-request
+    validation or serialization happens. Later, hospital_service can be
+    updated to pull from a real database or enriched state without changing
+    this router.
+
+    `fields` and `format` shrink the payload for large networks (e.g. map
+    markers only need id,lat,lng,status). `columns` returns
+    `{"count": n, "columns": {field: [values...]}}` with dotted names for
+    nested fields. Each variant is encoded once per data version and has its
+    own ETag. `msgpack` is the `columns` document as MessagePack.
+    """
+    try:
+        selected = hospital_views.parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    try:
+        snapshot = hospital_service.get_view(selected, format)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return conditional_response(
+        request, snapshot.body, snapshot.etag, media_type=hospital_views.MEDIA_TYPES[format]
+    )
+
+
+@router.get("/hospitals/clusters", response_model=List[HospitalCluster])
+def hospital_clusters(
+    bbox: str = Query(description="Viewport as west,south,east,north in degrees (west > east crosses the antimeridian)"),
+    zoom: int = Query(ge=0, le=24, description="Map zoom level; above 16 every hospital is its own marker"),
+) -> Response:
+    """
+    Map markers for a viewport: nearby hospitals are grouped into clusters
+    carrying total ICU/ward beds used/total and the worst status.
+
+    Served from a quadtree cluster index kept alongside the hospital store;
+    occupancy updates adjust cluster totals in place.
+    """
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    try:
+        body = hospital_service.clusters_json(box, zoom)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/hospitals/nearest", response_model=List[NearestHospital])
+def nearest_hospitals(
+    lat: float = Query(ge=-90.0, le=90.0),
+    lng: float = Query(ge=-180.0, le=180.0),
+    k: int = Query(default=5, ge=1, le=100, description="Maximum hospitals to return"),
+    min_icu_free: int = Query(default=0, ge=0, description="Minimum free ICU beds"),
+    oxygen: Optional[ResourceLevel] = Query(default=None, description="Minimum oxygen level"),
+    exclude_id: Optional[str] = Query(default=None, description="Hospital to leave out (e.g. the one in crisis)"),
+) -> List[NearestHospital]:
+    """
+    Nearest hospitals to a point that match the resource filters, nearest
+    first (e.g. 5 nearest with a free ICU bed and oxygen at least MEDIUM).
+
+    Served from the spatial index kept alongside the hospital store; the
+    filters prune index subtrees during the search rather than filtering a
+    full scan.
     """
     try:
-        return hospital_service.list_hospitals()
+        hits = hospital_service.nearest(lat, lng, k, min_icu_free, oxygen, exclude_id)
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return [
+        NearestHospital(
+            distance_km=round(km, 3),
+            icu_beds_free=max(node.occupancy.icu_beds_total - node.occupancy.icu_beds_used, 0),
+            hospital=node,
+        )
+        for node, km in hits
+    ]
+
+
+_NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+@router.post(
+    "/hospitals/occupancy:batch",
+    response_model=OccupancyIngestResponse,
+    status_code=202,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": HospitalOccupancyUpdate.model_json_schema()}
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+            "required": True,
+        }
+    },
+)
+async def ingest_occupancy(request: Request) -> OccupancyIngestResponse:
+    """
+    Accept a batch of live occupancy updates, as a JSON array or as NDJSON
+    (Content-Type: application/x-ndjson, one update per line).
+
+    Updates are queued and applied in micro-batches; a 202 means they were
+    accepted, not yet applied. Responds 400 when an `observed_at` is outside
+    the history window (see HISTORY_RETENTION_DAYS / HISTORY_MAX_SKEW) and
+    429 with Retry-After when the ingest queue is full.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    body = await request.body()
+    try:
+        updates = parse_updates(body, ndjson=content_type in _NDJSON_TYPES)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=jsonable_encoder(exc.errors(include_url=False, include_input=False))) from exc
+    try:
+        history_service.check_observed(updates)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    try:
+        accepted = ingestor.submit(updates)
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=429,
+            detail="Occupancy ingest queue is full; retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    return OccupancyIngestResponse(accepted=accepted, pending=ingestor.pending)
+
+
+@router.get("/hospitals/{hospital_id}/history", response_model=HospitalHistory)
+def hospital_history(
+    hospital_id: str,
+    start: Optional[datetime] = Query(default=None, description="Inclusive; defaults to 24h before end"),
+    end: Optional[datetime] = Query(default=None, description="Exclusive; defaults to now"),
+    resolution: Literal["raw", "5m", "1h", "1d"] = "raw",
+) -> HospitalHistory:
+    """
+    ICU/ward occupancy history for one hospital, recorded from live
+    occupancy updates. `raw` returns every base bucket (HISTORY_INTERVAL
+    seconds); rollups average the observed buckets in UTC-aligned windows.
+    """
+    if hospital_service.get(hospital_id) is None:
+        raise HTTPException(status_code=404, detail="Hospital not found")
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    try:
+        return history_service.history(hospital_id, start, end, resolution)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.services import stream_service
+from app.sse import SSE_HEADERS
+
+router = APIRouter(prefix="/api", tags=["stream"])
+
+
+@router.get("/stream")
+async def stream_updates() -> StreamingResponse:
+    """
+    Server-Sent Events stream of hospital, KPI and pending-action changes.
+
+    The first event (`snapshot`) carries the full state; subsequent `delta`
+    events carry only field-level changes, e.g.
+    `{"seq": 7, "hospitals": {"changed": {"hosp-1": {"occupancy.icu_beds_used": 19}}}}`.
+    """
+    return StreamingResponse(
+        stream_service.hub.subscribe(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
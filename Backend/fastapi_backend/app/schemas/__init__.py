@@ -1,14 +1,63 @@
 from .kpi import KPIMetrics
-from .hospital import HospitalNode
-from .actions import ActionItem, ActionApproveRequest, ActionRejectRequest
-from .advisory import AdvisoryGenerateRequest, AdvisoryDraftResponse
+from .hospital import (
+    HospitalCluster,
+    HospitalHistory,
+    HospitalNode,
+    HospitalOccupancyUpdate,
+    NearestHospital,
+    OccupancyIngestResponse,
+)
+from .actions import (
+    ActionItem,
+    ActionApproveRequest,
+    ActionRejectRequest,
+    ActionBulkItem,
+    ActionBulkRequest,
+    ActionBulkResponse,
+    ActionBulkResult,
+    ActionDeliveryReport,
+    DeliveryLogEntry,
+)
+from .forecast import ForecastResponse, HospitalForecast
+from .allocation import AllocationPlan, AllocationTransfer
+from .graph import DiffusionEdge, DiffusionNode, DiffusionResponse
+from .advisory import (
+    AdvisoryBatchItem,
+    AdvisoryBatchRequest,
+    AdvisoryBatchResult,
+    AdvisoryCacheStats,
+    AdvisoryDraftResponse,
+    AdvisoryGenerateRequest,
+)
 
 __all__ = [
     "KPIMetrics",
     "HospitalNode",
+    "HospitalCluster",
+    "HospitalHistory",
+    "HospitalOccupancyUpdate",
+    "NearestHospital",
+    "OccupancyIngestResponse",
     "ActionItem",
     "ActionApproveRequest",
     "ActionRejectRequest",
+    "ActionBulkItem",
+    "ActionBulkRequest",
+    "ActionBulkResponse",
+    "ActionBulkResult",
+    "ActionDeliveryReport",
+    "DeliveryLogEntry",
+    "AllocationPlan",
+    "AllocationTransfer",
+    "ForecastResponse",
+    "HospitalForecast",
+    "DiffusionEdge",
+    "DiffusionNode",
+    "DiffusionResponse",
     "AdvisoryGenerateRequest",
+    "AdvisoryBatchItem",
+    "AdvisoryBatchRequest",
+    "AdvisoryBatchResult",
     "AdvisoryDraftResponse",
+    "AdvisoryCacheStats",
 ]
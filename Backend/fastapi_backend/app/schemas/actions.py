@@ -1,12 +1,12 @@
 from datetime import datetime
-from typing import Literal, List, Optional
+from typing import Dict, Literal, List, Optional
 
 from pydantic import BaseModel, Field
 
 
 ActionChannel = Literal["SMS", "WHATSAPP", "EMAIL"]
 ActionStatus = Literal["PENDING", "APPROVED", "REJECTED", "SENT", "FAILED"]
-ActionType = Literal["STAFFING", "SUPPLY", "ADVISORY"]
+ActionType = Literal["STAFFING", "SUPPLY", "TRANSFER", "ADVISORY"]
 ActionTarget = Literal["STAFF", "VENDOR", "OFFICIAL", "PUBLIC"]
 
 
@@ -45,3 +45,52 @@ class ActionRejectRequest(BaseModel):
         default=None,
         description="Optional reason for rejection (for audit logs)",
     )
+
+
+class ActionBulkItem(BaseModel):
+    id: str
+    decision: Literal["APPROVE", "REJECT"]
+    message_override: Optional[str] = Field(
+        default=None,
+        description="Optional override text for the final message (APPROVE only)",
+    )
+    reason: Optional[str] = Field(
+        default=None,
+        description="Optional reason for rejection (for audit logs)",
+    )
+
+
+class ActionBulkRequest(BaseModel):
+    items: List[ActionBulkItem] = Field(min_length=1, max_length=1000)
+
+
+class ActionBulkResult(BaseModel):
+    id: str
+    ok: bool
+    action: Optional[ActionItem] = None
+    error: Optional[str] = None
+
+
+class ActionBulkResponse(BaseModel):
+    results: List[ActionBulkResult] = Field(description="One result per request item, in order")
+    approved: int = Field(ge=0)
+    rejected: int = Field(ge=0)
+    failed: int = Field(ge=0)
+
+
+class DeliveryLogEntry(BaseModel):
+    recipient: str
+    attempt: int = Field(ge=1, description="1-based attempt number for this recipient")
+    status: str = Field(description="Provider status for this attempt (e.g. queued, FAILED)")
+    sid: Optional[str] = None
+    error: Optional[str] = None
+    at: datetime
+
+
+class ActionDeliveryReport(BaseModel):
+    action_id: str
+    status: ActionStatus
+    jobs: Dict[str, int] = Field(
+        description="Per-recipient delivery job counts by status (PENDING, IN_FLIGHT, SENT, FAILED)"
+    )
+    log: List[DeliveryLogEntry]
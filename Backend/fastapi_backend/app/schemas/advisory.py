@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -18,6 +18,41 @@ class AdvisoryGenerateRequest(BaseModel):
     )
 
 
+class AdvisoryBatchItem(AdvisoryGenerateRequest):
+    id: Optional[str] = Field(
+        default=None,
+        description="Caller's key for this item (e.g. ward or hospital id), echoed in its result",
+    )
+
+
+class AdvisoryBatchRequest(BaseModel):
+    items: List[AdvisoryBatchItem] = Field(min_length=1, max_length=500)
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Lower the concurrent upstream calls for this batch (capped by ADVISORY_BATCH_CONCURRENCY)",
+    )
+    timeout_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Per-item time limit (capped by ADVISORY_BATCH_TIMEOUT)",
+    )
+
+
+class AdvisoryBatchResult(BaseModel):
+    """
+    One NDJSON line of a batch response, emitted as soon as its item
+    finishes; exactly one of `draft` / `error` is set.
+    """
+
+    index: int = Field(ge=0, description="Position of the item in the request")
+    id: Optional[str] = None
+    ok: bool
+    draft: Optional[str] = None
+    error: Optional[str] = None
+    elapsed_ms: float = Field(ge=0, description="Time spent generating (excluding time queued)")
+
+
 class AdvisoryDraftResponse(BaseModel):
     """
     Response payload containing a generated advisory draft.
@@ -27,3 +62,15 @@ class AdvisoryDraftResponse(BaseModel):
         description="Generated advisory text (may be mock or from OpenAI)",
         min_length=1,
     )
+
+
+class AdvisoryCacheStats(BaseModel):
+    """
+    Counters for the advisory draft cache.
+    """
+
+    hits: int = Field(ge=0, description="Requests served from the cache")
+    misses: int = Field(ge=0, description="Requests that triggered an upstream call")
+    coalesced: int = Field(ge=0, description="Requests that joined an identical in-flight call")
+    evictions: int = Field(ge=0, description="Entries dropped to respect the size limit")
+    size: int = Field(ge=0, description="Entries currently cached")
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+AllocationResource = Literal["PATIENTS", "STAFF", "OXYGEN"]
+
+
+class AllocationTransfer(BaseModel):
+    resource: AllocationResource
+    source_id: str = Field(description="Hospital giving patients, staff or oxygen")
+    target_id: str = Field(description="Hospital receiving them")
+    amount: int = Field(ge=1, description="Patients, nurses or oxygen cylinders")
+    distance_km: float = Field(ge=0.0)
+
+
+class AllocationPlan(BaseModel):
+    """
+    Result of one optimizer run; transfers are also published as PENDING
+    actions (TRANSFER, STAFFING and SUPPLY) when OPTIMIZER_RECIPIENTS is set.
+    """
+
+    generated_at: datetime
+    transfers: List[AllocationTransfer]
+    unmet: Dict[AllocationResource, int] = Field(description="Deficit left uncovered per resource")
+    iterations: Dict[AllocationResource, int] = Field(description="Solver iterations per resource")
+    warm_started: Dict[AllocationResource, bool]
+    actions_written: int = Field(ge=0, description="Actions created, refreshed or superseded")
@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class HospitalForecast(BaseModel):
+    """
+    Daily bed demand forecast for one hospital; entry i of every list is
+    for ForecastResponse.dates[i]. Bounds are an 80% prediction interval.
+    """
+
+    hospital_id: str
+    icu_beds_used: List[float]
+    icu_beds_lower: List[float]
+    icu_beds_upper: List[float]
+    ward_beds_used: List[float]
+    ward_beds_lower: List[float]
+    ward_beds_upper: List[float]
+    surge_probability: float = Field(
+        ge=0.0,
+        le=1.0,
+        description="Probability ICU demand crosses the surge threshold within the surge horizon",
+    )
+
+
+class ForecastResponse(BaseModel):
+    generated_at: datetime
+    horizon_days: int = Field(ge=1)
+    dates: List[date] = Field(description="Forecast days (UTC), starting tomorrow")
+    surge_confidence: float = Field(
+        ge=0.0,
+        le=1.0,
+        description="Probability network-wide ICU demand crosses the surge threshold within the surge horizon",
+    )
+    hospitals: List[HospitalForecast]
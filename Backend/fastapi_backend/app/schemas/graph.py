@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class DiffusionNode(BaseModel):
+    hospital_id: str
+    lat: float
+    lng: float
+    signal: float = Field(ge=0.0, le=1.0, description="Hospital's own forecast surge probability")
+    score: float = Field(ge=0.0, le=1.0, description="Surge signal after diffusion over neighbouring hospitals")
+
+
+class DiffusionEdge(BaseModel):
+    source: str
+    target: str
+    distance_km: float = Field(ge=0.0)
+    weight: float = Field(ge=0.0, le=1.0)
+
+
+class DiffusionResponse(BaseModel):
+    """
+    Surge scores smoothed over the hospital k-nearest-neighbour graph, for
+    the diffusion map.
+    """
+
+    generated_at: datetime
+    k: int = Field(ge=1, description="Neighbours per hospital")
+    kernel_km: float = Field(description="Distance scale of the edge weights")
+    iterations: int = Field(ge=0)
+    nodes: List[DiffusionNode]
+    edges: List[DiffusionEdge] = Field(default_factory=list, description="Present when include_edges=true")
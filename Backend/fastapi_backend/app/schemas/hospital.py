@@ -1,4 +1,5 @@
-from typing import Literal
+from datetime import datetime
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -6,12 +7,15 @@ from pydantic import BaseModel, Field
 HospitalStatus = Literal["NORMAL", "WARNING", "CRITICAL"]
 ResourceLevel = Literal["LOW", "MEDIUM", "HIGH"]
 
+# Upper bound on any bed count; keeps counts within the store's int32 columns.
+MAX_BEDS = 1_000_000
+
 
 class HospitalOccupancy(BaseModel):
-    icu_beds_used: int = Field(ge=0)
-    icu_beds_total: int = Field(ge=0)
-    ward_beds_used: int = Field(ge=0)
-    ward_beds_total: int = Field(ge=0)
+    icu_beds_used: int = Field(ge=0, le=MAX_BEDS)
+    icu_beds_total: int = Field(ge=0, le=MAX_BEDS)
+    ward_beds_used: int = Field(ge=0, le=MAX_BEDS)
+    ward_beds_total: int = Field(ge=0, le=MAX_BEDS)
 
 
 class HospitalResources(BaseModel):
@@ -31,3 +35,71 @@ class HospitalNode(BaseModel):
     occupancy: HospitalOccupancy
     status: HospitalStatus
     resources: HospitalResources
+
+
+class HospitalOccupancyUpdate(BaseModel):
+    """
+    Live bed-count update for one hospital from a facility feed.
+    """
+
+    hospital_id: str = Field(description="HospitalNode.id this update applies to")
+    occupancy: HospitalOccupancy
+    status: Optional[HospitalStatus] = Field(
+        default=None,
+        description="New status; the current status is kept when omitted",
+    )
+    resources: Optional[HospitalResources] = Field(
+        default=None,
+        description="New resource levels; current levels are kept when omitted",
+    )
+    observed_at: Optional[datetime] = Field(
+        default=None,
+        description="When the feed observed these counts (defaults to ingestion time)",
+    )
+
+
+class OccupancyIngestResponse(BaseModel):
+    accepted: int = Field(ge=0, description="Updates accepted from this request")
+    pending: int = Field(ge=0, description="Updates queued and not yet applied (all requests)")
+
+
+class HospitalHistory(BaseModel):
+    """
+    Occupancy history for one hospital in columnar form: entry i of every
+    list describes the bucket starting at timestamps[i]. Rollups report the
+    mean over the observed buckets in each window.
+    """
+
+    hospital_id: str
+    resolution: str = Field(description="raw, 5m, 1h or 1d")
+    interval_seconds: int = Field(description="Width of each returned bucket")
+    timestamps: List[int] = Field(description="Bucket start times (unix seconds, UTC)")
+    icu_beds_used: List[float]
+    icu_beds_total: List[float]
+    ward_beds_used: List[float]
+    ward_beds_total: List[float]
+    samples: List[int] = Field(description="Observed base buckets behind each value")
+
+
+class HospitalCluster(BaseModel):
+    """
+    One map marker at a zoom level: a group of nearby hospitals, or a single
+    hospital (count == 1, hospital_id set) once it has no close neighbours.
+    """
+
+    id: str = Field(description="Hospital id for single hospitals, otherwise the cluster's zoom/x/y cell")
+    lat: float = Field(description="Centroid latitude (exact position for single hospitals)")
+    lng: float = Field(description="Centroid longitude (exact position for single hospitals)")
+    count: int = Field(ge=1, description="Hospitals in the cluster")
+    hospital_id: Optional[str] = None
+    icu_beds_used: int = Field(ge=0)
+    icu_beds_total: int = Field(ge=0)
+    ward_beds_used: int = Field(ge=0)
+    ward_beds_total: int = Field(ge=0)
+    status: HospitalStatus = Field(description="Worst status among the hospitals in the cluster")
+
+
+class NearestHospital(BaseModel):
+    distance_km: float = Field(ge=0.0, description="Great-circle distance from the query point")
+    icu_beds_free: int = Field(ge=0)
+    hospital: HospitalNode
@@ -1,8 +1,23 @@
-from . import kpi_service, hospital_service, actions_service, advisory_service
+from . import (
+    kpi_service,
+    hospital_service,
+    history_service,
+    forecast_service,
+    graph_service,
+    actions_service,
+    allocation_service,
+    advisory_service,
+    stream_service,
+)
 
 __all__ = [
     "kpi_service",
     "hospital_service",
+    "history_service",
+    "forecast_service",
+    "graph_service",
     "actions_service",
+    "allocation_service",
     "advisory_service",
+    "stream_service",
 ]
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.schemas import ActionItem
+from app.schemas.actions import ActionChannel, ActionStatus, ActionTarget, ActionType
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_micros(value: datetime) -> int:
+    """
+    Sortable integer timestamp (UTC microseconds) used for indexed columns.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+@dataclass(frozen=True)
+class ActionQuery:
+    """
+    Server-side filter for listing actions. All fields are ANDed.
+    """
+
+    status: Optional[ActionStatus] = None
+    type: Optional[ActionType] = None
+    target: Optional[ActionTarget] = None
+    channel: Optional[ActionChannel] = None
+    recipient_prefix: Optional[str] = None
+
+
+# Keyset position: (created_at in UTC micros, id) of the last item returned.
+Cursor = Tuple[int, str]
+
+
+def encode_cursor(action: ActionItem) -> str:
+    return encode_position((to_micros(action.created_at), action.id))
+
+
+def encode_position(position: Cursor) -> str:
+    """
+    Opaque cursor for a raw keyset position (as returned by `find_json`).
+    """
+    raw = f"{position[0]}:{position[1]}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Parse an opaque cursor produced by `encode_cursor`; raises ValueError.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created, _, action_id = base64.urlsafe_b64decode(padded).decode("utf-8").partition(":")
+        return int(created), action_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor") from None
+
+
+class ActionRepository(ABC):
+    """
+    Storage interface for ActionItems.
+
+    actions_service only talks to this interface, so the backing store can be
+    swapped (SQLite today, a server database later) without touching routers.
+    """
+
+    @abstractmethod
+    def get(self, action_id: str) -> Optional[ActionItem]:
+        ...
+
+    @abstractmethod
+    def get_many(self, action_ids: Sequence[str]) -> Dict[str, ActionItem]:
+        """
+        Fetch several actions at once; unknown ids are simply absent.
+        """
+
+    def transaction(self) -> ContextManager[Any]:
+        """
+        Group reads and writes so they apply atomically. Implementations
+        without transactions may keep this no-op default.
+        """
+        return nullcontext()
+
+    @abstractmethod
+    def put(self, action: ActionItem) -> None:
+        """
+        Insert or replace an action.
+        """
+
+    @abstractmethod
+    def put_many(self, actions: Iterable[ActionItem]) -> None:
+        """
+        Insert or replace several actions in a single transaction.
+        """
+
+    @abstractmethod
+    def list_by_status(self, status: ActionStatus) -> List[ActionItem]:
+        """
+        Actions in `status`, oldest first (by created_at, then id).
+        """
+
+    @abstractmethod
+    def find(
+        self,
+        query: ActionQuery,
+        limit: Optional[int],
+        after: Optional[Cursor] = None,
+    ) -> List[ActionItem]:
+        """
+        Up to `limit` (all, if None) matching actions ordered by
+        (created_at, id), strictly after the keyset position `after`.
+        """
+
+    def find_json(
+        self,
+        query: ActionQuery,
+        limit: Optional[int],
+        after: Optional[Cursor] = None,
+    ) -> List[Tuple[Cursor, str]]:
+        """
+        Like `find`, but each match as (keyset position, ActionItem JSON).
+        Stores that keep the serialized form override this to return it
+        without validating and re-serializing every row.
+        """
+        return [
+            ((to_micros(a.created_at), a.id), a.model_dump_json()) for a in self.find(query, limit, after)
+        ]
+
+    @abstractmethod
+    def count(self, query: Optional[ActionQuery] = None) -> int:
+        """
+        Number of matching actions (all actions when `query` is None).
+        """
+
+    def close(self) -> None:
+        pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    id          TEXT PRIMARY KEY,
+    type        TEXT NOT NULL,
+    target      TEXT NOT NULL,
+    channel     TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    created_at  INTEGER NOT NULL,
+    updated_at  INTEGER NOT NULL,
+    payload     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_actions_status_created ON actions (status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_actions_type ON actions (type, status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_actions_target ON actions (target, status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_actions_created ON actions (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_actions_channel ON actions (channel, status, created_at, id);
+
+CREATE TABLE IF NOT EXISTS action_recipients (
+    recipient   TEXT NOT NULL,
+    action_id   TEXT NOT NULL REFERENCES actions (id) ON DELETE CASCADE,
+    PRIMARY KEY (recipient, action_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_action_recipients_action ON action_recipients (action_id);
+"""
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the compiled (prepared) form on every call.
+_SQL_GET = "SELECT payload FROM actions WHERE id = ?"
+_SQL_UPSERT = """
+INSERT INTO actions (id, type, target, channel, status, created_at, updated_at, payload)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    type = excluded.type,
+    target = excluded.target,
+    channel = excluded.channel,
+    status = excluded.status,
+    created_at = excluded.created_at,
+    updated_at = excluded.updated_at,
+    payload = excluded.payload
+"""
+_SQL_BY_STATUS = "SELECT payload FROM actions WHERE status = ? ORDER BY created_at, id"
+_SQL_COUNT = "SELECT COUNT(*) FROM actions"
+_SQL_DELETE_RECIPIENTS = "DELETE FROM action_recipients WHERE action_id = ?"
+_SQL_INSERT_RECIPIENT = "INSERT OR IGNORE INTO action_recipients (recipient, action_id) VALUES (?, ?)"
+_SQL_BACKFILL_RECIPIENTS = """
+INSERT OR IGNORE INTO action_recipients (recipient, action_id)
+SELECT j.value, a.id FROM actions AS a, json_each(a.payload, '$.recipients') AS j
+"""
+
+# Upper bound for prefix range scans on the recipient index.
+_PREFIX_SENTINEL = "\U0010ffff"
+
+
+def _where(query: ActionQuery, after: Optional[Cursor]) -> Tuple[str, List[Any]]:
+    """
+    Build a WHERE clause from a fixed set of column predicates. The SQL text
+    depends only on which filters are set, so the statement cache still
+    reuses a handful of prepared statements.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column in ("status", "type", "target", "channel"):
+        value = getattr(query, column)
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if query.recipient_prefix:
+        clauses.append(
+            "id IN (SELECT action_id FROM action_recipients WHERE recipient >= ? AND recipient < ?)"
+        )
+        params.extend([query.recipient_prefix, query.recipient_prefix + _PREFIX_SENTINEL])
+    if after is not None:
+        clauses.append("(created_at, id) > (?, ?)")
+        params.extend(after)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _sql_limit(limit: Optional[int]) -> int:
+    # SQLite treats a negative LIMIT as "no limit".
+    return -1 if limit is None else limit
+
+
+def _row(action: ActionItem) -> tuple:
+    return (
+        action.id,
+        action.type,
+        action.target,
+        action.channel,
+        action.status,
+        to_micros(action.created_at),
+        to_micros(action.updated_at),
+        action.model_dump_json(),
+    )
+
+
+class SqliteActionRepository(ActionRepository):
+    """
+    SQLite-backed action store.
+
+    - File databases run in WAL mode so readers don't block the writer.
+    - Secondary indexes on status/type/target/created_at make pending queries
+      an index range scan instead of a full table scan.
+    - Pass ":memory:" for an ephemeral store (tests).
+
+    A single connection is shared across threads and serialized by a lock;
+    FastAPI runs sync handlers in a threadpool.
+    """
+
+    def __init__(self, path: str) -> None:
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path,
+            check_same_thread=False,
+            isolation_level=None,  # explicit BEGIN/COMMIT via transaction()
+            cached_statements=64,
+        )
+        self._lock = threading.RLock()
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        # Databases created before the recipient index existed.
+        if self._conn.execute("SELECT 1 FROM action_recipients LIMIT 1").fetchone() is None:
+            self._conn.execute(_SQL_BACKFILL_RECIPIENTS)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run several statements atomically. Nested use joins the outer
+        transaction.
+        """
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self._conn
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get(self, action_id: str) -> Optional[ActionItem]:
+        with self._lock:
+            row = self._conn.execute(_SQL_GET, (action_id,)).fetchone()
+        return ActionItem.model_validate_json(row[0]) if row else None
+
+    def get_many(self, action_ids: Sequence[str]) -> Dict[str, ActionItem]:
+        out: Dict[str, ActionItem] = {}
+        ids = list(dict.fromkeys(action_ids))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                sql = f"SELECT payload FROM actions WHERE id IN ({','.join('?' * len(chunk))})"
+                for (payload,) in self._conn.execute(sql, chunk):
+                    action = ActionItem.model_validate_json(payload)
+                    out[action.id] = action
+        return out
+
+    def put(self, action: ActionItem) -> None:
+        self.put_many([action])
+
+    def put_many(self, actions: Iterable[ActionItem]) -> None:
+        actions = list(actions)
+        rows = [_row(a) for a in actions]
+        recipients = [(r, a.id) for a in actions for r in a.recipients]
+        with self.transaction() as conn:
+            conn.executemany(_SQL_UPSERT, rows)
+            conn.executemany(_SQL_DELETE_RECIPIENTS, [(a.id,) for a in actions])
+            conn.executemany(_SQL_INSERT_RECIPIENT, recipients)
+
+    def list_by_status(self, status: ActionStatus) -> List[ActionItem]:
+        with self._lock:
+            rows = self._conn.execute(_SQL_BY_STATUS, (status,)).fetchall()
+        return [ActionItem.model_validate_json(r[0]) for r in rows]
+
+    def find(
+        self,
+        query: ActionQuery,
+        limit: Optional[int],
+        after: Optional[Cursor] = None,
+    ) -> List[ActionItem]:
+        where, params = _where(query, after)
+        sql = f"SELECT payload FROM actions{where} ORDER BY created_at, id LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, _sql_limit(limit))).fetchall()
+        return [ActionItem.model_validate_json(r[0]) for r in rows]
+
+    def find_json(
+        self,
+        query: ActionQuery,
+        limit: Optional[int],
+        after: Optional[Cursor] = None,
+    ) -> List[Tuple[Cursor, str]]:
+        # `payload` is the model_dump_json() of an already-validated item.
+        where, params = _where(query, after)
+        sql = f"SELECT created_at, id, payload FROM actions{where} ORDER BY created_at, id LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, _sql_limit(limit))).fetchall()
+        return [((created, action_id), payload) for created, action_id, payload in rows]
+
+    def count(self, query: Optional[ActionQuery] = None) -> int:
+        if query is None:
+            sql, params = _SQL_COUNT, []
+        else:
+            where, params = _where(query, None)
+            sql = f"SELECT COUNT(*) FROM actions{where}"
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,34 +1,66 @@
 from __future__ import annotations
 
 import json
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, List, Optional, Sequence, Set, Tuple
 
-from app.schemas import ActionItem
-from app.services.twilio_client import TwilioClient, TwilioSendResult
+from app.config import get_settings
+from app.schemas import (
+    ActionBulkItem,
+    ActionBulkResponse,
+    ActionBulkResult,
+    ActionDeliveryReport,
+    ActionItem,
+    DeliveryLogEntry,
+)
+from app.schemas.actions import ActionChannel, ActionStatus, ActionTarget, ActionType
+from app.services.action_repository import (
+    ActionQuery,
+    ActionRepository,
+    SqliteActionRepository,
+    decode_cursor,
+    encode_position,
+)
+from app.services.delivery_queue import TERMINAL_STATUSES, SqliteDeliveryQueue
+from app.services.twilio_client import TwilioClient
 
 _DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 _ACTIONS_FILE = _DATA_DIR / "mock_actions.json"
 
 
-def _load_initial_actions() -> Dict[str, ActionItem]:
+def _load_initial_actions() -> List[ActionItem]:
     if not _ACTIONS_FILE.is_file():
         raise RuntimeError("Actions data file not found")
     raw = _ACTIONS_FILE.read_text(encoding="utf-8")
     data = json.loads(raw)
     if not isinstance(data, list):
         raise RuntimeError("Actions data must be a list")
-    actions = [ActionItem.model_validate(item) for item in data]
-    return {a.id: a for a in actions}
+    return [ActionItem.model_validate(item) for item in data]
 
 
-# Process-lifetime in-memory store; later can be swapped for DB-backed repo.
-_ACTIONS_STORE: Dict[str, ActionItem] = _load_initial_actions()
+def _create_repository() -> ActionRepository:
+    repo = SqliteActionRepository(get_settings().actions_db_path)
+    # First start against an empty database: seed from the mock data file.
+    if repo.count() == 0:
+        repo.put_many(_load_initial_actions())
+    return repo
+
+
+# Persistent action store (SQLite by default); can be replaced in tests.
+_repository: ActionRepository = _create_repository()
+
+# Durable per-recipient delivery queue drained by app.services.delivery_worker.
+_delivery_queue: SqliteDeliveryQueue = SqliteDeliveryQueue(get_settings().delivery_db_path)
 
 # Twilio client used for notifications; can be replaced in tests.
 _twilio_client: TwilioClient = TwilioClient()
 
+# Bumped on every mutation so observers (e.g. the SSE stream) can detect changes.
+_version: int = 0
+_listeners: List[Callable[[], None]] = []
+
 
 def set_twilio_client(client: TwilioClient) -> None:
     """
@@ -40,65 +72,344 @@ def set_twilio_client(client: TwilioClient) -> None:
     _twilio_client = client
 
 
+def get_twilio_client() -> TwilioClient:
+    return _twilio_client
+
+
+def get_delivery_queue() -> SqliteDeliveryQueue:
+    return _delivery_queue
+
+
+def set_delivery_queue(queue: SqliteDeliveryQueue) -> None:
+    """
+    Override the delivery queue (primarily for tests).
+    """
+    global _delivery_queue
+    _delivery_queue = queue
+
+
+def set_repository(repository: ActionRepository) -> None:
+    """
+    Override the action repository (primarily for tests).
+    """
+    global _repository
+    _repository = repository
+    _mark_changed()
+
+
+def add_listener(listener: Callable[[], None]) -> None:
+    """
+    Register a callback invoked (synchronously, possibly from a worker thread)
+    after any action changes state.
+    """
+    _listeners.append(listener)
+
+
+def version() -> int:
+    return _version
+
+
+def _mark_changed() -> None:
+    global _version
+    _version += 1
+    for listener in list(_listeners):
+        listener()
+
+
 def list_pending() -> List[ActionItem]:
-    return [a for a in _ACTIONS_STORE.values() if a.status == "PENDING"]
+    return _repository.list_by_status("PENDING")
+
+
+@dataclass
+class ActionPageJSON:
+    """
+    One page of actions, already serialized as a JSON array.
+    """
+
+    body: bytes
+    total: int
+    next_cursor: Optional[str]
+
+
+def _pending_query(
+    type: Optional[ActionType],
+    target: Optional[ActionTarget],
+    channel: Optional[ActionChannel],
+    recipient_prefix: Optional[str],
+) -> ActionQuery:
+    return ActionQuery(
+        status="PENDING",
+        type=type,
+        target=target,
+        channel=channel,
+        recipient_prefix=recipient_prefix,
+    )
+
+
+def query_pending_json(
+    limit: Optional[int],
+    cursor: Optional[str] = None,
+    type: Optional[ActionType] = None,
+    target: Optional[ActionTarget] = None,
+    channel: Optional[ActionChannel] = None,
+    recipient_prefix: Optional[str] = None,
+) -> ActionPageJSON:
+    """
+    One keyset-paginated page of PENDING actions, filtered server-side, as
+    response-ready JSON bytes.
+
+    - Ordering is (created_at, id); `cursor` is the opaque `next_cursor` of
+      the previous page. Raises ValueError for a malformed cursor.
+    - `limit=None` returns every match after `cursor` as a single page.
+    - `total` is the number of matching actions across all pages, computed
+      with an index-backed COUNT rather than by loading rows.
+
+    Actions are validated when they are stored and the repository keeps
+    their serialized form, so rows are spliced into the array as-is: no
+    model is built, validated or dumped per request.
+    """
+    query = _pending_query(type, target, channel, recipient_prefix)
+    after = decode_cursor(cursor) if cursor else None
+    # Fetch one extra row to know whether another page exists.
+    rows = _repository.find_json(query, None if limit is None else limit + 1, after)
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_position(rows[-1][0])
+    body = ("[" + ",".join(payload for _, payload in rows) + "]").encode("utf-8")
+    return ActionPageJSON(body=body, total=_repository.count(query), next_cursor=next_cursor)
 
 
 def get(action_id: str) -> Optional[ActionItem]:
-    return _ACTIONS_STORE.get(action_id)
+    return _repository.get(action_id)
 
 
-def approve(action_id: str, message_override: Optional[str]) -> ActionItem:
-    existing = _ACTIONS_STORE.get(action_id)
+class ActionStateError(Exception):
+    """
+    Raised when an action is not in the status a transition requires.
+    """
+
+
+def _get_pending(action_id: str) -> ActionItem:
+    existing = _repository.get(action_id)
     if existing is None:
         raise KeyError(action_id)
+    if existing.status != "PENDING":
+        raise ActionStateError(f"Action is {existing.status}, not PENDING")
+    return existing
 
-    message_final = message_override or existing.message_template
-    now = datetime.now(timezone.utc)
-    updated = existing.model_copy(
-        update={
-            "message_final": message_final,
-            "status": "APPROVED",
-            "updated_at": now,
-        }
-    )
-    _ACTIONS_STORE[action_id] = updated
+
+def approve(action_id: str, message_override: Optional[str]) -> ActionItem:
+    """
+    Approve a PENDING action and enqueue one delivery job per recipient.
+
+    The jobs are committed inside the action-store transaction, so an
+    approval is never persisted without its jobs; jobs left behind by a
+    crash before the approval committed are dropped by the delivery worker
+    (see `approved_ids`). Raises KeyError for an unknown id and
+    ActionStateError if the action is not PENDING, so a repeated approval
+    can't send its notifications twice.
+    """
+    with _repository.transaction():
+        existing = _get_pending(action_id)
+        message_final = message_override or existing.message_template
+        now = datetime.now(timezone.utc)
+        updated = existing.model_copy(
+            update={
+                "message_final": message_final,
+                "status": "APPROVED",
+                "updated_at": now,
+            }
+        )
+        _repository.put(updated)
+        _delivery_queue.enqueue(updated.id, updated.recipients, message_final)
+    _mark_changed()
     return updated
 
 
 def reject(action_id: str) -> ActionItem:
-    existing = _ACTIONS_STORE.get(action_id)
-    if existing is None:
-        raise KeyError(action_id)
+    """
+    Reject a PENDING action. Raises KeyError for an unknown id and
+    ActionStateError if the action is not PENDING.
+    """
+    with _repository.transaction():
+        existing = _get_pending(action_id)
+        now = datetime.now(timezone.utc)
+        updated = existing.model_copy(
+            update={
+                "status": "REJECTED",
+                "updated_at": now,
+            }
+        )
+        _repository.put(updated)
+    _mark_changed()
+    return updated
 
+
+def approved_ids(action_ids: Sequence[str]) -> Set[str]:
+    """
+    The subset of `action_ids` that are currently APPROVED.
+    """
+    return {a.id for a in _repository.get_many(action_ids).values() if a.status == "APPROVED"}
+
+
+def bulk_decide(items: Sequence[ActionBulkItem]) -> ActionBulkResponse:
+    """
+    Approve/reject many actions at once.
+
+    - All state transitions are written in a single store transaction, and
+      all approval notifications are enqueued in a single queue transaction
+      committed inside it (delivered in the background like
+      `approve_and_notify`).
+    - Only PENDING actions can be decided in bulk; unknown, non-pending and
+      duplicate ids are reported per item without affecting the others.
+    - Results are returned in request order.
+    """
     now = datetime.now(timezone.utc)
+    results: List[ActionBulkResult] = []
+    updates: List[ActionItem] = []
+    messages: List[Tuple[str, List[str], str]] = []
+    seen: Set[str] = set()
+
+    with _repository.transaction():
+        existing = _repository.get_many([item.id for item in items])
+        for item in items:
+            action = existing.get(item.id)
+            if item.id in seen:
+                results.append(ActionBulkResult(id=item.id, ok=False, error="Duplicate id in request"))
+                continue
+            seen.add(item.id)
+            if action is None:
+                results.append(ActionBulkResult(id=item.id, ok=False, error="Action not found"))
+                continue
+            if action.status != "PENDING":
+                results.append(
+                    ActionBulkResult(id=item.id, ok=False, error=f"Action is {action.status}, not PENDING")
+                )
+                continue
+
+            if item.decision == "APPROVE":
+                message_final = item.message_override or action.message_template
+                updated = action.model_copy(
+                    update={"message_final": message_final, "status": "APPROVED", "updated_at": now}
+                )
+                messages.append((updated.id, updated.recipients, message_final))
+            else:
+                updated = action.model_copy(update={"status": "REJECTED", "updated_at": now})
+            updates.append(updated)
+            results.append(ActionBulkResult(id=item.id, ok=True, action=updated))
+
+        if updates:
+            _repository.put_many(updates)
+        if messages:
+            _delivery_queue.enqueue_many(messages)
+
+    if updates:
+        _mark_changed()
+
+    approved = len(messages)
+    return ActionBulkResponse(
+        results=results,
+        approved=approved,
+        rejected=len(updates) - approved,
+        failed=len(results) - len(updates),
+    )
+
+
+def publish_recommendations(actions: Sequence[ActionItem], id_prefix: str) -> int:
+    """
+    Replace the PENDING actions of one generator (ids starting with
+    `id_prefix`) with a fresh set of recommendations.
+
+    - New ids are inserted; PENDING actions with the same id are refreshed
+      in place (created_at kept), so re-running a generator doesn't pile up
+      duplicates.
+    - Ids that were already decided (approved, rejected, sent) are left
+      alone.
+    - PENDING actions from the prefix that are no longer recommended are
+      REJECTED as superseded.
+
+    Returns the number of actions written.
+    """
+    now = datetime.now(timezone.utc)
+    wanted = {action.id: action for action in actions}
+    updates: List[ActionItem] = []
+    with _repository.transaction():
+        existing = _repository.get_many(list(wanted))
+        for action_id, action in wanted.items():
+            current = existing.get(action_id)
+            if current is None:
+                updates.append(action)
+            elif current.status == "PENDING":
+                if current.message_template != action.message_template or current.recipients != action.recipients:
+                    updates.append(action.model_copy(update={"created_at": current.created_at, "updated_at": now}))
+        for stale in _repository.list_by_status("PENDING"):
+            if stale.id.startswith(id_prefix) and stale.id not in wanted:
+                updates.append(stale.model_copy(update={"status": "REJECTED", "updated_at": now}))
+        if updates:
+            _repository.put_many(updates)
+    if updates:
+        _mark_changed()
+    return len(updates)
+
+
+def mark_delivered(action_id: str) -> Optional[ActionItem]:
+    """
+    Settle an APPROVED action once none of its delivery jobs are outstanding:
+    SENT if every recipient was delivered, FAILED if any exhausted its
+    retries. Returns the updated action, or None if delivery is still in
+    progress (or the action was already settled).
+    """
+    existing = _repository.get(action_id)
+    if existing is None or existing.status != "APPROVED":
+        return None
+    jobs = _delivery_queue.summary(action_id)
+    if any(status not in TERMINAL_STATUSES for status in jobs):
+        return None
+    status: ActionStatus = "FAILED" if jobs.get("FAILED") else "SENT"
     updated = existing.model_copy(
         update={
-            "status": "REJECTED",
-            "updated_at": now,
+            "status": status,
+            "updated_at": datetime.now(timezone.utc),
         }
     )
-    _ACTIONS_STORE[action_id] = updated
+    _repository.put(updated)
+    _mark_changed()
     return updated
 
 
+def delivery_report(action_id: str) -> ActionDeliveryReport:
+    existing = _repository.get(action_id)
+    if existing is None:
+        raise KeyError(action_id)
+    return ActionDeliveryReport(
+        action_id=action_id,
+        status=existing.status,
+        jobs=_delivery_queue.summary(action_id),
+        log=[
+            DeliveryLogEntry(
+                recipient=rec.recipient,
+                attempt=rec.attempt,
+                status=rec.status,
+                sid=rec.sid,
+                error=rec.error,
+                at=datetime.fromtimestamp(rec.at, tz=timezone.utc),
+            )
+            for rec in _delivery_queue.log(action_id)
+        ],
+    )
+
+
 async def approve_and_notify(action_id: str, message_override: Optional[str]) -> ActionItem:
     """
-    Approve an action and attempt to send notifications via Twilio.
+    Approve an action and queue its notifications for background delivery.
 
-    - First updates the in-memory store via `approve`.
-    - Then, for each recipient, calls TwilioClient.send_message in best-effort mode.
-    - Does not currently change the ActionItem status based on Twilio result;
-      the action remains APPROVED regardless of delivery outcome. This can be
-      extended later to track SENT/FAILED states if desired.
+    - `approve` updates the action store and enqueues one durable delivery
+      job per recipient together, then this returns immediately; API
+      latency no longer depends on the SMS provider. Idle delivery workers
+      are woken through the action-change listeners.
+    - Workers in app.services.delivery_worker send the messages with
+      retry/backoff and move the action to SENT or FAILED via
+      `mark_delivered`.
     """
-    updated = approve(action_id, message_override)
-
-    body = updated.message_final or updated.message_template
-    results: List[TwilioSendResult] = []
-    for recipient in updated.recipients:
-        result = await _twilio_client.send_message(recipient, body)
-        results.append(result)
-        # In a more advanced version you might aggregate/report these results.
-
-    return updated
+    return approve(action_id, message_override)
@@ -1,21 +1,57 @@
 from __future__ import annotations
 
-from typing import Optional, Dict, Any
+import asyncio
+import time
+from dataclasses import asdict
+from typing import AsyncIterator, Optional, Sequence
 
-from app.schemas import AdvisoryDraftResponse, AdvisoryGenerateRequest
+from app.config import get_settings
+from app.schemas import (
+    AdvisoryBatchItem,
+    AdvisoryBatchResult,
+    AdvisoryCacheStats,
+    AdvisoryDraftResponse,
+    AdvisoryGenerateRequest,
+)
 from app.services.openai_client import OpenAIClient
+from app.services.response_cache import AsyncTTLCache, canonical_key
 
 _openai_client: OpenAIClient = OpenAIClient()
 
+# Drafts keyed on (model, prompt, context); identical concurrent requests share
+# one upstream call.
+_draft_cache: AsyncTTLCache[str] = AsyncTTLCache(
+    maxsize=get_settings().advisory_cache_size,
+    ttl=get_settings().advisory_cache_ttl,
+)
+
 
 def set_openai_client(client: OpenAIClient) -> None:
     """
     Override the OpenAI client instance (primarily for tests).
 
     In production you typically rely on the default client configured via env vars.
+    Clears the draft cache, since cached drafts came from the previous client.
     """
     global _openai_client
     _openai_client = client
+    _draft_cache.clear()
+
+
+def cache_stats() -> AdvisoryCacheStats:
+    return AdvisoryCacheStats(**asdict(_draft_cache.stats()))
+
+
+def clear_cache() -> None:
+    _draft_cache.clear()
+
+
+def _cache_key(request: AdvisoryGenerateRequest) -> str:
+    return canonical_key(
+        model=_openai_client.settings.openai_model,
+        prompt=request.prompt,
+        context=request.context,
+    )
 
 
 async def generate_draft(request: AdvisoryGenerateRequest) -> AdvisoryDraftResponse:
@@ -25,7 +61,93 @@ async def generate_draft(request: AdvisoryGenerateRequest) -> AdvisoryDraftRespo
     - In dry-run or when OPENAI_API_KEY is missing, this will return a deterministic
       mock draft (handled by OpenAIClient).
     - Otherwise, it will call OpenAI's chat/completions API via OpenAIClient.
+    - Results are cached (LRU + TTL) on a canonical hash of model, prompt and
+      context, and concurrent identical requests are coalesced. A fallback
+      draft from a live client is returned but not cached, so the next
+      request tries OpenAI again.
     """
-    context: Optional[Dict[str, Any]] = request.context if hasattr(request, "context") else None
-    text = await _openai_client.generate_advisory(request.prompt, context)
+    text = await _draft_cache.get_or_compute(
+        _cache_key(request),
+        lambda: _openai_client.generate_advisory(request.prompt, request.context),
+        cacheable=lambda draft: not _openai_client.is_fallback(request.prompt, draft),
+    )
     return AdvisoryDraftResponse(draft=text)
+
+
+async def stream_draft(request: AdvisoryGenerateRequest) -> AsyncIterator[str]:
+    """
+    Yield an advisory draft incrementally (token deltas from OpenAI, or
+    deterministic mock chunks in dry-run).
+
+    A cached draft is yielded at once; a fully streamed draft is stored in
+    the same cache as `generate_draft`, so either endpoint benefits.
+    """
+    key = _cache_key(request)
+    cached = _draft_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    async for delta in _openai_client.stream_advisory(request.prompt, request.context):
+        parts.append(delta)
+        yield delta
+    draft = "".join(parts)
+    if draft and not _openai_client.is_fallback(request.prompt, draft):
+        _draft_cache.put(key, draft)
+
+
+async def _batch_item(
+    index: int,
+    item: AdvisoryBatchItem,
+    slots: asyncio.Semaphore,
+    timeout: float,
+) -> AdvisoryBatchResult:
+    async with slots:
+        start = time.perf_counter()
+        draft = error = None
+        try:
+            draft = (await asyncio.wait_for(generate_draft(item), timeout)).draft
+        except asyncio.TimeoutError:
+            error = f"Timed out after {timeout:g}s"
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+        return AdvisoryBatchResult(
+            index=index,
+            id=item.id,
+            ok=error is None,
+            draft=draft,
+            error=error,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+        )
+
+
+async def generate_batch(
+    items: Sequence[AdvisoryBatchItem],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[AdvisoryBatchResult]:
+    """
+    Generate drafts for many items concurrently, yielding each result as
+    soon as it finishes (completion order, not request order).
+
+    - At most ADVISORY_BATCH_CONCURRENCY upstream calls run at once (or
+      `max_concurrency`, if lower); all share the pooled OpenAI client and
+      the draft cache, so duplicate items cost one call.
+    - Each item gets ADVISORY_BATCH_TIMEOUT seconds (or `timeout`, if
+      lower) once it starts; a timeout or upstream error fails that item
+      only.
+    - If the consumer stops early (client disconnect), unfinished items
+      are cancelled.
+    """
+    settings = get_settings()
+    limit = max(1, min(max_concurrency or settings.advisory_batch_concurrency, settings.advisory_batch_concurrency))
+    budget = min(timeout or settings.advisory_batch_timeout, settings.advisory_batch_timeout)
+    slots = asyncio.Semaphore(limit)
+    tasks = [asyncio.ensure_future(_batch_item(i, item, slots, budget)) for i, item in enumerate(items)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.schemas import ActionItem, HospitalNode
+from app.schemas.actions import ActionTarget, ActionType
+from app.services import actions_service, forecast_service, hospital_service
+from app.services.allocation_engine import round_plan, solve_transport
+from app.services.hospital_table import HospitalTable, code
+from app.services.kdtree import chord_to_km, unit_vectors
+
+logger = logging.getLogger(__name__)
+
+RESOURCES: Tuple[str, ...] = ("PATIENTS", "STAFF", "OXYGEN")
+# Action ids from the optimizer share this prefix so a re-solve can
+# supersede its own pending recommendations.
+ID_PREFIX = "opt-"
+
+_ACTION_KIND: Dict[str, Tuple[ActionType, ActionTarget]] = {
+    "PATIENTS": ("TRANSFER", "OFFICIAL"),
+    "STAFF": ("STAFFING", "STAFF"),
+    "OXYGEN": ("SUPPLY", "OFFICIAL"),
+}
+_SLACK = ""
+
+
+@dataclass(frozen=True)
+class Transfer:
+    resource: str
+    source_id: str
+    target_id: str
+    amount: int
+    distance_km: float
+
+
+@dataclass(frozen=True)
+class AllocationResult:
+    generated_at: datetime
+    forecast_version: str
+    transfers: List[Transfer]
+    unmet: Dict[str, int]
+    iterations: Dict[str, int]
+    warm_started: Dict[str, bool]
+    actions_written: int
+
+
+_lock = threading.Lock()
+# Per resource: sink hospital id -> column dual of the last solve.
+_duals: Dict[str, Dict[str, float]] = {}
+_last: Optional[AllocationResult] = None
+
+
+def _balances(hospitals: HospitalTable, peak: np.ndarray) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    (surplus, deficit) per hospital for every resource, from forecast peak
+    ICU demand and current occupancy/resource levels.
+
+    - PATIENTS: demand above the surge threshold must move out (at most the
+      patients there now); spare beds below the threshold can take them.
+    - STAFF: at OPTIMIZER_PATIENTS_PER_NURSE, a HIGH staff load is short
+      OPTIMIZER_RESOURCE_SHARE of the nurses its peak needs; a LOW load can
+      spare that share of a full ICU's complement.
+    - OXYGEN: likewise in cylinders at OPTIMIZER_OXYGEN_PER_PATIENT, short
+      at LOW oxygen and spare at HIGH.
+    """
+    settings = get_settings()
+    icu_total = hospitals.array("occupancy.icu_beds_total").astype(np.float64)
+    icu_used = hospitals.array("occupancy.icu_beds_used").astype(np.float64)
+    staff = hospitals.array("resources.staff_load")
+    oxygen = hospitals.array("resources.oxygen")
+    share = settings.optimizer_resource_share
+
+    target = settings.forecast_surge_threshold * icu_total
+    patients_out = np.clip(np.ceil(peak - target), 0, icu_used)
+    patients_in = np.clip(np.floor(target - peak), 0, icu_total - icu_used)
+
+    per_nurse = max(settings.optimizer_patients_per_nurse, 1e-9)
+    per_patient = settings.optimizer_oxygen_per_patient
+    high, low = code("resources.staff_load", "HIGH"), code("resources.staff_load", "LOW")
+    staff_short = np.where(staff == high, np.ceil(share * peak / per_nurse), 0.0)
+    staff_spare = np.where(staff == low, np.floor(share * icu_total / per_nurse), 0.0)
+    oxygen_short = np.where(oxygen == low, np.ceil(share * peak * per_patient), 0.0)
+    oxygen_spare = np.where(oxygen == high, np.floor(share * icu_total * per_patient), 0.0)
+    return {
+        "PATIENTS": (patients_out, patients_in),
+        "STAFF": (staff_spare, staff_short),
+        "OXYGEN": (oxygen_spare, oxygen_short),
+    }
+
+
+def _message(resource: str, amount: int, source: HospitalNode, target: HospitalNode, km: float) -> str:
+    route = f"from {source.name} to {target.name} ({km:.0f} km)"
+    if resource == "PATIENTS":
+        return (
+            f"Transfer {amount} ICU patient(s) {route}. {source.name} is forecast above the surge "
+            f"threshold while {target.name} is forecast to have spare ICU beds."
+        )
+    if resource == "STAFF":
+        return f"Redeploy {amount} nurse(s) {route} to cover a projected ICU staffing shortfall at {target.name}."
+    return f"Send {amount} oxygen cylinder(s) {route}; oxygen at {target.name} is LOW against projected ICU demand."
+
+
+def _recipients() -> List[str]:
+    return [r.strip() for r in get_settings().optimizer_recipients.split(",") if r.strip()]
+
+
+def _actions(
+    transfers: List[Transfer], by_id: Dict[str, HospitalNode], recipients: List[str], now: datetime
+) -> List[ActionItem]:
+    day = now.strftime("%Y%m%d")
+    actions = []
+    for t in transfers:
+        action_type, target = _ACTION_KIND[t.resource]
+        source, dest = by_id[t.source_id], by_id[t.target_id]
+        actions.append(
+            ActionItem(
+                id=f"{ID_PREFIX}{day}-{t.resource.lower()}-{t.source_id}-{t.target_id}",
+                type=action_type,
+                target=target,
+                channel="SMS",
+                recipients=recipients,
+                message_template=_message(t.resource, t.amount, source, dest, t.distance_km),
+                status="PENDING",
+                created_at=now,
+                updated_at=now,
+            )
+        )
+    return actions
+
+
+def solve(emit: bool = True) -> AllocationResult:
+    """
+    Plan patient, staff and oxygen transfers for the current forecast and
+    (with `emit`) publish them as PENDING actions, superseding the previous
+    plan's pending recommendations.
+
+    Each resource is a transport problem from hospitals with surplus to
+    hospitals with a deficit, costed by great-circle distance and limited to
+    OPTIMIZER_MAX_TRANSFER_KM, solved with app.services.allocation_engine
+    and warm-started from the previous solve's duals (matched by hospital).
+    The cost matrix is dense in sources x sinks, sized for networks of a
+    few thousand hospitals.
+    """
+    global _last
+    settings = get_settings()
+    forecast = forecast_service.get_forecast(fresh=True)
+    hospitals = hospital_service.get_snapshot().data
+    ids = hospitals.ids
+    position = {hid: i for i, hid in enumerate(forecast.hospital_ids)}
+    rows = np.array([position.get(hid, -1) for hid in ids], dtype=np.int64)
+    horizon = min(max(1, settings.forecast_surge_horizon), forecast_service.MAX_HORIZON)
+    current = hospitals.array("occupancy.icu_beds_used").astype(np.float64)
+    peak = current.copy()
+    if len(rows):
+        forecast_peak = forecast.icu.mean[rows.clip(0), :horizon].max(axis=1, initial=0.0)
+        peak = np.where(rows >= 0, np.maximum(forecast_peak, current), current)
+
+    points = unit_vectors(hospitals.array("lat"), hospitals.array("lng"))
+    max_km = settings.optimizer_max_transfer_km
+    penalty = 2.0 * max_km
+
+    transfers: List[Transfer] = []
+    unmet: Dict[str, int] = {}
+    iterations: Dict[str, int] = {}
+    warm_started: Dict[str, bool] = {}
+    with _lock:
+        for resource, (surplus, deficit) in _balances(hospitals, peak).items():
+            sources, sinks = np.flatnonzero(surplus > 0), np.flatnonzero(deficit > 0)
+            unmet[resource] = int(deficit.sum())
+            iterations[resource] = 0
+            warm_started[resource] = False
+            if not sources.size or not sinks.size:
+                _duals.pop(resource, None)
+                continue
+            # Unit vectors: |a - b|^2 = 2 - 2 a.b
+            chord = np.sqrt(np.clip(2.0 - 2.0 * points[sources] @ points[sinks].T, 0.0, 4.0))
+            km = chord_to_km(chord)
+            cost = np.where(km <= max_km, km, np.inf)
+
+            sink_ids = [ids[j] for j in sinks] + [_SLACK]
+            previous = _duals.get(resource)
+            warm = None
+            if previous:
+                warm = np.array([previous.get(hid, 0.0) for hid in sink_ids])
+                warm_started[resource] = True
+            solution = solve_transport(
+                surplus[sources],
+                deficit[sinks],
+                cost,
+                penalty,
+                epsilon=settings.optimizer_epsilon,
+                warm_start=warm,
+                max_iter=settings.optimizer_max_iter,
+                tol=settings.optimizer_tol,
+            )
+            _duals[resource] = dict(zip(sink_ids, solution.column_dual.tolist()))
+            iterations[resource] = solution.iterations
+
+            moves = round_plan(solution.plan, surplus[sources], deficit[sinks])
+            for i, j, amount in moves:
+                transfers.append(
+                    Transfer(
+                        resource=resource,
+                        source_id=ids[sources[i]],
+                        target_id=ids[sinks[j]],
+                        amount=amount,
+                        distance_km=round(float(km[i, j]), 1),
+                    )
+                )
+            unmet[resource] -= sum(amount for _, _, amount in moves)
+
+    # Only the hospitals named in an action are materialized.
+    endpoints = {hid for t in transfers for hid in (t.source_id, t.target_id)}
+    by_id = {hid: hospitals[i] for i, hid in enumerate(ids) if hid in endpoints}
+    now = datetime.now(timezone.utc)
+    written = 0
+    recipients = _recipients()
+    if emit and not recipients:
+        # Hospitals carry no contact numbers, so there is nobody to notify.
+        logger.warning("OPTIMIZER_RECIPIENTS is not set; allocation actions are not published")
+    elif emit:
+        written = actions_service.publish_recommendations(_actions(transfers, by_id, recipients, now), ID_PREFIX)
+    result = AllocationResult(
+        generated_at=now,
+        forecast_version=forecast.version,
+        transfers=transfers,
+        unmet=unmet,
+        iterations=iterations,
+        warm_started=warm_started,
+        actions_written=written,
+    )
+    with _lock:
+        _last = result
+    return result
+
+
+def last() -> Optional[AllocationResult]:
+    return _last
+
+
+def reset() -> None:
+    """
+    Drop the stored plan and warm-start duals (primarily for tests).
+    """
+    global _last
+    with _lock:
+        _duals.clear()
+        _last = None
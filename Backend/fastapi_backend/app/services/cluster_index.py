@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.schemas import HospitalNode
+from app.schemas.hospital import HospitalStatus
+from app.services.hospital_table import BEDS, STATUSES, HospitalTable
+
+# Zoom levels 0..MAX_ZOOM are clustered; deeper zooms show every hospital.
+MAX_ZOOM = 16
+# A cluster covers one quadtree cell of 2**-CELL_BITS tiles (32 px of a
+# 256 px tile), so markers stay roughly that far apart at every zoom.
+CELL_BITS = 3
+# Cell resolution used to sort the unclustered level. That level is never
+# reduced, so hospitals sharing a cell (or a position) stay separate markers.
+_DEPTH = MAX_ZOOM + CELL_BITS + 1
+_MAX_LAT = 85.05112878  # Web Mercator limit
+
+# Aggregate columns: ICU used/total, ward used/total, then one count per status.
+# Statuses are in increasing severity (the table's code order).
+_STATUS_COLUMN = {status: 4 + i for i, status in enumerate(STATUSES)}
+_WIDTH = 4 + len(STATUSES)
+
+
+@dataclass(frozen=True)
+class BBox:
+    """
+    Viewport in degrees. `west > east` means it crosses the antimeridian.
+    """
+
+    west: float
+    south: float
+    east: float
+    north: float
+
+
+def parse_bbox(text: str) -> BBox:
+    """
+    Parse "west,south,east,north" (degrees); raises ValueError.
+    """
+    parts = text.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be west,south,east,north")
+    try:
+        west, south, east, north = (float(p) for p in parts)
+    except ValueError:
+        raise ValueError("bbox values must be numbers") from None
+    if not (-180.0 <= west <= 180.0 and -180.0 <= east <= 180.0):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+    if not -90.0 <= south <= north <= 90.0:
+        raise ValueError("bbox latitudes must be within [-90, 90] with south <= north")
+    return BBox(west, south, east, north)
+
+
+@dataclass
+class Cluster:
+    """
+    One map marker (see schemas.HospitalCluster).
+    """
+
+    id: str
+    lat: float
+    lng: float
+    count: int
+    hospital_id: Optional[str]
+    icu_beds_used: int
+    icu_beds_total: int
+    ward_beds_used: int
+    ward_beds_total: int
+    status: HospitalStatus
+
+
+def _mercator_x(lng: np.ndarray) -> np.ndarray:
+    return np.asarray(lng, dtype=np.float64) / 360.0 + 0.5
+
+
+def _mercator_y(lat: np.ndarray) -> np.ndarray:
+    sin = np.sin(np.radians(np.clip(np.asarray(lat, dtype=np.float64), -_MAX_LAT, _MAX_LAT)))
+    return 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * math.pi)
+
+
+def _latitude(y: np.ndarray) -> np.ndarray:
+    return np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * y))))
+
+
+def _cells(coord: np.ndarray, bits: int) -> np.ndarray:
+    scale = 1 << bits
+    return np.clip(np.floor(coord * scale), 0, scale - 1).astype(np.int64)
+
+
+def _interleave(v: np.ndarray) -> np.ndarray:
+    """
+    Spread the low 32 bits of each value to the even bit positions.
+    """
+    v = v & 0xFFFFFFFF
+    v = (v | (v << 16)) & 0x0000FFFF0000FFFF
+    v = (v | (v << 8)) & 0x00FF00FF00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F0F0F0F0F
+    v = (v | (v << 2)) & 0x3333333333333333
+    return (v | (v << 1)) & 0x5555555555555555
+
+
+def _contribution(beds: Tuple[int, int, int, int], status: HospitalStatus) -> List[int]:
+    row = [*beds, 0, 0, 0]
+    row[_STATUS_COLUMN[status]] = 1
+    return row
+
+
+class _Level:
+    """
+    Clusters of one zoom level, sorted by quadtree cell (column, then row).
+    Row i of the level is row `offset + i` of the shared aggregate table.
+    """
+
+    __slots__ = ("bits", "offset", "cx", "cy", "lat", "lng", "count", "member")
+
+    def __init__(
+        self,
+        bits: int,
+        offset: int,
+        cx: np.ndarray,
+        cy: np.ndarray,
+        lat: np.ndarray,
+        lng: np.ndarray,
+        count: np.ndarray,
+        member: np.ndarray,
+    ) -> None:
+        self.bits = bits
+        self.offset = offset
+        self.cx, self.cy = cx, cy
+        self.lat, self.lng = lat, lng
+        self.count = count
+        self.member = member  # some member slot (the only one when count == 1)
+
+
+class ClusterIndex:
+    """
+    Hierarchical map clustering over hospital positions.
+
+    Positions are projected to Web Mercator and bucketed into a quadtree:
+    at zoom z every occupied cell of depth z + CELL_BITS is one cluster,
+    and the four cells below it at zoom z + 1 are its children, so the
+    levels nest exactly. Each cluster carries its weighted centroid and
+    ICU/ward bed totals plus a count per status, from which the worst
+    status is read.
+
+    - A viewport query is two binary searches over the level's sorted cell
+      columns plus a vectorised row filter, touching only visible clusters.
+    - Occupancy/status changes add the hospital's delta to the one cluster
+      per level that holds it (a single fancy-indexed add).
+    - Added or moved hospitals change the layout, so the levels are rebuilt
+      on the next query rather than on every write.
+
+    Callers are responsible for locking.
+    """
+
+    def __init__(self) -> None:
+        self.reset(())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def reset(self, nodes: Iterable[HospitalNode]) -> None:
+        self.load(HospitalTable.from_nodes(nodes))
+
+    def load(self, table: HospitalTable) -> None:
+        """
+        Reset to the hospitals in `table`, read column-wise.
+        """
+        size = len(table)
+        self._ids: List[str] = list(table.ids)
+        self._slots: Dict[str, int] = {hid: i for i, hid in enumerate(self._ids)}
+        capacity = max(size, 16)
+        self._positions = np.zeros((capacity, 2))  # (lat, lng)
+        self._contrib = np.zeros((capacity, _WIDTH), dtype=np.int64)
+        if size:
+            self._positions[:size, 0] = table.array("lat")
+            self._positions[:size, 1] = table.array("lng")
+            for column, path in enumerate(BEDS):
+                self._contrib[:size, column] = table.array(path)
+            self._contrib[np.arange(size), 4 + table.array("status").astype(np.intp)] = 1
+        self._levels: List[_Level] = []
+        self._paths = np.zeros((0, MAX_ZOOM + 2), dtype=np.int32)
+        self._agg = np.zeros((0, _WIDTH), dtype=np.int64)
+        self._stale = True
+
+    def upsert(self, node: HospitalNode) -> None:
+        occ = node.occupancy
+        beds = (occ.icu_beds_used, occ.icu_beds_total, occ.ward_beds_used, occ.ward_beds_total)
+        self.put(node.id, node.lat, node.lng, beds, node.status)
+
+    def put(
+        self, hospital_id: str, lat: float, lng: float, beds: Tuple[int, int, int, int], status: HospitalStatus
+    ) -> None:
+        """
+        Insert or update one hospital from plain values; `beds` is ICU
+        used/total then ward used/total.
+        """
+        slot = self._slots.get(hospital_id)
+        if slot is None:
+            slot = len(self._ids)
+            if slot == len(self._contrib):
+                self._positions = np.vstack([self._positions, np.zeros_like(self._positions)])
+                self._contrib = np.vstack([self._contrib, np.zeros_like(self._contrib)])
+            self._ids.append(hospital_id)
+            self._slots[hospital_id] = slot
+            self._stale = True
+        position = self._positions[slot]
+        if position[0] != lat or position[1] != lng:
+            position[:] = (lat, lng)
+            self._stale = True
+        row = np.array(_contribution(beds, status), dtype=np.int64)
+        delta = row - self._contrib[slot]
+        if not delta.any():
+            return
+        self._contrib[slot] = row
+        if not self._stale:
+            self._agg[self._paths[slot]] += delta
+
+    def _build(self) -> None:
+        n = len(self._ids)
+        x, y = _mercator_x(self._positions[:n, 1]), _mercator_y(self._positions[:n, 0])
+        ix, iy = _cells(x, _DEPTH), _cells(y, _DEPTH)
+
+        # In Morton (Z) order every cluster is a contiguous run of the level
+        # below it, so each level is a run-length reduction of the previous
+        # one, from the unclustered level up to zoom 0.
+        morton = _interleave(ix) << 1 | _interleave(iy)
+        order = np.argsort(morton, kind="stable")
+        code = morton[order]
+        cx, cy = ix[order], iy[order]
+        member = order
+        # One contiguous row per quantity: count, x sum, y sum, aggregates.
+        # Values stay far below 2**53, so float sums are exact.
+        totals = np.empty((3 + _WIDTH, n))
+        totals[0] = 1.0
+        totals[1], totals[2] = x[order], y[order]
+        totals[3:] = self._contrib[:n][order].T
+        row_of_slot = np.empty(n, dtype=np.int64)
+        row_of_slot[order] = np.arange(n)
+
+        levels: List[_Level] = []
+        blocks: List[np.ndarray] = []
+        rows: List[np.ndarray] = []
+        for zoom in range(MAX_ZOOM + 1, -1, -1):
+            bits = _DEPTH if zoom > MAX_ZOOM else zoom + CELL_BITS
+            # The unclustered level keeps one row per hospital.
+            if zoom <= MAX_ZOOM:
+                code, cx, cy = code >> 2, cx >> 1, cy >> 1
+                first = np.empty(len(code), dtype=bool)
+                first[:1] = True
+                np.not_equal(code[1:], code[:-1], out=first[1:])
+                starts = np.flatnonzero(first)
+                row_of_slot = (np.cumsum(first) - 1)[row_of_slot]
+                code, cx, cy, member = code[starts], cx[starts], cy[starts], member[starts]
+                totals = np.add.reduceat(totals, starts, axis=1)
+            # Queries scan cell columns, so each level is stored column-major.
+            by_column = np.argsort(cx << bits | cy)
+            rank = np.empty(len(by_column), dtype=np.int64)
+            rank[by_column] = np.arange(len(by_column))
+            level_totals = np.take(totals, by_column, axis=1)
+            count = level_totals[0]
+            levels.append(
+                _Level(
+                    bits,
+                    0,
+                    cx[by_column],
+                    cy[by_column],
+                    _latitude(level_totals[2] / count),
+                    (level_totals[1] / count - 0.5) * 360.0,
+                    count.astype(np.int64),
+                    member[by_column],
+                )
+            )
+            blocks.append(level_totals[3:].T.astype(np.int64))
+            rows.append(rank[row_of_slot])
+
+        levels.reverse()
+        blocks.reverse()
+        rows.reverse()
+        offset = 0
+        for level, block in zip(levels, blocks):
+            level.offset = offset
+            offset += len(block)
+        self._levels = levels
+        self._paths = np.stack([r + level.offset for r, level in zip(rows, levels)], axis=1).astype(np.int32)
+        self._agg = np.concatenate(blocks)
+        self._stale = False
+
+    def query(self, bbox: BBox, zoom: int) -> List[Cluster]:
+        """
+        Clusters at `zoom` whose centroid lies inside `bbox`; zooms beyond
+        MAX_ZOOM return individual hospitals.
+        """
+        if not self._ids:
+            return []
+        if self._stale:
+            self._build()
+        level = self._levels[min(max(zoom, 0), MAX_ZOOM + 1)]
+        y0, y1 = _cells(_mercator_y([bbox.north, bbox.south]), level.bits).tolist()
+        if bbox.west <= bbox.east:
+            spans = [(bbox.west, bbox.east)]
+        else:
+            spans = [(bbox.west, 180.0), (-180.0, bbox.east)]
+        rows: List[np.ndarray] = []
+        for west, east in spans:
+            x0, x1 = _cells(_mercator_x([west, east]), level.bits).tolist()
+            lo = int(np.searchsorted(level.cx, x0, side="left"))
+            hi = int(np.searchsorted(level.cx, x1, side="right"))
+            if lo == hi:
+                continue
+            idx = np.arange(lo, hi)
+            lat, lng, cy = level.lat[lo:hi], level.lng[lo:hi], level.cy[lo:hi]
+            keep = (cy >= y0) & (cy <= y1) & (lat >= bbox.south) & (lat <= bbox.north)
+            keep &= (lng >= west) & (lng <= east)
+            rows.append(idx[keep])
+        if not rows:
+            return []
+        idx = np.concatenate(rows)
+        return self._clusters(level, idx)
+
+    def _clusters(self, level: _Level, idx: np.ndarray) -> List[Cluster]:
+        zoom = level.bits - CELL_BITS
+        count = level.count[idx]
+        member = level.member[idx]
+        single = count == 1
+        # Single hospitals are reported at their exact position.
+        lat = np.where(single, self._positions[member, 0], level.lat[idx])
+        lng = np.where(single, self._positions[member, 1], level.lng[idx])
+        agg = self._agg[idx + level.offset]
+        worst = np.zeros(len(idx), dtype=np.int64)
+        for rank, status in enumerate(STATUSES[1:], start=1):
+            worst[agg[:, _STATUS_COLUMN[status]] > 0] = rank
+        ids = self._ids
+        marker_ids = [
+            ids[m] if one else f"{zoom}/{x}/{y}"
+            for one, m, x, y in zip(single.tolist(), member.tolist(), level.cx[idx].tolist(), level.cy[idx].tolist())
+        ]
+        return [
+            Cluster(marker, la, ln, c, marker if c == 1 else None, iu, it, wu, wt, STATUSES[w])
+            for marker, la, ln, c, (iu, it, wu, wt), w in zip(
+                marker_ids,
+                lat.tolist(),
+                lng.tolist(),
+                count.tolist(),
+                agg[:, :4].tolist(),
+                worst.tolist(),
+            )
+        ]
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS delivery_jobs (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    action_id        TEXT NOT NULL,
+    recipient        TEXT NOT NULL,
+    body             TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at  REAL NOT NULL,
+    last_error       TEXT,
+    created_at       REAL NOT NULL,
+    updated_at       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_delivery_jobs_due ON delivery_jobs (status, next_attempt_at, id);
+CREATE INDEX IF NOT EXISTS ix_delivery_jobs_action ON delivery_jobs (action_id, status);
+
+CREATE TABLE IF NOT EXISTS delivery_log (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id      INTEGER NOT NULL,
+    action_id   TEXT NOT NULL,
+    recipient   TEXT NOT NULL,
+    attempt     INTEGER NOT NULL,
+    status      TEXT NOT NULL,
+    sid         TEXT,
+    error       TEXT,
+    at          REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_delivery_log_action ON delivery_log (action_id, id);
+"""
+
+_SQL_ENQUEUE = """
+INSERT INTO delivery_jobs (action_id, recipient, body, status, next_attempt_at, created_at, updated_at)
+VALUES (?, ?, ?, 'PENDING', ?, ?, ?)
+"""
+_SQL_CLAIM = """
+UPDATE delivery_jobs
+SET status = 'IN_FLIGHT', attempts = attempts + 1, updated_at = ?
+WHERE id IN (
+    SELECT id FROM delivery_jobs
+    WHERE status = 'PENDING' AND next_attempt_at <= ?
+    ORDER BY next_attempt_at, id
+    LIMIT ?
+)
+RETURNING id, action_id, recipient, body, attempts
+"""
+_SQL_FINISH = "UPDATE delivery_jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ?"
+_SQL_RETRY = """
+UPDATE delivery_jobs SET status = 'PENDING', last_error = ?, next_attempt_at = ?, updated_at = ?
+WHERE id = ?
+"""
+_SQL_LOG = """
+INSERT INTO delivery_log (job_id, action_id, recipient, attempt, status, sid, error, at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_SUMMARY = "SELECT status, COUNT(*) FROM delivery_jobs WHERE action_id = ? GROUP BY status"
+_SQL_ACTION_LOG = """
+SELECT recipient, attempt, status, sid, error, at FROM delivery_log
+WHERE action_id = ? ORDER BY id
+"""
+_SQL_REQUEUE_IN_FLIGHT = "UPDATE delivery_jobs SET status = 'PENDING' WHERE status = 'IN_FLIGHT'"
+_SQL_NEXT_DUE = "SELECT MIN(next_attempt_at) FROM delivery_jobs WHERE status = 'PENDING'"
+
+# Job statuses that will never be retried again.
+TERMINAL_STATUSES = frozenset({"SENT", "FAILED"})
+
+
+@dataclass(frozen=True)
+class DeliveryJob:
+    id: int
+    action_id: str
+    recipient: str
+    body: str
+    attempts: int
+
+
+@dataclass(frozen=True)
+class DeliveryAttempt:
+    job: DeliveryJob
+    status: str  # provider status, e.g. "queued" / "QUEUED" / "FAILED"
+    sid: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class DeliveryLogRecord:
+    recipient: str
+    attempt: int
+    status: str
+    sid: Optional[str]
+    error: Optional[str]
+    at: float
+
+
+class SqliteDeliveryQueue:
+    """
+    Durable per-recipient delivery queue with an append-only attempt log.
+
+    Jobs move PENDING -> IN_FLIGHT (claimed by a worker) -> SENT/FAILED, or
+    back to PENDING with a later `next_attempt_at` when a retry is scheduled.
+    Jobs left IN_FLIGHT by a crash are re-queued by `recover()`.
+    """
+
+    def __init__(self, path: str) -> None:
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self._conn
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, action_id: str, recipients: Sequence[str], body: str) -> int:
+        return self.enqueue_many([(action_id, recipients, body)])
+
+    def enqueue_many(self, messages: Sequence[Tuple[str, Sequence[str], str]]) -> int:
+        """
+        Enqueue (action_id, recipients, body) triples in one transaction.
+        Returns the number of jobs created.
+        """
+        now = time.time()
+        rows = [
+            (action_id, r, body, now, now, now)
+            for action_id, recipients, body in messages
+            for r in recipients
+        ]
+        with self._transaction() as conn:
+            conn.executemany(_SQL_ENQUEUE, rows)
+        return len(rows)
+
+    def claim(self, limit: int, now: Optional[float] = None) -> List[DeliveryJob]:
+        """
+        Atomically mark up to `limit` due jobs IN_FLIGHT and return them.
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            rows = conn.execute(_SQL_CLAIM, (now, now, limit)).fetchall()
+        return [DeliveryJob(*row) for row in sorted(rows)]
+
+    def record(
+        self,
+        attempts: Sequence[DeliveryAttempt],
+        retry_at: Dict[int, float],
+    ) -> None:
+        """
+        Log each attempt and settle its job in one transaction: jobs whose id
+        is in `retry_at` go back to PENDING until that time; the rest become
+        SENT or FAILED according to the attempt status.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            for a in attempts:
+                conn.execute(
+                    _SQL_LOG,
+                    (a.job.id, a.job.action_id, a.job.recipient, a.job.attempts, a.status, a.sid, a.error, now),
+                )
+                if a.job.id in retry_at:
+                    conn.execute(_SQL_RETRY, (a.error, retry_at[a.job.id], now, a.job.id))
+                else:
+                    final = "FAILED" if a.status == "FAILED" else "SENT"
+                    conn.execute(_SQL_FINISH, (final, a.error, now, a.job.id))
+
+    def summary(self, action_id: str) -> Dict[str, int]:
+        """
+        Job counts per status for one action.
+        """
+        with self._lock:
+            return dict(self._conn.execute(_SQL_SUMMARY, (action_id,)).fetchall())
+
+    def log(self, action_id: str) -> List[DeliveryLogRecord]:
+        with self._lock:
+            rows = self._conn.execute(_SQL_ACTION_LOG, (action_id,)).fetchall()
+        return [DeliveryLogRecord(*row) for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            return self._conn.execute(_SQL_NEXT_DUE).fetchone()[0]
+
+    def recover(self) -> None:
+        with self._transaction() as conn:
+            conn.execute(_SQL_REQUEUE_IN_FLIGHT)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.services import actions_service
+from app.services.delivery_queue import DeliveryAttempt
+from app.services.notifier import send_many
+
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with "equal jitter": between half and all of
+    min(cap, base * 2 ** (attempts - 1)) seconds.
+    """
+    delay = min(cap, base * (2 ** max(0, attempts - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class DeliveryDispatcher:
+    """
+    Pool of async workers draining actions_service's delivery queue.
+
+    Each worker claims a batch of due jobs, sends them through the pooled,
+    rate-limited Twilio sender, logs every attempt, schedules retries with
+    jittered exponential backoff and finally settles each action to SENT or
+    FAILED. Only failures the provider marks retryable (the message was
+    certainly not accepted) are retried; any other failure is final on the
+    first attempt, so a retry never duplicates an SMS. Idle workers sleep until the next job is due, the poll interval
+    elapses, or an action change wakes them.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def wake(self) -> None:
+        """
+        Nudge idle workers. Safe to call from any thread.
+        """
+        loop, event = self._loop, self._wakeup
+        if loop is None or event is None:
+            return
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass
+
+    async def process_once(self) -> int:
+        """
+        Claim and process a single batch. Returns the number of jobs handled.
+        """
+        settings = get_settings()
+        queue = actions_service.get_delivery_queue()
+        jobs = await asyncio.to_thread(queue.claim, settings.delivery_batch_size)
+        if not jobs:
+            return 0
+
+        # Jobs whose approval never committed (a crash between the queue and
+        # action-store commits) must not be sent.
+        approved = await asyncio.to_thread(actions_service.approved_ids, sorted({job.action_id for job in jobs}))
+        attempts: List[DeliveryAttempt] = [
+            DeliveryAttempt(job=job, status="FAILED", error="Action is not APPROVED")
+            for job in jobs
+            if job.action_id not in approved
+        ]
+        sendable = [job for job in jobs if job.action_id in approved]
+        results = await send_many(
+            actions_service.get_twilio_client(),
+            [(job.recipient, job.body) for job in sendable],
+        )
+
+        retry_at: Dict[int, float] = {}
+        now = time.time()
+        for job, result in zip(sendable, results):
+            failed = result.status == "FAILED"
+            attempts.append(
+                DeliveryAttempt(
+                    job=job,
+                    status=result.status,
+                    sid=result.sid,
+                    error=(result.error or "provider reported FAILED") if failed else None,
+                )
+            )
+            if failed and result.retryable and job.attempts < settings.delivery_max_attempts:
+                retry_at[job.id] = now + backoff_delay(
+                    job.attempts, settings.delivery_backoff_base, settings.delivery_backoff_max
+                )
+        await asyncio.to_thread(queue.record, attempts, retry_at)
+
+        for action_id in sorted({job.action_id for job in jobs}):
+            await asyncio.to_thread(actions_service.mark_delivered, action_id)
+        return len(jobs)
+
+    async def drain(self) -> int:
+        """
+        Process batches until no job is currently due (useful for scripts
+        and tests). Returns the total number of jobs handled.
+        """
+        total = 0
+        while True:
+            handled = await self.process_once()
+            if not handled:
+                return total
+            total += handled
+
+    async def _idle(self) -> None:
+        settings = get_settings()
+        timeout = settings.delivery_poll_interval
+        next_due = await asyncio.to_thread(actions_service.get_delivery_queue().next_due)
+        if next_due is not None:
+            timeout = max(0.0, min(timeout, next_due - time.time()))
+        assert self._wakeup is not None
+        if self._stopping:
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _worker(self) -> None:
+        # The flag, not just cancellation, ends the loop: on Python < 3.12
+        # wait_for() can swallow a cancel that races with the event firing.
+        while not self._stopping:
+            try:
+                handled = await self.process_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep the worker alive; jobs left IN_FLIGHT are recovered
+                # on the next start.
+                handled = 0
+            if not handled:
+                await self._idle()
+
+    def start(self, workers: Optional[int] = None) -> None:
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        actions_service.get_delivery_queue().recover()
+        count = workers if workers is not None else get_settings().delivery_workers
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(count)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+        self._wakeup = None
+
+
+dispatcher = DeliveryDispatcher()
+
+actions_service.add_listener(dispatcher.wake)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# Candidate (alpha, beta, gamma) smoothing parameters. Every series is fitted
+# with all of them at once and keeps the one with the lowest one-step error.
+DEFAULT_GRID: Tuple[Tuple[float, float, float], ...] = (
+    (0.2, 0.05, 0.10),
+    (0.2, 0.15, 0.10),
+    (0.4, 0.05, 0.10),
+    (0.4, 0.15, 0.20),
+    (0.6, 0.05, 0.10),
+    (0.6, 0.15, 0.20),
+    (0.8, 0.05, 0.10),
+    (0.8, 0.15, 0.30),
+)
+
+
+@dataclass(frozen=True)
+class SeriesForecast:
+    """
+    Forecasts for a batch of series: row i of every array is series i.
+    """
+
+    mean: np.ndarray  # (n, horizon)
+    sigma: np.ndarray  # (n, horizon) standard deviation of the forecast error
+    alpha: np.ndarray  # (n,) chosen level smoothing, for diagnostics
+
+
+def forecast_batch(
+    y: np.ndarray,
+    horizon: int,
+    season: int = 7,
+    damping: float = 0.9,
+    holidays: Optional[np.ndarray] = None,
+    future_holidays: Optional[np.ndarray] = None,
+    grid: Sequence[Tuple[float, float, float]] = DEFAULT_GRID,
+    sigma_floor: Optional[np.ndarray] = None,
+    sigma_default: Optional[np.ndarray] = None,
+) -> SeriesForecast:
+    """
+    Damped additive Holt-Winters for many series at once.
+
+    `y` is (n, T): one row per series, one column per period, NaN where
+    nothing was observed (missing points are imputed with the one-step
+    prediction, so they neither move the state nor count as error).
+
+    The recursion runs over time only; each step updates all n series for
+    all grid candidates as (len(grid), n) array operations, so cost grows
+    with T, not with the number of series.
+
+    Holidays: `holidays` (T,) and `future_holidays` (horizon,) flag special
+    days. The mean one-step residual on past holidays is each series'
+    holiday effect and is added to future holidays.
+
+    Error spread is the one-step RMSE, at least `sigma_floor`; series with
+    fewer than two observations use `sigma_default` instead.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n, periods = y.shape
+    params = np.asarray(grid, dtype=np.float64)
+    alpha, beta, gamma = (params[:, i, None] for i in range(3))  # (G, 1)
+    g = len(params)
+
+    observed = ~np.isnan(y)
+    first = np.where(observed.any(axis=1), observed.argmax(axis=1), 0)
+    rows = np.arange(n)
+
+    # Initial seasonal profile: mean deviation from the series mean per phase.
+    initial_season = np.zeros((n, season))
+    if periods >= 2 * season:
+        centred = y - _nanmean(y, axis=1)[:, None]
+        padded = np.full((n, -(-periods // season) * season), np.nan)
+        padded[:, :periods] = centred
+        initial_season = np.nan_to_num(_nanmean(padded.reshape(n, -1, season), axis=1))
+    start = np.nan_to_num(y[rows, first] - initial_season[rows, first % season])
+
+    level = np.broadcast_to(start, (g, n)).copy()
+    trend = np.zeros((g, n))
+    seasonal = np.broadcast_to(initial_season, (g, n, season)).copy()
+    sse = np.zeros((g, n))
+    errors = np.zeros(n)
+    holiday_sum = np.zeros((g, n))
+    holiday_count = np.zeros(n)
+    if holidays is None:
+        holidays = np.zeros(periods, dtype=bool)
+
+    for t in range(periods):
+        s = t % season
+        damped = level + damping * trend
+        predicted = damped + seasonal[:, :, s]
+        seen = observed[:, t]
+        obs = np.where(seen, y[:, t], predicted)
+        err = obs - predicted
+        # The first observation initialises the level; don't score it.
+        scored = seen & (t > first)
+        sse += np.where(scored, err * err, 0.0)
+        errors += scored
+        if holidays[t]:
+            holiday_sum += np.where(scored, err, 0.0)
+            holiday_count += scored
+
+        new_level = alpha * (obs - seasonal[:, :, s]) + (1 - alpha) * damped
+        trend = beta * (new_level - level) + (1 - beta) * damping * trend
+        seasonal[:, :, s] = gamma * (obs - new_level) + (1 - gamma) * seasonal[:, :, s]
+        level = new_level
+
+    best = sse.argmin(axis=0)  # (n,)
+    level, trend, seasonal = level[best, rows], trend[best, rows], seasonal[best, rows]
+    chosen_alpha = params[best, 0]
+
+    steps = np.arange(1, horizon + 1)
+    damp_sum = np.cumsum(damping ** steps)  # phi + phi^2 + ... + phi^k
+    season_idx = (periods + steps - 1) % season
+    mean = level[:, None] + damp_sum[None, :] * trend[:, None] + seasonal[:, season_idx]
+
+    if future_holidays is not None and np.any(future_holidays):
+        effect = np.divide(
+            holiday_sum[best, rows], holiday_count, out=np.zeros(n), where=holiday_count > 0
+        )
+        mean += np.outer(effect, np.asarray(future_holidays, dtype=np.float64))
+
+    residual = np.sqrt(np.divide(sse[best, rows], errors, out=np.zeros(n), where=errors > 0))
+    if sigma_default is not None:
+        residual = np.where(errors > 0, residual, sigma_default)
+    if sigma_floor is not None:
+        residual = np.maximum(residual, sigma_floor)
+    # Error variance of a level-smoothing forecast grows as 1 + (k-1) alpha^2.
+    spread = np.sqrt(1.0 + (steps - 1)[None, :] * chosen_alpha[:, None] ** 2)
+    sigma = residual[:, None] * spread
+
+    return SeriesForecast(mean=np.maximum(mean, 0.0), sigma=sigma, alpha=chosen_alpha)
+
+
+def _nanmean(values: np.ndarray, axis: int) -> np.ndarray:
+    # np.nanmean without the all-NaN RuntimeWarning; empty slices give NaN.
+    seen = ~np.isnan(values)
+    total = np.where(seen, values, 0.0).sum(axis=axis)
+    count = seen.sum(axis=axis)
+    return np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+
+
+def normal_sf(z: np.ndarray) -> np.ndarray:
+    """
+    Survival function 1 - Phi(z) of the standard normal, vectorized
+    (Abramowitz & Stegun 7.1.26 erf approximation, |error| < 1.5e-7).
+    """
+    z = np.asarray(z, dtype=np.float64)
+    x = np.abs(z) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return np.where(z >= 0, 0.5 * (1.0 - erf), 0.5 * (1.0 + erf))
+
+
+def exceedance_probability(mean: np.ndarray, sigma: np.ndarray, limit: np.ndarray) -> np.ndarray:
+    """
+    P(value > limit) for normally distributed forecasts. A zero sigma gives
+    a hard 0/1 answer.
+    """
+    safe = np.where(sigma > 0, sigma, 1.0)
+    z = (limit - mean) / safe
+    return np.where(sigma > 0, normal_sf(z), (mean > limit).astype(np.float64))
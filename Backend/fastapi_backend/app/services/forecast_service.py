@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.schemas import ForecastResponse, HospitalForecast
+from app.services import history_service, hospital_service
+from app.services.forecast_engine import SeriesForecast, exceedance_probability, forecast_batch
+from app.services.hospital_table import HospitalTable
+from app.services.snapshot_cache import Snapshot, make_etag
+
+logger = logging.getLogger(__name__)
+
+# Longest horizon served; shorter requests are prefixes of this forecast.
+MAX_HORIZON = 14
+MIN_HORIZON = 3
+# Two-sided 80% prediction interval.
+_Z80 = 1.2815515655446004
+
+
+@dataclass(frozen=True)
+class NetworkForecast:
+    """
+    MAX_HORIZON-day forecast for every hospital, computed in one batch.
+    """
+
+    version: str
+    generated_at: datetime
+    first_day: date
+    hospital_ids: List[str]
+    icu: SeriesForecast
+    ward: SeriesForecast
+    surge_probability: np.ndarray  # (n,)
+    surge_confidence: float
+
+
+_lock = threading.Lock()
+_forecast: Optional[NetworkForecast] = None
+_bodies: Dict[int, Snapshot[ForecastResponse]] = {}
+_refreshing = False
+
+
+def _holidays() -> FrozenSet[date]:
+    raw = get_settings().forecast_holidays
+    return frozenset(date.fromisoformat(d.strip()) for d in raw.split(",") if d.strip())
+
+
+def _flags(first: date, days: int, holidays: FrozenSet[date]) -> np.ndarray:
+    return np.array([first + timedelta(days=i) in holidays for i in range(days)], dtype=bool)
+
+
+def _compute(version: str, hospitals: HospitalTable, today: date) -> NetworkForecast:
+    settings = get_settings()
+    lookback = max(1, settings.forecast_lookback_days)
+    ids = hospitals.ids
+    first_hist = today - timedelta(days=lookback - 1)
+    epoch_day = (first_hist - date(1970, 1, 1)).days
+
+    daily = history_service.get_store().daily_matrix(ids, epoch_day, lookback)
+    icu_total = hospitals.array("occupancy.icu_beds_total").astype(np.float64)
+    ward_total = hospitals.array("occupancy.ward_beds_total").astype(np.float64)
+    # Today's column is the live value, so hospitals without history still
+    # get a (flat) forecast from their current occupancy.
+    icu = daily["icu_beds_used"]
+    ward = daily["ward_beds_used"]
+    icu[:, -1] = hospitals.array("occupancy.icu_beds_used")
+    ward[:, -1] = hospitals.array("occupancy.ward_beds_used")
+
+    holidays = _holidays()
+    capacity = np.concatenate([icu_total, ward_total])
+    # ICU and ward rows go through the engine as one batch.
+    result = forecast_batch(
+        np.vstack([icu, ward]),
+        MAX_HORIZON,
+        holidays=_flags(first_hist, lookback, holidays),
+        future_holidays=_flags(today + timedelta(days=1), MAX_HORIZON, holidays),
+        sigma_floor=settings.forecast_sigma_floor * capacity,
+        sigma_default=settings.forecast_sigma_cold * capacity,
+    )
+    n = len(hospitals)
+    icu_fc = SeriesForecast(result.mean[:n], result.sigma[:n], result.alpha[:n])
+    ward_fc = SeriesForecast(result.mean[n:], result.sigma[n:], result.alpha[n:])
+
+    horizon = min(max(1, settings.forecast_surge_horizon), MAX_HORIZON)
+    limit = settings.forecast_surge_threshold * icu_total
+    mean, sigma = icu_fc.mean[:, :horizon], icu_fc.sigma[:, :horizon]
+    per_hospital = exceedance_probability(mean, sigma, limit[:, None]).max(axis=1, initial=0.0)
+    per_hospital = np.where(icu_total > 0, per_hospital, 0.0)
+
+    # Network demand: sum of hospital forecasts, errors treated as independent.
+    network = 0.0
+    if icu_total.sum() > 0:
+        network = float(
+            exceedance_probability(
+                mean.sum(axis=0),
+                np.sqrt((sigma**2).sum(axis=0)),
+                settings.forecast_surge_threshold * icu_total.sum(),
+            ).max(initial=0.0)
+        )
+
+    return NetworkForecast(
+        version=version,
+        generated_at=datetime.now(timezone.utc),
+        first_day=today + timedelta(days=1),
+        hospital_ids=ids,
+        icu=icu_fc,
+        ward=ward_fc,
+        surge_probability=per_hospital,
+        surge_confidence=round(network, 4),
+    )
+
+
+def _key(data_version: str, today: date) -> str:
+    return f"{data_version}@{today.isoformat()}"
+
+
+def _install(forecast: NetworkForecast) -> None:
+    # Caller holds _lock.
+    global _forecast
+    _forecast = forecast
+    _bodies.clear()
+
+
+def get_forecast(fresh: bool = False) -> NetworkForecast:
+    """
+    Forecast of the current network, recomputed when the hospital data
+    changes or the UTC day rolls over.
+
+    Occupancy updates change the data version on every micro-batch, so
+    with FORECAST_REFRESH_INTERVAL > 0 a changed network does not block
+    readers: the current forecast is served while a background thread
+    recomputes it, at most once per interval. Only the first forecast (or
+    one after `invalidate`) is computed on the caller's thread, as is any
+    out-of-date forecast when `fresh` is set (explicit operations such as
+    allocation solves).
+    """
+    global _refreshing
+    today = datetime.now(timezone.utc).date()
+    refresh = 0.0 if fresh else get_settings().forecast_refresh_interval
+    data_version = hospital_service.version()
+    with _lock:
+        current = _forecast
+        if current is not None and current.version == _key(data_version, today):
+            return current
+        if current is not None and refresh > 0 and _refreshing:
+            return current
+        if current is not None and refresh > 0:
+            age = (datetime.now(timezone.utc) - current.generated_at).total_seconds()
+            if age >= refresh:
+                _refreshing = True
+                threading.Thread(target=_refresh, args=(current,), name="forecast-refresh", daemon=True).start()
+            return current
+        data_version, hospitals = hospital_service.table()
+        forecast = _compute(_key(data_version, today), hospitals, today)
+        _install(forecast)
+        return forecast
+
+
+def _refresh(previous: NetworkForecast) -> None:
+    global _refreshing
+    try:
+        today = datetime.now(timezone.utc).date()
+        data_version, hospitals = hospital_service.table()
+        forecast = _compute(_key(data_version, today), hospitals, today)
+        with _lock:
+            # Dropped if invalidate() ran meanwhile.
+            if _forecast is previous:
+                _install(forecast)
+    except Exception:
+        logger.exception("Background forecast refresh failed")
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def surge_confidence() -> Tuple[str, float]:
+    """
+    (forecast version, network surge probability) for KPIMetrics.
+    """
+    forecast = get_forecast()
+    return forecast.version, forecast.surge_confidence
+
+
+def invalidate() -> None:
+    global _forecast
+    with _lock:
+        _forecast = None
+        _bodies.clear()
+
+
+def _build(forecast: NetworkForecast, horizon: int) -> ForecastResponse:
+    def rounded(values: np.ndarray) -> List[List[float]]:
+        return np.round(values[:, :horizon], 2).tolist()
+
+    icu, ward = forecast.icu, forecast.ward
+    columns = zip(
+        forecast.hospital_ids,
+        rounded(icu.mean),
+        rounded(np.maximum(icu.mean - _Z80 * icu.sigma, 0.0)),
+        rounded(icu.mean + _Z80 * icu.sigma),
+        rounded(ward.mean),
+        rounded(np.maximum(ward.mean - _Z80 * ward.sigma, 0.0)),
+        rounded(ward.mean + _Z80 * ward.sigma),
+        np.round(forecast.surge_probability, 4).tolist(),
+    )
+    # Values come straight from the engine; skip per-field validation.
+    hospitals = [
+        HospitalForecast.model_construct(
+            hospital_id=hid,
+            icu_beds_used=icu_mean,
+            icu_beds_lower=icu_lo,
+            icu_beds_upper=icu_hi,
+            ward_beds_used=ward_mean,
+            ward_beds_lower=ward_lo,
+            ward_beds_upper=ward_hi,
+            surge_probability=surge,
+        )
+        for hid, icu_mean, icu_lo, icu_hi, ward_mean, ward_lo, ward_hi, surge in columns
+    ]
+    return ForecastResponse.model_construct(
+        generated_at=forecast.generated_at,
+        horizon_days=horizon,
+        dates=[forecast.first_day + timedelta(days=i) for i in range(horizon)],
+        surge_confidence=forecast.surge_confidence,
+        hospitals=hospitals,
+    )
+
+
+def get_snapshot(horizon: int) -> Snapshot[ForecastResponse]:
+    """
+    Serialized forecast response for `horizon` days (MIN_HORIZON to
+    MAX_HORIZON), cached per forecast version.
+    """
+    if not MIN_HORIZON <= horizon <= MAX_HORIZON:
+        raise ValueError(f"horizon must be between {MIN_HORIZON} and {MAX_HORIZON} days")
+    forecast = get_forecast()
+    with _lock:
+        cached = _bodies.get(horizon)
+        if cached is not None and cached.version == forecast.version:
+            return cached
+    response = _build(forecast, horizon)
+    body = response.model_dump_json().encode("utf-8")
+    snapshot = Snapshot(version=forecast.version, data=response, body=body, etag=make_etag(body))
+    with _lock:
+        if _forecast is forecast:
+            _bodies[horizon] = snapshot
+    return snapshot
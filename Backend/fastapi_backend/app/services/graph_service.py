@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.schemas import DiffusionEdge, DiffusionNode, DiffusionResponse
+from app.services import forecast_service, hospital_service
+from app.services.hospital_table import HospitalTable
+from app.services.snapshot_cache import Snapshot, make_etag
+from app.services.spatial_graph import SpatialGraph
+
+
+@dataclass(frozen=True)
+class Diffusion:
+    """
+    Diffused surge scores for one (layout, forecast) version, with the
+    graph's parameters and edges as of that version. The graph itself is
+    updated in place as hospitals are added, so responses are built from
+    this snapshot only, never from the live graph.
+    """
+
+    version: str
+    generated_at: datetime
+    hospital_ids: List[str]
+    lat: np.ndarray
+    lng: np.ndarray
+    signal: np.ndarray
+    scores: np.ndarray
+    iterations: int
+    k: int
+    kernel_km: float
+    # (source, target, distance_km, weight), source < target.
+    edges: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+_lock = threading.Lock()
+_graph: Optional[SpatialGraph] = None
+_layout_version: Optional[str] = None
+_coords: List[Tuple[str, float, float]] = []
+_diffusion: Optional[Diffusion] = None
+_bodies: Dict[bool, Snapshot[DiffusionResponse]] = {}
+
+
+def _sync_graph(version: str, hospitals: HospitalTable) -> SpatialGraph:
+    """
+    Bring the graph up to date with the hospital layout. Hospitals appended
+    since the last sync are inserted incrementally; any other change (moves,
+    removals, a reseed) rebuilds it. Must be called with `_lock` held.
+    """
+    global _graph, _layout_version, _coords
+    if _graph is not None and version == _layout_version:
+        return _graph
+    coords = list(zip(hospitals.ids, hospitals.array("lat").tolist(), hospitals.array("lng").tolist()))
+    settings = get_settings()
+    known = len(_coords)
+    if _graph is not None and len(coords) > known and coords[:known] == _coords:
+        for _, lat, lng in coords[known:]:
+            _graph.add(lat, lng)
+    else:
+        _graph = SpatialGraph(
+            np.array([c[1] for c in coords]),
+            np.array([c[2] for c in coords]),
+            k=settings.graph_k,
+            kernel_km=settings.graph_kernel_km or None,
+        )
+    _layout_version = version
+    _coords = coords
+    return _graph
+
+
+def get_graph() -> SpatialGraph:
+    version, hospitals = hospital_service.layout()
+    with _lock:
+        return _sync_graph(version, hospitals)
+
+
+def get_diffusion() -> Diffusion:
+    """
+    Forecast surge probabilities diffused over the hospital k-NN graph,
+    recomputed only when the layout or the forecast changes.
+    """
+    global _diffusion
+    layout_version, hospitals = hospital_service.layout()
+    forecast = forecast_service.get_forecast()
+    version = f"{layout_version}/{forecast.version}"
+    with _lock:
+        if _diffusion is not None and _diffusion.version == version:
+            return _diffusion
+        graph = _sync_graph(layout_version, hospitals)
+        position = {hid: i for i, hid in enumerate(forecast.hospital_ids)}
+        rows = np.array([position.get(hid, -1) for hid in hospitals.ids], dtype=np.int64)
+        signal = np.where(rows >= 0, forecast.surge_probability[rows], 0.0) if len(rows) else np.zeros(0)
+        settings = get_settings()
+        scores, iterations = graph.diffuse(
+            signal,
+            alpha=settings.graph_diffusion_alpha,
+            max_iter=settings.graph_diffusion_max_iter,
+            tol=settings.graph_diffusion_tol,
+        )
+        source, target, km = graph.edges()
+        _diffusion = Diffusion(
+            version=version,
+            generated_at=datetime.now(timezone.utc),
+            hospital_ids=hospitals.ids,
+            lat=hospitals.array("lat"),
+            lng=hospitals.array("lng"),
+            signal=signal,
+            scores=np.clip(scores, 0.0, 1.0),
+            iterations=iterations,
+            k=graph.k,
+            kernel_km=graph.kernel_km,
+            edges=(source, target, km, graph.weights(km)),
+        )
+        _bodies.clear()
+        return _diffusion
+
+
+def invalidate() -> None:
+    global _graph, _layout_version, _coords, _diffusion
+    with _lock:
+        _graph = None
+        _layout_version = None
+        _coords = []
+        _diffusion = None
+        _bodies.clear()
+
+
+def _build(diffusion: Diffusion, include_edges: bool) -> DiffusionResponse:
+    ids = diffusion.hospital_ids
+    nodes = [
+        DiffusionNode.model_construct(hospital_id=hid, lat=lat, lng=lng, signal=signal, score=score)
+        for hid, lat, lng, signal, score in zip(
+            ids,
+            diffusion.lat.tolist(),
+            diffusion.lng.tolist(),
+            np.round(diffusion.signal, 4).tolist(),
+            np.round(diffusion.scores, 4).tolist(),
+        )
+    ]
+    edges: List[DiffusionEdge] = []
+    if include_edges:
+        source, target, km, weight = diffusion.edges
+        edges = [
+            DiffusionEdge.model_construct(source=ids[s], target=ids[t], distance_km=d, weight=w)
+            for s, t, d, w in zip(
+                source.tolist(),
+                target.tolist(),
+                np.round(km, 2).tolist(),
+                np.round(weight, 4).tolist(),
+            )
+        ]
+    return DiffusionResponse.model_construct(
+        generated_at=diffusion.generated_at,
+        k=diffusion.k,
+        kernel_km=round(diffusion.kernel_km, 2),
+        iterations=diffusion.iterations,
+        nodes=nodes,
+        edges=edges,
+    )
+
+
+def get_snapshot(include_edges: bool = False) -> Snapshot[DiffusionResponse]:
+    """
+    Serialized diffusion response, cached per version; edges are optional
+    because they dominate the payload on large networks.
+    """
+    diffusion = get_diffusion()
+    with _lock:
+        cached = _bodies.get(include_edges)
+        if cached is not None and cached.version == diffusion.version:
+            return cached
+    response = _build(diffusion, include_edges)
+    body = response.model_dump_json().encode("utf-8")
+    snapshot = Snapshot(version=diffusion.version, data=response, body=body, etag=make_etag(body))
+    with _lock:
+        if _diffusion is diffusion:
+            _bodies[include_edges] = snapshot
+    return snapshot
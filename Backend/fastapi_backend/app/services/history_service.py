@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.config import get_settings
+from app.schemas import HospitalHistory, HospitalOccupancyUpdate
+from app.services.timeseries_store import COLUMNS, OccupancySeriesStore
+
+# Rollup windows accepted by the history API, in seconds.
+RESOLUTIONS: Dict[str, Optional[int]] = {"raw": None, "5m": 300, "1h": 3600, "1d": 86400}
+
+_DAY = 86_400
+
+_store = OccupancySeriesStore(
+    get_settings().history_dir,
+    interval=get_settings().history_interval,
+    retention=get_settings().history_retention_days * _DAY,
+)
+
+
+def get_store() -> OccupancySeriesStore:
+    return _store
+
+
+def set_store(store: OccupancySeriesStore) -> None:
+    """
+    Override the history store (primarily for tests).
+    """
+    global _store
+    _store = store
+
+
+def observed_window(now: float) -> Tuple[float, float]:
+    """
+    (earliest, latest) observed_at accepted at receive time `now`: back to
+    the retention window and up to HISTORY_MAX_SKEW seconds ahead.
+    """
+    settings = get_settings()
+    return now - settings.history_retention_days * _DAY, now + settings.history_max_skew
+
+
+def check_observed(updates: Sequence[HospitalOccupancyUpdate], received_at: Optional[float] = None) -> None:
+    """
+    Raise ValueError if any update's observed_at is outside observed_window.
+    """
+    earliest, latest = observed_window(time.time() if received_at is None else received_at)
+    for i, update in enumerate(updates):
+        if update.observed_at is not None and not earliest <= _epoch(update.observed_at) <= latest:
+            raise ValueError(
+                f"Update {i} ({update.hospital_id}): observed_at must be within "
+                f"{get_settings().history_retention_days} days before and "
+                f"{get_settings().history_max_skew:g}s after now"
+            )
+
+
+def record(updates: Sequence[HospitalOccupancyUpdate], received_at: Optional[float] = None) -> int:
+    """
+    Append occupancy updates to history. Updates without `observed_at` are
+    stamped with `received_at` (default: now); those observed outside
+    observed_window are skipped. Returns the number recorded.
+    """
+    now = time.time() if received_at is None else received_at
+    earliest, latest = observed_window(now)
+    points = (
+        (
+            u.hospital_id,
+            (
+                _epoch(u.observed_at) if u.observed_at is not None else now,
+                u.occupancy.icu_beds_used,
+                u.occupancy.icu_beds_total,
+                u.occupancy.ward_beds_used,
+                u.occupancy.ward_beds_total,
+            ),
+        )
+        for u in updates
+    )
+    return _store.append_many(p for p in points if earliest <= p[1][0] <= latest)
+
+
+def _epoch(value: datetime) -> float:
+    # Naive datetimes are taken as UTC, like the rest of the API.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def history(hospital_id: str, start: datetime, end: datetime, resolution: str) -> HospitalHistory:
+    """
+    Occupancy history for one hospital in [start, end), raw or rolled up.
+
+    Raises ValueError for an unknown resolution or a range that would return
+    more than HISTORY_MAX_POINTS points.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+    window = RESOLUTIONS[resolution]
+    step = window or _store.interval
+    t0, t1 = _epoch(start), _epoch(end)
+    if t1 <= t0:
+        raise ValueError("end must be after start")
+    if (t1 - t0) / step > get_settings().history_max_points:
+        raise ValueError("Range too large for this resolution; use a coarser rollup")
+
+    result = _store.query(hospital_id, t0, t1, window)
+    return HospitalHistory(
+        hospital_id=hospital_id,
+        resolution=resolution,
+        interval_seconds=result.interval,
+        timestamps=result.timestamps.tolist(),
+        samples=result.samples.tolist(),
+        **{name: result.values[name].tolist() for name in COLUMNS},
+    )
@@ -1,28 +1,330 @@
 from __future__ import annotations
 
 import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from app.schemas import HospitalNode
+from pydantic import TypeAdapter
+
+from app import metrics
+from app.schemas import HospitalNode, HospitalOccupancyUpdate, KPIMetrics
+from app.services import history_service, hospital_views
+from app.services.cluster_index import BBox, Cluster
+from app.services.hospital_store import HospitalStore
+from app.services.hospital_table import HospitalTable, leaf_values
+from app.services.snapshot_cache import Snapshot, SnapshotCache, make_etag
 
 _DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 _HOSPITALS_FILE = _DATA_DIR / "mock_hospitals.json"
 
+_CLUSTER_LIST = TypeAdapter(List[Cluster])
 
-def list_hospitals() -> List[HospitalNode]:
-    """
-    Load HospitalNode list from the mock data file.
-
-    Later this can be replaced with DB-backed queries and additional
-    enrichment (e.g. joining with forecast signals).
-    """
-    if not _HOSPITALS_FILE.is_file():
-        raise RuntimeError("Hospitals data file not found")
 
-    raw = _HOSPITALS_FILE.read_text(encoding="utf-8")
+def _parse_hospitals(raw: bytes) -> HospitalTable:
     data = json.loads(raw)
     if not isinstance(data, list):
         raise RuntimeError("Hospitals data must be a list")
+    # Validated nodes only live until they are packed into columns.
+    return HospitalTable.from_nodes(HospitalNode.model_validate(item) for item in data)
+
+
+def _file_cache(path: Path) -> SnapshotCache[HospitalTable]:
+    return SnapshotCache(
+        path,
+        parse=_parse_hospitals,
+        serialize=HospitalTable.dump_json,
+        missing_message="Hospitals data file not found",
+        name="hospitals_file",
+    )
+
+
+_cache: SnapshotCache[HospitalTable] = _file_cache(_HOSPITALS_FILE)
+
+# Live network state: seeded from the data file, then updated in place.
+# A change to the file itself (mtime/size) reseeds the store.
+_lock = threading.RLock()
+_store = HospitalStore()
+_file_version: Optional[str] = None
+_seed_store_version = 0
+_snapshot: Optional[Snapshot[HospitalTable]] = None
+_listeners: List[Callable[[], None]] = []
+
+# Projected/encoded variants of the current snapshot, keyed by (fields,
+# encoding) and dropped whenever the data version changes. Bounded because
+# the key comes from the query string.
+_VIEW_CACHE_SIZE = 32
+_views_lock = threading.Lock()
+_views: "OrderedDict[Tuple[Optional[Tuple[str, ...]], str], Snapshot[HospitalTable]]" = OrderedDict()
+_views_version: Optional[str] = None
+
+
+def add_listener(listener: Callable[[], None]) -> None:
+    """
+    Register a callback invoked (synchronously, outside the store lock)
+    after live updates change the network.
+    """
+    _listeners.append(listener)
+
+
+def _notify() -> None:
+    for listener in list(_listeners):
+        listener()
+
+
+def _sync() -> Snapshot[HospitalTable]:
+    """
+    Reseed the store if the data file changed; return the file snapshot.
+    Must be called with `_lock` held.
+    """
+    global _file_version, _seed_store_version
+    file_snapshot = _cache.get()
+    if file_snapshot.version != _file_version:
+        _store.load(file_snapshot.data)
+        _file_version = file_snapshot.version
+        _seed_store_version = _store.version
+    return file_snapshot
+
+
+def _version(file_snapshot: Snapshot) -> str:
+    return f"{file_snapshot.version}.{_store.version}"
 
-    return [HospitalNode.model_validate(item) for item in data]
+
+def get_snapshot() -> Snapshot[HospitalTable]:
+    """
+    Return the current validated hospital snapshot.
+
+    `data` is a columnar HospitalTable: a Sequence of HospitalNode that
+    only builds models for the rows it is indexed or iterated for, so
+    prefer its columns for network-wide work.
+
+    Serialization happens at most once per data version; while the network
+    is exactly the data file's contents, the file snapshot's pre-serialized
+    body is reused as-is.
+    """
+    global _snapshot
+    with _lock:
+        file_snapshot = _sync()
+        version = _version(file_snapshot)
+        if _snapshot is not None and _snapshot.version == version:
+            metrics.record_cache("hospitals", hit=True)
+            return _snapshot
+        metrics.record_cache("hospitals", hit=False)
+        if _store.version == _seed_store_version:
+            data, body, etag = file_snapshot.data, file_snapshot.body, file_snapshot.etag
+        else:
+            data = _store.table()
+            body = data.dump_json()
+            etag = make_etag(body)
+        _snapshot = Snapshot(version=version, data=data, body=body, etag=etag)
+        return _snapshot
+
+
+def get_view(
+    fields: Optional[Tuple[str, ...]] = None,
+    encoding: hospital_views.Encoding = "json",
+) -> Snapshot[HospitalTable]:
+    """
+    The current snapshot restricted to `fields` (leaf paths from
+    hospital_views.parse_fields; None for all) in `encoding`.
+
+    Each variant is encoded at most once per data version and shares the
+    snapshot's table; the plain full JSON view is the snapshot
+    itself.
+    """
+    global _views_version
+    snapshot = get_snapshot()
+    if fields is None and encoding == "json":
+        return snapshot
+    key = (fields, encoding)
+    with _views_lock:
+        if _views_version != snapshot.version:
+            _views.clear()
+            _views_version = snapshot.version
+        view = _views.get(key)
+        metrics.record_cache("hospital_views", hit=view is not None)
+        if view is not None:
+            _views.move_to_end(key)
+            return view
+        body = hospital_views.encode(snapshot.data, fields, encoding)
+        view = Snapshot(version=snapshot.version, data=snapshot.data, body=body, etag=make_etag(body))
+        _views[key] = view
+        if len(_views) > _VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+        return view
+
+
+def version() -> str:
+    """
+    Current data version (changes on file reloads and live updates).
+    """
+    with _lock:
+        return _version(_sync())
+
+
+def invalidate() -> None:
+    """
+    Force the next read to reload hospitals from disk, discarding live
+    updates.
+    """
+    global _file_version
+    with _lock:
+        _cache.invalidate()
+        _file_version = None
+
+
+def set_data_file(path: Optional[Path]) -> None:
+    """
+    Seed hospitals from `path` instead of the bundled mock file (None
+    restores it), discarding live updates (primarily for tests and
+    benchmarks).
+    """
+    global _cache, _file_version
+    with _lock:
+        _cache = _file_cache(path or _HOSPITALS_FILE)
+        _file_version = None
+
+
+def table() -> Tuple[str, HospitalTable]:
+    """
+    (data version, hospitals) without serializing them, for computations
+    over the current network.
+    """
+    with _lock:
+        file_snapshot = _sync()
+        return _version(file_snapshot), _store.table()
+
+
+def layout() -> Tuple[str, HospitalTable]:
+    """
+    (layout version, hospitals). The layout version only changes when hospitals
+    are added or moved, so position-derived structures can be cached on it
+    across occupancy updates.
+    """
+    with _lock:
+        file_snapshot = _sync()
+        return f"{file_snapshot.version}.{_store.layout_version}", _store.table()
+
+
+def get(hospital_id: str) -> Optional[HospitalNode]:
+    with _lock:
+        _sync()
+        return _store.get(hospital_id)
+
+
+def nearest(
+    lat: float,
+    lng: float,
+    k: int,
+    min_icu_free: int = 0,
+    min_oxygen: Optional[str] = None,
+    exclude: Optional[str] = None,
+) -> List[Tuple[HospitalNode, float]]:
+    """
+    Up to k (hospital, distance km) pairs nearest to (lat, lng) that have at
+    least `min_icu_free` free ICU beds and oxygen at or above `min_oxygen`.
+    Filters are applied inside the spatial index traversal.
+    """
+    with _lock:
+        _sync()
+        hits = _store.index.nearest(lat, lng, k, min_icu_free, min_oxygen, exclude)
+        return [(_store.get(hospital_id), km) for hospital_id, km in hits]
+
+
+def clusters(bbox: BBox, zoom: int) -> List[Cluster]:
+    """
+    Map markers for the viewport `bbox` at `zoom`: clusters of nearby
+    hospitals with summed bed counts and their worst status.
+    """
+    with _lock:
+        _sync()
+        return _store.clusters.query(bbox, zoom)
+
+
+def clusters_json(bbox: BBox, zoom: int) -> bytes:
+    """
+    `clusters` serialized as a JSON array of HospitalCluster objects.
+    """
+    return _CLUSTER_LIST.dump_json(clusters(bbox, zoom))
+
+
+def upsert_hospitals(nodes: Iterable[HospitalNode]) -> int:
+    """
+    Insert or replace hospitals in the live store. KPI totals are updated
+    incrementally (O(1) per hospital). Returns the number written.
+    """
+    with _lock:
+        _sync()
+        written = _store.upsert_many(nodes)
+    if written:
+        _notify()
+    return written
+
+
+@dataclass
+class OccupancyApplyResult:
+    applied: int
+    unknown: List[str]
+
+
+def apply_occupancy_updates(updates: Sequence[HospitalOccupancyUpdate]) -> OccupancyApplyResult:
+    """
+    Apply a micro-batch of occupancy updates in one pass.
+
+    Updates for the same hospital are coalesced (last one wins), the store
+    and KPI aggregates are written under a single lock acquisition, and the
+    data version is bumped once for the whole batch. Every update for a
+    known hospital (not only the last) is appended to occupancy history.
+    Updates for unknown hospital ids are skipped and reported. Fields are
+    written straight into the store's columns; no HospitalNode is built.
+    """
+    latest: Dict[str, HospitalOccupancyUpdate] = {}
+    for update in updates:
+        latest[update.hospital_id] = update
+
+    unknown: List[str] = []
+    with _lock:
+        _sync()
+        changes: List[Tuple[str, Dict[str, Any]]] = []
+        rows = _store.rows(list(latest))
+        for (hospital_id, update), row in zip(latest.items(), rows.tolist()):
+            if row < 0:
+                unknown.append(hospital_id)
+                continue
+            values = leaf_values(update.occupancy, "occupancy.")
+            if update.status is not None:
+                values["status"] = update.status
+            if update.resources is not None:
+                values.update(leaf_values(update.resources, "resources."))
+            changes.append((hospital_id, values))
+        written = _store.update_many(changes)
+    skipped = set(unknown)
+    history_service.record([u for u in updates if u.hospital_id not in skipped])
+    if written:
+        _notify()
+    return OccupancyApplyResult(applied=written, unknown=unknown)
+
+
+def kpi_metrics(surge_confidence: float) -> Tuple[str, KPIMetrics]:
+    """
+    Network KPIs derived from the running aggregates, with the data version
+    they correspond to.
+    """
+    with _lock:
+        file_snapshot = _sync()
+        return _version(file_snapshot), _store.kpi.metrics(surge_confidence)
+
+
+def list_hospitals() -> List[HospitalNode]:
+    """
+    List hospitals from the live store (seeded from the mock data file),
+    materialized as HospitalNode models.
+
+    Parsing and validation happen once per file version; subsequent calls are
+    served from the in-memory snapshot. Later this can be replaced with
+    DB-backed queries and additional enrichment (e.g. joining with forecast
+    signals).
+    """
+    return list(get_snapshot().data)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.schemas import HospitalNode
+from app.services.cluster_index import ClusterIndex
+from app.services.hospital_table import BEDS, FIELDS, LEVELS, STATUSES, HospitalTable, leaf_values, to_column
+from app.services.kpi_aggregator import KPIAggregator
+from app.services.spatial_index import HospitalIndex
+
+_MIN_CAPACITY = 16
+
+
+class HospitalStore:
+    """
+    Mutable in-memory hospital network with an attached KPI aggregator,
+    spatial index and map cluster index, all maintained on every write.
+
+    Hospitals are rows of one NumPy column per leaf field (see
+    hospital_table), with no per-hospital Python objects: `_order` holds
+    the rows sorted by id, so an id lookup is a binary search. Rows never
+    move; new hospitals are appended. `table()` publishes the current rows
+    as a read-only HospitalTable sharing the columns, and the next write
+    copies them first, so a published table never changes underneath its
+    readers.
+
+    `version` increases on every mutation so readers can cache anything
+    derived from the store (serialized bodies, KPIs, indexes) per version.
+    `layout_version` only increases when hospitals are added or move, for
+    caches that depend on positions alone (spatial graph and indexes).
+    Callers are responsible for locking.
+    """
+
+    def __init__(self) -> None:
+        self.kpi = KPIAggregator()
+        self.index = HospitalIndex()
+        self.clusters = ClusterIndex()
+        self.version = 0
+        self.layout_version = 0
+        self._adopt(HospitalTable.from_nodes(()))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held by the columns (including spare capacity) and id index.
+        """
+        return sum(values.nbytes for values in self._columns.values()) + self._order.nbytes
+
+    def _adopt(self, table: HospitalTable) -> None:
+        self._columns: Dict[str, np.ndarray] = {path: table.array(path) for path in FIELDS}
+        self._size = len(table)
+        self._order = np.argsort(self._columns["id"], kind="stable").astype(np.int32)
+        self._table: Optional[HospitalTable] = table
+
+    def load(self, table: HospitalTable) -> None:
+        """
+        Replace the network with `table`; for a repeated id the last row wins.
+        """
+        _, last = np.unique(table.array("id")[::-1], return_index=True)
+        if len(last) < len(table):
+            table = table.take(np.sort(len(table) - 1 - last))
+        self._adopt(table)
+        self.kpi.load(table)
+        self.index.load(table)
+        self.clusters.load(table)
+        self.version += 1
+        self.layout_version += 1
+
+    def table(self) -> HospitalTable:
+        """
+        The current hospitals (read-only, shares the columns until the
+        next write).
+        """
+        if self._table is None:
+            self._table = HospitalTable({path: values[: self._size] for path, values in self._columns.items()})
+        return self._table
+
+    def row(self, hospital_id: str) -> Optional[int]:
+        key = hospital_id.encode()
+        ids = self._columns["id"]
+        # np.searchsorted(sorter=...) checks the whole sorter on every call,
+        # so single lookups bisect instead.
+        i = bisect_left(self._order, key, key=ids.__getitem__)
+        if i < len(self._order):
+            row = int(self._order[i])
+            if ids[row] == key:
+                return row
+        return None
+
+    def rows(self, hospital_ids: Sequence[str]) -> np.ndarray:
+        """
+        Row of each id in one vectorised search; -1 for unknown ids.
+        """
+        indexed = len(self._order)
+        if not indexed or not hospital_ids:
+            return np.full(len(hospital_ids), -1, dtype=np.int64)
+        ids = self._columns["id"][:indexed]
+        keys = np.array([hid.encode() for hid in hospital_ids])
+        found = self._order[np.minimum(np.searchsorted(ids, keys, sorter=self._order), indexed - 1)]
+        return np.where(ids[found] == keys, found, -1)
+
+    def get(self, hospital_id: str) -> Optional[HospitalNode]:
+        row = self.row(hospital_id)
+        return None if row is None else self.table()[row]
+
+    def upsert_many(self, nodes: Iterable[HospitalNode]) -> int:
+        """
+        Insert or replace nodes and bump the version once. Returns the
+        number of nodes written.
+        """
+        return self.update_many((node.id, leaf_values(node)) for node in nodes)
+
+    def update_many(self, changes: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Set fields of hospitals by id and bump the version once.
+
+        `changes` yields (hospital id, {leaf path: value}) with API values,
+        e.g. ("h1", {"occupancy.icu_beds_used": 4, "status": "WARNING"});
+        later changes to the same hospital win. Unknown ids are appended and
+        must set every field. Columns are written with one vectorised
+        assignment each and the KPI totals adjusted by the column sums; only
+        the spatial and cluster indexes are updated per hospital. Returns the
+        number of hospitals written.
+
+        Every value is converted before anything is written, so a missing
+        field or a value that does not fit its column raises ValueError and
+        leaves the store unchanged.
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for hospital_id, values in changes:
+            merged.setdefault(hospital_id, {}).update(values)
+        if not merged:
+            return 0
+        ids = list(merged)
+        rows = self.rows(ids)
+        new = [i for i, row in enumerate(rows.tolist()) if row < 0]
+        for i in new:
+            missing = [path for path in FIELDS if path != "id" and path not in merged[ids[i]]]
+            if missing:
+                raise ValueError(f"New hospital '{ids[i]}' is missing {', '.join(missing)}")
+            merged[ids[i]]["id"] = ids[i]
+        writes = self._convert(ids, merged)
+
+        self._own(self._size + len(new))
+        known = rows >= 0
+        rows[new] = np.arange(self._size, self._size + len(new))
+        old_beds, old_status = self._contributions(rows[known])
+        old_position = (self._columns["lat"][rows[known]], self._columns["lng"][rows[known]])
+        for path, (selected, data) in writes.items():
+            self._write(path, rows[selected], data)
+        self._size += len(new)
+        if new:
+            self._index_rows(rows[new].astype(np.int32))
+
+        beds, status = self._contributions(rows)
+        self.kpi.add(old_beds, old_status, sign=-1)
+        self.kpi.add(beds, status)
+        lat, lng = self._columns["lat"][rows], self._columns["lng"][rows]
+        oxygen = self._columns["resources.oxygen"][rows]
+        for hid, la, ln, bed, st, ox in zip(
+            ids, lat.tolist(), lng.tolist(), beds.tolist(), status.tolist(), oxygen.tolist()
+        ):
+            self.index.put(hid, la, ln, bed[1] - bed[0], LEVELS[ox])
+            self.clusters.put(hid, la, ln, tuple(bed), STATUSES[st])
+
+        self.version += 1
+        moved = (old_position[0] != lat[known]) | (old_position[1] != lng[known])
+        if new or moved.any():
+            self.layout_version += 1
+        return len(ids)
+
+    @staticmethod
+    def _convert(
+        ids: List[str], merged: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Tuple[List[int], np.ndarray]]:
+        # {path: (positions in `ids`, column data)} for every field written.
+        writes: Dict[str, Tuple[List[int], np.ndarray]] = {}
+        for path in FIELDS:
+            selected = [i for i, hid in enumerate(ids) if path in merged[hid]]
+            if not selected:
+                continue
+            try:
+                data = to_column(path, [merged[ids[i]][path] for i in selected])
+            except (AttributeError, KeyError, TypeError, ValueError, OverflowError) as exc:
+                raise ValueError(f"Invalid value for {path}: {exc}") from exc
+            writes[path] = (selected, data)
+        return writes
+
+    def _own(self, capacity: int) -> None:
+        """
+        Make the columns private to the store (copying them if a table
+        shares them) with room for at least `capacity` rows.
+        """
+        current = len(self._columns["id"])
+        if self._table is None and capacity <= current:
+            return
+        if capacity > current:
+            current = max(capacity, 2 * current, _MIN_CAPACITY)
+        columns: Dict[str, np.ndarray] = {}
+        for path, values in self._columns.items():
+            columns[path] = np.zeros(current, dtype=values.dtype)
+            columns[path][: self._size] = values[: self._size]
+        self._columns = columns
+        self._table = None
+
+    def _write(self, path: str, rows: np.ndarray, data: np.ndarray) -> None:
+        column = self._columns[path]
+        if data.dtype.kind == "S" and data.dtype.itemsize > column.dtype.itemsize:
+            column = self._columns[path] = column.astype(data.dtype)
+        column[rows] = data
+
+    def _contributions(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # (beds, status codes) of `rows`, as KPIAggregator.add takes them.
+        beds = np.stack([self._columns[path][rows] for path in BEDS], axis=1)
+        return beds, self._columns["status"][rows]
+
+    def _index_rows(self, rows: np.ndarray) -> None:
+        # Rows below len(self._order) are indexed; merge the new ones in by id.
+        ids = self._columns["id"]
+        keys = ids[rows]
+        by_key = np.argsort(keys, kind="stable")
+        positions = np.searchsorted(ids[: len(self._order)], keys[by_key], sorter=self._order)
+        self._order = np.insert(self._order, positions, rows[by_key]).astype(np.int32)
@@ -0,0 +1,266 @@
+"""
+Columnar (struct-of-arrays) hospital data.
+
+Columns are keyed by HospitalNode leaf path (`id`, `lat`,
+`occupancy.icu_beds_used`, `resources.oxygen`, ...; see FIELDS):
+- str fields:     UTF-8 in a fixed-width bytes column, as wide as the
+                  longest value.
+- Literal fields: int8 codes, indexes into CODES[path] (schema order).
+- float fields:   float64; int fields (bed counts): int32.
+"""
+
+from __future__ import annotations
+
+from functools import cached_property, lru_cache
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, Type, Union
+from typing import get_args, get_origin
+
+import numpy as np
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.schemas import HospitalNode
+from app.schemas.hospital import HospitalStatus, ResourceLevel
+
+
+def _leaves(model: Type[BaseModel], prefix: str = "") -> List[Tuple[str, Any]]:
+    leaves: List[Tuple[str, Any]] = []
+    for name, info in model.model_fields.items():
+        annotation = info.annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            leaves.extend(_leaves(annotation, f"{prefix}{name}."))
+        else:
+            leaves.append((prefix + name, annotation))
+    return leaves
+
+
+_LEAVES = _leaves(HospitalNode)
+
+# Every leaf field, in schema order.
+FIELDS: Tuple[str, ...] = tuple(path for path, _ in _LEAVES)
+# Allowed values of each Literal field; a code is an index into these.
+CODES: Dict[str, Tuple[str, ...]] = {path: get_args(a) for path, a in _LEAVES if get_origin(a) is Literal}
+STATUSES: Tuple[HospitalStatus, ...] = CODES["status"]  # increasing severity
+LEVELS: Tuple[ResourceLevel, ...] = CODES["resources.oxygen"]  # increasing supply
+# ICU used/total, then ward used/total.
+BEDS: Tuple[str, ...] = tuple(path for path in FIELDS if path.startswith("occupancy."))
+
+_CODE_INDEX = {path: {value: i for i, value in enumerate(values)} for path, values in CODES.items()}
+_CODE_VALUES = {path: np.array(values, dtype=object) for path, values in CODES.items()}
+_CODE_JSON = {path: np.array([to_json(v) for v in values], dtype=object) for path, values in CODES.items()}
+
+
+def _dtype(path: str, annotation: Any) -> np.dtype:
+    if path in CODES:
+        return np.dtype(np.int8)
+    if annotation is str:
+        return np.dtype("S1")
+    if annotation is float:
+        return np.dtype(np.float64)
+    if annotation is int:
+        return np.dtype(np.int32)
+    raise TypeError(f"No column type for {path} ({annotation})")
+
+
+DTYPES: Dict[str, np.dtype] = {path: _dtype(path, a) for path, a in _LEAVES}
+
+
+def code(path: str, value: str) -> int:
+    """
+    The int8 code of `value` in the Literal column `path`.
+    """
+    return _CODE_INDEX[path][value]
+
+
+@lru_cache(maxsize=None)
+def _leaf_getters(model: Type[BaseModel], prefix: str) -> Tuple[Tuple[str, attrgetter], ...]:
+    return tuple((prefix + path, attrgetter(path)) for path, _ in _leaves(model))
+
+
+def leaf_values(model: BaseModel, prefix: str = "") -> Dict[str, Any]:
+    """
+    A model's leaf values keyed by dotted path, e.g.
+    leaf_values(occupancy, "occupancy.") -> {"occupancy.icu_beds_used": 3, ...}.
+    """
+    return {path: get(model) for path, get in _leaf_getters(type(model), prefix)}
+
+
+def to_column(path: str, values: Sequence[Any]) -> np.ndarray:
+    """
+    API values (str, float, int, Literal names) as the column for `path`.
+    """
+    if path in CODES:
+        index = _CODE_INDEX[path]
+        return np.array([index[v] for v in values], dtype=np.int8)
+    dtype = DTYPES[path]
+    if dtype.kind == "S":
+        encoded = [v.encode() for v in values]
+        return np.array(encoded, dtype=f"S{max(map(len, encoded), default=1) or 1}")
+    return np.array(values, dtype=dtype)
+
+
+def from_column(path: str, values: np.ndarray) -> List[Any]:
+    """
+    A column (or a slice of one) back as API values.
+    """
+    if path in CODES:
+        return _CODE_VALUES[path][values].tolist()
+    if values.dtype.kind == "S":
+        return [v.decode() for v in values.tolist()]
+    return values.tolist()
+
+
+class HospitalTable(Sequence[HospitalNode]):
+    """
+    Immutable hospitals as one NumPy column per leaf field (see the module
+    docstring): about 35 bytes per hospital plus the id and name widths.
+
+    It is a Sequence of HospitalNode, but rows are only materialized as
+    models when indexed or iterated; serialization goes through `records`
+    and `dump_json`, filters and aggregates through `array`, `isin`,
+    `take` and `sum` without creating any per-hospital objects.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]) -> None:
+        self._columns = {path: columns[path] for path in FIELDS}
+        for values in self._columns.values():
+            values.flags.writeable = False
+        self._size = len(self._columns["id"])
+
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[HospitalNode]) -> "HospitalTable":
+        nodes = list(nodes)
+        return cls({path: to_column(path, list(map(attrgetter(path), nodes))) for path in FIELDS})
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[HospitalNode, "HospitalTable"]:
+        if isinstance(index, slice):
+            return self.take(np.arange(self._size)[index])
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("hospital row out of range")
+        record: Dict[str, Any] = {}
+        for path in FIELDS:
+            value = from_column(path, self._columns[path][index : index + 1])[0]
+            head, _, leaf = path.partition(".")
+            if leaf:
+                record.setdefault(head, {})[leaf] = value
+            else:
+                record[head] = value
+        return HospitalNode.model_validate(record)
+
+    def __iter__(self) -> Iterator[HospitalNode]:
+        for record in self.records():
+            yield HospitalNode.model_validate(record)
+
+    @cached_property
+    def ids(self) -> List[str]:
+        return self.column("id")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(values.nbytes for values in self._columns.values())
+
+    def array(self, path: str) -> np.ndarray:
+        """
+        The raw (read-only) column for `path`; Literal fields are codes.
+        """
+        return self._columns[path]
+
+    def column(self, path: str) -> List[Any]:
+        return from_column(path, self._columns[path])
+
+    def columns(self, fields: Optional[Sequence[str]] = None) -> Dict[str, List[Any]]:
+        """
+        {path: values} for `fields` (None for all), as API values.
+        """
+        return {path: self.column(path) for path in fields or FIELDS}
+
+    def records(self, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        One HospitalNode-shaped dict per hospital (JSON-ready values),
+        restricted to `fields` (None for all).
+        """
+        groups: Dict[str, List[Tuple[str, List[Any]]]] = {}
+        for path, values in self.columns(fields).items():
+            head, _, leaf = path.partition(".")
+            groups.setdefault(head, []).append((leaf, values))
+        keys: List[str] = []
+        parts: List[List[Any]] = []
+        for head, leaves in groups.items():
+            keys.append(head)
+            if len(leaves) == 1 and not leaves[0][0]:
+                parts.append(leaves[0][1])
+            else:
+                names = [leaf for leaf, _ in leaves]
+                parts.append([dict(zip(names, row)) for row in zip(*(values for _, values in leaves))])
+        return [dict(zip(keys, row)) for row in zip(*parts)]
+
+    def dump_json(self, fields: Optional[Sequence[str]] = None) -> bytes:
+        """
+        The JSON array of `records(fields)`, byte-identical to dumping the
+        equivalent HospitalNode list.
+
+        Each column is serialized once with pydantic_core and split into
+        per-value fragments, which fill a per-row template; no per-row
+        dicts are built, so this is as fast as dumping validated models.
+        """
+        if not self._size:
+            return b"[]"
+        selected = fields or FIELDS
+        groups: Dict[str, List[str]] = {}
+        for path in selected:
+            head, _, leaf = path.partition(".")
+            groups.setdefault(head, []).append(leaf)
+        parts = []
+        for head, leaves in groups.items():
+            if leaves == [""]:
+                parts.append(b'"%s":%%s' % head.encode())
+            else:
+                members = b",".join(b'"%s":%%s' % leaf.encode() for leaf in leaves)
+                parts.append(b'"%s":{%s}' % (head.encode(), members))
+        template = b"{" + b",".join(parts) + b"}"
+        fragments = [self._fragments(path) for path in selected]
+        return b"[" + b",".join([template % row for row in zip(*fragments)]) + b"]"
+
+    def _fragments(self, path: str) -> List[bytes]:
+        values = self._columns[path]
+        if path in CODES:
+            return _CODE_JSON[path][values].tolist()
+        if values.dtype.kind == "S":
+            # Inside a JSON string every quote is escaped, so '","' only
+            # ever separates array items.
+            text = to_json(from_column(path, values))
+            return [b'"' + item + b'"' for item in text[2:-2].split(b'","')]
+        return to_json(values.tolist())[1:-1].split(b",")
+
+    def isin(self, path: str, values: Iterable[Any]) -> np.ndarray:
+        """
+        Boolean mask of rows whose `path` is one of `values` (API values).
+        """
+        column = self._columns[path]
+        targets = to_column(path, list(values))
+        if path in CODES:
+            # A few small codes: comparisons beat np.isin's sort.
+            return np.logical_or.reduce([column == c for c in np.unique(targets)], initial=False)
+        return np.isin(column, targets)
+
+    def take(self, rows: np.ndarray) -> "HospitalTable":
+        """
+        The rows selected by an index array or boolean mask, in that order.
+        """
+        return HospitalTable({path: values[rows] for path, values in self._columns.items()})
+
+    def sum(self, path: str, where: Optional[np.ndarray] = None) -> Union[int, float]:
+        """
+        Sum of a numeric column, optionally over a boolean row mask.
+        """
+        values = self._columns[path]
+        dtype = np.float64 if values.dtype.kind == "f" else np.int64
+        if where is None:
+            return values.sum(dtype=dtype).item()
+        return values.sum(dtype=dtype, where=where).item()
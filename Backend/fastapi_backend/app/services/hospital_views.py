@@ -0,0 +1,116 @@
+"""
+Projected and compact encodings of the hospital list.
+
+Field names are the HospitalNode leaf paths: top-level scalars (`id`,
+`lat`, ...) and dotted nested fields (`occupancy.icu_beds_used`); a nested
+object's name (`occupancy`) selects all of its fields.
+
+Encodings:
+- json:    the usual array of objects, restricted to the selected fields.
+- columns: struct-of-arrays JSON, {"count": n, "columns": {field: [...]}},
+           with one list per leaf field in schema order. Keys are not
+           repeated per hospital, so it is far smaller and faster to parse.
+- msgpack: the columns document as MessagePack, written straight from the
+           table's arrays (no msgpack package needed): floats as float64,
+           bed counts as int32, text as str.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic_core import to_json
+
+from app.services.hospital_table import CODES, FIELDS, HospitalTable
+
+Encoding = Literal["json", "columns", "msgpack"]
+
+MEDIA_TYPES: Dict[str, str] = {
+    "json": "application/json",
+    "columns": "application/json",
+    "msgpack": "application/msgpack",
+}
+
+
+def parse_fields(spec: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Normalize a comma-separated `fields=` value to leaf paths in schema
+    order (so equivalent selections share one cache entry). None or empty
+    means all fields; unknown names raise ValueError.
+    """
+    if spec is None or not spec.strip():
+        return None
+    wanted = set()
+    for name in (part.strip() for part in spec.split(",")):
+        if not name:
+            continue
+        matches = [path for path in FIELDS if path == name or path.startswith(name + ".")]
+        if not matches:
+            raise ValueError(f"Unknown field '{name}'; expected some of: {', '.join(FIELDS)}")
+        wanted.update(matches)
+    return tuple(path for path in FIELDS if path in wanted)
+
+
+def columns(table: HospitalTable, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    The struct-of-arrays document for `table`, read straight from its
+    columns.
+    """
+    return {"count": len(table), "columns": table.columns(fields)}
+
+
+def encode(table: HospitalTable, fields: Optional[Sequence[str]], encoding: Encoding) -> bytes:
+    """
+    Serialize `table` restricted to `fields` (None for all).
+    """
+    if encoding == "json":
+        return table.dump_json(fields)
+    if encoding == "msgpack":
+        return _pack_columns(table, fields or FIELDS)
+    return to_json(columns(table, fields))
+
+
+# MessagePack (https://msgpack.org/) headers: (fix-size limit, fix base, 8/16/32-bit type bytes).
+_STR = (32, 0xA0, (0xD9, 0xDA, 0xDB))
+_ARRAY = (16, 0x90, (None, 0xDC, 0xDD))
+_MAP = (16, 0x80, (None, 0xDE, 0xDF))
+
+
+def _header(kind: Tuple[int, int, Tuple[Optional[int], int, int]], n: int) -> bytes:
+    fixed, base, (b8, b16, b32) = kind
+    if n < fixed:
+        return bytes((base | n,))
+    if b8 is not None and n < 0x100:
+        return bytes((b8, n))
+    if n < 0x10000:
+        return struct.pack(">BH", b16, n)
+    return struct.pack(">BI", b32, n)
+
+
+def _pack_str(value: bytes) -> bytes:
+    return _header(_STR, len(value)) + value
+
+
+def _pack_values(path: str, values: np.ndarray) -> bytes:
+    if path in CODES:
+        packed = np.array([_pack_str(v.encode()) for v in CODES[path]], dtype=object)
+        return b"".join(packed[values].tolist())
+    if values.dtype.kind == "S":
+        headers = [_header(_STR, n) for n in range(values.dtype.itemsize + 1)]
+        return b"".join([headers[len(v)] + v for v in values.tolist()])
+    # Fixed-size numbers: a type byte then the big-endian value.
+    kind, width = (0xCB, ">f8") if values.dtype.kind == "f" else (0xD2, ">i4")
+    out = np.empty(len(values), dtype=[("type", "u1"), ("value", width)])
+    out["type"] = kind
+    out["value"] = values
+    return out.tobytes()
+
+
+def _pack_columns(table: HospitalTable, fields: Sequence[str]) -> bytes:
+    parts: List[bytes] = [_header(_MAP, 2), _pack_str(b"count"), struct.pack(">BI", 0xCE, len(table))]
+    parts += [_pack_str(b"columns"), _header(_MAP, len(fields))]
+    for path in fields:
+        parts += [_pack_str(path.encode()), _header(_ARRAY, len(table)), _pack_values(path, table.array(path))]
+    return b"".join(parts)
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from app.config import get_settings
+
+# Long-lived pooled clients keyed by integration name. Populated by the app
+# lifespan (see app.main); empty outside of it, in which case integrations
+# fall back to a short-lived client per call.
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+# Gateway/overload responses worth retrying; anything else is returned as is.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Errors raised before the request could have reached the provider, so a
+# retry can't duplicate a non-idempotent call (e.g. an SMS send).
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@dataclass(frozen=True)
+class Integration:
+    """
+    Connection, timeout and resilience settings for one outbound provider.
+    """
+
+    base_url: str
+    timeout: float
+    connect_timeout: float
+    max_connections: int
+    max_keepalive: int
+    keepalive_expiry: float
+    max_retries: int
+    backoff_base: float
+    backoff_max: float
+    breaker_failures: int
+    breaker_reset: float
+    # False for calls that must not be repeated once sent: only connection
+    # failures and 429s (rejected unprocessed) are retried.
+    idempotent: bool = True
+    http2: bool = False
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling a provider whose circuit breaker is open.
+    """
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"{name} circuit open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one provider.
+
+    - closed: calls go through; `failures` failed attempts in a row open it.
+    - open: calls fail immediately with CircuitOpenError for `reset_after`
+      seconds, so a slow or down provider can't tie up request tasks and
+      pool connections waiting on timeouts.
+    - half-open: one probe call is let through (others keep failing fast);
+      its success closes the breaker, its failure re-opens it.
+
+    A failure is a transport error/timeout or a 5xx response. Not locked:
+    all calls run on the event loop and no state change spans an await.
+    """
+
+    def __init__(self, failures: int = 5, reset_after: float = 30.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failures = max(1, failures)
+        self.reset_after = reset_after
+        self._clock = clock
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.reset_after:
+            return "open"
+        return "half-open"
+
+    def before_call(self, name: str = "provider") -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return
+        remaining = self.reset_after - (self._clock() - self._opened_at) if state == "open" else self.reset_after
+        raise CircuitOpenError(name, max(remaining, 0.0))
+
+    def record_success(self) -> None:
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._consecutive += 1
+        if self._probing or self._consecutive >= self.failures:
+            self._opened_at = self._clock()
+        self._probing = False
+
+    def release(self) -> None:
+        # The call ended without an outcome (e.g. cancelled); let another probe through.
+        self._probing = False
+
+
+_integrations: Dict[str, Integration] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def _default_integration(name: str) -> Integration:
+    settings = get_settings()
+    shared = dict(
+        connect_timeout=settings.http_connect_timeout,
+        keepalive_expiry=settings.http_keepalive_expiry,
+        backoff_base=settings.http_retry_backoff_base,
+        backoff_max=settings.http_retry_backoff_max,
+        breaker_failures=settings.http_breaker_failures,
+        breaker_reset=settings.http_breaker_reset,
+        # HTTP/2 needs the optional `h2` package (httpx[http2]).
+        http2=settings.http2 and importlib.util.find_spec("h2") is not None,
+    )
+    if name == "twilio":
+        return Integration(
+            base_url=settings.twilio_api_base,
+            timeout=settings.twilio_timeout,
+            max_connections=settings.twilio_max_concurrency,
+            max_keepalive=settings.twilio_max_concurrency,
+            max_retries=settings.twilio_max_retries,
+            idempotent=False,
+            **shared,
+        )
+    if name == "openai":
+        return Integration(
+            base_url=settings.openai_api_base,
+            timeout=settings.openai_timeout,
+            max_connections=settings.openai_max_connections,
+            max_keepalive=settings.openai_max_keepalive,
+            max_retries=settings.openai_max_retries,
+            **shared,
+        )
+    raise ValueError(f"Unknown integration: {name}")
+
+
+def get_integration(name: str) -> Integration:
+    integration = _integrations.get(name)
+    if integration is None:
+        integration = _integrations[name] = _default_integration(name)
+    return integration
+
+
+def set_integration(name: str, integration: Optional[Integration]) -> None:
+    """
+    Override (or with None, restore from settings) an integration's
+    settings and reset its breaker (primarily for tests and benchmarks).
+    """
+    if integration is None:
+        _integrations.pop(name, None)
+    else:
+        _integrations[name] = integration
+    _breakers.pop(name, None)
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        integration = get_integration(name)
+        breaker = _breakers[name] = CircuitBreaker(integration.breaker_failures, integration.breaker_reset)
+    return breaker
+
+
+def reset_breakers() -> None:
+    _breakers.clear()
+
+
+def backoff(attempt: int, base: float, cap: float, rand: Callable[[], float] = random.random) -> float:
+    """
+    "Full jitter" exponential backoff: uniform in [0, min(cap, base * 2^attempt)),
+    so clients retrying after a shared outage don't all come back at once.
+    """
+    return rand() * min(cap, base * (2 ** attempt))
+
+
+def _retry_after(resp: httpx.Response) -> float:
+    try:
+        return max(float(resp.headers.get("Retry-After", 0)), 0.0)
+    except ValueError:
+        return 0.0
+
+
+def new_client(name: str) -> httpx.AsyncClient:
+    """
+    A client configured for `name` (base URL, timeouts, pool limits).
+    """
+    integration = get_integration(name)
+    return httpx.AsyncClient(
+        base_url=integration.base_url,
+        timeout=httpx.Timeout(integration.timeout, connect=integration.connect_timeout),
+        limits=httpx.Limits(
+            max_connections=integration.max_connections,
+            max_keepalive_connections=integration.max_keepalive,
+            keepalive_expiry=integration.keepalive_expiry,
+        ),
+        http2=integration.http2,
+    )
+
+
+async def request(
+    name: str,
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    stream: bool = False,
+    auth: Any = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Send a request to integration `name` through its circuit breaker,
+    retrying transient failures with jittered exponential backoff.
+
+    - Retried: connection failures and pool timeouts, plus (for idempotent
+      integrations) read timeouts and other transport errors, and 429/5xx
+      responses (429 only for non-idempotent ones). A Retry-After header
+      is honoured up to the backoff cap.
+    - After the last retry a retryable response is returned (callers
+      decide via raise_for_status) and a transport error is raised.
+    - An open breaker raises CircuitOpenError without touching the network.
+
+    With `stream=True` the body is not read; the caller must close the
+    response.
+    """
+    integration = get_integration(name)
+    breaker = get_breaker(name)
+    retry_statuses = RETRY_STATUSES if integration.idempotent else frozenset({429})
+    attempt = 0
+    while True:
+        breaker.before_call(name)
+        try:
+            resp = await client.send(client.build_request(method, url, **kwargs), auth=auth, stream=stream)
+        except httpx.TransportError as exc:
+            breaker.record_failure()
+            retryable = integration.idempotent or isinstance(exc, UNSENT_ERRORS)
+            if not retryable or attempt >= integration.max_retries:
+                raise
+            delay = backoff(attempt, integration.backoff_base, integration.backoff_max)
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if resp.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if resp.status_code not in retry_statuses or attempt >= integration.max_retries:
+                return resp
+            delay = min(
+                max(_retry_after(resp), backoff(attempt, integration.backoff_base, integration.backoff_max)),
+                integration.backoff_max,
+            )
+            await resp.aclose()
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+def get_client(name: str) -> Optional[httpx.AsyncClient]:
+    return _clients.get(name)
+
+
+def set_client(name: str, client: Optional[httpx.AsyncClient]) -> None:
+    """
+    Register (or with None, remove) a pooled client (primarily for tests).
+    """
+    if client is None:
+        _clients.pop(name, None)
+    else:
+        _clients[name] = client
+
+
+async def open_clients() -> None:
+    """
+    Create the pooled outbound clients. Called once at application startup.
+    """
+    for name in ("twilio", "openai"):
+        if name not in _clients:
+            _clients[name] = new_client(name)
+
+
+async def close_clients() -> None:
+    """
+    Close every pooled client. Called once at application shutdown.
+    """
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
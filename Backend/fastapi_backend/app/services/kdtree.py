@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vectors(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """
+    (n, 3) points on the unit sphere for latitude/longitude in degrees.
+
+    Straight-line (chord) distance between these points is monotonic in
+    great-circle distance, so nearest neighbours in 3-D are the haversine
+    nearest neighbours, and no trig is needed per comparison.
+    """
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lam = np.radians(np.asarray(lng, dtype=np.float64))
+    cos_phi = np.cos(phi)
+    return np.column_stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)])
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distance in km for chord lengths on the unit sphere.
+    """
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2.0, 0.0, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return float(2.0 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2.0))
+
+
+def _box_gaps(lo: np.ndarray, hi: np.ndarray, qlo: np.ndarray, qhi: np.ndarray) -> np.ndarray:
+    # Squared distance from one query box to each of many boxes (0 on overlap).
+    gap = np.maximum(0.0, np.maximum(lo - qhi, qlo - hi))
+    return np.einsum("ij,ij->i", gap, gap)
+
+
+class KDTree:
+    """
+    Static k-d tree over 3-D points with batched queries.
+
+    The tree recursively splits points at the median of their widest axis
+    until leaves hold at most `leaf_size` points; each leaf keeps its
+    bounding box. Queries run one spatially compact block of query points
+    at a time:
+
+    1. the nearest leaves (by box gap) that together hold k candidates give
+       an upper bound on every query's k-th neighbour distance;
+    2. every leaf whose box is within that bound is gathered, and the
+       block x candidates distances are computed and partitioned at once.
+
+    Leaf gaps are computed for all leaves in one vector operation per
+    block, so Python work is per block rather than per point or per node,
+    and no all-pairs distance matrix is ever built.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 32) -> None:
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.leaf_size = max(1, leaf_size)
+        n = len(self.points)
+        self.order = np.arange(n)
+        lo: List[np.ndarray] = []
+        hi: List[np.ndarray] = []
+        left: List[int] = []
+        right: List[int] = []
+        start: List[int] = []
+        end: List[int] = []
+
+        def new_node(s: int, e: int) -> int:
+            block = self.points[self.order[s:e]]
+            lo.append(block.min(axis=0) if e > s else np.zeros(3))
+            hi.append(block.max(axis=0) if e > s else np.zeros(3))
+            left.append(-1)
+            right.append(-1)
+            start.append(s)
+            end.append(e)
+            return len(start) - 1
+
+        stack = [new_node(0, n)]
+        while stack:
+            node = stack.pop()
+            s, e = start[node], end[node]
+            if e - s <= self.leaf_size:
+                continue
+            axis = int(np.argmax(hi[node] - lo[node]))
+            mid = (s + e) // 2
+            segment = self.order[s:e]
+            part = np.argpartition(self.points[segment, axis], mid - s)
+            self.order[s:e] = segment[part]
+            left[node] = new_node(s, mid)
+            right[node] = new_node(mid, e)
+            stack.extend((left[node], right[node]))
+
+        self._lo = np.array(lo)
+        self._hi = np.array(hi)
+        self._left = np.array(left)
+        self._right = np.array(right)
+        self._start = np.array(start)
+        self._end = np.array(end)
+        self._leaves = np.flatnonzero(self._left < 0)
+        self._leaf_lo = self._lo[self._leaves]
+        self._leaf_hi = self._hi[self._leaves]
+        self._leaf_sizes = self._end[self._leaves] - self._start[self._leaves]
+        parent = np.full(len(start), -1)
+        inner = np.flatnonzero(self._left >= 0)
+        parent[self._left[inner]] = inner
+        parent[self._right[inner]] = inner
+        self._parent = parent
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _subtrees(self, size: int) -> List[np.ndarray]:
+        # Point groups of the largest subtrees holding at most `size` points.
+        size = max(size, self.leaf_size)
+        sizes = self._end - self._start
+        parent_sizes = np.where(self._parent >= 0, sizes[self._parent], np.iinfo(np.int64).max)
+        nodes = np.flatnonzero((sizes <= size) & (parent_sizes > size) & (sizes > 0))
+        return [self.order[self._start[n] : self._end[n]] for n in nodes]
+
+    def _blocks(self, queries: np.ndarray, size: int) -> List[np.ndarray]:
+        # Group query points spatially so each block's bounding box is tight.
+        if queries is self.points:
+            return self._subtrees(size)
+        if len(queries) <= size:
+            return [np.arange(len(queries))]
+        return KDTree(queries, self.leaf_size)._subtrees(size)
+
+    def _leaf_gaps(self, block: np.ndarray) -> np.ndarray:
+        return _box_gaps(self._leaf_lo, self._leaf_hi, block.min(axis=0), block.max(axis=0))
+
+    def _gather(self, leaves: np.ndarray) -> np.ndarray:
+        return np.concatenate([self.order[self._start[l] : self._end[l]] for l in leaves])
+
+    @staticmethod
+    def _distances(block: np.ndarray, points: np.ndarray) -> np.ndarray:
+        # Squared Euclidean distances as |a|^2 + |b|^2 - 2ab (one matmul),
+        # centred on the block first so nearby points don't lose precision.
+        centre = block.mean(axis=0)
+        a, b = block - centre, points - centre
+        d = (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :]
+        d -= 2.0 * a @ b.T
+        return np.maximum(d, 0.0, out=d)
+
+    def query(
+        self,
+        queries: np.ndarray,
+        k: int,
+        exclude: Optional[np.ndarray] = None,
+        block_size: int = 64,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest tree points for each query point.
+
+        Returns (distances, indices), each (m, k), sorted nearest first;
+        rows with fewer than k candidates are padded with inf / -1.
+        `exclude[i]` is a tree index never returned for query i (e.g. the
+        query point itself). Pass `tree.points` as `queries` for an
+        all-points query; the tree's own partition then groups the blocks.
+        """
+        if queries is not self.points:
+            queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        m = len(queries)
+        out_d = np.full((m, k), np.inf)
+        out_i = np.full((m, k), -1, dtype=np.int64)
+        if not m or not len(self.points) or k <= 0:
+            return out_d, out_i
+
+        sizes = self._leaf_sizes
+        need = k + (1 if exclude is not None else 0)
+        for rows in self._blocks(queries, block_size):
+            block = queries[rows]
+            gaps = self._leaf_gaps(block)
+            # 1. Bound: the k-th distance using the nearest leaves holding >= need points.
+            nearest = np.argsort(gaps)
+            enough = int(np.searchsorted(np.cumsum(sizes[nearest]), need)) + 1
+            seed = self._gather(self._leaves[nearest[:enough]])
+            d = self._distances(block, self.points[seed])
+            if exclude is not None:
+                d[seed[None, :] == exclude[rows][:, None]] = np.inf
+            kk = min(k, d.shape[1])
+            bound = np.partition(d, kk - 1, axis=1)[:, kk - 1].max() if kk == k else np.inf
+            # 2. Exact: every leaf that could hold a point within the bound.
+            candidates = self._gather(self._leaves[gaps <= bound * (1 + 1e-12) + 1e-15])
+            d = self._distances(block, self.points[candidates])
+            if exclude is not None:
+                d[candidates[None, :] == exclude[rows][:, None]] = np.inf
+            kk = min(k, d.shape[1])
+            part = np.argpartition(d, kk - 1, axis=1)[:, :kk] if d.shape[1] > kk else np.argsort(d, axis=1)
+            part_d = np.take_along_axis(d, part, axis=1)
+            rank = np.argsort(part_d, axis=1)
+            best_d = np.take_along_axis(part_d, rank, axis=1)
+            best_i = candidates[np.take_along_axis(part, rank, axis=1)]
+            out_d[rows, :kk] = np.sqrt(best_d)
+            out_i[rows, :kk] = np.where(np.isfinite(best_d), best_i, -1)
+        return out_d, out_i
+
+    def query_radius(self, point: np.ndarray, radius: float) -> np.ndarray:
+        """
+        Indices of tree points within chord distance `radius` of `point`.
+        """
+        block = np.atleast_2d(np.asarray(point, dtype=np.float64))
+        limit = radius * radius
+        leaves = self._leaves[self._leaf_gaps(block) <= limit]
+        if not leaves.size:
+            return np.empty(0, dtype=np.int64)
+        candidates = self._gather(leaves)
+        diff = self.points[candidates] - block[0]
+        return candidates[np.einsum("ij,ij->i", diff, diff) <= limit]
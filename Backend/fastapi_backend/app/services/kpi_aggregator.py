@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+from app.schemas import KPIMetrics
+from app.schemas.hospital import HospitalStatus
+from app.services.hospital_table import BEDS, STATUSES, HospitalTable
+
+
+def _ratio(used: int, total: int) -> float:
+    if total <= 0:
+        return 0.0
+    return min(1.0, used / total)
+
+
+class KPIAggregator:
+    """
+    Running network totals over a set of hospitals.
+
+    Keeps sums of ICU/ward beds used and total plus a count per
+    HospitalStatus. Changing hospitals is an update proportional to the
+    change (subtract their previous values, add the new ones), so reading
+    KPIs never scans the network. The aggregator keeps no per-hospital
+    state: its owner (HospitalStore) passes the previous values from its
+    columns.
+    """
+
+    def __init__(self) -> None:
+        self._clear()
+
+    def _clear(self) -> None:
+        self._count = 0
+        self.icu_used = 0
+        self.icu_total = 0
+        self.ward_used = 0
+        self.ward_total = 0
+        self.status_counts: Dict[HospitalStatus, int] = {"NORMAL": 0, "WARNING": 0, "CRITICAL": 0}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def load(self, table: HospitalTable) -> None:
+        """
+        Reset to the totals of `table`, summed column-wise.
+        """
+        self._clear()
+        beds = np.stack([table.array(path) for path in BEDS], axis=1)
+        self.add(beds, table.array("status"))
+
+    def add(self, beds: np.ndarray, statuses: np.ndarray, sign: int = 1) -> None:
+        """
+        Add (sign=-1: subtract) many hospitals' contributions at once
+        without tracking them by id: `beds` is (n, 4) ICU used/total then
+        ward used/total, `statuses` their codes into STATUSES.
+        """
+        icu_used, icu_total, ward_used, ward_total = beds.sum(axis=0, dtype=np.int64).tolist()
+        self.icu_used += sign * icu_used
+        self.icu_total += sign * icu_total
+        self.ward_used += sign * ward_used
+        self.ward_total += sign * ward_total
+        counts = np.bincount(statuses, minlength=len(STATUSES)).tolist()
+        for status, count in zip(STATUSES, counts):
+            self.status_counts[status] += sign * count
+        self._count += sign * len(statuses)
+
+    def metrics(self, surge_confidence: float) -> KPIMetrics:
+        critical = self.status_counts["CRITICAL"]
+        return KPIMetrics(
+            total_patients=self.icu_used + self.ward_used,
+            icu_occupancy=_ratio(self.icu_used, self.icu_total),
+            ward_occupancy=_ratio(self.ward_used, self.ward_total),
+            alert_count=self.status_counts["WARNING"] + critical,
+            surge_confidence=surge_confidence,
+            critical_hospital_count=critical,
+        )
@@ -1,24 +1,59 @@
 from __future__ import annotations
 
-import json
-from pathlib import Path
+import threading
+from typing import Optional
 
+from app import metrics
 from app.schemas import KPIMetrics
+from app.services import forecast_service, hospital_service
+from app.services.snapshot_cache import Snapshot, make_etag
 
-_DATA_DIR = Path(__file__).resolve().parents[1] / "data"
-_KPI_FILE = _DATA_DIR / "mock_kpi.json"
+_lock = threading.Lock()
+_snapshot: Optional[Snapshot[KPIMetrics]] = None
 
 
-def get_kpi() -> KPIMetrics:
+def get_snapshot() -> Snapshot[KPIMetrics]:
+    """
+    Return the KPI snapshot for the current hospital data and forecast
+    versions.
+
+    Totals come from hospital_service's running aggregates (O(1) to read),
+    so this never scans the network; `surge_confidence` comes from the
+    cached network forecast, which lags live updates by up to
+    FORECAST_REFRESH_INTERVAL rather than being recomputed per read. The
+    result and its serialized body are cached until either version changes.
+    """
+    global _snapshot
+    forecast_version, surge = forecast_service.surge_confidence()
+    with _lock:
+        data_version, kpi = hospital_service.kpi_metrics(surge)
+        version = f"{data_version}/{forecast_version}"
+        if _snapshot is not None and _snapshot.version == version:
+            metrics.record_cache("kpi", hit=True)
+            return _snapshot
+        metrics.record_cache("kpi", hit=False)
+        body = kpi.model_dump_json().encode("utf-8")
+        _snapshot = Snapshot(version=version, data=kpi, body=body, etag=make_etag(body))
+        return _snapshot
+
+
+def invalidate() -> None:
+    """
+    Force the next read to recompute KPIs and the forecast behind them.
     """
-    Load KPIMetrics from the mock data file.
+    global _snapshot
+    with _lock:
+        _snapshot = None
+    forecast_service.invalidate()
+
 
-    In a later phase this will be replaced or augmented by logic that
-    queries a data store and incorporates forecast signals.
+def get_kpi() -> KPIMetrics:
     """
-    if not _KPI_FILE.is_file():
-        raise RuntimeError("KPI data file not found")
+    Current network KPIs.
 
-    raw = _KPI_FILE.read_text(encoding="utf-8")
-    data = json.loads(raw)
-    return KPIMetrics.model_validate(data)
+    ICU/ward occupancy, patient totals, alert and critical counts are derived
+    from the hospital network's running aggregates; `surge_confidence` is
+    the forecast probability of a network-wide ICU surge (see
+    forecast_service).
+    """
+    return get_snapshot().data
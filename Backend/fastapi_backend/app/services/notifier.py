@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from app.config import get_settings
+from app.services.twilio_client import TwilioClient, TwilioSendResult
+
+
+class TokenBucket:
+    """
+    Async token bucket: at most `rate` acquisitions per second on average,
+    with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+@dataclass
+class RecipientResult:
+    recipient: str
+    sid: Optional[str]
+    status: str
+    retryable: bool = False
+    error: Optional[str] = None
+
+
+# Shared across sends so concurrent delivery batches together respect the
+# provider rate limit. One bucket per event loop, since asyncio primitives
+# cannot be shared between loops.
+_buckets: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TokenBucket]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_bucket() -> TokenBucket:
+    loop = asyncio.get_running_loop()
+    bucket = _buckets.get(loop)
+    if bucket is None:
+        bucket = _buckets[loop] = TokenBucket(get_settings().twilio_rate_per_sec)
+    return bucket
+
+
+async def send_many(
+    client: TwilioClient,
+    messages: Sequence[Tuple[str, str]],
+    max_concurrency: Optional[int] = None,
+    bucket: Optional[TokenBucket] = None,
+) -> List[RecipientResult]:
+    """
+    Send each (recipient, body) pair concurrently.
+
+    - At most `max_concurrency` requests are in flight (defaults to
+      TWILIO_MAX_CONCURRENCY, which also sizes the HTTP connection pool).
+    - Each send first takes a token from `bucket` (defaults to a process-wide
+      bucket refilled at TWILIO_RATE_PER_SEC).
+    - Results are returned in input order; a send that raises is recorded
+      as a non-retryable FAILED (it may have gone out) rather than aborting
+      the batch.
+    """
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(max_concurrency or settings.twilio_max_concurrency)
+    if bucket is None and not client.dry_run:
+        bucket = _shared_bucket()
+
+    async def _send(recipient: str, body: str) -> RecipientResult:
+        async with semaphore:
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                result: TwilioSendResult = await client.send_message(recipient, body)
+            except Exception as exc:
+                return RecipientResult(
+                    recipient=recipient, sid=None, status="FAILED", error=f"{type(exc).__name__}: {exc}"
+                )
+            return RecipientResult(
+                recipient=recipient,
+                sid=result.sid,
+                status=result.status,
+                retryable=result.retryable,
+                error=result.error,
+            )
+
+    return list(await asyncio.gather(*(_send(r, b) for r, b in messages)))
+
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, List, Optional, Sequence
+
+from pydantic import TypeAdapter
+
+from app.config import get_settings
+from app.schemas import HospitalOccupancyUpdate
+from app.services import hospital_service
+
+logger = logging.getLogger(__name__)
+
+_UPDATE_LIST = TypeAdapter(List[HospitalOccupancyUpdate])
+
+
+class IngestQueueFull(Exception):
+    """
+    Raised when accepting a request would exceed INGEST_MAX_PENDING.
+    """
+
+
+def parse_updates(body: bytes, ndjson: bool) -> List[HospitalOccupancyUpdate]:
+    """
+    Validate a request body straight from bytes (no intermediate dicts).
+
+    - ndjson=True: one JSON object per line; blank lines are ignored.
+    - otherwise: a single JSON array.
+
+    Raises pydantic.ValidationError (NDJSON errors carry the line number in
+    their `loc`).
+    """
+    if not ndjson:
+        return _UPDATE_LIST.validate_json(body)
+    # Validate lines as one JSON array so pydantic-core does a single pass;
+    # error locations then index lines (0-based, blank lines excluded).
+    lines = [line for line in body.splitlines() if line.strip()]
+    return _UPDATE_LIST.validate_json(b"[" + b",".join(lines) + b"]")
+
+
+class OccupancyIngestor:
+    """
+    Size/time-bounded micro-batcher in front of hospital_service.
+
+    Requests append validated updates to a bounded in-memory queue and return
+    immediately; a single background task applies them in batches of up to
+    INGEST_BATCH_SIZE, at the latest INGEST_MAX_DELAY seconds after the first
+    queued update. Each batch is one `apply_occupancy_updates` call: one lock
+    acquisition, one version bump, one KPI/stream notification.
+
+    When the queue would exceed INGEST_MAX_PENDING, `submit` raises
+    IngestQueueFull so the API can push back (HTTP 429) instead of growing
+    without bound. When the background task is not running (scripts, tests
+    without the app lifespan), `submit` applies updates inline.
+
+    A batch that fails to apply is logged and dropped (counted in `failed`)
+    so later batches still go through; should the task die anyway, the next
+    `submit` restarts it.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Deque[HospitalOccupancyUpdate] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.applied = 0
+        self.batches = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, updates: Sequence[HospitalOccupancyUpdate]) -> int:
+        """
+        Queue updates for the next micro-batch. Returns the number accepted.
+        Must be called from the event loop thread.
+        """
+        if not updates:
+            return 0
+        if self._task is not None and self._task.done():
+            self._restart()
+        if not self.running:
+            self._apply(list(updates))
+            return len(updates)
+        settings = get_settings()
+        if len(self._pending) + len(updates) > settings.ingest_max_pending:
+            raise IngestQueueFull()
+        self._pending.extend(updates)
+        assert self._wakeup is not None
+        self._wakeup.set()
+        return len(updates)
+
+    def _apply(self, batch: List[HospitalOccupancyUpdate]) -> None:
+        result = hospital_service.apply_occupancy_updates(batch)
+        self.applied += result.applied
+        self.batches += 1
+
+    def _apply_logged(self, batch: List[HospitalOccupancyUpdate]) -> None:
+        try:
+            self._apply(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Dropped a batch of %d occupancy updates", len(batch))
+
+    def _take(self, limit: int) -> List[HospitalOccupancyUpdate]:
+        pending = self._pending
+        count = min(limit, len(pending))
+        return [pending.popleft() for _ in range(count)]
+
+    def flush(self) -> int:
+        """
+        Apply everything queued right now (failed batches are logged and
+        dropped). Returns the number of updates taken off the queue.
+        """
+        limit = get_settings().ingest_batch_size
+        total = 0
+        while self._pending:
+            batch = self._take(limit)
+            total += len(batch)
+            self._apply_logged(batch)
+        return total
+
+    async def _run(self) -> None:
+        settings = get_settings()
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Give the batch up to max_delay to fill, unless it already is.
+            if len(self._pending) < settings.ingest_batch_size:
+                await asyncio.sleep(settings.ingest_max_delay)
+            while self._pending:
+                self._apply_logged(self._take(settings.ingest_batch_size))
+                # Let request handlers run between batches.
+                await asyncio.sleep(0)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def _restart(self) -> None:
+        task = self._task
+        assert task is not None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Occupancy ingest task died; restarting", exc_info=task.exception())
+        self._task = asyncio.create_task(self._run())
+        if self._pending:
+            assert self._wakeup is not None
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.flush()
+        self._wakeup = None
+
+
+ingestor = OccupancyIngestor()
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import asyncio
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 
+from app import metrics
 from app.config import get_settings
+from app.services import http_clients
+
+_CHAT_COMPLETIONS_PATH = "/v1/chat/completions"
+
+# Dry-run streaming splits the mock draft into word-sized chunks, keeping the
+# whitespace attached so the chunks concatenate back to the exact draft.
+_MOCK_CHUNK_RE = re.compile(r"\S+\s*|\s+")
 
 
 class OpenAIClient:
@@ -16,21 +29,33 @@ class OpenAIClient:
       * Return a deterministic mock draft: "[MOCK DRAFT] {prompt}".
     - Otherwise:
       * Call OpenAI's chat/completions API and return the first choice text.
+
+    Requests go through the app-wide pooled `httpx.AsyncClient` (see
+    app.services.http_clients) when available, with that module's retries
+    and circuit breaker; an open breaker raises CircuitOpenError. Live
+    calls record latency and token usage in app.metrics.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None) -> None:
         self.settings = get_settings()
+        self._http_client = http_client
 
-    async def generate_advisory(
-        self,
-        prompt: str,
-        context: Optional[Dict[str, Any]] = None,
-    ) -> str:
-        # Dry-run or missing key: keep behaviour deterministic and offline.
-        if self.settings.openai_dry_run or not self.settings.openai_api_key:
-            return f"[MOCK DRAFT] {prompt}"
+    @property
+    def dry_run(self) -> bool:
+        return bool(self.settings.openai_dry_run or not self.settings.openai_api_key)
+
+    def _mock_draft(self, prompt: str) -> str:
+        return f"[MOCK DRAFT] {prompt}"
 
-        messages = [
+    def is_fallback(self, prompt: str, draft: str) -> bool:
+        """
+        True if `draft` is the mock draft a live client fell back to (e.g.
+        on a malformed response), as opposed to a real or dry-run draft.
+        """
+        return not self.dry_run and draft == self._mock_draft(prompt)
+
+    def _payload(self, prompt: str, context: Optional[Dict[str, Any]], stream: bool) -> Dict[str, Any]:
+        messages: List[Dict[str, str]] = [
             {
                 "role": "system",
                 "content": "You are a public health advisory generator. Respond with a clear, concise advisory message.",
@@ -52,22 +77,120 @@ class OpenAIClient:
             }
         )
 
-        url = "https://api.openai.com/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.settings.openai_api_key}",
-            "Content-Type": "application/json",
-        }
-        payload = {
+        payload: Dict[str, Any] = {
             "model": self.settings.openai_model,
             "messages": messages,
         }
+        if stream:
+            payload["stream"] = True
+            # Ask for a final usage chunk so streamed calls report tokens too.
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.settings.openai_api_key}",
+            "Content-Type": "application/json",
+        }
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        client = self._http_client or http_clients.get_client("openai")
+        if client is not None:
+            yield client
+            return
+        # Outside the app lifespan (scripts, tests): one-off client.
+        async with http_clients.new_client("openai") as one_off:
+            yield one_off
+
+    async def generate_advisory(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        # Dry-run or missing key: keep behaviour deterministic and offline.
+        if self.dry_run:
+            return self._mock_draft(prompt)
+
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self._client() as client:
+                resp = await http_clients.request(
+                    "openai",
+                    client,
+                    "POST",
+                    _CHAT_COMPLETIONS_PATH,
+                    json=self._payload(prompt, context, stream=False),
+                    headers=self._headers(),
+                )
+                resp.raise_for_status()
+                data = resp.json()
+            outcome = "ok"
+        finally:
+            metrics.OPENAI_LATENCY.labels("generate", outcome).observe(time.perf_counter() - start)
+        try:
+            metrics.record_openai_usage(data.get("usage"))
+            return data["choices"][0]["message"]["content"]
+        except Exception:
+            # Fallback if response structure is unexpected
+            return self._mock_draft(prompt)
+
+    async def stream_advisory(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the draft incrementally as chat-completions `stream=true`
+        content deltas arrive. In dry-run mode the mock draft is yielded in
+        deterministic word-sized chunks.
+        """
+        if self.dry_run:
+            for chunk in _MOCK_CHUNK_RE.findall(self._mock_draft(prompt)):
+                yield chunk
+            return
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(url, json=payload, headers=headers, timeout=20.0)
-            resp.raise_for_status()
-            data = resp.json()
-            try:
-                return data["choices"][0]["message"]["content"]
-            except Exception:
-                # Fallback if response structure is unexpected
-                return f"[MOCK DRAFT] {prompt}"
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self._client() as client:
+                # Retries only happen before the first byte of the stream.
+                resp = await http_clients.request(
+                    "openai",
+                    client,
+                    "POST",
+                    _CHAT_COMPLETIONS_PATH,
+                    stream=True,
+                    json=self._payload(prompt, context, stream=True),
+                    headers=self._headers(),
+                )
+                try:
+                    resp.raise_for_status()
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                        except ValueError:
+                            continue
+                        if isinstance(chunk, dict):
+                            metrics.record_openai_usage(chunk.get("usage"))
+                        try:
+                            delta = chunk["choices"][0]["delta"].get("content")
+                        except (TypeError, KeyError, IndexError, AttributeError):
+                            continue
+                        if delta:
+                            yield delta
+                finally:
+                    await resp.aclose()
+            outcome = "ok"
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer stopped reading (e.g. the SSE client went away).
+            outcome = "cancelled"
+            raise
+        finally:
+            metrics.OPENAI_LATENCY.labels("stream", outcome).observe(time.perf_counter() - start)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def canonical_key(**parts: Any) -> str:
+    """
+    Stable hash of JSON-serializable parts: key order inside dicts and
+    whitespace do not affect the result.
+    """
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+@dataclass
+class _Flight(Generic[V]):
+    task: "asyncio.Task[V]"
+    waiters: int = 0
+
+
+class AsyncTTLCache(Generic[V]):
+    """
+    LRU + TTL cache for async computations with single-flight coalescing.
+
+    - A hit returns the stored value without awaiting anything.
+    - On a miss, the computation runs in its own task; concurrent callers for
+      the same key await that task instead of starting their own.
+    - A cancelled caller only stops waiting: the shared computation is
+      cancelled once no caller is waiting for it any more.
+    - Failures are propagated to every waiter and are not cached, nor are
+      values rejected by the caller's `cacheable` predicate.
+
+    Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, V]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight[V]] = {}
+        self._stats = CacheStats()
+
+    def _lookup(self, key: str) -> Optional[Tuple[float, V]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, value: V) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def get(self, key: str) -> Optional[V]:
+        """
+        Return a fresh cached value (counted as a hit) or None (a miss).
+        """
+        entry = self._lookup(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        self._stats.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: V) -> None:
+        self._store(key, value)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[V]],
+        cacheable: Optional[Callable[[V], bool]] = None,
+    ) -> V:
+        entry = self._lookup(key)
+        if entry is not None:
+            self._stats.hits += 1
+            return entry[1]
+
+        flight = self._inflight.get(key)
+        if flight is None or flight.task.done():
+            self._stats.misses += 1
+            flight = _Flight(asyncio.ensure_future(self._load(key, compute, cacheable)))
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+            self._inflight[key] = flight
+        else:
+            self._stats.coalesced += 1
+        flight.waiters += 1
+        try:
+            # shield: a waiter being cancelled must not cancel the others.
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def _load(
+        self, key: str, compute: Callable[[], Awaitable[V]], cacheable: Optional[Callable[[V], bool]]
+    ) -> V:
+        value = await compute()
+        if cacheable is None or cacheable(value):
+            self._store(key, value)
+        return value
+
+    def _finish(self, key: str, flight: _Flight[V]) -> None:
+        # A done callback rather than a finally in _load: a load cancelled
+        # before it started never runs its body.
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            coalesced=self._stats.coalesced,
+            evictions=self._stats.evictions,
+            size=len(self._entries),
+        )
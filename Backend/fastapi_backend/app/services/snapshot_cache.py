@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+from app import metrics
+
+T = TypeVar("T")
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Strong ETag (quoted) for a response body.
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+@dataclass(frozen=True)
+class Snapshot(Generic[T]):
+    """
+    Immutable, already-validated view of a data file.
+
+    - `data` holds the validated pydantic object(s).
+    - `body` holds the JSON response bytes serialized once from `data`.
+    - `version` changes whenever the source file (mtime/size) changes.
+    - `etag` is a strong validator derived from `body`, computed once.
+    """
+
+    version: str
+    data: T
+    body: bytes
+    etag: str
+
+
+class SnapshotCache(Generic[T]):
+    """
+    Mtime-aware in-memory cache for a JSON data file.
+
+    The file is re-read, parsed and validated only when its mtime or size
+    changes (or after `invalidate()`); every other call is a stat() plus a
+    tuple comparison. Readers never see a partially built snapshot because
+    the current snapshot is swapped in as a single reference assignment.
+
+    With a `name`, lookups are counted as cache hits/misses in app.metrics.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        parse: Callable[[bytes], T],
+        serialize: Callable[[T], bytes],
+        missing_message: str,
+        name: Optional[str] = None,
+    ) -> None:
+        self._path = path
+        self._parse = parse
+        self._serialize = serialize
+        self._missing_message = missing_message
+        self._name = name
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Snapshot[T]] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    def _stat(self) -> Tuple[int, int]:
+        try:
+            st = self._path.stat()
+        except FileNotFoundError:
+            raise RuntimeError(self._missing_message) from None
+        return st.st_mtime_ns, st.st_size
+
+    def get(self) -> Snapshot[T]:
+        stamp = self._stat()
+        snapshot = self._snapshot
+        if snapshot is not None and stamp == self._stamp:
+            if self._name:
+                metrics.record_cache(self._name, hit=True)
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock.
+            stamp = self._stat()
+            hit = self._snapshot is not None and stamp == self._stamp
+            if self._name:
+                metrics.record_cache(self._name, hit=hit)
+            if hit:
+                return self._snapshot
+            data = self._parse(self._path.read_bytes())
+            body = self._serialize(data)
+            snapshot = Snapshot(
+                version=f"{stamp[0]:x}-{stamp[1]:x}",
+                data=data,
+                body=body,
+                etag=make_etag(body),
+            )
+            self._snapshot = snapshot
+            self._stamp = stamp
+            return snapshot
+
+    def invalidate(self) -> None:
+        """
+        Drop the current snapshot so the next `get()` reloads from disk.
+        """
+        with self._lock:
+            self._snapshot = None
+            self._stamp = None
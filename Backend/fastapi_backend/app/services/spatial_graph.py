@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.services.kdtree import KDTree, chord_to_km, unit_vectors
+
+# Once hospitals added since the last build pass this share of the graph,
+# the k-NN lists are rebuilt from scratch.
+_MIN_PENDING = 64
+_REBUILD_FRACTION = 0.05
+
+
+def _csr(n: int, rows: np.ndarray, cols: np.ndarray, dist: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Deduplicate (row, col) pairs; sorting the keys also gives CSR order.
+    keys, first = np.unique(rows * n + cols, return_index=True)
+    rows, cols = keys // n, keys % n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols.astype(np.int64), dist[first]
+
+
+class SpatialGraph:
+    """
+    Symmetric k-nearest-neighbour graph over hospital locations.
+
+    Each hospital links to its k nearest hospitals by great-circle distance
+    (found with a KD-tree, so no n x n distance matrix is built); an edge
+    exists when either endpoint picked the other. Edges carry a Gaussian
+    weight exp(-(d / h)^2), where h is `kernel_km` or the median neighbour
+    distance at build time.
+
+    Adjacency is stored as CSR arrays (`indptr`, `indices`, `distance_km`)
+    plus a small edge list for hospitals added since the last build. An
+    added hospital gets its own k nearest neighbours, and links to every
+    existing hospital it is now closer to than that hospital's k-th
+    neighbour. Edges it displaced from those hospitals' lists are kept
+    until the next full rebuild, which happens once the added points pass
+    5% of the graph.
+    """
+
+    def __init__(self, lat: np.ndarray, lng: np.ndarray, k: int = 8, kernel_km: Optional[float] = None) -> None:
+        self.k = max(1, k)
+        self._kernel_km = kernel_km
+        self._points = unit_vectors(lat, lng)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    # -- construction ----------------------------------------------------
+
+    def _build(self) -> None:
+        n = len(self._points)
+        tree = KDTree(self._points)
+        self._built = n
+        dist, nbrs = tree.query(tree.points, self.k, exclude=np.arange(n))
+        found = nbrs >= 0
+        rows = np.repeat(np.arange(n), found.sum(axis=1))
+        cols = nbrs[found]
+        km = chord_to_km(dist[found])
+        # Sorted k-NN distances per node (inf padded), to tell which nodes an
+        # added hospital displaces a neighbour from.
+        self._knn_km = np.where(found, chord_to_km(dist), np.inf)
+        if self._kernel_km:
+            self.kernel_km = float(self._kernel_km)
+        else:
+            self.kernel_km = float(np.median(km)) if km.size else 1.0
+        self.kernel_km = max(self.kernel_km, 1e-3)
+        self.indptr, self.indices, self.distance_km = _csr(
+            n, np.concatenate([rows, cols]), np.concatenate([cols, rows]), np.concatenate([km, km])
+        )
+        self._extra_rows: List[np.ndarray] = []
+        self._extra_cols: List[np.ndarray] = []
+        self._extra_km: List[np.ndarray] = []
+        self._operator = None
+
+    def add(self, lat: float, lng: float) -> int:
+        """
+        Insert one hospital and link it into the graph; returns its index.
+        """
+        point = unit_vectors([lat], [lng])
+        self._points = np.vstack([self._points, point])
+        index = len(self._points) - 1
+        if index - self._built > max(_MIN_PENDING, _REBUILD_FRACTION * self._built):
+            self._build()
+            return index
+
+        # One vectorized distance pass (O(n), no tree needed for a single
+        # point) gives both the new point's k nearest and the existing points
+        # that now have it among their k nearest.
+        diff = self._points[:index] - point[0]
+        all_km = chord_to_km(np.sqrt(np.einsum("ij,ij->i", diff, diff)))
+        take = min(self.k, index)
+        cand = np.argpartition(all_km, take - 1)[:take] if 0 < take < index else np.arange(index)
+        cand = cand[np.argsort(all_km[cand], kind="stable")]
+        cand_km = all_km[cand]
+        closer = np.flatnonzero(all_km < self._knn_km[:index, -1])
+        if closer.size:
+            merged = np.column_stack([self._knn_km[closer], all_km[closer]])
+            self._knn_km[closer] = np.sort(merged, axis=1)[:, : self.k]
+        closer = closer[~np.isin(closer, cand)]
+
+        linked = np.concatenate([cand, closer])
+        linked_km = np.concatenate([cand_km, all_km[closer]])
+        new = np.full(len(linked), index)
+        self._extra_rows.extend((new, linked))
+        self._extra_cols.extend((linked, new))
+        self._extra_km.extend((linked_km, linked_km))
+        own = np.full((1, self.k), np.inf)
+        own[0, : len(cand_km)] = cand_km
+        self._knn_km = np.vstack([self._knn_km, own])
+        self._operator = None
+        return index
+
+    # -- adjacency -------------------------------------------------------
+
+    def _coo(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = len(self._points)
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        if not self._extra_rows:
+            return rows, self.indices, self.distance_km
+        rows = np.concatenate([rows] + self._extra_rows)
+        cols = np.concatenate([self.indices] + self._extra_cols)
+        km = np.concatenate([self.distance_km] + self._extra_km)
+        # Fold the added edges into the CSR arrays so later calls are cheap.
+        self.indptr, self.indices, self.distance_km = _csr(n, rows, cols, km)
+        self._extra_rows, self._extra_cols, self._extra_km = [], [], []
+        return np.repeat(np.arange(n), np.diff(self.indptr)), self.indices, self.distance_km
+
+    def weights(self, distance_km: np.ndarray) -> np.ndarray:
+        return np.exp(-((distance_km / self.kernel_km) ** 2))
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Undirected edges as (source, target, distance_km) with source < target.
+        """
+        rows, cols, km = self._coo()
+        keep = rows < cols
+        return rows[keep], cols[keep], km[keep]
+
+    def degree(self) -> np.ndarray:
+        rows, _, _ = self._coo()
+        return np.bincount(rows, minlength=len(self._points))
+
+    # -- diffusion -------------------------------------------------------
+
+    def _transition(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Row-normalized weights P = D^-1 W, cached until the graph changes.
+        if self._operator is None:
+            n = len(self._points)
+            rows, cols, km = self._coo()
+            w = self.weights(km)
+            strength = np.bincount(rows, weights=w, minlength=n)
+            p = w / np.where(strength > 0, strength, 1.0)[rows]
+            self._operator = (rows, cols, p, strength == 0)
+        return self._operator
+
+    def diffuse(
+        self,
+        signal: np.ndarray,
+        alpha: float = 0.5,
+        max_iter: int = 50,
+        tol: float = 1e-4,
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Spread `signal` over the graph: iterate s <- (1 - alpha) s0 + alpha P s
+        until no score moves more than `tol` (or `max_iter`); returns
+        (scores, iterations).
+
+        Each step is one sparse mat-vec, O(edges). Scores are a weighted
+        blend of a hospital's own signal and its neighbourhood's, so a
+        cluster of strained hospitals lifts the hospitals around it while an
+        isolated spike is damped. Isolated hospitals keep their own signal.
+        """
+        s0 = np.asarray(signal, dtype=np.float64)
+        n = len(self._points)
+        if s0.shape != (n,):
+            raise ValueError(f"signal must have one value per node ({n})")
+        if not 0.0 <= alpha < 1.0:
+            raise ValueError("alpha must be in [0, 1)")
+        rows, cols, p, isolated = self._transition()
+        base = (1.0 - alpha) * s0
+        scores = s0.copy()
+        for iteration in range(1, max_iter + 1):
+            spread = np.bincount(rows, weights=p * scores[cols], minlength=n)
+            spread[isolated] = scores[isolated]
+            updated = base + alpha * spread
+            delta = np.abs(updated - scores).max(initial=0.0)
+            scores = updated
+            if delta < tol:
+                return scores, iteration
+        return scores, max_iter
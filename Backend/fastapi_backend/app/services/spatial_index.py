@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.schemas import HospitalNode
+from app.services.hospital_table import LEVELS, HospitalTable
+from app.services.kdtree import KDTree, chord_to_km, unit_vectors
+
+# Oxygen levels in increasing order (the table's codes); each hospital's
+# level is one bit.
+OXYGEN_LEVELS: Tuple[str, ...] = LEVELS
+_ANY_OXYGEN = (1 << len(OXYGEN_LEVELS)) - 1
+_DEAD = -1  # free-bed value of a vacated slot; never matches a filter
+_MIN_PENDING = 64
+_REBUILD_FRACTION = 0.05
+
+
+def oxygen_mask(minimum: Optional[str]) -> int:
+    """
+    Bit mask of oxygen levels at or above `minimum` (all levels for None).
+    """
+    if minimum is None:
+        return _ANY_OXYGEN
+    return _ANY_OXYGEN & ~((1 << OXYGEN_LEVELS.index(minimum)) - 1)
+
+
+class _FilterTree(KDTree):
+    """
+    KD-tree whose nodes also carry the best free-ICU count and the union of
+    oxygen levels below them, so filtered searches can skip whole subtrees.
+    """
+
+    def __init__(self, points: np.ndarray, free: np.ndarray, mask: np.ndarray) -> None:
+        super().__init__(points, leaf_size=16)
+        self.free = free
+        self.mask = mask
+        self.leaf_of = np.empty(len(points), dtype=np.int64)
+        for leaf in self._leaves.tolist():
+            self.leaf_of[self.order[self._start[leaf] : self._end[leaf]]] = leaf
+        # Plain lists: the search touches a handful of nodes per query and
+        # Python scalars are much cheaper than NumPy ones at that scale.
+        self._left_list = self._left.tolist()
+        self._right_list = self._right.tolist()
+        self._parent_list = self._parent.tolist()
+        self._start_list = self._start.tolist()
+        self._end_list = self._end.tolist()
+        self._boxes = list(zip(self._lo.tolist(), self._hi.tolist()))
+        self.node_free = [_DEAD] * len(self._start_list)
+        self.node_mask = [0] * len(self._start_list)
+        for leaf in self._leaves.tolist():
+            self._refresh_leaf(leaf)
+        # Children are always numbered after their parent.
+        for node in np.flatnonzero(self._left >= 0)[::-1].tolist():
+            self._combine(node)
+
+    def _refresh_leaf(self, leaf: int) -> None:
+        members = self.order[self._start_list[leaf] : self._end_list[leaf]]
+        self.node_free[leaf] = int(self.free[members].max(initial=_DEAD))
+        self.node_mask[leaf] = int(np.bitwise_or.reduce(self.mask[members])) if members.size else 0
+
+    def _combine(self, node: int) -> bool:
+        left, right = self._left_list[node], self._right_list[node]
+        free = max(self.node_free[left], self.node_free[right])
+        mask = self.node_mask[left] | self.node_mask[right]
+        changed = free != self.node_free[node] or mask != self.node_mask[node]
+        self.node_free[node], self.node_mask[node] = free, mask
+        return changed
+
+    def update(self, slot: int) -> None:
+        # Re-aggregate the slot's leaf and walk up while anything changes.
+        node = int(self.leaf_of[slot])
+        self._refresh_leaf(node)
+        node = self._parent_list[node]
+        while node >= 0 and self._combine(node):
+            node = self._parent_list[node]
+
+    def search(
+        self, q: np.ndarray, k: int, min_free: int, allowed: int, best: List[Tuple[float, int]], skip: int
+    ) -> None:
+        """
+        Best-first search pushing filters into the traversal; `best` is a
+        max-heap of (-squared distance, slot) holding at most k entries.
+        """
+        node_free, node_mask = self.node_free, self.node_mask
+        left, right, boxes = self._left_list, self._right_list, self._boxes
+        qx, qy, qz = q.tolist()
+        heap = [(0.0, 0)]
+        while heap:
+            gap, node = heapq.heappop(heap)
+            if len(best) == k and gap > -best[0][0]:
+                break
+            if node_free[node] < min_free or not node_mask[node] & allowed:
+                continue
+            if left[node] >= 0:
+                for child in (left[node], right[node]):
+                    (lx, ly, lz), (hx, hy, hz) = boxes[child]
+                    dx = lx - qx if qx < lx else (qx - hx if qx > hx else 0.0)
+                    dy = ly - qy if qy < ly else (qy - hy if qy > hy else 0.0)
+                    dz = lz - qz if qz < lz else (qz - hz if qz > hz else 0.0)
+                    child_gap = dx * dx + dy * dy + dz * dz
+                    if len(best) < k or child_gap <= -best[0][0]:
+                        heapq.heappush(heap, (child_gap, child))
+                continue
+            members = self.order[self._start_list[node] : self._end_list[node]]
+            _offer(best, k, q, self.points, members, self.free, self.mask, min_free, allowed, skip)
+
+
+def _offer(
+    best: List[Tuple[float, int]],
+    k: int,
+    q: np.ndarray,
+    points: np.ndarray,
+    slots: np.ndarray,
+    free: np.ndarray,
+    mask: np.ndarray,
+    min_free: int,
+    allowed: int,
+    skip: int,
+) -> None:
+    keep = (free[slots] >= min_free) & ((mask[slots] & allowed) != 0) & (slots != skip)
+    slots = slots[keep]
+    if not slots.size:
+        return
+    diff = points[slots] - q
+    d2 = np.einsum("ij,ij->i", diff, diff)
+    for dist, slot in zip(d2.tolist(), slots.tolist()):
+        if len(best) < k:
+            heapq.heappush(best, (-dist, slot))
+        elif dist < -best[0][0]:
+            heapq.heapreplace(best, (-dist, slot))
+
+
+class HospitalIndex:
+    """
+    Spatial index over hospitals for filtered nearest-neighbour queries.
+
+    Hospitals live in slots of flat arrays (unit-sphere position, free ICU
+    beds, oxygen level bit). A KD-tree over the slots keeps, per node, the
+    most free ICU beds and the oxygen levels present beneath it, so a query
+    like "5 nearest with >= 2 free ICU beds and oxygen not LOW" prunes
+    subtrees that can't match instead of filtering afterwards.
+
+    Occupancy changes update a slot and re-aggregate up its tree path
+    (O(log n)). Added or moved hospitals take a new slot that is scanned
+    linearly until the tree is rebuilt, once they pass 5% of the index;
+    a moved hospital's old slot is vacated. Callers are responsible for
+    locking.
+    """
+
+    def __init__(self) -> None:
+        self.reset(())
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def reset(self, nodes: Iterable[HospitalNode]) -> None:
+        self.load(HospitalTable.from_nodes(nodes))
+
+    def load(self, table: HospitalTable) -> None:
+        """
+        Rebuild from the columns of `table`.
+        """
+        size = len(table)
+        lat, lng = table.array("lat"), table.array("lng")
+        self._ids: List[Optional[str]] = list(table.ids)
+        self._slots: Dict[str, int] = {hid: i for i, hid in enumerate(self._ids)}
+        self._positions: List[Tuple[float, float]] = list(zip(lat.tolist(), lng.tolist()))
+        count = max(size, 16)
+        self._points = np.zeros((count, 3))
+        self._free = np.full(count, _DEAD, dtype=np.int64)
+        self._mask = np.zeros(count, dtype=np.int64)
+        if size:
+            used, total = table.array("occupancy.icu_beds_used"), table.array("occupancy.icu_beds_total")
+            self._points[:size] = unit_vectors(lat, lng)
+            self._free[:size] = np.maximum(total.astype(np.int64) - used, 0)
+            self._mask[:size] = np.left_shift(1, table.array("resources.oxygen").astype(np.int64))
+        self._build()
+
+    def _build(self) -> None:
+        size = len(self._ids)
+        self._built = size
+        self._tree = _FilterTree(self._points[:size], self._free, self._mask) if size else None
+
+    def _compact(self) -> None:
+        live = [i for i, hid in enumerate(self._ids) if hid is not None]
+        size = len(live)
+        capacity = max(2 * size, 16)
+        points = np.zeros((capacity, 3))
+        free = np.full(capacity, _DEAD, dtype=np.int64)
+        mask = np.zeros(capacity, dtype=np.int64)
+        points[:size], free[:size], mask[:size] = self._points[live], self._free[live], self._mask[live]
+        self._points, self._free, self._mask = points, free, mask
+        self._ids = [self._ids[i] for i in live]
+        self._positions = [self._positions[i] for i in live]
+        self._slots = {hid: i for i, hid in enumerate(self._ids)}
+        self._build()
+
+    def _new_slot(self, hospital_id: str, lat: float, lng: float, free: int, mask: int) -> None:
+        slot = len(self._ids)
+        if slot == len(self._free):
+            grow = len(self._free)
+            self._points = np.vstack([self._points, np.zeros((grow, 3))])
+            self._free = np.concatenate([self._free, np.full(grow, _DEAD, dtype=np.int64)])
+            self._mask = np.concatenate([self._mask, np.zeros(grow, dtype=np.int64)])
+            if self._tree is not None:
+                self._tree.free, self._tree.mask = self._free, self._mask
+        self._ids.append(hospital_id)
+        self._positions.append((lat, lng))
+        self._slots[hospital_id] = slot
+        self._points[slot] = unit_vectors([lat], [lng])[0]
+        self._free[slot] = free
+        self._mask[slot] = mask
+        if slot + 1 - self._built > max(_MIN_PENDING, _REBUILD_FRACTION * self._built):
+            self._compact()
+
+    def _set(self, slot: int, free: int, mask: int) -> None:
+        if self._free[slot] == free and self._mask[slot] == mask:
+            return
+        self._free[slot], self._mask[slot] = free, mask
+        if slot < self._built:
+            self._tree.update(slot)
+
+    def upsert(self, node: HospitalNode) -> None:
+        self.put(node.id, node.lat, node.lng, _free_icu(node), node.resources.oxygen)
+
+    def put(self, hospital_id: str, lat: float, lng: float, icu_free: int, oxygen: str) -> None:
+        """
+        Insert or update one hospital from plain values (`icu_free` is
+        clamped at 0).
+        """
+        free, mask = max(icu_free, 0), 1 << OXYGEN_LEVELS.index(oxygen)
+        slot = self._slots.get(hospital_id)
+        if slot is not None and self._positions[slot] == (lat, lng):
+            self._set(slot, free, mask)
+            return
+        if slot is not None:
+            self._set(slot, _DEAD, 0)
+            self._ids[slot] = None
+        self._new_slot(hospital_id, lat, lng, free, mask)
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        k: int,
+        min_icu_free: int = 0,
+        min_oxygen: Optional[str] = None,
+        exclude: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Up to k (hospital id, great-circle km) pairs, nearest first, among
+        hospitals with at least `min_icu_free` free ICU beds and oxygen at
+        or above `min_oxygen`.
+        """
+        if k <= 0 or not self._slots:
+            return []
+        q = unit_vectors([lat], [lng])[0]
+        allowed = oxygen_mask(min_oxygen)
+        skip = self._slots.get(exclude, -1) if exclude is not None else -1
+        best: List[Tuple[float, int]] = []
+        pending = np.arange(self._built, len(self._ids))
+        if pending.size:
+            _offer(best, k, q, self._points, pending, self._free, self._mask, min_icu_free, allowed, skip)
+        if self._tree is not None:
+            self._tree.search(q, k, min_icu_free, allowed, best, skip)
+        ranked = sorted((-neg, slot) for neg, slot in best)
+        km = chord_to_km(np.sqrt([d for d, _ in ranked])).tolist()
+        return [(self._ids[slot], dist) for (_, slot), dist in zip(ranked, km)]
+
+
+def _free_icu(node: HospitalNode) -> int:
+    occ = node.occupancy
+    return occ.icu_beds_total - occ.icu_beds_used
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple, Union
+
+from app.config import get_settings
+from app.services import actions_service, hospital_service, kpi_service
+from app.sse import HEARTBEAT_FRAME, format_sse
+
+# Queued in place of a real frame when a subscriber fell too far behind; the
+# subscriber then receives a fresh snapshot instead of the dropped deltas.
+_RESYNC = object()
+_MISSING = object()
+
+Flat = Dict[str, Any]
+
+
+def flatten(value: Dict[str, Any], prefix: str = "") -> Flat:
+    """
+    Flatten nested dicts into dotted paths, e.g. {"occupancy.icu_beds_used": 3}.
+    """
+    out: Flat = {}
+    for key, item in value.items():
+        path = f"{prefix}{key}"
+        if isinstance(item, dict):
+            out.update(flatten(item, path + "."))
+        else:
+            out[path] = item
+    return out
+
+
+def diff_flat(old: Flat, new: Flat) -> Flat:
+    """
+    Field-level changes from `old` to `new`; removed fields map to None.
+    """
+    changes = {k: v for k, v in new.items() if old.get(k, _MISSING) != v}
+    for k in old.keys() - new.keys():
+        changes[k] = None
+    return changes
+
+
+def diff_collection(old: Dict[str, Flat], new: Dict[str, Flat]) -> Dict[str, Any]:
+    """
+    Diff two id-keyed collections of flattened records. Only non-empty
+    sections are included in the result.
+    """
+    added = [new[k] for k in new.keys() - old.keys()]
+    removed = sorted(old.keys() - new.keys())
+    changed: Dict[str, Flat] = {}
+    for key in new.keys() & old.keys():
+        if new[key] is old[key]:
+            continue
+        fields = diff_flat(old[key], new[key])
+        if fields:
+            changed[key] = fields
+    out: Dict[str, Any] = {}
+    if added:
+        out["added"] = added
+    if removed:
+        out["removed"] = removed
+    if changed:
+        out["changed"] = changed
+    return out
+
+
+def _unflatten(flat: Flat) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for path, value in flat.items():
+        node = out
+        *parents, leaf = path.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    return out
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: "asyncio.Queue[Union[bytes, object]]"
+
+
+@dataclass
+class _State:
+    hospitals_version: Optional[str] = None
+    kpi_version: Optional[str] = None
+    actions_version: Optional[int] = None
+    hospitals: Dict[str, Flat] = field(default_factory=dict)
+    kpi: Flat = field(default_factory=dict)
+    actions: Dict[str, Flat] = field(default_factory=dict)
+
+
+class StreamHub:
+    """
+    Single in-process fan-out broadcaster for hospital, KPI and action changes.
+
+    `refresh()` compares the current service versions with the last published
+    ones, computes one delta and encodes it once; every subscriber then just
+    receives the same bytes. Subscribers are bounded asyncio queues, fed via
+    `call_soon_threadsafe` so refreshes can come from worker threads.
+
+    While anyone is subscribed, a watcher task refreshes every poll interval
+    and whenever `wake()` is called. Service change listeners only call
+    `wake()`, so the diff runs on the watcher (off the mutating request and
+    its locks), and a burst of changes is coalesced into one refresh.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: Set[_Subscriber] = set()
+        self._state = _State()
+        self._seq = 0
+        self._snapshot_frame: Optional[Tuple[int, bytes]] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dirty: Optional[asyncio.Event] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    # --- state tracking ---------------------------------------------------
+
+    def _collect(self, state: _State) -> Dict[str, Any]:
+        """
+        Update `state` in place from the services and return the delta
+        sections that changed (empty dict if nothing did).
+        """
+        delta: Dict[str, Any] = {}
+
+        hospitals = hospital_service.get_snapshot()
+        if hospitals.version != state.hospitals_version:
+            # Columns are keyed by leaf path, i.e. already flattened.
+            columns = hospitals.data.columns()
+            flat = [dict(zip(columns, row)) for row in zip(*columns.values())]
+            current = {row["id"]: row for row in flat}
+            section = diff_collection(state.hospitals, current)
+            if section and state.hospitals_version is not None:
+                delta["hospitals"] = section
+            state.hospitals = current
+            state.hospitals_version = hospitals.version
+
+        kpi = kpi_service.get_snapshot()
+        if kpi.version != state.kpi_version:
+            current_kpi = flatten(kpi.data.model_dump(mode="json"))
+            fields = diff_flat(state.kpi, current_kpi)
+            if fields and state.kpi_version is not None:
+                delta["kpi"] = fields
+            state.kpi = current_kpi
+            state.kpi_version = kpi.version
+
+        actions_version = actions_service.version()
+        if actions_version != state.actions_version:
+            current_actions = {
+                a.id: flatten(a.model_dump(mode="json")) for a in actions_service.list_pending()
+            }
+            section = diff_collection(state.actions, current_actions)
+            if section and state.actions_version is not None:
+                delta["pending_actions"] = section
+            state.actions = current_actions
+            state.actions_version = actions_version
+
+        return delta
+
+    def _publish_locked(self) -> Optional[bytes]:
+        delta = self._collect(self._state)
+        if not delta:
+            return None
+        self._seq += 1
+        self._snapshot_frame = None
+        return format_sse(
+            json.dumps({"seq": self._seq, **delta}, separators=(",", ":")).encode("utf-8"),
+            event="delta",
+            event_id=str(self._seq),
+        )
+
+    def _snapshot_locked(self) -> bytes:
+        cached = self._snapshot_frame
+        if cached is not None and cached[0] == self._seq:
+            return cached[1]
+        state = self._state
+        payload = {
+            "seq": self._seq,
+            "hospitals": [_unflatten(h) for h in state.hospitals.values()],
+            "kpi": _unflatten(state.kpi),
+            "pending_actions": [_unflatten(a) for a in state.actions.values()],
+        }
+        frame = format_sse(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            event="snapshot",
+            event_id=str(self._seq),
+        )
+        self._snapshot_frame = (self._seq, frame)
+        return frame
+
+    def refresh(self) -> bool:
+        """
+        Broadcast a delta if any tracked service changed. Returns True if a
+        delta was sent. Safe to call from any thread.
+        """
+        with self._lock:
+            frame = self._publish_locked()
+            targets = list(self._subscribers)
+        if frame is None:
+            return False
+        for sub in targets:
+            self._deliver(sub, frame)
+        return True
+
+    def _join(self, sub: Optional[_Subscriber]) -> bytes:
+        """
+        Return a snapshot frame, first flushing any pending delta to existing
+        subscribers. When `sub` is given it is registered atomically with the
+        snapshot so it never misses or double-applies a delta.
+
+        A resyncing subscriber (``sub=None``) may still see a delta whose
+        ``seq`` equals the snapshot's; clients ignore deltas with
+        ``seq <= snapshot.seq``.
+        """
+        with self._lock:
+            frame = self._publish_locked()
+            targets = list(self._subscribers)
+            if sub is not None:
+                self._subscribers.add(sub)
+            snapshot = self._snapshot_locked()
+        if frame is not None:
+            for target in targets:
+                self._deliver(target, frame)
+        return snapshot
+
+    # --- subscribers ------------------------------------------------------
+
+    def _deliver(self, sub: _Subscriber, frame: bytes) -> None:
+        def _put() -> None:
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow consumer: drop the backlog and ask it to resync.
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait(_RESYNC)
+
+        try:
+            sub.loop.call_soon_threadsafe(_put)
+        except RuntimeError:
+            # Subscriber's loop is closed; it will be discarded on exit.
+            pass
+
+    def wake(self) -> None:
+        """
+        Ask the watcher to refresh soon. Cheap and safe to call from any
+        thread; a no-op while nobody is subscribed.
+        """
+        loop, dirty = self._loop, self._dirty
+        if loop is None or dirty is None or not self._subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(dirty.set)
+        except RuntimeError:
+            pass
+
+    async def _watch(self, dirty: asyncio.Event) -> None:
+        interval = get_settings().stream_poll_interval
+        while self._subscribers:
+            # Cleared first: a change made during the refresh wakes us again.
+            dirty.clear()
+            try:
+                await asyncio.to_thread(self.refresh)
+            except RuntimeError:
+                # Data file temporarily unavailable; try again next tick.
+                pass
+            try:
+                await asyncio.wait_for(dirty.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """
+        Yield SSE frames for one client: a snapshot, then deltas, with
+        periodic keep-alive comments.
+        """
+        settings = get_settings()
+        sub = _Subscriber(
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=settings.stream_queue_size),
+        )
+        try:
+            yield await asyncio.to_thread(self._join, sub)
+            if self._watcher is None or self._watcher.done():
+                self._loop, self._dirty = sub.loop, asyncio.Event()
+                self._watcher = asyncio.create_task(self._watch(self._dirty))
+            while True:
+                try:
+                    frame = await asyncio.wait_for(
+                        sub.queue.get(), timeout=settings.stream_heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT_FRAME
+                    continue
+                if frame is _RESYNC:
+                    frame = await asyncio.to_thread(self._join, None)
+                yield frame
+        finally:
+            self._subscribers.discard(sub)
+
+
+hub = StreamHub()
+
+# Action and live hospital changes wake the watcher instead of waiting for
+# the next poll tick.
+actions_service.add_listener(hub.wake)
+hospital_service.add_listener(hub.wake)
@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Columns stored per bucket, in this order.
+COLUMNS: Tuple[str, ...] = ("icu_beds_used", "icu_beds_total", "ward_beds_used", "ward_beds_total")
+
+_DTYPE = np.uint16
+# Marks a bucket with no observation; real counts are clamped below it.
+_MISSING = np.iinfo(_DTYPE).max
+_MAX_VALUE = _MISSING - 1
+_MIN_CAPACITY = 256
+_INDEX_FILE = "index.json"
+_DAY = 86_400
+# Days of daily rollups kept when the store has no retention limit.
+_ROLLUP_DAYS = 64
+
+# Point = (unix seconds, icu_used, icu_total, ward_used, ward_total)
+Point = Tuple[float, int, int, int, int]
+
+
+@dataclass
+class _Series:
+    start: int  # absolute bucket number of column 0
+    length: int  # buckets in use (trailing missing buckets are not counted)
+    data: np.ndarray  # shape (len(COLUMNS), capacity), one contiguous row per column
+    file: Optional[str] = None
+
+
+class _DailyRollup:
+    """
+    Per-hospital daily sums and observed-bucket counts as dense
+    (hospitals x days) arrays, kept up to date on every write so network
+    reads (forecasting) never scan raw buckets.
+
+    Columns form a ring over the last `days` UTC days: day d lives in column
+    d % days, and a column is recycled (zeroed for every hospital) when a
+    newer day first needs it. Writes for days older than the ring are
+    ignored. Not thread-safe; the store holds its lock.
+    """
+
+    def __init__(self, days: int, max_daily_sum: int) -> None:
+        self.days = days
+        self._dtype = np.int32 if max_daily_sum <= np.iinfo(np.int32).max else np.int64
+        self._rows: Dict[str, int] = {}
+        self._day = np.full(days, -1, dtype=np.int64)  # day held by each column
+        self._sums = np.zeros((len(COLUMNS), 0, days), dtype=self._dtype)
+        self._counts = np.zeros((0, days), dtype=np.int32)
+
+    def row(self, hospital_id: str) -> int:
+        """
+        The matrix row of `hospital_id`, added if new.
+        """
+        row = self._rows.get(hospital_id)
+        if row is None:
+            row = self._rows[hospital_id] = len(self._rows)
+            capacity = self._counts.shape[0]
+            if row >= capacity:
+                grown = max(_MIN_CAPACITY, capacity * 2)
+                sums = np.zeros((len(COLUMNS), grown, self.days), dtype=self._dtype)
+                sums[:, :capacity] = self._sums
+                counts = np.zeros((grown, self.days), dtype=np.int32)
+                counts[:capacity] = self._counts
+                self._sums, self._counts = sums, counts
+        return row
+
+    def add(self, rows: np.ndarray, days: np.ndarray, values: np.ndarray, counts: np.ndarray) -> None:
+        """
+        Add `values` ((k, len(COLUMNS)), may be negative) and `counts` (k,)
+        to cell (rows[i], days[i]) for each i, in one vectorised pass.
+        """
+        cols = days % self.days
+        newer = self._day[cols] < days
+        if newer.any():
+            for col, day in set(zip(cols[newer].tolist(), days[newer].tolist())):
+                if self._day[col] < day:
+                    self._day[col] = day
+                    self._sums[:, :, col] = 0
+                    self._counts[:, col] = 0
+        current = self._day[cols] == days
+        if not current.any():
+            return
+        cells, inverse = np.unique(rows[current] * self.days + cols[current], return_inverse=True)
+        values, counts = values[current], counts[current]
+        for i in range(len(COLUMNS)):
+            self._sums[i].reshape(-1)[cells] += np.bincount(inverse, weights=values[:, i]).astype(self._dtype)
+        self._counts.reshape(-1)[cells] += np.bincount(inverse, weights=counts).astype(np.int32)
+
+    def means(self, hospital_ids: Sequence[str], first_day: int, periods: int) -> Dict[str, np.ndarray]:
+        out = {name: np.full((len(hospital_ids), periods), np.nan) for name in COLUMNS}
+        wanted = np.arange(first_day, first_day + periods, dtype=np.int64)
+        cols = wanted % self.days
+        held = self._day[cols] == wanted
+        rows = np.array([self._rows.get(hid, -1) for hid in hospital_ids], dtype=np.int64)
+        known = rows >= 0
+        if not held.any() or not known.any():
+            return out
+        counts = self._counts[np.ix_(rows[known], cols[held])]
+        observed = counts > 0
+        where = np.ix_(known, held)
+        for i, name in enumerate(COLUMNS):
+            sums = self._sums[i][np.ix_(rows[known], cols[held])]
+            block = np.full(counts.shape, np.nan)
+            np.divide(sums, counts, out=block, where=observed)
+            out[name][where] = block
+        return out
+
+
+@dataclass(frozen=True)
+class SeriesRange:
+    """
+    Result of a range query: bucket start times plus one array per column.
+
+    Raw queries return one entry per observed bucket. Rollups return the mean
+    of the observed buckets in each window, and `samples` counts them.
+    """
+
+    interval: int
+    timestamps: np.ndarray  # int64 unix seconds
+    values: Dict[str, np.ndarray]
+    samples: np.ndarray
+
+
+class OccupancySeriesStore:
+    """
+    Append-only, fixed-interval time series of bed counts per hospital.
+
+    Each hospital's history is a (4, capacity) uint16 array: 8 bytes per
+    bucket, with bucket timestamps implicit from the series start. An
+    observation lands in bucket floor(t / interval); later observations for
+    the same bucket overwrite it. Buckets without data hold a sentinel and
+    are skipped by queries.
+
+    With a `root` directory, each series is a memory-mapped .npy file and
+    `index.json` maps hospital ids to (file, start bucket); the OS page cache
+    does the buffering and a restart reopens the files without loading them.
+    With root=None (or ":memory:") series live in ordinary arrays.
+
+    With `retention` (seconds), a series holds at most that much history:
+    it works as a ring buffer that discards its oldest buckets (an eighth
+    of its capacity at a time, so the index is rarely rewritten) when newer
+    points need the room.
+
+    Daily means for the whole network (`daily_matrix`) come from rollups
+    maintained on every append, covering the retention window (or the last
+    64 days without one); they are rebuilt from the series on reopen.
+    """
+
+    def __init__(self, root: Optional[str], interval: int = 60, retention: Optional[int] = None) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if retention is not None and retention < interval:
+            raise ValueError("retention must cover at least one interval")
+        self.interval = interval
+        self._max_buckets = None if retention is None else retention // interval
+        self._rollup_days = _ROLLUP_DAYS if retention is None else -(-retention // _DAY) + 1
+        self._daily = self._new_rollup()
+        self._root = None if root in (None, "", ":memory:") else Path(root)
+        self._lock = threading.RLock()
+        self._series: Dict[str, _Series] = {}
+        if self._root is not None:
+            self._root.mkdir(parents=True, exist_ok=True)
+            self._open_existing()
+
+    # -- persistence -----------------------------------------------------
+
+    def _open_existing(self) -> None:
+        index_path = self._root / _INDEX_FILE
+        if not index_path.exists():
+            return
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        if index.get("interval") != self.interval:
+            raise RuntimeError(
+                f"History at {self._root} uses interval {index.get('interval')}s, not {self.interval}s"
+            )
+        for hospital_id, entry in index["series"].items():
+            data = np.load(self._root / entry["file"], mmap_mode="r+")
+            observed = np.flatnonzero((data != _MISSING).any(axis=0))
+            length = int(observed[-1]) + 1 if observed.size else 0
+            series = self._series[hospital_id] = _Series(entry["start"], length, data, entry["file"])
+            self._rebuild_rollup(hospital_id, series)
+
+    def _rebuild_rollup(self, hospital_id: str, series: _Series) -> None:
+        # Only the buckets inside the rollup window are read.
+        if not series.length:
+            return
+        last_day = (series.start + series.length - 1) * self.interval // _DAY
+        first = max((last_day - self._rollup_days + 1) * _DAY // self.interval - series.start, 0)
+        observed = first + np.flatnonzero(series.data[0, first : series.length] != _MISSING)
+        if observed.size:
+            self._roll_up([(hospital_id, series.start + observed, series.data[:, observed].T, None)])
+
+    def _write_index(self) -> None:
+        index = {
+            "interval": self.interval,
+            "series": {hid: {"file": s.file, "start": s.start} for hid, s in self._series.items()},
+        }
+        tmp = self._root / (_INDEX_FILE + ".tmp")
+        tmp.write_text(json.dumps(index), encoding="utf-8")
+        os.replace(tmp, self._root / _INDEX_FILE)
+
+    def _allocate(self, capacity: int, file: Optional[str]) -> np.ndarray:
+        shape = (len(COLUMNS), capacity)
+        if self._root is None:
+            return np.full(shape, _MISSING, dtype=_DTYPE)
+        data = np.lib.format.open_memmap(self._root / file, mode="w+", dtype=_DTYPE, shape=shape)
+        data[:] = _MISSING
+        return data
+
+    def flush(self) -> None:
+        with self._lock:
+            for series in self._series.values():
+                if isinstance(series.data, np.memmap):
+                    series.data.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._series.clear()
+            self._daily = self._new_rollup()
+
+    def _new_rollup(self) -> _DailyRollup:
+        return _DailyRollup(self._rollup_days, max_daily_sum=-(-_DAY // self.interval) * int(_MAX_VALUE))
+
+    # -- writes ----------------------------------------------------------
+
+    def _ensure(self, hospital_id: str, first: int, last: int) -> _Series:
+        """
+        Return the series for `hospital_id`, created (starting at bucket
+        `first`) or grown so that bucket `last` fits. Under a retention
+        limit the series may start later than `first`; callers drop points
+        before `series.start`.
+        """
+        limit = self._max_buckets
+        series = self._series.get(hospital_id)
+        if series is None:
+            if limit is not None:
+                first = max(first, last - limit + 1)
+            capacity = max(_MIN_CAPACITY, last - first + 1)
+            if limit is not None:
+                capacity = min(capacity, limit)
+            file = f"{len(self._series):06d}.npy" if self._root is not None else None
+            series = _Series(first, 0, self._allocate(capacity, file), file)
+            self._series[hospital_id] = series
+            if self._root is not None:
+                self._write_index()
+            return series
+        needed = last - series.start + 1
+        capacity = series.data.shape[1]
+        if needed > capacity and (limit is None or capacity < limit):
+            new_capacity = max(needed, capacity * 2)
+            if limit is not None:
+                new_capacity = min(new_capacity, limit)
+            grown = self._allocate(new_capacity, series.file + ".grow" if series.file else None)
+            grown[:, :capacity] = series.data
+            if series.file:
+                # The map follows the inode, so it stays valid after the rename.
+                grown.flush()
+                os.replace(self._root / (series.file + ".grow"), self._root / series.file)
+            series.data = grown
+            capacity = new_capacity
+        if needed > capacity:
+            self._discard(series, max(needed - capacity, capacity // 8))
+        return series
+
+    def _discard(self, series: _Series, count: int) -> None:
+        # Drop the oldest `count` buckets, moving the series start forward.
+        keep = max(series.data.shape[1] - count, 0)
+        if keep:
+            series.data[:, :keep] = series.data[:, count:]
+        series.data[:, keep:] = _MISSING
+        series.start += count
+        series.length = max(series.length - count, 0)
+        if self._root is not None:
+            self._write_index()
+
+    def append_many(self, points: Iterable[Tuple[str, Point]]) -> int:
+        """
+        Record (hospital_id, point) pairs. Points older than a hospital's
+        first bucket (or than the retention window) are dropped; returns the
+        number recorded.
+        """
+        grouped: Dict[str, List[Point]] = {}
+        for hospital_id, point in points:
+            grouped.setdefault(hospital_id, []).append(point)
+
+        written = 0
+        rollup: List[Tuple[str, np.ndarray, np.ndarray, np.ndarray]] = []
+        with self._lock:
+            for hospital_id, rows in grouped.items():
+                arr = np.asarray(rows, dtype=np.float64)
+                # Stable sort so the latest observation of a bucket wins.
+                arr = arr[np.argsort(arr[:, 0], kind="stable")]
+                buckets = np.floor_divide(arr[:, 0], self.interval).astype(np.int64)
+                values = np.clip(arr[:, 1:], 0, _MAX_VALUE).astype(_DTYPE)
+
+                series = self._ensure(hospital_id, int(buckets[0]), int(buckets[-1]))
+                offsets = buckets - series.start
+                keep = offsets >= 0
+                if not keep.all():
+                    offsets, values = offsets[keep], values[keep]
+                if not offsets.size:
+                    continue
+                if offsets.size > 1:
+                    # The last observation of each bucket wins.
+                    last = np.append(offsets[1:] != offsets[:-1], True)
+                    offsets, values = offsets[last], values[last]
+                # What the buckets held before, so the rollups can swap it out.
+                rollup.append((hospital_id, series.start + offsets, values, series.data[:, offsets]))
+                series.data[:, offsets] = values.T
+                series.length = max(series.length, int(offsets[-1]) + 1)
+                written += int(offsets.size)
+            if rollup:
+                self._roll_up(rollup)
+        return written
+
+    def _roll_up(self, points: List[Tuple[str, np.ndarray, np.ndarray, Optional[np.ndarray]]]) -> None:
+        # points: (hospital id, buckets, new values (k, 4), previous bucket
+        # contents (4, k) or None) per hospital; all go into the rollups at once.
+        rows = np.concatenate([np.full(len(b), self._daily.row(hid), dtype=np.int64) for hid, b, _, _ in points])
+        buckets = np.concatenate([b for _, b, _, _ in points])
+        values = np.concatenate([v for _, _, v, _ in points]).astype(np.float64)
+        counts = np.ones(len(buckets))
+        if any(old is not None for _, _, _, old in points):
+            old = np.concatenate(
+                [np.full((len(COLUMNS), len(b)), _MISSING, dtype=_DTYPE) if o is None else o for _, b, _, o in points], axis=1
+            ).T
+            replaced = old[:, 0] != _MISSING
+            values[replaced] -= old[replaced]
+            counts[replaced] = 0
+        self._daily.add(rows, buckets * self.interval // _DAY, values, counts)
+
+    def append(self, hospital_id: str, point: Point) -> int:
+        return self.append_many([(hospital_id, point)])
+
+    # -- reads -----------------------------------------------------------
+
+    def __contains__(self, hospital_id: str) -> bool:
+        return hospital_id in self._series
+
+    def bytes_used(self, hospital_id: str) -> int:
+        series = self._series.get(hospital_id)
+        return 0 if series is None else series.length * len(COLUMNS) * _DTYPE().itemsize
+
+    def query(self, hospital_id: str, start: float, end: float, resolution: Optional[int] = None) -> SeriesRange:
+        """
+        Observations with start <= t < end.
+
+        `resolution` (seconds, a multiple of the store interval) rolls buckets
+        up into UTC-aligned windows of that size; None returns raw buckets.
+        """
+        step = resolution or self.interval
+        if step % self.interval:
+            raise ValueError(f"resolution must be a multiple of {self.interval}s")
+        factor = step // self.interval
+
+        with self._lock:
+            series = self._series.get(hospital_id)
+            if series is None:
+                return _empty(step)
+            first = max(int(start // self.interval), series.start)
+            last = min(int(-(-end // self.interval)), series.start + series.length)
+            if factor > 1:
+                # Widen to whole windows; the trimmed range is re-applied below.
+                first = max(first - first % factor, series.start)
+            if last <= first:
+                return _empty(step)
+            block = np.array(series.data[:, first - series.start : last - series.start])
+
+        valid = block[0] != _MISSING
+        bucket_times = np.arange(first, last, dtype=np.int64) * self.interval
+        in_range = (bucket_times >= start) & (bucket_times < end)
+        valid &= in_range
+
+        if factor == 1:
+            return SeriesRange(
+                interval=step,
+                timestamps=bucket_times[valid],
+                values={name: block[i, valid].astype(np.int64) for i, name in enumerate(COLUMNS)},
+                samples=np.ones(int(valid.sum()), dtype=np.int64),
+            )
+
+        # Lay the block out in whole windows (zero-padded) and reduce every
+        # column plus the sample count in one pass.
+        offset = first % factor
+        width = block.shape[1]
+        windows = -(-(offset + width) // factor)
+        grid = np.zeros((len(COLUMNS) + 1, windows * factor))
+        grid[:-1, offset : offset + width] = np.where(valid, block, 0)
+        grid[-1, offset : offset + width] = valid
+        totals = grid.reshape(len(COLUMNS) + 1, windows, factor).sum(axis=2)
+        counts = totals[-1]
+        present = counts > 0
+        window_times = (np.arange(windows, dtype=np.int64) + (first - offset) // factor) * step
+        means = totals[:-1, present] / counts[present]
+        return SeriesRange(
+            interval=step,
+            timestamps=window_times[present],
+            values={name: means[i] for i, name in enumerate(COLUMNS)},
+            samples=counts[present].astype(np.int64),
+        )
+
+    def daily_matrix(self, hospital_ids: Sequence[str], first_day: int, periods: int) -> Dict[str, np.ndarray]:
+        """
+        Daily means for many hospitals as dense (len(ids), periods) arrays
+        per column, column j covering UTC day `first_day + j` (days since
+        the epoch). Matches `query(..., resolution=86400)` per hospital;
+        cells with no observations, or older than the rollup window, are
+        NaN.
+        """
+        with self._lock:
+            return self._daily.means(hospital_ids, first_day, periods)
+
+
+def _empty(step: int) -> SeriesRange:
+    return SeriesRange(
+        interval=step,
+        timestamps=np.empty(0, dtype=np.int64),
+        values={name: np.empty(0) for name in COLUMNS},
+        samples=np.empty(0, dtype=np.int64),
+    )
+
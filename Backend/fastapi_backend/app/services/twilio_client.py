@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from typing import Optional
 
 import httpx
 
+from app import metrics
 from app.config import get_settings
+from app.services import http_clients
+
+logger = logging.getLogger(__name__)
+
+# Responses where Twilio refused the message without processing it.
+RETRYABLE_STATUSES = frozenset({429, 503})
 
 
 @dataclass
 class TwilioSendResult:
     sid: Optional[str]
     status: str  # e.g. "QUEUED", "SENT", "FAILED"
+    # Only for FAILED: True when the message certainly was not accepted, so
+    # sending it again can't duplicate it.
+    retryable: bool = False
+    error: Optional[str] = None
 
 
 class TwilioClient:
@@ -23,19 +35,36 @@ class TwilioClient:
       * Log/introspect payload, do not hit the network, return status="QUEUED".
     - Otherwise:
       * Call Twilio's Messages API using the same semantics as twilio_thing.md.
+
+    Requests go through the app-wide pooled `httpx.AsyncClient` (see
+    app.services.http_clients) so connections are reused across messages;
+    a client can also be injected directly (e.g. pointing at a stub server).
+    Sends are retried only on failures where Twilio can't have received
+    the request, so a retry never duplicates an SMS; a FAILED result says
+    whether a later retry is safe (`retryable`).
     """
 
-    def __init__(self) -> None:
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None) -> None:
         self.settings = get_settings()
+        self._http_client = http_client
 
-    async def send_message(self, to: str, body: str) -> TwilioSendResult:
-        # Dry-run or missing configuration: no-op but report queued
-        if (
+    @property
+    def dry_run(self) -> bool:
+        return bool(
             self.settings.twilio_dry_run
             or not self.settings.twilio_account_sid
             or not self.settings.twilio_auth_token
             or not self.settings.twilio_from_number
-        ):
+        )
+
+    async def send_message(self, to: str, body: str) -> TwilioSendResult:
+        result = await self._send(to, body)
+        metrics.TWILIO_MESSAGES.labels(result.status.upper()).inc()
+        return result
+
+    async def _send(self, to: str, body: str) -> TwilioSendResult:
+        # Dry-run or missing configuration: no-op but report queued
+        if self.dry_run:
             # In real app you'd use structured logging; for now this is silent
             return TwilioSendResult(sid=None, status="QUEUED")
 
@@ -43,7 +72,7 @@ class TwilioClient:
         auth_token = self.settings.twilio_auth_token
         from_number = self.settings.twilio_from_number
 
-        url = f"https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json"
+        path = f"/2010-04-01/Accounts/{account_sid}/Messages.json"
 
         auth = (account_sid, auth_token)
         data = {
@@ -52,14 +81,35 @@ class TwilioClient:
             "Body": body,
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.post(url, data=data, auth=auth, timeout=10.0)
-                resp.raise_for_status()
-                payload = resp.json()
-                return TwilioSendResult(
-                    sid=payload.get("sid"), status=payload.get("status", "SENT")
-                )
-            except Exception:
-                # For now, swallow details and signal failure
-                return TwilioSendResult(sid=None, status="FAILED")
+        client = self._http_client or http_clients.get_client("twilio")
+        if client is None:
+            # Outside the app lifespan (scripts, tests): one-off client.
+            async with http_clients.new_client("twilio") as one_off:
+                return await self._post(one_off, path, data, auth)
+        return await self._post(client, path, data, auth)
+
+    async def _post(
+        self,
+        client: httpx.AsyncClient,
+        path: str,
+        data: dict,
+        auth: tuple,
+    ) -> TwilioSendResult:
+        try:
+            resp = await http_clients.request("twilio", client, "POST", path, data=data, auth=auth)
+            resp.raise_for_status()
+            payload = resp.json()
+            return TwilioSendResult(sid=payload.get("sid"), status=payload.get("status", "SENT"))
+        except httpx.HTTPStatusError as exc:
+            code = exc.response.status_code
+            error = f"HTTP {code}: {exc.response.text[:200]}"
+            retryable = code in RETRYABLE_STATUSES
+        except (*http_clients.UNSENT_ERRORS, http_clients.CircuitOpenError) as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            retryable = True
+        except Exception as exc:
+            # e.g. a read timeout: Twilio may have accepted the message.
+            error = f"{type(exc).__name__}: {exc}"
+            retryable = False
+        logger.warning("Twilio send to %s failed (%s): %s", data["To"], "retryable" if retryable else "final", error)
+        return TwilioSendResult(sid=None, status="FAILED", retryable=retryable, error=error)
@@ -0,0 +1,30 @@
+"""
+Server-Sent Events framing helpers.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Disable proxy buffering (nginx) so events are flushed immediately.
+    "X-Accel-Buffering": "no",
+}
+
+HEARTBEAT_FRAME = b": keep-alive\n\n"
+
+
+def format_sse(data: bytes, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    """
+    Encode one SSE frame. `data` must already be serialized (usually JSON).
+    """
+    parts = []
+    if event_id is not None:
+        parts.append(b"id: " + event_id.encode("utf-8") + b"\n")
+    if event is not None:
+        parts.append(b"event: " + event.encode("utf-8") + b"\n")
+    for line in data.split(b"\n"):
+        parts.append(b"data: " + line + b"\n")
+    parts.append(b"\n")
+    return b"".join(parts)
@@ -0,0 +1,111 @@
+"""
+Synthetic data shaped like app/data/mock_hospitals.json and mock_actions.json,
+scaled to any size.
+
+    python -m benchmarks.datagen --hospitals 50000 --actions 20000 --out /tmp/bench-data
+
+Output is deterministic for a given seed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+_STATUSES = ("NORMAL", "WARNING", "CRITICAL")
+_LEVELS = ("LOW", "MEDIUM", "HIGH")
+_ACTION_KINDS = (("STAFFING", "STAFF"), ("SUPPLY", "VENDOR"), ("TRANSFER", "OFFICIAL"), ("ADVISORY", "PUBLIC"))
+_CHANNELS = ("SMS", "WHATSAPP", "EMAIL")
+_ACTION_STATUSES = ("PENDING", "PENDING", "PENDING", "APPROVED", "REJECTED", "SENT")
+
+
+def hospitals(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    `n` hospitals spread over India, clustered around a few hundred city
+    centres, with bed counts and status consistent with occupancy.
+    """
+    rng = np.random.default_rng(seed)
+    cities = np.column_stack([rng.uniform(8, 34, 300), rng.uniform(69, 95, 300)])
+    centre = cities[rng.integers(0, len(cities), n)]
+    lat = np.clip(centre[:, 0] + rng.normal(0, 0.15, n), -90, 90)
+    lng = np.clip(centre[:, 1] + rng.normal(0, 0.15, n), -180, 180)
+    icu_total = rng.integers(4, 60, n)
+    ward_total = icu_total * rng.integers(4, 10, n)
+    icu_load = rng.beta(5, 2, n)
+    icu_used = np.minimum(np.round(icu_total * icu_load), icu_total).astype(int)
+    ward_used = np.minimum(np.round(ward_total * rng.beta(4, 2, n)), ward_total).astype(int)
+    status = np.where(icu_load >= 0.95, 2, np.where(icu_load >= 0.8, 1, 0))
+    oxygen = rng.integers(0, 3, n)
+    staff = rng.integers(0, 3, n)
+    return [
+        {
+            "id": f"hosp-{i + 1}",
+            "name": f"Hospital {i + 1}",
+            "lat": round(float(lat[i]), 5),
+            "lng": round(float(lng[i]), 5),
+            "occupancy": {
+                "icu_beds_used": int(icu_used[i]),
+                "icu_beds_total": int(icu_total[i]),
+                "ward_beds_used": int(ward_used[i]),
+                "ward_beds_total": int(ward_total[i]),
+            },
+            "status": _STATUSES[status[i]],
+            "resources": {"oxygen": _LEVELS[oxygen[i]], "staff_load": _LEVELS[staff[i]]},
+        }
+        for i in range(n)
+    ]
+
+
+def actions(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    `n` actions, about half PENDING, created over the last 30 days.
+    """
+    rng = np.random.default_rng(seed + 1)
+    start = datetime(2025, 11, 1, tzinfo=timezone.utc)
+    minutes = np.sort(rng.integers(0, 30 * 24 * 60, n))
+    out = []
+    for i in range(n):
+        action_type, target = _ACTION_KINDS[int(rng.integers(0, len(_ACTION_KINDS)))]
+        created = (start + timedelta(minutes=int(minutes[i]))).isoformat().replace("+00:00", "Z")
+        recipients = [f"+9198{int(rng.integers(0, 10**8)):08d}" for _ in range(int(rng.integers(1, 4)))]
+        out.append(
+            {
+                "id": f"act-{i + 1}",
+                "type": action_type,
+                "target": target,
+                "channel": _CHANNELS[int(rng.integers(0, len(_CHANNELS)))],
+                "recipients": recipients,
+                "message_template": f"{action_type.title()} request #{i + 1}: projected ICU load above threshold.",
+                "message_final": None,
+                "status": _ACTION_STATUSES[int(rng.integers(0, len(_ACTION_STATUSES)))],
+                "created_at": created,
+                "updated_at": created,
+            }
+        )
+    return out
+
+
+def write(out: Path, n_hospitals: int, n_actions: int, seed: int = 0) -> Dict[str, Path]:
+    """
+    Write mock_hospitals.json / mock_actions.json into `out`.
+    """
+    out.mkdir(parents=True, exist_ok=True)
+    paths = {"hospitals": out / "mock_hospitals.json", "actions": out / "mock_actions.json"}
+    paths["hospitals"].write_text(json.dumps(hospitals(n_hospitals, seed)), encoding="utf-8")
+    paths["actions"].write_text(json.dumps(actions(n_actions, seed)), encoding="utf-8")
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hospitals", type=int, default=10_000)
+    parser.add_argument("--actions", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True)
+    args = parser.parse_args()
+    for kind, path in write(args.out, args.hospitals, args.actions, args.seed).items():
+        print(f"{kind}: {path}")
@@ -0,0 +1,70 @@
+"""
+Micro-benchmarks for schema validation, serialization and the in-memory
+hospital structures, independent of HTTP.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from app.schemas import ActionItem, HospitalNode
+from app.services.hospital_store import HospitalStore
+from app.services.hospital_table import HospitalTable
+from app.services.spatial_index import HospitalIndex
+from benchmarks.stats import timeit
+
+_HOSPITALS = TypeAdapter(List[HospitalNode])
+_ACTIONS = TypeAdapter(List[ActionItem])
+
+
+def run(data: Dict[str, Path], repeat: int = 5) -> Dict[str, Dict[str, Any]]:
+    hospitals_raw = data["hospitals"].read_bytes()
+    actions_raw = data["actions"].read_bytes()
+    hospital_dicts = json.loads(hospitals_raw)
+    nodes = _HOSPITALS.validate_json(hospitals_raw)
+    actions = _ACTIONS.validate_json(actions_raw)
+    n, m = len(nodes), len(actions)
+
+    results: Dict[str, Dict[str, Any]] = {
+        "hospitals.validate_json": timeit(lambda: _HOSPITALS.validate_json(hospitals_raw), repeat, n),
+        "hospitals.model_validate_each": timeit(
+            lambda: [HospitalNode.model_validate(item) for item in hospital_dicts], repeat, n
+        ),
+        "hospitals.dump_json": timeit(lambda: _HOSPITALS.dump_json(nodes), repeat, n),
+        "hospitals.model_dump_each": timeit(lambda: [node.model_dump(mode="json") for node in nodes], repeat, n),
+        "actions.validate_json": timeit(lambda: _ACTIONS.validate_json(actions_raw), repeat, m),
+        "actions.dump_json": timeit(lambda: _ACTIONS.dump_json(actions), repeat, m),
+    }
+
+    table = HospitalTable.from_nodes(nodes)
+    results["table.from_nodes"] = timeit(lambda: HospitalTable.from_nodes(nodes), repeat, n)
+    results["table.dump_json"] = timeit(table.dump_json, repeat, n)
+    critical = table.isin("status", ["CRITICAL"])
+    results["table.sum_icu_used_critical"] = timeit(
+        lambda: table.sum("occupancy.icu_beds_used", where=critical), repeat
+    )
+
+    store = HospitalStore()
+    results["store.load"] = timeit(lambda: store.load(table), repeat, n)
+    results["store.kpi_metrics"] = timeit(lambda: store.kpi.metrics(0.5), repeat)
+    updated = [
+        node.model_copy(update={"occupancy": node.occupancy.model_copy(update={"icu_beds_used": 0})})
+        for node in nodes[:1000]
+    ]
+    results["store.upsert_1000"] = timeit(lambda: store.upsert_many(updated), repeat, len(updated))
+
+    index = HospitalIndex()
+    index.reset(nodes)
+    rng = np.random.default_rng(0)
+    points = list(zip(rng.uniform(8, 34, 1000).tolist(), rng.uniform(69, 95, 1000).tolist()))
+
+    def queries() -> None:
+        for lat, lng in points:
+            index.nearest(lat, lng, 5, min_icu_free=1)
+
+    results["index.nearest_1000"] = timeit(queries, repeat, len(points))
+    return results
@@ -0,0 +1,103 @@
+"""
+Outbound HTTP benchmark against the local stub providers (benchmarks.stubs).
+
+- openai.per_call_client: a new httpx.AsyncClient per request (the old
+                          behaviour)
+- openai.pooled_client:   the lifespan-style pooled client from http_clients
+- openai.provider_down:   the stub answers 503; shows the circuit breaker
+                          turning slow failures into immediate ones
+- twilio.pooled_client:   TwilioClient.send_message over the pooled client
+
+Run from Backend/fastapi_backend:
+
+    python -m benchmarks.outbound_http --requests 1000 --concurrency 50
+
+Prints one JSON object with throughput and latency percentiles per scenario.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from dataclasses import replace
+from typing import Any, Dict
+
+import httpx
+
+from app.config import Settings
+from app.services import http_clients
+from app.services.openai_client import OpenAIClient
+from app.services.twilio_client import TwilioClient
+from benchmarks.stats import best_of, drive
+from benchmarks.stubs import provider, serve
+
+
+async def run(
+    requests: int = 500, concurrency: int = 50, latency: float = 0.01, rounds: int = 3
+) -> Dict[str, Dict[str, Any]]:
+    state = {"calls": 0, "down": False}
+    base = serve(provider(latency, state))
+    settings = Settings(
+        openai_dry_run=False,
+        openai_api_key="sk-bench",
+        openai_api_base=base,
+        twilio_dry_run=False,
+        twilio_account_sid="AC-bench",
+        twilio_auth_token="token",
+        twilio_from_number="+15550000000",
+        twilio_api_base=base,
+    )
+    for name in ("openai", "twilio"):
+        http_clients.set_integration(
+            name, replace(http_clients.get_integration(name), base_url=base, backoff_base=0.01, max_connections=concurrency)
+        )
+
+    def openai(http: Any = None) -> OpenAIClient:
+        live = OpenAIClient(http_client=http)
+        live.settings = settings
+        return live
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+
+        async def per_call() -> str:
+            async with httpx.AsyncClient(base_url=base) as http:
+                return await openai(http).generate_advisory("Heat")
+
+        results["openai.per_call_client"] = await drive(per_call, requests, concurrency)
+
+        async with http_clients.new_client("openai") as pooled:
+            live = openai(pooled)
+            results["openai.pooled_client"] = await best_of(
+                rounds, lambda: live.generate_advisory("Heat"), requests, concurrency
+            )
+
+            state["down"], state["calls"] = True, 0
+            http_clients.reset_breakers()
+            down = await drive(lambda: live.generate_advisory("Heat"), requests, concurrency)
+            down["provider_calls"] = state["calls"]
+            results["openai.provider_down"] = down
+            state["down"] = False
+
+        async with http_clients.new_client("twilio") as pooled:
+            twilio = TwilioClient(http_client=pooled)
+            twilio.settings = settings
+
+            async def send() -> None:
+                if (await twilio.send_message("+919800000000", "Surge alert")).status == "FAILED":
+                    raise RuntimeError("send failed")
+
+            results["twilio.pooled_client"] = await best_of(rounds, send, requests, concurrency)
+    finally:
+        for name in ("openai", "twilio"):
+            http_clients.set_integration(name, None)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="stub response delay in seconds")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests, args.concurrency, args.latency)), indent=2))
@@ -0,0 +1,271 @@
+"""
+In-process throughput/latency per API route.
+
+Requests go through httpx.ASGITransport straight into the app (no sockets),
+with the app lifespan running, against a synthetic network from
+benchmarks.datagen. Each case is warmed up, then driven with a fixed number
+of requests at a fixed concurrency.
+
+Mutating action routes (approve, reject, bulk) get a fresh PENDING action
+per request, seeded before the case runs, so every request does a real
+state transition rather than failing with 409.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import httpx
+
+from benchmarks.stats import best_of, drive
+
+
+@dataclass(frozen=True)
+class Case:
+    """
+    One route benchmark. `path` and `body` may be callables evaluated per
+    request; `setup(n)` runs before a case that will send `n` requests;
+    `requests`/`concurrency` cap the suite-wide values for routes that do
+    seconds of work per call; `first_event` reads an endless SSE response
+    only up to its first chunk.
+    """
+
+    name: str
+    method: str
+    path: Union[str, Callable[[], str]]
+    body: Any = None
+    setup: Optional[Callable[[int], None]] = None
+    requests: Optional[int] = None
+    concurrency: Optional[int] = None
+    first_event: bool = False
+
+
+class _FreshPending:
+    """
+    Ids of PENDING actions created on demand for the mutating routes.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        self.prefix = prefix
+        self._ids: List[str] = []
+        self._created = 0
+
+    def seed(self, count: int) -> None:
+        from app.schemas import ActionItem
+        from app.services import actions_service
+
+        now = datetime.now(timezone.utc)
+        fresh = [f"{self.prefix}-{self._created + i}" for i in range(count)]
+        self._created += count
+        actions_service._repository.put_many(
+            ActionItem(
+                id=action_id,
+                type="ADVISORY",
+                target="PUBLIC",
+                channel="SMS",
+                recipients=["+919800000000"],
+                message_template="Benchmark notice.",
+                status="PENDING",
+                created_at=now,
+                updated_at=now,
+            )
+            for action_id in fresh
+        )
+        self._ids.extend(reversed(fresh))
+
+    def take(self) -> str:
+        return self._ids.pop()
+
+
+def _cases(hospital_ids: List[str]) -> List[Case]:
+    updates = [
+        {
+            "hospital_id": hid,
+            "occupancy": {"icu_beds_used": 5, "icu_beds_total": 20, "ward_beds_used": 50, "ward_beds_total": 100},
+        }
+        for hid in hospital_ids[:100]
+    ]
+    advisory_batch = {
+        "items": [{"id": f"ward-{i}", "prompt": f"Heatwave advisory for ward {i}"} for i in range(10)],
+    }
+    approvals = _FreshPending("bench-approve")
+    rejections = _FreshPending("bench-reject")
+    decided = _FreshPending("bench-bulk")
+    delivered = _FreshPending("bench-delivered")
+    bulk_size = 10
+
+    def _approve_one(_: int) -> None:
+        from app.services import actions_service
+
+        delivered.seed(1)
+        actions_service.approve(delivered.take(), None)
+
+    def _bulk_body() -> Dict[str, Any]:
+        return {
+            "items": [
+                {"id": decided.take(), "decision": "APPROVE" if i % 2 else "REJECT"} for i in range(bulk_size)
+            ]
+        }
+
+    return [
+        Case("GET /api/hospitals", "GET", "/api/hospitals"),
+        Case(
+            "GET /api/hospitals?format=columns (map fields)",
+            "GET",
+            "/api/hospitals?fields=id,lat,lng,status&format=columns",
+        ),
+        Case("GET /api/hospitals/clusters", "GET", "/api/hospitals/clusters?bbox=68,8,97,35&zoom=6"),
+        Case("GET /api/hospitals/nearest", "GET", "/api/hospitals/nearest?lat=19.07&lng=72.88&k=5&min_icu_free=1"),
+        Case("GET /api/hospitals/{id}/history", "GET", f"/api/hospitals/{hospital_ids[0]}/history"),
+        Case("GET /api/dashboard/kpi", "GET", "/api/dashboard/kpi"),
+        Case("GET /api/forecast", "GET", "/api/forecast"),
+        Case("GET /api/graph/diffusion", "GET", "/api/graph/diffusion"),
+        Case("GET /api/actions/pending", "GET", "/api/actions/pending?limit=100"),
+        Case("GET /api/actions/pending?type=SUPPLY", "GET", "/api/actions/pending?limit=100&type=SUPPLY"),
+        Case("GET /api/stream (first event)", "GET", "/api/stream", first_event=True),
+        Case("POST /api/advisory/generate", "POST", "/api/advisory/generate", {"prompt": "Heatwave advisory"}),
+        Case(
+            "POST /api/advisory/generate/stream",
+            "POST",
+            "/api/advisory/generate/stream",
+            {"prompt": "Heatwave advisory"},
+        ),
+        Case("POST /api/advisory/generate:batch", "POST", "/api/advisory/generate:batch", advisory_batch),
+        Case("GET /api/advisory/cache", "GET", "/api/advisory/cache"),
+        Case("POST /api/hospitals/occupancy:batch", "POST", "/api/hospitals/occupancy:batch", updates),
+        # A full re-plan takes seconds at 10k hospitals, and the plan it returns
+        # runs to megabytes; a few runs of each suffice.
+        Case("POST /api/allocation/solve", "POST", "/api/allocation/solve", requests=5, concurrency=1),
+        Case("GET /api/allocation", "GET", "/api/allocation", requests=20),
+        Case(
+            "POST /api/actions/{id}/approve",
+            "POST",
+            lambda: f"/api/actions/{approvals.take()}/approve",
+            {},
+            setup=approvals.seed,
+        ),
+        Case(
+            "POST /api/actions/{id}/reject",
+            "POST",
+            lambda: f"/api/actions/{rejections.take()}/reject",
+            {},
+            setup=rejections.seed,
+        ),
+        Case(
+            f"POST /api/actions/bulk ({bulk_size} items)",
+            "POST",
+            "/api/actions/bulk",
+            _bulk_body,
+            setup=lambda n: decided.seed(n * bulk_size),
+        ),
+        Case(
+            "GET /api/actions/{id}/deliveries",
+            "GET",
+            "/api/actions/bench-delivered-0/deliveries",
+            setup=_approve_one,
+        ),
+        Case("GET /metrics", "GET", "/metrics"),
+    ]
+
+
+async def _first_event(app: Any, path: str) -> int:
+    """
+    Open an SSE endpoint, wait for its first body chunk, then disconnect
+    (ASGITransport would wait for an endless response to finish).
+    Returns the HTTP status.
+    """
+    got_chunk = asyncio.Event()
+    sent_request = False
+    status = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await got_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and (message.get("body") or not message.get("more_body")):
+            got_chunk.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept", b"text/event-stream")],
+        "client": ("127.0.0.1", 123),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def run(
+    data: Dict[str, Path], requests: int = 200, concurrency: int = 16, rounds: int = 3
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark every case against the data files in `data` (see
+    benchmarks.datagen.write). Returns {case name: best-of-`rounds` summary}.
+    """
+    # Imported here so callers can point settings (env) at scratch stores first.
+    from app.main import app
+    from app.schemas import ActionItem
+    from app.services import actions_service, hospital_service
+    from app.services.action_repository import SqliteActionRepository
+
+    hospital_service.set_data_file(data["hospitals"])
+    repository = SqliteActionRepository(":memory:")
+    raw_actions = json.loads(data["actions"].read_text(encoding="utf-8"))
+    repository.put_many(ActionItem.model_validate(item) for item in raw_actions)
+    previous = actions_service._repository
+    actions_service.set_repository(repository)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                ids = hospital_service.get_snapshot().data.ids
+                cases = _cases(ids)
+                etag = (await client.get("/api/hospitals")).headers["etag"]
+                cases.insert(1, Case("GET /api/hospitals (304)", "GET", "/api/hospitals"))
+                for case in cases:
+                    headers = {"If-None-Match": etag} if case.name.endswith("(304)") else None
+                    count = min(requests, case.requests or requests)
+                    slots = min(concurrency, case.concurrency or concurrency)
+                    warmup = min(count, 20)
+                    if case.setup is not None:
+                        case.setup(warmup + rounds * count)
+
+                    async def call(case: Case = case, headers: Optional[Dict[str, str]] = headers) -> None:
+                        path = case.path() if callable(case.path) else case.path
+                        if case.first_event:
+                            status = await _first_event(app, path)
+                        else:
+                            body = case.body() if callable(case.body) else case.body
+                            status = (await client.request(case.method, path, json=body, headers=headers)).status_code
+                        if status >= 400:
+                            raise RuntimeError(f"{case.name}: HTTP {status}")
+
+                    await drive(call, warmup, slots)  # warm-up (caches, threadpool)
+                    results[case.name] = await best_of(rounds, call, count, slots)
+    finally:
+        hospital_service.set_data_file(None)
+        actions_service.set_repository(previous)
+        repository.close()
+    return results
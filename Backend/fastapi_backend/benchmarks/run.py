@@ -0,0 +1,175 @@
+"""
+Run the benchmark suites and compare against a stored baseline.
+
+    python -m benchmarks.run                                  # default sizes, print JSON
+    python -m benchmarks.run --hospitals 100000 --out results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.25
+    python -m benchmarks.run --baseline benchmarks/baseline.json --update-baseline
+
+Suites:
+- routes:   in-process ASGI p50/p95/p99 and RPS per API route (best of
+            --rounds)
+- micro:    schema validation/serialization and in-memory structures
+- outbound: OpenAI/Twilio clients against local stub servers
+
+With --baseline, every p50_ms/ms that grew, or rps that fell, by more than
+--threshold (a fraction) and, for timings, by at least MIN_DELTA_MS, is a
+regression, as is a case that starts erroring; the run then exits 1. p95/p99 are reported but not gated: under
+in-process concurrency they swing 2x between identical runs.
+A case missing from the baseline (or from the run) also fails the
+comparison, so adding, renaming or removing a case means re-recording the
+baseline (--update-baseline) in the same change.
+Baselines are machine-specific: record one on the machine that compares.
+"""
+from __future__ import annotations
+
+import os
+
+# Benchmarks never touch the persistent stores; set before the app is imported.
+os.environ.setdefault("ACTIONS_DB_PATH", ":memory:")
+os.environ.setdefault("DELIVERY_DB_PATH", ":memory:")
+os.environ.setdefault("HISTORY_DIR", ":memory:")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import platform  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Any, Dict, List, Sequence  # noqa: E402
+
+from benchmarks import datagen  # noqa: E402
+
+SUITES = ("routes", "micro", "outbound")
+LOWER_IS_BETTER = ("p50_ms", "ms")
+HIGHER_IS_BETTER = ("rps",)
+# Timing changes smaller than this are never regressions, however large relatively.
+MIN_DELTA_MS = 0.5
+
+
+def run(
+    hospitals: int = 10_000,
+    actions: int = 10_000,
+    requests: int = 200,
+    concurrency: int = 16,
+    suites: Sequence[str] = SUITES,
+    seed: int = 0,
+    rounds: int = 3,
+) -> Dict[str, Any]:
+    """
+    Generate data, run the selected suites and return the results document.
+    """
+    from benchmarks import micro, outbound_http, routes
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="surgeguard-bench-") as scratch:
+        data = datagen.write(Path(scratch), hospitals, actions, seed)
+        if "routes" in suites:
+            results["routes"] = asyncio.run(routes.run(data, requests, concurrency, rounds))
+        if "micro" in suites:
+            results["micro"] = micro.run(data)
+        if "outbound" in suites:
+            results["outbound"] = asyncio.run(outbound_http.run(requests, concurrency, rounds=rounds))
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "hospitals": hospitals,
+            "actions": actions,
+            "requests": requests,
+            "concurrency": concurrency,
+            "rounds": rounds,
+        },
+        "results": results,
+    }
+
+
+def _flatten(results: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {f"{suite}/{case}": values for suite, cases in results.items() for case, values in cases.items()}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Human-readable regressions of `current` against `baseline` (both
+    results documents). A case only one side has is reported too (and so
+    fails the run) until the baseline is re-recorded.
+    """
+    regressions: List[str] = []
+    now, before = _flatten(current["results"]), _flatten(baseline["results"])
+    for key in sorted(now.keys() - before.keys()):
+        regressions.append(f"{key}: not in the baseline; re-record it with --update-baseline")
+    for key in sorted(before.keys() - now.keys()):
+        regressions.append(f"{key}: in the baseline but not measured; re-record it with --update-baseline")
+    for key in sorted(now.keys() & before.keys()):
+        new, old = now[key], before[key]
+        if old.get("errors") == 0 and new.get("errors", 0) > 0:
+            regressions.append(f"{key}: {new['errors']} errors (baseline 0)")
+        for metric in LOWER_IS_BETTER:
+            if (
+                metric in new
+                and old.get(metric)
+                and new[metric] > old[metric] * (1 + threshold)
+                and new[metric] - old[metric] >= MIN_DELTA_MS
+            ):
+                regressions.append(f"{key}: {metric} {old[metric]} -> {new[metric]} (+{new[metric] / old[metric] - 1:.0%})")
+        for metric in HIGHER_IS_BETTER:
+            if metric in new and old.get(metric) and new[metric] < old[metric] * (1 - threshold):
+                regressions.append(f"{key}: {metric} {old[metric]} -> {new[metric]} ({new[metric] / old[metric] - 1:.0%})")
+    return regressions
+
+
+def _sizes(document: Dict[str, Any]) -> tuple:
+    meta = document.get("meta", {})
+    return tuple(meta.get(k) for k in ("hospitals", "actions", "requests", "concurrency", "rounds"))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hospitals", type=int, default=10_000)
+    parser.add_argument("--actions", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route/scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per case; the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", type=Path, help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    document = run(args.hospitals, args.actions, args.requests, args.concurrency, suites, args.seed, args.rounds)
+    text = json.dumps(document, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline and args.update_baseline:
+        args.baseline.write_text(text + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if _sizes(baseline) != _sizes(document):
+            print(f"baseline sizes {_sizes(baseline)} differ from this run {_sizes(document)}", file=sys.stderr)
+            return 2
+        regressions = compare(document, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Shared timing helpers for the benchmark suites.
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def summarize(latencies: List[float], wall: float, errors: int = 0) -> Dict[str, Any]:
+    """
+    Percentiles (ms) and throughput for one run of requests.
+    """
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+    }
+
+
+async def drive(call: Callable[[], Awaitable[Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Run `call` `requests` times with at most `concurrency` in flight; an
+    exception counts as an error (its latency is still recorded).
+    """
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def best_of(rounds: int, call: Callable[[], Awaitable[Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    `drive` `rounds` times and keep the round with the lowest p50; a single
+    round of a few hundred requests is at the mercy of whatever else the
+    machine is doing.
+    """
+    runs = [await drive(call, requests, concurrency) for _ in range(max(1, rounds))]
+    return min(runs, key=lambda summary: summary["p50_ms"])
+
+
+def timeit(fn: Callable[[], Any], repeat: int = 5, items: int = 0) -> Dict[str, Any]:
+    """
+    Best wall time of `fn` over `repeat` runs (after one warm-up), plus the
+    per-item cost when `items` is given. As with timeit, the minimum is the
+    most repeatable figure; slower runs measure other load on the machine.
+    """
+    fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    best = min(runs)
+    result: Dict[str, Any] = {"ms": round(best * 1000, 3)}
+    if items:
+        result["per_item_us"] = round(best / items * 1e6, 3)
+    return result
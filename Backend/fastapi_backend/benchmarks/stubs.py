@@ -0,0 +1,61 @@
+"""
+Local stand-ins for the Twilio Messages and OpenAI chat-completions APIs,
+served over real TCP by uvicorn so connection costs are part of the numbers.
+"""
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import time
+from typing import Any, Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def provider(latency: float, state: Dict[str, Any]) -> FastAPI:
+    """
+    One app serving both providers. `state["calls"]` counts requests and
+    `state["down"] = True` makes every call answer 503 (after the latency).
+    """
+    stub = FastAPI()
+
+    @stub.post("/v1/chat/completions")
+    async def completions() -> JSONResponse:
+        state["calls"] += 1
+        await asyncio.sleep(latency)
+        if state["down"]:
+            return JSONResponse({"error": "overloaded"}, status_code=503)
+        return JSONResponse(
+            {
+                "choices": [{"message": {"content": "Stay indoors."}}],
+                "usage": {"prompt_tokens": 40, "completion_tokens": 12},
+            }
+        )
+
+    @stub.post("/2010-04-01/Accounts/{sid}/Messages.json")
+    async def messages(sid: str, request: Request) -> JSONResponse:
+        state["calls"] += 1
+        await request.body()
+        await asyncio.sleep(latency)
+        if state["down"]:
+            return JSONResponse({"message": "unavailable"}, status_code=503)
+        return JSONResponse({"sid": f"SM{state['calls']}", "status": "queued"}, status_code=201)
+
+    return stub
+
+
+def serve(app: FastAPI) -> str:
+    """
+    Run `app` on a free localhost port in a daemon thread; return its base URL.
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
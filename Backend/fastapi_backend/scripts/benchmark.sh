@@ -0,0 +1,11 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Run the benchmark suite and fail on regressions against the stored baseline.
+# Extra arguments are passed through, e.g.:
+#   scripts/benchmark.sh --suites routes,micro
+#   scripts/benchmark.sh --update-baseline   (after an intended change, on the same machine)
+
+cd "$(dirname "${BASH_SOURCE[0]}")/.."
+
+./.venv/bin/python -m benchmarks.run --baseline benchmarks/baseline.json --out benchmark-results.json "$@"
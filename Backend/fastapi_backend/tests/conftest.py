@@ -1,7 +1,42 @@
+import os
 import sys
 from pathlib import Path
+from typing import Iterator
+
+import pytest
 
 # Ensure the project root (Backend/fastapi_backend) is on sys.path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+# Keep the suite hermetic: never read or write persistent stores.
+os.environ.setdefault("ACTIONS_DB_PATH", ":memory:")
+os.environ.setdefault("DELIVERY_DB_PATH", ":memory:")
+os.environ.setdefault("HISTORY_DIR", ":memory:")
+
+
+@pytest.fixture()
+def fresh_hospitals() -> Iterator[None]:
+    """
+    Reload the hospital snapshot from disk before and after the test.
+    """
+    from app.services import hospital_service
+
+    hospital_service.invalidate()
+    yield
+    hospital_service.invalidate()
+
+
+@pytest.fixture()
+def fresh_graph(fresh_hospitals: None) -> Iterator[None]:
+    """
+    `fresh_hospitals`, plus the forecast and diffusion graph derived from it.
+    """
+    from app.services import forecast_service, graph_service
+
+    forecast_service.invalidate()
+    graph_service.invalidate()
+    yield
+    forecast_service.invalidate()
+    graph_service.invalidate()
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from app.schemas import ActionItem
+from app.services.action_repository import (
+    ActionQuery,
+    SqliteActionRepository,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _action(action_id: str, status: str = "PENDING", minutes: int = 0) -> ActionItem:
+    ts = datetime(2025, 11, 28, 18, 0, tzinfo=timezone.utc) + timedelta(minutes=minutes)
+    return ActionItem(
+        id=action_id,
+        type="STAFFING",
+        target="STAFF",
+        channel="SMS",
+        recipients=["+911234567890"],
+        message_template="Report early.",
+        status=status,
+        created_at=ts,
+        updated_at=ts,
+    )
+
+
+def test_sqlite_repository_persists_across_reopen(tmp_path: Path) -> None:
+    path = str(tmp_path / "actions.db")
+    repo = SqliteActionRepository(path)
+    repo.put_many([_action("a-1"), _action("a-2", status="APPROVED")])
+    repo.close()
+
+    reopened = SqliteActionRepository(path)
+    assert reopened.count() == 2
+    assert reopened.get("a-2").status == "APPROVED"
+    assert reopened.get("missing") is None
+    reopened.close()
+
+
+def test_sqlite_repository_lists_by_status_in_creation_order() -> None:
+    repo = SqliteActionRepository(":memory:")
+    repo.put_many([_action("late", minutes=5), _action("early"), _action("done", status="SENT")])
+    assert [a.id for a in repo.list_by_status("PENDING")] == ["early", "late"]
+
+    repo.put(_action("early", status="REJECTED"))
+    assert [a.id for a in repo.list_by_status("PENDING")] == ["late"]
+
+
+def test_pending_query_uses_status_index() -> None:
+    repo = SqliteActionRepository(":memory:")
+    plan = repo._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT payload FROM actions WHERE status = ? ORDER BY created_at, id",
+        ("PENDING",),
+    ).fetchall()
+    assert any("ix_actions_status_created" in row[-1] for row in plan)
+
+
+def test_find_filters_and_keyset_pagination() -> None:
+    repo = SqliteActionRepository(":memory:")
+    actions = [_action(f"a-{i:02d}", minutes=i) for i in range(5)]
+    vendor = _action("v-1", minutes=2).model_copy(
+        update={"type": "SUPPLY", "target": "VENDOR", "recipients": ["+449990001"]}
+    )
+    repo.put_many([*actions, vendor])
+
+    pending = ActionQuery(status="PENDING")
+    first = repo.find(pending, limit=3)
+    assert [a.id for a in first] == ["a-00", "a-01", "a-02"]
+    rest = repo.find(pending, limit=10, after=decode_cursor(encode_cursor(first[-1])))
+    assert [a.id for a in rest] == ["v-1", "a-03", "a-04"]
+
+    assert repo.count(pending) == 6
+    assert repo.count(ActionQuery(status="PENDING", target="VENDOR")) == 1
+    assert [a.id for a in repo.find(ActionQuery(recipient_prefix="+44"), limit=10)] == ["v-1"]
+    assert repo.find(ActionQuery(recipient_prefix="+4499900010"), limit=10) == []
+
+
+def test_decode_cursor_rejects_garbage() -> None:
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor!!")
@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas import ActionItem
+from app.services import actions_service
+from app.services.action_repository import SqliteActionRepository
+
+client = TestClient(app)
+
+
+def _seed(count: int) -> SqliteActionRepository:
+    repo = SqliteActionRepository(":memory:")
+    base = datetime(2025, 11, 28, 18, 0, tzinfo=timezone.utc)
+    repo.put_many(
+        ActionItem(
+            id=f"act-{i:03d}",
+            type="ADVISORY" if i % 2 else "STAFFING",
+            target="PUBLIC" if i % 2 else "STAFF",
+            channel="WHATSAPP" if i % 2 else "SMS",
+            recipients=[f"+91{i:010d}"],
+            message_template="Surge notice.",
+            status="PENDING",
+            created_at=base + timedelta(seconds=i),
+            updated_at=base + timedelta(seconds=i),
+        )
+        for i in range(count)
+    )
+    return repo
+
+
+@pytest.fixture
+def surge_repository() -> Iterator[SqliteActionRepository]:
+    previous = actions_service._repository
+    repo = _seed(25)
+    actions_service.set_repository(repo)
+    yield repo
+    actions_service.set_repository(previous)
+
+
+def test_pending_without_limit_or_cursor_is_unpaginated() -> None:
+    previous = actions_service._repository
+    actions_service.set_repository(_seed(250))
+    try:
+        resp = client.get("/api/actions/pending")
+        assert resp.status_code == 200
+        assert len(resp.json()) == 250
+        assert resp.headers["x-total-count"] == "250"
+        assert "x-next-cursor" not in resp.headers
+
+        # A cursor on its own pages with the default page size.
+        first = client.get("/api/actions/pending", params={"limit": 1})
+        rest = client.get("/api/actions/pending", params={"cursor": first.headers["x-next-cursor"]})
+        assert [item["id"] for item in rest.json()] == [f"act-{i:03d}" for i in range(1, 101)]
+        assert "x-next-cursor" in rest.headers
+    finally:
+        actions_service.set_repository(previous)
+
+
+def test_pending_pages_through_all_actions(surge_repository: SqliteActionRepository) -> None:
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/actions/pending", params=params)
+        assert resp.status_code == 200
+        assert resp.headers["x-total-count"] == "25"
+        seen.extend(item["id"] for item in resp.json())
+        cursor = resp.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen == [f"act-{i:03d}" for i in range(25)]
+
+
+def test_pending_filters_are_applied_server_side(surge_repository: SqliteActionRepository) -> None:
+    resp = client.get("/api/actions/pending", params={"type": "ADVISORY", "channel": "WHATSAPP"})
+    ids = [item["id"] for item in resp.json()]
+    assert resp.headers["x-total-count"] == "12"
+    assert all(int(i.split("-")[1]) % 2 == 1 for i in ids)
+
+    resp = client.get("/api/actions/pending", params={"recipient_prefix": "+91000000002"})
+    assert sorted(item["id"] for item in resp.json()) == ["act-020", "act-021", "act-022", "act-023", "act-024"]
+
+
+def test_pending_rejects_invalid_cursor(surge_repository: SqliteActionRepository) -> None:
+    resp = client.get("/api/actions/pending", params={"cursor": "%%%"})
+    assert resp.status_code == 400
+
+
+def test_pending_page_is_the_stored_actions_as_json(surge_repository: SqliteActionRepository) -> None:
+    staffing = [a for a in surge_repository.list_by_status("PENDING") if a.type == "STAFFING"]
+    resp = client.get("/api/actions/pending", params={"limit": 10, "type": "STAFFING"})
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == [a.model_dump(mode="json") for a in staffing[:10]]
+    assert resp.headers["x-total-count"] == str(len(staffing))
+
+    page = actions_service.query_pending_json(10, type="STAFFING")
+    assert resp.content == page.body
+    assert resp.headers["x-next-cursor"] == page.next_cursor
+    rest = actions_service.query_pending_json(10, cursor=page.next_cursor, type="STAFFING")
+    assert [item["id"] for item in json.loads(rest.body)] == [a.id for a in staffing[10:]]
+    assert rest.next_cursor is None
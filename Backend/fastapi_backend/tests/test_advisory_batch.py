@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import advisory_service
+from app.services.openai_client import OpenAIClient
+
+
+class SlowOpenAI(OpenAIClient):
+    """Upstream stand-in: latency read from the context, tracks peak concurrency."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def generate_advisory(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep((context or {}).get("delay", 0.05))
+            if prompt == "fail":
+                raise RuntimeError("upstream 503")
+            return f"draft: {prompt}"
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def slow_client() -> Iterator[SlowOpenAI]:
+    previous = advisory_service._openai_client
+    fake = SlowOpenAI()
+    advisory_service.set_openai_client(fake)
+    advisory_service.clear_cache()
+    yield fake
+    advisory_service.set_openai_client(previous)
+    advisory_service.clear_cache()
+
+
+def _lines(resp) -> list:
+    return [json.loads(line) for line in resp.text.splitlines() if line]
+
+
+def test_batch_runs_concurrently_and_streams_in_completion_order(slow_client: SlowOpenAI) -> None:
+    client = TestClient(app)
+    items = [{"id": f"ward-{i}", "prompt": f"Heat alert {i}", "context": {"delay": 0.05}} for i in range(200)]
+    items[0]["context"] = {"delay": 1.0}
+
+    start = time.perf_counter()
+    resp = client.post("/api/advisory/generate:batch", json={"items": items})
+    elapsed = time.perf_counter() - start
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    results = _lines(resp)
+    assert sorted(r["index"] for r in results) == list(range(200))
+    assert all(r["ok"] and r["draft"] == f"draft: Heat alert {r['index']}" for r in results)
+    assert {r["id"] for r in results} == {f"ward-{i}" for i in range(200)}
+    # The slow first item finishes last instead of holding up the rest.
+    assert results[-1]["index"] == 0
+    # 200 x 50 ms sequentially is 10 s; 16 at a time is ~0.65 s, plus the slow item.
+    assert slow_client.peak == 16
+    assert elapsed < 3.0
+
+
+def test_failures_and_timeouts_are_reported_per_item(slow_client: SlowOpenAI) -> None:
+    client = TestClient(app)
+    body = {
+        "items": [
+            {"prompt": "ok"},
+            {"prompt": "fail"},
+            {"prompt": "stuck", "context": {"delay": 5}},
+        ],
+        "timeout_seconds": 0.2,
+        "max_concurrency": 2,
+    }
+    results = {r["index"]: r for r in _lines(client.post("/api/advisory/generate:batch", json=body))}
+    assert results[0]["ok"] and results[0]["error"] is None
+    assert not results[1]["ok"] and results[1]["error"] == "upstream 503"
+    assert not results[2]["ok"] and "Timed out" in results[2]["error"]
+    assert results[2]["elapsed_ms"] < 1000
+    assert slow_client.peak <= 2
+
+
+def test_batch_validation(slow_client: SlowOpenAI) -> None:
+    client = TestClient(app)
+    assert client.post("/api/advisory/generate:batch", json={"items": []}).status_code == 422
+    assert client.post("/api/advisory/generate:batch", json={"items": [{"prompt": ""}]}).status_code == 422
+    too_many = {"items": [{"prompt": "x"}] * 501}
+    assert client.post("/api/advisory/generate:batch", json=too_many).status_code == 422
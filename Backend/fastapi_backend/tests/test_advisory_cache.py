@@ -0,0 +1,175 @@
+import asyncio
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.schemas import AdvisoryGenerateRequest
+from app.services import advisory_service
+from app.services.openai_client import OpenAIClient
+from app.services.response_cache import AsyncTTLCache, canonical_key
+
+
+class CountingOpenAI(OpenAIClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def generate_advisory(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f"draft #{self.calls}: {prompt}"
+
+
+@pytest.fixture
+def counting_client() -> Iterator[CountingOpenAI]:
+    previous = advisory_service._openai_client
+    fake = CountingOpenAI()
+    advisory_service.set_openai_client(fake)
+    yield fake
+    advisory_service.set_openai_client(previous)
+
+
+def test_identical_concurrent_requests_share_one_upstream_call(counting_client: CountingOpenAI) -> None:
+    async def _run():
+        a = AdvisoryGenerateRequest(prompt="Flood warning", context={"ward": "X", "level": 3})
+        b = AdvisoryGenerateRequest(prompt="Flood warning", context={"level": 3, "ward": "X"})
+        return await asyncio.gather(*(advisory_service.generate_draft(r) for r in [a, b, a, b]))
+
+    before = advisory_service.cache_stats()
+    drafts = asyncio.run(_run())
+    after = advisory_service.cache_stats()
+
+    assert counting_client.calls == 1
+    assert len({d.draft for d in drafts}) == 1
+    assert after.misses - before.misses == 1
+    assert after.coalesced - before.coalesced == 3
+
+    # A later identical request is a plain cache hit.
+    asyncio.run(advisory_service.generate_draft(AdvisoryGenerateRequest(prompt="Flood warning", context={"ward": "X", "level": 3})))
+    assert counting_client.calls == 1
+    assert advisory_service.cache_stats().hits - after.hits == 1
+
+
+def test_cache_expires_and_evicts(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = {"now": 100.0}
+    monkeypatch.setattr("app.services.response_cache.time.monotonic", lambda: clock["now"])
+    cache: AsyncTTLCache[str] = AsyncTTLCache(maxsize=2, ttl=10)
+    calls = []
+
+    async def _get(key: str) -> str:
+        async def _compute() -> str:
+            calls.append(key)
+            return key.upper()
+
+        return await cache.get_or_compute(key, _compute)
+
+    async def _run() -> None:
+        await _get("a")
+        await _get("b")
+        await _get("a")  # hit; "b" is now least recently used
+        await _get("c")  # evicts "b"
+        await _get("b")
+        clock["now"] += 11
+        await _get("c")  # expired
+
+    asyncio.run(_run())
+    assert calls == ["a", "b", "c", "b", "c"]
+    assert cache.stats().evictions >= 1
+
+
+def test_failures_are_not_cached() -> None:
+    cache: AsyncTTLCache[str] = AsyncTTLCache(maxsize=4, ttl=60)
+    attempts = []
+
+    async def _flaky() -> str:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream 500")
+        return "ok"
+
+    async def _run() -> str:
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", _flaky)
+        return await cache.get_or_compute("k", _flaky)
+
+    assert asyncio.run(_run()) == "ok"
+    assert len(attempts) == 2
+
+
+def test_fallback_drafts_are_not_cached() -> None:
+    replies = [{"error": "overloaded"}, {"choices": [{"message": {"content": "Stay indoors."}}]}]
+
+    def _reply(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=replies.pop(0))
+
+    async def _run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_reply), base_url="http://openai.test") as http:
+            live = OpenAIClient(http_client=http)
+            live.settings = Settings(openai_dry_run=False, openai_api_key="sk-test")
+            previous = advisory_service._openai_client
+            advisory_service.set_openai_client(live)
+            try:
+                request = AdvisoryGenerateRequest(prompt="Heat advisory")
+                return [(await advisory_service.generate_draft(request)).draft for _ in range(3)]
+            finally:
+                advisory_service.set_openai_client(previous)
+
+    # The malformed first reply yields the fallback; the next request asks
+    # OpenAI again, and its real draft is then served from the cache.
+    assert asyncio.run(_run()) == ["[MOCK DRAFT] Heat advisory", "Stay indoors.", "Stay indoors."]
+    assert replies == []
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_load() -> None:
+    cache: AsyncTTLCache[str] = AsyncTTLCache(maxsize=4, ttl=60)
+    started, cancelled = [], []
+
+    async def _slow() -> str:
+        started.append(1)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "draft"
+
+    async def _run() -> None:
+        # The caller that started the load gives up; the coalesced one still
+        # gets the value and nothing is loaded twice.
+        owner = asyncio.ensure_future(cache.get_or_compute("k", _slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.get_or_compute("k", _slow))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        assert await waiter == "draft"
+        assert owner.cancelled()
+        assert await cache.get_or_compute("k", _slow) == "draft"
+        assert started == [1] and cancelled == []
+
+        # Once every caller has given up, the load itself is cancelled.
+        cache.clear()
+        callers = [asyncio.ensure_future(cache.get_or_compute("k", _slow)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert cancelled == [1]
+
+        # A load cancelled before it ever ran does not wedge the key.
+        doomed = asyncio.ensure_future(cache.get_or_compute("k", _slow))
+        await asyncio.sleep(0)
+        doomed.cancel()
+        await asyncio.gather(doomed, return_exceptions=True)
+        assert await cache.get_or_compute("k", _slow) == "draft"
+
+    asyncio.run(_run())
+
+
+def test_canonical_key_ignores_dict_order() -> None:
+    assert canonical_key(prompt="p", context={"a": 1, "b": 2}) == canonical_key(
+        context={"b": 2, "a": 1}, prompt="p"
+    )
+    assert canonical_key(prompt="p", context=None) != canonical_key(prompt="p", context={})
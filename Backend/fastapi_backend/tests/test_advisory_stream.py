@@ -0,0 +1,68 @@
+import asyncio
+import json
+from typing import Dict, List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.main import app
+from app.services import advisory_service
+from app.services.openai_client import OpenAIClient
+
+client = TestClient(app)
+
+
+def _events(text: str) -> List[Dict]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append({"event": lines["event"], "data": json.loads(lines["data"])})
+    return events
+
+
+def test_stream_endpoint_dry_run_emits_deterministic_chunks() -> None:
+    advisory_service.clear_cache()
+    resp = client.post("/api/advisory/generate/stream", json={"prompt": "Heatwave in Ward 7 today"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    tokens = [e["data"]["delta"] for e in events if e["event"] == "token"]
+    assert tokens == ["[MOCK ", "DRAFT] ", "Heatwave ", "in ", "Ward ", "7 ", "today"]
+    assert events[-1] == {"event": "done", "data": {"draft": "[MOCK DRAFT] Heatwave in Ward 7 today"}}
+
+    # The streamed draft is cached for the non-streaming endpoint too.
+    hits = advisory_service.cache_stats().hits
+    client.post("/api/advisory/generate", json={"prompt": "Heatwave in Ward 7 today"})
+    assert advisory_service.cache_stats().hits == hits + 1
+
+
+def _stub_openai() -> FastAPI:
+    stub = FastAPI()
+
+    @stub.post("/v1/chat/completions")
+    async def completions(body: dict) -> StreamingResponse:
+        assert body["stream"] is True
+
+        async def _chunks():
+            for piece in ["Stay ", "hydrated", "."]:
+                chunk = {"choices": [{"delta": {"content": piece}}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_chunks(), media_type="text/event-stream")
+
+    return stub
+
+
+def test_openai_client_relays_stream_deltas() -> None:
+    async def _run() -> List[str]:
+        transport = httpx.ASGITransport(app=_stub_openai())
+        async with httpx.AsyncClient(transport=transport, base_url="http://openai.test") as http:
+            live = OpenAIClient(http_client=http)
+            live.settings = Settings(openai_dry_run=False, openai_api_key="sk-test")
+            return [delta async for delta in live.stream_advisory("Heat advisory")]
+
+    assert asyncio.run(_run()) == ["Stay ", "hydrated", "."]
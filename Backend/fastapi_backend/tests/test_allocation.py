@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.services import actions_service, allocation_service, forecast_service, hospital_service
+from app.services.action_repository import SqliteActionRepository
+from app.services.allocation_engine import round_plan, solve_transport
+from app.services.kdtree import chord_to_km, unit_vectors
+
+
+def test_transport_finds_cheaper_crossing_plan() -> None:
+    # Greedy nearest-first would send source 0 -> sink 0 and pay 10 for the
+    # rest; the optimum crosses over (total 3 instead of 11 per unit).
+    cost = np.array([[1.0, 2.0], [1.0, 10.0]])
+    solution = solve_transport(np.array([5.0, 5.0]), np.array([5.0, 5.0]), cost, penalty=20.0)
+    assert solution.converged
+    moves = sorted(round_plan(solution.plan, np.array([5.0, 5.0]), np.array([5.0, 5.0])))
+    assert moves == [(0, 1, 5), (1, 0, 5)]
+
+
+def test_unbalanced_and_out_of_range_demand_is_unmet() -> None:
+    cost = np.array([[1.0, np.inf]])
+    solution = solve_transport(np.array([3.0]), np.array([2.0, 4.0]), cost, penalty=10.0)
+    assert round_plan(solution.plan, np.array([3.0]), np.array([2.0, 4.0])) == [(0, 0, 2)]
+    assert solution.unmet[1] == pytest.approx(4.0, abs=0.05)
+    assert solution.plan[0, 1] == 0.0
+
+
+def test_1000_hospital_network_solves_fast_and_warm_starts() -> None:
+    rng = np.random.default_rng(0)
+    lat, lng = rng.uniform(8, 35, 1_000), rng.uniform(68, 97, 1_000)
+    balance = rng.integers(-10, 11, 1_000).astype(np.float64)
+    sources, sinks = np.flatnonzero(balance > 0), np.flatnonzero(balance < 0)
+    points = unit_vectors(lat, lng)
+    km = chord_to_km(np.linalg.norm(points[sources][:, None] - points[sinks][None], axis=2))
+    cost = np.where(km <= 300, km, np.inf)
+
+    start = time.perf_counter()
+    cold = solve_transport(balance[sources], -balance[sinks], cost, penalty=600.0)
+    assert time.perf_counter() - start < 2.0
+    assert cold.converged
+    # Sources never ship materially more than they have (rounding caps the rest).
+    assert np.all(cold.plan.sum(axis=1) <= balance[sources] + 0.25)
+
+    # Same network with a little more demand: the previous duals are close.
+    demand = -balance[sinks] + (rng.random(len(sinks)) < 0.05)
+    warm = solve_transport(balance[sources], demand, cost, penalty=600.0, warm_start=cold.column_dual)
+    fresh = solve_transport(balance[sources], demand, cost, penalty=600.0)
+    assert warm.converged and warm.iterations < fresh.iterations
+
+
+@pytest.fixture()
+def network(monkeypatch):
+    monkeypatch.setattr(get_settings(), "optimizer_recipients", "+911100000001, +911100000002")
+    repo = SqliteActionRepository(":memory:")
+    previous = actions_service._repository
+    actions_service.set_repository(repo)
+    hospital_service.invalidate()
+    forecast_service.invalidate()
+    allocation_service.reset()
+    base = hospital_service.get("hosp-1")
+
+    def hospital(hid, lat, used, oxygen, staff):
+        occupancy = base.occupancy.model_copy(update={"icu_beds_used": used, "icu_beds_total": 20})
+        resources = base.resources.model_copy(update={"oxygen": oxygen, "staff_load": staff})
+        fields = {"id": hid, "name": hid, "lat": lat, "lng": 80.0, "occupancy": occupancy, "resources": resources}
+        return base.model_copy(update=fields)
+
+    hospital_service.upsert_hospitals(
+        [hospital("over", 10.0, 20, "LOW", "HIGH"), hospital("spare", 10.05, 4, "HIGH", "LOW")]
+    )
+    yield repo
+    actions_service.set_repository(previous)
+    hospital_service.invalidate()
+    forecast_service.invalidate()
+    allocation_service.reset()
+
+
+def test_solve_emits_actions_and_warm_starts(network) -> None:
+    client = TestClient(app)
+    assert client.get("/api/allocation").status_code in (200, 404)
+
+    resp = client.post("/api/allocation/solve")
+    assert resp.status_code == 200
+    plan = resp.json()
+    ours = {t["resource"]: t for t in plan["transfers"] if {t["source_id"], t["target_id"]} == {"over", "spare"}}
+    # 20 ICU patients against a 90% threshold of 20 beds: 2 must move.
+    assert ours["PATIENTS"]["source_id"] == "over" and ours["PATIENTS"]["amount"] == 2
+    assert ours["STAFF"]["target_id"] == "over"
+    assert ours["OXYGEN"]["target_id"] == "over"
+    assert ours["PATIENTS"]["distance_km"] == pytest.approx(5.6, abs=0.1)
+
+    pending = {a.id: a for a in actions_service.list_pending()}
+    transfer = [a for a in pending.values() if a.type == "TRANSFER" and "-over-spare" in a.id]
+    assert len(transfer) == 1 and "Transfer 2 ICU patient(s)" in transfer[0].message_template
+    assert transfer[0].recipients == ["+911100000001", "+911100000002"]
+    assert {a.type for a in pending.values()} >= {"TRANSFER", "STAFFING", "SUPPLY"}
+
+    # Re-solving unchanged data reuses the duals and writes nothing new.
+    again = client.post("/api/allocation/solve").json()
+    assert all(again["warm_started"][r] for r, t in ours.items())
+    assert again["actions_written"] == 0
+    assert len(actions_service.list_pending()) == len(pending)
+
+    # Once "over" has room again its transfer is superseded.
+    node = hospital_service.get("over")
+    hospital_service.upsert_hospitals(
+        [node.model_copy(update={"occupancy": node.occupancy.model_copy(update={"icu_beds_used": 10})})]
+    )
+    client.post("/api/allocation/solve")
+    assert network.get(transfer[0].id).status == "REJECTED"
+    assert client.get("/api/allocation").json()["generated_at"] >= again["generated_at"]
+
+
+def test_no_actions_without_recipients(network, monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "optimizer_recipients", "")
+    result = allocation_service.solve()
+    assert any(t.source_id == "over" for t in result.transfers)
+    assert result.actions_written == 0
+    assert not [a for a in actions_service.list_pending() if a.id.startswith(allocation_service.ID_PREFIX)]
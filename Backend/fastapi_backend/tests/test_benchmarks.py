@@ -0,0 +1,65 @@
+import asyncio
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.schemas import ActionItem, HospitalNode
+from benchmarks import datagen, routes
+from benchmarks.run import compare
+
+
+def test_generated_data_is_valid_and_deterministic(tmp_path) -> None:
+    hospitals = TypeAdapter(List[HospitalNode]).validate_python(datagen.hospitals(500, seed=3))
+    actions = TypeAdapter(List[ActionItem]).validate_python(datagen.actions(300, seed=3))
+    assert len({h.id for h in hospitals}) == 500
+    assert all(h.occupancy.icu_beds_used <= h.occupancy.icu_beds_total for h in hospitals)
+    assert any(a.status == "PENDING" for a in actions)
+    assert datagen.hospitals(50, seed=3) == datagen.hospitals(50, seed=3)
+
+    paths = datagen.write(tmp_path, 20, 10)
+    assert paths["hospitals"].is_file() and paths["actions"].is_file()
+
+
+def test_compare_flags_regressions_beyond_threshold() -> None:
+    baseline = {
+        "results": {
+            "routes": {"GET /a": {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "rps": 100.0, "errors": 0}},
+            "micro": {"dump": {"ms": 5.0}, "tiny": {"ms": 0.01}},
+        }
+    }
+    same = {
+        "results": {
+            "routes": {"GET /a": {"p50_ms": 11.0, "p95_ms": 20.0, "p99_ms": 90.0, "rps": 90.0, "errors": 0}},
+            "micro": {"dump": {"ms": 5.5}, "tiny": {"ms": 0.05}},
+        }
+    }
+    assert compare(same, baseline, threshold=0.25) == []
+
+    # Cases only one side has are never silently ungated.
+    same["results"]["micro"]["new"] = {"ms": 1.0}
+    del same["results"]["micro"]["tiny"]
+    assert compare(same, baseline, threshold=0.25) == [
+        "micro/new: not in the baseline; re-record it with --update-baseline",
+        "micro/tiny: in the baseline but not measured; re-record it with --update-baseline",
+    ]
+
+    worse = {
+        "results": {
+            "routes": {"GET /a": {"p50_ms": 14.0, "p95_ms": 60.0, "p99_ms": 30.0, "rps": 50.0, "errors": 2}},
+            "micro": {"dump": {"ms": 7.0}, "tiny": {"ms": 0.01}},
+        }
+    }
+    flagged = compare(worse, baseline, threshold=0.25)
+    assert len(flagged) == 4  # p95/p99 are not gated
+    assert any("routes/GET /a: p50_ms" in line for line in flagged)
+    assert any("rps" in line for line in flagged)
+    assert any("errors" in line for line in flagged)
+    assert any("micro/dump: ms" in line for line in flagged)
+
+
+def test_route_suite_runs_against_generated_network(tmp_path) -> None:
+    data = datagen.write(tmp_path, 300, 200)
+    results = asyncio.run(routes.run(data, requests=5, concurrency=2, rounds=1))
+    assert "GET /api/hospitals (304)" in results
+    assert {"POST /api/actions/{id}/approve", "GET /api/stream (first event)", "POST /api/allocation/solve"} <= set(results)
+    assert all(r["errors"] == 0 and r["requests"] == 5 for r in results.values())
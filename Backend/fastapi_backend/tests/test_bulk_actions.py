@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas import ActionBulkItem, ActionItem
+from app.services import actions_service
+from app.services.action_repository import SqliteActionRepository
+from app.services.delivery_queue import SqliteDeliveryQueue
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def backlog() -> Iterator[SqliteDeliveryQueue]:
+    repo = SqliteActionRepository(":memory:")
+    queue = SqliteDeliveryQueue(":memory:")
+    base = datetime(2025, 11, 28, 18, 0, tzinfo=timezone.utc)
+    repo.put_many(
+        ActionItem(
+            id=f"b-{i}",
+            type="STAFFING",
+            target="STAFF",
+            channel="SMS",
+            recipients=[f"+9100{i}", f"+9101{i}"],
+            message_template=f"Template {i}",
+            status="SENT" if i == 4 else "PENDING",
+            created_at=base + timedelta(minutes=i),
+            updated_at=base + timedelta(minutes=i),
+        )
+        for i in range(5)
+    )
+    previous = (actions_service._repository, actions_service.get_delivery_queue())
+    actions_service.set_repository(repo)
+    actions_service.set_delivery_queue(queue)
+    yield queue
+    actions_service.set_repository(previous[0])
+    actions_service.set_delivery_queue(previous[1])
+
+
+def test_bulk_endpoint_applies_decisions_and_reports_per_item(backlog: SqliteDeliveryQueue) -> None:
+    resp = client.post(
+        "/api/actions/bulk",
+        json={
+            "items": [
+                {"id": "b-0", "decision": "APPROVE"},
+                {"id": "b-1", "decision": "APPROVE", "message_override": "Custom"},
+                {"id": "b-2", "decision": "REJECT", "reason": "Duplicate"},
+                {"id": "missing", "decision": "APPROVE"},
+                {"id": "b-4", "decision": "REJECT"},
+                {"id": "b-0", "decision": "REJECT"},
+            ]
+        },
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["approved"], body["rejected"], body["failed"]) == (2, 1, 3)
+    results = body["results"]
+    assert [r["ok"] for r in results] == [True, True, True, False, False, False]
+    assert results[1]["action"]["message_final"] == "Custom"
+    assert results[3]["error"] == "Action not found"
+    assert results[4]["error"] == "Action is SENT, not PENDING"
+    assert results[5]["error"] == "Duplicate id in request"
+
+    assert actions_service.get("b-0").status == "APPROVED"
+    assert actions_service.get("b-2").status == "REJECTED"
+    assert [a.id for a in actions_service.list_pending()] == ["b-3"]
+    # Notifications for both approvals were queued together.
+    assert backlog.summary("b-0") == {"PENDING": 2}
+    assert backlog.summary("b-1") == {"PENDING": 2}
+    assert backlog.summary("b-2") == {}
+
+
+def test_bulk_rolls_back_store_on_error(backlog: SqliteDeliveryQueue, monkeypatch: pytest.MonkeyPatch) -> None:
+    repo = actions_service._repository
+
+    def _boom(_actions):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(repo, "put_many", _boom)
+    with pytest.raises(RuntimeError):
+        actions_service.bulk_decide(
+            [ActionBulkItem(id="b-0", decision="APPROVE")]
+        )
+    assert actions_service.get("b-0").status == "PENDING"
+    assert backlog.summary("b-0") == {}
+
+
+def test_bulk_request_requires_items() -> None:
+    assert client.post("/api/actions/bulk", json={"items": []}).status_code == 422
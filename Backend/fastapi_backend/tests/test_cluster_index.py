@@ -0,0 +1,179 @@
+import math
+import time
+from collections import defaultdict
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas import HospitalNode
+from app.services import hospital_service
+from app.services.cluster_index import CELL_BITS, MAX_ZOOM, STATUSES, BBox, ClusterIndex, parse_bbox
+
+WORLD = BBox(-180.0, -85.0, 180.0, 85.0)
+
+
+def _network(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    nodes = []
+    for i in range(n):
+        icu_total, ward_total = int(rng.integers(5, 40)), int(rng.integers(20, 200))
+        nodes.append(
+            HospitalNode(
+                id=f"h{i}",
+                name=f"Hospital {i}",
+                lat=float(rng.uniform(8, 35)),
+                lng=float(rng.uniform(68, 97)),
+                occupancy={
+                    "icu_beds_used": int(rng.integers(0, icu_total + 1)),
+                    "icu_beds_total": icu_total,
+                    "ward_beds_used": int(rng.integers(0, ward_total + 1)),
+                    "ward_beds_total": ward_total,
+                },
+                status=STATUSES[int(rng.integers(0, 3))],
+                resources={"oxygen": "HIGH", "staff_load": "LOW"},
+            )
+        )
+    return nodes
+
+
+def _brute(nodes, zoom):
+    """(count, icu used, ward total, worst status) per quadtree cell at `zoom`."""
+    scale = 2 ** (zoom + CELL_BITS)
+    groups = defaultdict(list)
+    for n in nodes:
+        x = n.lng / 360 + 0.5
+        sin = math.sin(math.radians(n.lat))
+        y = 0.5 - math.log((1 + sin) / (1 - sin)) / (4 * math.pi)
+        key = (int(x * scale), int(y * scale)) if zoom <= MAX_ZOOM else n.id
+        groups[key].append(n)
+    return sorted(
+        (
+            len(g),
+            sum(n.occupancy.icu_beds_used for n in g),
+            sum(n.occupancy.ward_beds_total for n in g),
+            max((n.status for n in g), key=STATUSES.index),
+        )
+        for g in groups.values()
+    )
+
+
+def _summary(clusters):
+    return sorted((c.count, c.icu_beds_used, c.ward_beds_total, c.status) for c in clusters)
+
+
+def test_clusters_match_brute_force_at_every_zoom() -> None:
+    nodes = _network(2_000)
+    index = ClusterIndex()
+    index.reset(nodes)
+    for zoom in (0, 2, 5, 8, 12, MAX_ZOOM + 1):
+        assert _summary(index.query(WORLD, zoom)) == _brute(nodes, zoom)
+
+    singles = index.query(WORLD, MAX_ZOOM + 3)
+    assert len(singles) == len(nodes)
+    by_id = {n.id: n for n in nodes}
+    assert all(c.hospital_id == c.id and (c.lat, c.lng) == (by_id[c.id].lat, by_id[c.id].lng) for c in singles)
+
+    # Viewport filtering: only clusters whose centroid is inside the box.
+    box = BBox(75.0, 15.0, 80.0, 20.0)
+    inside = index.query(box, 7)
+    assert inside and all(75 <= c.lng <= 80 and 15 <= c.lat <= 20 for c in inside)
+    assert sum(c.count for c in index.query(box, MAX_ZOOM + 1)) == sum(
+        75 <= n.lng <= 80 and 15 <= n.lat <= 20 for n in nodes
+    )
+    # Antimeridian-crossing boxes wrap; this one misses the whole network.
+    assert index.query(BBox(170.0, -10.0, -170.0, 10.0), 4) == []
+
+
+def test_clusters_follow_updates_moves_and_additions() -> None:
+    nodes = _network(800, seed=1)
+    index = ClusterIndex()
+    index.reset(nodes)
+    index.query(WORLD, 0)  # build, so later occupancy changes go through the incremental path
+    by_id = {n.id: n for n in nodes}
+
+    def upsert(node):
+        by_id[node.id] = node
+        index.upsert(node)
+
+    rng = np.random.default_rng(2)
+    for step in range(200):
+        node = by_id[f"h{int(rng.integers(0, 800))}"]
+        occ = node.occupancy.model_copy(update={"icu_beds_used": int(rng.integers(0, node.occupancy.icu_beds_total + 1))})
+        upsert(node.model_copy(update={"occupancy": occ, "status": STATUSES[step % 3]}))
+    for zoom in (0, 4, 9):
+        assert _summary(index.query(WORLD, zoom)) == _brute(list(by_id.values()), zoom)
+
+    upsert(by_id["h1"].model_copy(update={"lat": 30.0, "lng": 90.0}))
+    upsert(by_id["h2"].model_copy(update={"id": "new", "lat": 9.0}))
+    for zoom in (3, MAX_ZOOM + 1):
+        assert _summary(index.query(WORLD, zoom)) == _brute(list(by_id.values()), zoom)
+
+
+def test_co_located_hospitals_are_separate_markers_above_max_zoom() -> None:
+    base = _network(3, seed=3)
+    nodes = [base[0], *(n.model_copy(update={"lat": base[0].lat, "lng": base[0].lng}) for n in base[1:])]
+    nodes.append(base[0].model_copy(update={"id": "near", "lat": base[0].lat + 1e-7}))
+    index = ClusterIndex()
+    index.reset(nodes)
+    (merged,) = index.query(WORLD, MAX_ZOOM)
+    assert merged.count == len(nodes) and merged.hospital_id is None
+    for zoom in (MAX_ZOOM + 1, MAX_ZOOM + 4, 24):
+        markers = index.query(WORLD, zoom)
+        assert sorted(c.hospital_id for c in markers) == sorted(n.id for n in nodes)
+        assert all(c.count == 1 for c in markers)
+
+    # Incremental updates go to the hospital's own marker, not its neighbours'.
+    occ = nodes[1].occupancy.model_copy(update={"icu_beds_used": 0})
+    index.upsert(nodes[1].model_copy(update={"occupancy": occ}))
+    by_id = {c.hospital_id: c for c in index.query(WORLD, MAX_ZOOM + 1)}
+    assert by_id[nodes[1].id].icu_beds_used == 0
+    assert by_id[nodes[2].id].icu_beds_used == nodes[2].occupancy.icu_beds_used
+
+
+def test_viewport_query_is_sub_millisecond_at_50k() -> None:
+    index = ClusterIndex()
+    index.reset(_network(50_000, seed=3))
+    index.query(WORLD, 0)
+    rng = np.random.default_rng(4)
+    timings = []
+    for j in range(500):
+        zoom = int(rng.integers(4, 14))
+        # A 1024x768 px viewport at this zoom.
+        width, height = 1024 / 256 * 360 / 2**zoom, 768 / 256 * 180 / 2**zoom
+        lng, lat = float(rng.uniform(68, 97)), float(rng.uniform(8, 35))
+        box = BBox(lng - width / 2, max(lat - height / 2, -85), lng + width / 2, min(lat + height / 2, 85))
+        start = time.perf_counter()
+        index.query(box, zoom)
+        timings.append(time.perf_counter() - start)
+    assert np.median(timings) < 0.001
+
+
+def test_parse_bbox_validates() -> None:
+    assert parse_bbox("72.5,18.8,73.2,19.4") == BBox(72.5, 18.8, 73.2, 19.4)
+    for bad in ("1,2,3", "a,b,c,d", "0,10,1,5", "-200,0,0,1"):
+        with pytest.raises(ValueError):
+            parse_bbox(bad)
+
+
+def test_clusters_endpoint(fresh_hospitals) -> None:
+    client = TestClient(app)
+    params = {"bbox": "60,0,100,40", "zoom": 0}
+    (cluster,) = client.get("/api/hospitals/clusters", params=params).json()
+    nodes = hospital_service.list_hospitals()
+    assert cluster["count"] == len(nodes)
+    assert cluster["icu_beds_used"] == sum(n.occupancy.icu_beds_used for n in nodes)
+    assert cluster["status"] == max((n.status for n in nodes), key=STATUSES.index)
+
+    # Occupancy updates are reflected without a rebuild.
+    node = nodes[0]
+    occ = node.occupancy.model_copy(update={"icu_beds_used": 0})
+    hospital_service.upsert_hospitals([node.model_copy(update={"occupancy": occ})])
+    (updated,) = client.get("/api/hospitals/clusters", params=params).json()
+    assert updated["icu_beds_used"] == cluster["icu_beds_used"] - node.occupancy.icu_beds_used
+
+    singles = client.get("/api/hospitals/clusters", params={"bbox": "60,0,100,40", "zoom": 20}).json()
+    assert sorted(c["hospital_id"] for c in singles) == sorted(n.id for n in nodes)
+    assert client.get("/api/hospitals/clusters", params={"bbox": "1,2,3", "zoom": 3}).status_code == 400
+    assert client.get("/api/hospitals/clusters", params={"bbox": "60,0,100,40", "zoom": 30}).status_code == 422
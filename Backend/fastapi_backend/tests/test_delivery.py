@@ -0,0 +1,193 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Sequence
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.schemas import ActionItem
+from app.services import actions_service
+from app.services.action_repository import SqliteActionRepository
+from app.services.delivery_queue import SqliteDeliveryQueue
+from app.services.delivery_worker import DeliveryDispatcher, backoff_delay
+from app.services.twilio_client import TwilioClient, TwilioSendResult
+
+client = TestClient(app)
+
+
+class ScriptedTwilio(TwilioClient):
+    """
+    Fails each recipient for its first `failures[recipient]` attempts
+    (retryably, unless the recipient is in `permanent`).
+    """
+
+    def __init__(self, failures: Dict[str, int], permanent: Sequence[str] = ()) -> None:
+        super().__init__()
+        self.failures = dict(failures)
+        self.permanent = set(permanent)
+        self.calls: List[str] = []
+
+    @property
+    def dry_run(self) -> bool:
+        return True  # skip the shared rate limiter in tests
+
+    async def send_message(self, to: str, body: str) -> TwilioSendResult:
+        self.calls.append(to)
+        if self.failures.get(to, 0) > 0:
+            self.failures[to] -= 1
+            retryable = to not in self.permanent
+            return TwilioSendResult(sid=None, status="FAILED", retryable=retryable, error="HTTP 503")
+        return TwilioSendResult(sid=f"SM-{to}", status="queued")
+
+
+@pytest.fixture
+def isolated_actions(monkeypatch: pytest.MonkeyPatch) -> Iterator[SqliteActionRepository]:
+    repo = SqliteActionRepository(":memory:")
+    now = datetime.now(timezone.utc)
+    repo.put(
+        ActionItem(
+            id="act-d1",
+            type="ADVISORY",
+            target="PUBLIC",
+            channel="SMS",
+            recipients=["+911", "+912", "+913"],
+            message_template="Stay indoors.",
+            status="PENDING",
+            created_at=now,
+            updated_at=now,
+        )
+    )
+    previous = (
+        actions_service._repository,
+        actions_service.get_delivery_queue(),
+        actions_service.get_twilio_client(),
+    )
+    actions_service.set_repository(repo)
+    actions_service.set_delivery_queue(SqliteDeliveryQueue(":memory:"))
+    monkeypatch.setattr(get_settings(), "delivery_backoff_base", 0.0)
+    yield repo
+    actions_service.set_repository(previous[0])
+    actions_service.set_delivery_queue(previous[1])
+    actions_service.set_twilio_client(previous[2])
+
+
+def _approve_and_drain(twilio: ScriptedTwilio) -> ActionItem:
+    actions_service.set_twilio_client(twilio)
+
+    async def _run() -> ActionItem:
+        approved = await actions_service.approve_and_notify("act-d1", None)
+        assert approved.status == "APPROVED"
+        assert actions_service.get_delivery_queue().summary("act-d1") == {"PENDING": 3}
+        await DeliveryDispatcher().drain()
+        return actions_service.get("act-d1")
+
+    return asyncio.run(_run())
+
+
+def test_delivery_marks_action_sent(isolated_actions: SqliteActionRepository) -> None:
+    final = _approve_and_drain(ScriptedTwilio({}))
+    assert final.status == "SENT"
+    report = actions_service.delivery_report("act-d1")
+    assert report.jobs == {"SENT": 3}
+    assert sorted(entry.recipient for entry in report.log) == ["+911", "+912", "+913"]
+
+
+def test_delivery_retries_then_succeeds(isolated_actions: SqliteActionRepository) -> None:
+    twilio = ScriptedTwilio({"+912": 2})
+    final = _approve_and_drain(twilio)
+    assert final.status == "SENT"
+    assert twilio.calls.count("+912") == 3
+    attempts = [e for e in actions_service.delivery_report("act-d1").log if e.recipient == "+912"]
+    assert [(e.attempt, e.status) for e in attempts] == [(1, "FAILED"), (2, "FAILED"), (3, "queued")]
+
+
+def test_delivery_marks_action_failed_after_max_attempts(
+    isolated_actions: SqliteActionRepository, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_settings(), "delivery_max_attempts", 2)
+    final = _approve_and_drain(ScriptedTwilio({"+913": 10}))
+    assert final.status == "FAILED"
+    assert actions_service.delivery_report("act-d1").jobs == {"SENT": 2, "FAILED": 1}
+
+
+def test_non_retryable_failure_is_final_on_first_attempt(isolated_actions: SqliteActionRepository) -> None:
+    twilio = ScriptedTwilio({"+913": 10}, permanent=["+913"])
+    final = _approve_and_drain(twilio)
+    assert final.status == "FAILED"
+    assert twilio.calls.count("+913") == 1
+    report = actions_service.delivery_report("act-d1")
+    assert report.jobs == {"SENT": 2, "FAILED": 1}
+    assert [e.error for e in report.log if e.recipient == "+913"] == ["HTTP 503"]
+
+
+def test_deliveries_endpoint(isolated_actions: SqliteActionRepository) -> None:
+    assert client.get("/api/actions/unknown/deliveries").status_code == 404
+    resp = client.post("/api/actions/act-d1/approve", json={})
+    assert resp.json()["status"] == "APPROVED"
+    body = client.get("/api/actions/act-d1/deliveries").json()
+    assert body["status"] == "APPROVED"
+    assert body["jobs"] == {"PENDING": 3}
+    assert body["log"] == []
+
+
+def test_repeated_approval_is_rejected_without_new_jobs(isolated_actions: SqliteActionRepository) -> None:
+    assert client.post("/api/actions/act-d1/approve", json={}).status_code == 200
+    again = client.post("/api/actions/act-d1/approve", json={})
+    assert again.status_code == 409
+    assert "APPROVED" in again.json()["detail"]
+    assert client.post("/api/actions/act-d1/reject", json={}).status_code == 409
+    assert actions_service.get_delivery_queue().summary("act-d1") == {"PENDING": 3}
+    assert actions_service.get("act-d1").status == "APPROVED"
+
+
+def test_approval_rolls_back_when_jobs_cannot_be_queued(
+    isolated_actions: SqliteActionRepository, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def _broken(*args: object) -> int:
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(actions_service.get_delivery_queue(), "enqueue", _broken)
+    with pytest.raises(RuntimeError):
+        actions_service.approve("act-d1", None)
+    assert actions_service.get("act-d1").status == "PENDING"
+
+
+def test_jobs_of_unapproved_actions_are_not_sent(isolated_actions: SqliteActionRepository) -> None:
+    # As left by a crash after the queue committed but before the approval.
+    actions_service.get_delivery_queue().enqueue("act-d1", ["+911"], "Stay indoors.")
+    twilio = ScriptedTwilio({})
+    actions_service.set_twilio_client(twilio)
+    asyncio.run(DeliveryDispatcher().drain())
+    assert twilio.calls == []
+    assert actions_service.get_delivery_queue().summary("act-d1") == {"FAILED": 1}
+    assert actions_service.get("act-d1").status == "PENDING"
+
+
+def test_queue_recovers_in_flight_jobs() -> None:
+    queue = SqliteDeliveryQueue(":memory:")
+    queue.enqueue("a", ["+1", "+2"], "hi")
+    assert len(queue.claim(10)) == 2
+    assert queue.claim(10) == []
+    queue.recover()
+    assert [job.attempts for job in queue.claim(10)] == [2, 2]
+
+
+def test_backoff_delay_grows_and_is_capped() -> None:
+    assert 1.0 <= backoff_delay(1, base=2.0, cap=60.0) <= 2.0
+    assert 8.0 <= backoff_delay(4, base=2.0, cap=60.0) <= 16.0
+    assert backoff_delay(20, base=2.0, cap=60.0) <= 60.0
+
+
+def test_background_workers_deliver_after_approval(isolated_actions: SqliteActionRepository) -> None:
+    actions_service.set_twilio_client(ScriptedTwilio({}))
+    with TestClient(app) as live:
+        resp = live.post("/api/actions/act-d1/approve", json={"message_override": "Go"})
+        assert resp.json()["status"] == "APPROVED"
+        for _ in range(100):
+            if live.get("/api/actions/act-d1/deliveries").json()["status"] == "SENT":
+                break
+            time.sleep(0.02)
+    assert actions_service.get("act-d1").status == "SENT"
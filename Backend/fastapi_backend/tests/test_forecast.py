@@ -0,0 +1,181 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.schemas import HospitalNode, HospitalOccupancyUpdate
+from app.services import forecast_service, history_service, hospital_service, kpi_service
+from app.services.forecast_engine import exceedance_probability, forecast_batch
+from app.services.hospital_table import HospitalTable
+from app.services.timeseries_store import OccupancySeriesStore
+from benchmarks import datagen
+
+
+def _weekly(n: int, periods: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(periods + 14)
+    base = rng.uniform(5, 40, (n, 1))
+    clean = base + 3 * np.sin(2 * np.pi * t / 7)[None, :] + 0.05 * t[None, :]
+    y = clean[:, :periods] + rng.normal(0, 0.5, (n, periods))
+    y[rng.random((n, periods)) < 0.1] = np.nan
+    return y, clean[:, periods:]
+
+
+def test_batch_forecast_beats_naive_and_scales() -> None:
+    # 5,000 hospitals x (ICU, ward) as one batch.
+    y, truth = _weekly(10_000, 56)
+    start = time.perf_counter()
+    result = forecast_batch(y, 14)
+    elapsed = time.perf_counter() - start
+
+    assert result.mean.shape == result.sigma.shape == (10_000, 14)
+    naive = np.nanmean(y[:, -7:], axis=1)[:, None]
+    assert np.abs(result.mean - truth).mean() < 0.6 * np.abs(naive - truth).mean()
+    assert np.all(np.diff(result.sigma, axis=1) >= 0)
+    assert elapsed < 1.0
+
+
+def test_holiday_effect_and_cold_start() -> None:
+    periods = 56
+    holidays = np.zeros(periods, dtype=bool)
+    holidays[[10, 24, 38, 52]] = True
+    y = np.full((1, periods), 20.0)
+    y[0, holidays] = 30.0
+    future = np.zeros(7, dtype=bool)
+    future[3] = True
+
+    result = forecast_batch(y, 7, holidays=holidays, future_holidays=future)
+    assert result.mean[0, 3] > result.mean[0, 2] + 5
+
+    # A single observation: flat forecast with the default spread.
+    cold = np.full((1, periods), np.nan)
+    cold[0, -1] = 12.0
+    result = forecast_batch(cold, 3, sigma_default=np.array([2.0]))
+    assert np.allclose(result.mean, 12.0)
+    assert result.sigma[0, 0] == pytest.approx(2.0)
+
+
+def test_exceedance_probability() -> None:
+    p = exceedance_probability(np.array([10.0, 10.0, 10.0]), np.array([1.0, 1.0, 0.0]), np.array([10.0, 12.0, 9.0]))
+    assert p[0] == pytest.approx(0.5, abs=1e-6)
+    assert p[1] == pytest.approx(0.02275, abs=1e-4)
+    assert p[2] == 1.0
+
+
+@pytest.fixture()
+def _history():
+    previous = history_service.get_store()
+    history_service.set_store(OccupancySeriesStore(None, interval=3600))
+    hospital_service.invalidate()
+    forecast_service.invalidate()
+    yield history_service.get_store()
+    history_service.set_store(previous)
+    hospital_service.invalidate()
+    forecast_service.invalidate()
+
+
+def test_forecast_endpoint_and_kpi_surge_confidence(_history) -> None:
+    client = TestClient(app)
+    baseline = client.get("/api/forecast", params={"horizon": 3}).json()
+    by_id = {h["hospital_id"]: h for h in baseline["hospitals"]}
+
+    # hosp-2 has been climbing steadily towards its ICU capacity.
+    capacity = hospital_service.get("hosp-2").occupancy.icu_beds_total
+    today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+    _history.append_many(
+        ("hosp-2", ((today - timedelta(days=d)).timestamp(), capacity * (0.9 - 0.02 * d), capacity, 50, 100))
+        for d in range(1, 30)
+    )
+    forecast_service.invalidate()
+
+    resp = client.get("/api/forecast", params={"horizon": 5})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["horizon_days"] == 5
+    assert body["dates"][0] == (today.date() + timedelta(days=1)).isoformat()
+    hosp2 = next(h for h in body["hospitals"] if h["hospital_id"] == "hosp-2")
+    assert len(hosp2["icu_beds_used"]) == 5
+    assert hosp2["surge_probability"] > by_id["hosp-2"]["surge_probability"]
+    assert all(lo <= mid <= hi for lo, mid, hi in zip(hosp2["icu_beds_lower"], hosp2["icu_beds_used"], hosp2["icu_beds_upper"]))
+
+    assert client.get("/api/forecast", params={"horizon": 5}, headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+    assert client.get("/api/forecast", params={"horizon": 30}).status_code == 422
+
+    assert kpi_service.get_kpi().surge_confidence == body["surge_confidence"]
+    assert forecast_service.get_forecast() is forecast_service.get_forecast()
+
+
+def test_forecast_is_recomputed_on_data_change(_history, monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "forecast_surge_threshold", 0.5)
+    monkeypatch.setattr(get_settings(), "forecast_refresh_interval", 0.0)
+    first = forecast_service.get_forecast()
+    node = hospital_service.get("hosp-1")
+    hospital_service.upsert_hospitals(
+        [node.model_copy(update={"occupancy": node.occupancy.model_copy(update={"icu_beds_used": 0})})]
+    )
+    second = forecast_service.get_forecast()
+    assert second is not first
+    assert second.surge_confidence < first.surge_confidence
+
+
+def test_live_updates_refresh_the_forecast_in_the_background(_history, monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "forecast_surge_threshold", 0.5)
+    first = forecast_service.get_forecast()
+    kpi = kpi_service.get_snapshot()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("forecast recomputed on the request path")
+
+    # Within the refresh interval, updates only move the running KPI totals.
+    monkeypatch.setattr(forecast_service, "_compute", _fail)
+    update = HospitalOccupancyUpdate.model_validate(
+        {
+            "hospital_id": "hosp-1",
+            "occupancy": {"icu_beds_used": 0, "icu_beds_total": 24, "ward_beds_used": 0, "ward_beds_total": 180},
+        }
+    )
+    hospital_service.apply_occupancy_updates([update])
+    assert forecast_service.get_forecast() is first
+    after = kpi_service.get_snapshot()
+    assert after.etag != kpi.etag and after.data.surge_confidence == first.surge_confidence
+    monkeypatch.undo()
+
+    # Once it has elapsed, the stale forecast is served while a new one is computed.
+    monkeypatch.setattr(get_settings(), "forecast_surge_threshold", 0.5)
+    monkeypatch.setattr(get_settings(), "forecast_refresh_interval", 1e-6)
+    assert forecast_service.get_forecast() is first
+    deadline = time.monotonic() + 5
+    while forecast_service.get_forecast() is first and time.monotonic() < deadline:
+        time.sleep(0.01)
+    second = forecast_service.get_forecast()
+    assert second is not first and second.surge_confidence < first.surge_confidence
+    assert kpi_service.get_kpi().surge_confidence == second.surge_confidence
+
+
+def test_network_forecast_reads_daily_rollups_at_5k(monkeypatch) -> None:
+    hospitals = HospitalTable.from_nodes(HospitalNode.model_validate(h) for h in datagen.hospitals(5_000, seed=2))
+    store = OccupancySeriesStore(None, interval=get_settings().history_interval)
+    now = time.time()
+    store.append_many(
+        (hid, (now - h * 3600, h % 20, 30, 40, 100)) for hid in hospitals.ids for h in range(24)
+    )
+    monkeypatch.setattr(history_service, "_store", store)
+    today = datetime.now(timezone.utc).date()
+
+    start = time.perf_counter()
+    forecast = forecast_service._compute("v", hospitals, today)
+    elapsed = time.perf_counter() - start
+    assert forecast.icu.mean.shape == (5_000, forecast_service.MAX_HORIZON)
+    assert elapsed < 1.0
+
+    # The dense read matches per-hospital daily rollups.
+    day = int(now // 86_400)
+    matrix = store.daily_matrix(hospitals.ids[:3], day - 1, 2)
+    for row, hid in enumerate(hospitals.ids[:3]):
+        rolled = store.query(hid, (day - 1) * 86_400, (day + 1) * 86_400, resolution=86_400)
+        cols = rolled.timestamps // 86_400 - (day - 1)
+        assert np.allclose(matrix["icu_beds_used"][row, cols], rolled.values["icu_beds_used"])
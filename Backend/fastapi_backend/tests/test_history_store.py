@@ -0,0 +1,130 @@
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas import HospitalOccupancyUpdate
+from app.services import history_service, hospital_service
+from app.services.timeseries_store import OccupancySeriesStore
+
+DAY = 86_400
+T0 = 1_700_006_400  # midnight UTC
+
+
+def _point(t: float, icu: int) -> tuple:
+    return (t, icu, 20, icu * 2, 100)
+
+
+def test_raw_range_and_last_write_wins() -> None:
+    store = OccupancySeriesStore(None, interval=60)
+    store.append_many([("h", _point(T0 + i * 60, i)) for i in range(10)])
+    store.append("h", _point(T0 + 5 * 60 + 30, 99))  # same bucket as i=5
+
+    result = store.query("h", T0 + 120, T0 + 420)
+    assert result.timestamps.tolist() == [T0 + 60 * i for i in range(2, 7)]
+    assert result.values["icu_beds_used"].tolist() == [2, 3, 4, 99, 6]
+    assert store.query("missing", T0, T0 + DAY).timestamps.size == 0
+    assert store.bytes_used("h") == 10 * 8
+
+
+def test_rollups_average_observed_buckets_in_aligned_windows() -> None:
+    store = OccupancySeriesStore(None, interval=60)
+    # One point every 2 minutes for two hours, starting 10 minutes in.
+    store.append_many([("h", _point(T0 + 600 + i * 120, i % 7)) for i in range(60)])
+
+    hourly = store.query("h", T0, T0 + 3 * 3600, resolution=3600)
+    assert hourly.timestamps.tolist() == [T0, T0 + 3600, T0 + 7200]
+    assert hourly.samples.tolist() == [25, 30, 5]
+
+    raw = store.query("h", T0, T0 + 3 * 3600)
+    expected = [raw.values["icu_beds_used"][(raw.timestamps // 3600) == t // 3600].mean() for t in hourly.timestamps]
+    assert np.allclose(hourly.values["icu_beds_used"], expected)
+
+    # A range starting mid-window only averages buckets inside the range.
+    partial = store.query("h", T0 + 1800, T0 + 3600, resolution=3600)
+    assert partial.samples.tolist() == [15]
+
+    with pytest.raises(ValueError):
+        store.query("h", T0, T0 + 3600, resolution=90)
+
+
+def test_memory_mapped_series_survive_reopen_and_growth(tmp_path) -> None:
+    store = OccupancySeriesStore(str(tmp_path), interval=60)
+    store.append("a", _point(T0, 1))
+    # Far beyond the initial capacity, forcing the file to grow.
+    store.append_many([("a", _point(T0 + 2 * DAY, 7)), ("b", _point(T0, 3))])
+    store.close()
+
+    reopened = OccupancySeriesStore(str(tmp_path), interval=60)
+    result = reopened.query("a", T0, T0 + 3 * DAY)
+    assert result.values["icu_beds_used"].tolist() == [1, 7]
+    assert reopened.query("b", T0, T0 + 60).values["icu_beds_used"].tolist() == [3]
+    # Daily rollups are rebuilt from the files.
+    daily = reopened.daily_matrix(["a", "b", "c"], T0 // DAY, 3)["icu_beds_used"]
+    np.testing.assert_array_equal(daily, [[1, np.nan, 7], [3, np.nan, np.nan], [np.nan] * 3])
+    with pytest.raises(RuntimeError):
+        OccupancySeriesStore(str(tmp_path), interval=300)
+
+
+def test_retention_discards_oldest_buckets(tmp_path) -> None:
+    store = OccupancySeriesStore(str(tmp_path), interval=60, retention=DAY)
+    store.append("a", _point(0, 1))  # 1970, then now-ish: no 50-year allocation
+    store.append_many([("a", _point(T0 + i * 3600, i)) for i in range(48)])
+    assert store.bytes_used("a") <= DAY // 60 * 8
+
+    result = store.query("a", 0, T0 + 2 * DAY)
+    assert result.timestamps[0] >= T0 + 47 * 3600 - DAY
+    assert result.values["icu_beds_used"][-1] == 47
+    assert store.append("a", _point(T0, 5)) == 0  # older than retention
+
+    store.close()
+    reopened = OccupancySeriesStore(str(tmp_path), interval=60, retention=DAY)
+    assert reopened.query("a", 0, T0 + 2 * DAY).timestamps.tolist() == result.timestamps.tolist()
+
+
+@pytest.fixture()
+def _history():
+    previous = history_service.get_store()
+    history_service.set_store(OccupancySeriesStore(None, interval=60))
+    hospital_service.invalidate()
+    yield
+    history_service.set_store(previous)
+    hospital_service.invalidate()
+
+
+def test_history_endpoint_records_ingested_updates(_history) -> None:
+    client = TestClient(app)
+    t0 = (int(time.time()) // 3600 - 24) * 3600
+    start = datetime.fromtimestamp(t0, tz=timezone.utc)
+    updates = [
+        {
+            "hospital_id": "hosp-1",
+            "occupancy": {"icu_beds_used": i, "icu_beds_total": 24, "ward_beds_used": 90, "ward_beds_total": 180},
+            "observed_at": datetime.fromtimestamp(t0 + i * 60, tz=timezone.utc).isoformat(),
+        }
+        for i in range(10)
+    ]
+    assert client.post("/api/hospitals/occupancy:batch", json=updates).status_code == 202
+
+    params = {"start": start.isoformat(), "end": datetime.fromtimestamp(t0 + 3600, tz=timezone.utc).isoformat()}
+    raw = client.get("/api/hospitals/hosp-1/history", params=params).json()
+    assert raw["icu_beds_used"] == list(range(10))
+    assert raw["timestamps"][0] == t0
+
+    rolled = client.get("/api/hospitals/hosp-1/history", params={**params, "resolution": "5m"}).json()
+    assert rolled["interval_seconds"] == 300
+    assert rolled["icu_beds_used"] == [2.0, 7.0]
+    assert rolled["samples"] == [5, 5]
+
+    assert client.get("/api/hospitals/nope/history").status_code == 404
+    too_long = {"start": "2020-01-01T00:00:00Z", "end": "2024-01-01T00:00:00Z"}
+    assert client.get("/api/hospitals/hosp-1/history", params=too_long).status_code == 400
+
+    for observed_at in ("9999-01-01T00:00:00Z", "1970-01-01T00:00:00Z"):
+        bad = [{**updates[0], "observed_at": observed_at}]
+        resp = client.post("/api/hospitals/occupancy:batch", json=bad)
+        assert resp.status_code == 400 and "observed_at" in resp.json()["detail"]
+    assert history_service.record([HospitalOccupancyUpdate.model_validate(bad[0])]) == 0
@@ -0,0 +1,166 @@
+import random
+import statistics
+import time
+from typing import List
+
+import numpy as np
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from app.schemas import HospitalNode, HospitalOccupancyUpdate
+from app.schemas.hospital import MAX_BEDS
+from app.services import hospital_service
+from app.services.hospital_store import HospitalStore
+from app.services.hospital_table import STATUSES, HospitalTable, leaf_values
+from benchmarks import datagen
+
+_NODES = TypeAdapter(List[HospitalNode])
+
+
+def _network(n: int, seed: int = 0) -> List[HospitalNode]:
+    return _NODES.validate_python(datagen.hospitals(n, seed=seed))
+
+
+def test_table_round_trips_nodes_and_serializes_identically() -> None:
+    nodes = _network(200, seed=1)
+    nodes[0] = nodes[0].model_copy(update={"name": 'St. "Mary\'s", Pune \\ Kothrud — ICU', "lat": 1e-05})
+    table = HospitalTable.from_nodes(nodes)
+
+    assert len(table) == 200
+    assert table[0] == nodes[0] and table[-1] == nodes[-1]
+    assert list(table[10:13]) == nodes[10:13]
+    assert table.ids == [n.id for n in nodes]
+    assert table.dump_json() == _NODES.dump_json(nodes)
+    assert HospitalTable.from_nodes([]).dump_json() == b"[]"
+
+    fields = ("id", "occupancy.icu_beds_used", "resources.oxygen")
+    include = {"__all__": {"id": True, "occupancy": {"icu_beds_used": True}, "resources": {"oxygen": True}}}
+    assert table.dump_json(fields) == _NODES.dump_json(nodes, include=include)
+    assert table.column("status") == [n.status for n in nodes]
+
+    critical = table.isin("status", ["CRITICAL"])
+    expected = [n for n in nodes if n.status == "CRITICAL"]
+    assert int(critical.sum()) == len(expected)
+    assert table.sum("occupancy.icu_beds_used", where=critical) == sum(n.occupancy.icu_beds_used for n in expected)
+    assert list(table.take(critical)) == expected
+
+
+def test_store_writes_match_a_node_dict() -> None:
+    rng = random.Random(5)
+    nodes = _network(300, seed=2)
+    expected = {n.id: n for n in nodes}
+    store = HospitalStore()
+    store.load(HospitalTable.from_nodes(nodes))
+    published = store.table()
+
+    layout = store.layout_version
+    changed = [n.model_copy(update={"status": rng.choice(STATUSES)}) for n in rng.sample(nodes, 50)]
+    assert store.upsert_many(changed) == 50
+    expected.update((n.id, n) for n in changed)
+    assert store.layout_version == layout  # no moves or additions
+    assert published.dump_json() == _NODES.dump_json(nodes)  # copy on write
+
+    # New ids (one wider than any before) are indexed by id.
+    added = [
+        nodes[0].model_copy(update={"id": "zz-a-much-longer-hospital-id", "name": "N" * 80}),
+        nodes[1].model_copy(update={"id": "aa-0", "lat": 10.5}),
+    ]
+    store.upsert_many(added)
+    expected.update((n.id, n) for n in added)
+    assert store.layout_version == layout + 1
+    assert len(store) == 302
+    assert store.get("zz-a-much-longer-hospital-id") == added[0]
+    assert store.get("aa-0") == added[1] and store.get("missing") is None
+
+    occupancy = {"occupancy.icu_beds_used": 0, "occupancy.icu_beds_total": 9}
+    store.update_many([(nodes[5].id, occupancy)])
+    before = expected[nodes[5].id]
+    expected[before.id] = before.model_copy(
+        update={"occupancy": before.occupancy.model_copy(update={"icu_beds_used": 0, "icu_beds_total": 9})}
+    )
+    with pytest.raises(ValueError, match="missing"):
+        store.update_many([("brand-new", occupancy)])
+
+    table = store.table()
+    assert {n.id: n for n in table} == expected
+    assert [store.row(hid) for hid in table.ids] == list(range(len(table)))
+    values = list(expected.values())
+    assert store.kpi.icu_used == sum(n.occupancy.icu_beds_used for n in values)
+    assert store.kpi.ward_total == sum(n.occupancy.ward_beds_total for n in values)
+    assert store.kpi.status_counts["CRITICAL"] == sum(n.status == "CRITICAL" for n in values)
+    assert len(store.kpi) == len(values)
+    assert store.index.nearest(10.5, added[1].lng, 1)[0][0] == "aa-0"
+
+
+def test_failed_write_leaves_the_store_unchanged() -> None:
+    nodes = _network(50, seed=4)
+    store = HospitalStore()
+    store.load(HospitalTable.from_nodes(nodes))
+    body, version, kpi = store.table().dump_json(), store.version, store.kpi.icu_used
+
+    new = leaf_values(nodes[0])
+    new.update({"id": "zz-new", "occupancy.icu_beds_total": 3_000_000_000})
+    changes = [
+        (nodes[1].id, {"occupancy.icu_beds_used": 1, "status": "CRITICAL"}),
+        ("zz-new", new),
+        (nodes[2].id, {"resources.oxygen": "NONE"}),
+    ]
+    for bad in (changes, changes[:2], [changes[0], changes[2]]):
+        with pytest.raises(ValueError, match="Invalid value"):
+            store.update_many(bad)
+        assert store.table().dump_json() == body
+        assert (len(store), store.version, store.kpi.icu_used) == (50, version, kpi)
+        assert store.row("zz-new") is None and store.get(nodes[1].id) == nodes[1]
+
+    # The API never lets such counts through.
+    with pytest.raises(ValidationError):
+        HospitalOccupancyUpdate(
+            hospital_id=nodes[1].id,
+            occupancy={"icu_beds_used": 0, "icu_beds_total": MAX_BEDS + 1, "ward_beds_used": 0, "ward_beds_total": 0},
+        )
+
+
+def test_network_of_100k_is_compact_and_aggregates_in_microseconds() -> None:
+    nodes = _network(100_000, seed=3)
+    store = HospitalStore()
+    store.load(HospitalTable.from_nodes(nodes))
+    del nodes
+
+    assert store.nbytes / len(store) < 100
+    table = store.table()
+    critical = table.isin("status", ["CRITICAL"])
+    timings = []
+    for _ in range(50):
+        start = time.perf_counter()
+        total = table.sum("occupancy.icu_beds_used", where=critical)
+        timings.append(time.perf_counter() - start)
+    assert statistics.median(timings) < 1e-3
+    used = table.array("occupancy.icu_beds_used")
+    assert total == int(used[table.array("status") == STATUSES.index("CRITICAL")].sum())
+    assert store.kpi.icu_used == int(used.sum(dtype=np.int64))
+
+
+def test_live_updates_and_serialization_never_build_nodes(monkeypatch: pytest.MonkeyPatch) -> None:
+    hospital_service.invalidate()
+    snapshot = hospital_service.get_snapshot()
+    assert isinstance(snapshot.data, HospitalTable)
+    target = snapshot.data.ids[0]
+    update = HospitalOccupancyUpdate(
+        hospital_id=target,
+        occupancy={"icu_beds_used": 1, "icu_beds_total": 7, "ward_beds_used": 2, "ward_beds_total": 9},
+        status="CRITICAL",
+    )
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("HospitalNode materialized")
+
+    try:
+        monkeypatch.setattr(HospitalNode, "model_validate", _fail)
+        assert hospital_service.apply_occupancy_updates([update]).applied == 1
+        body = hospital_service.get_snapshot().body
+        monkeypatch.undo()
+        assert b'"icu_beds_total":7' in body
+        node = hospital_service.get(target)
+        assert node.status == "CRITICAL" and node.occupancy.icu_beds_total == 7
+    finally:
+        hospital_service.invalidate()
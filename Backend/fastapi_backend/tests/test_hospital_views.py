@@ -0,0 +1,137 @@
+import struct
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.main import app
+from app.schemas import HospitalNode
+from app.services import hospital_service, hospital_views
+from app.services.hospital_table import HospitalTable
+from benchmarks import datagen
+
+_NODES = TypeAdapter(List[HospitalNode])
+
+client = TestClient(app)
+
+
+def test_parse_fields_normalizes_to_schema_order() -> None:
+    assert hospital_views.parse_fields(None) is None
+    assert hospital_views.parse_fields(" ") is None
+    assert hospital_views.parse_fields("status, id,lat") == ("id", "lat", "status")
+    assert hospital_views.parse_fields("occupancy.icu_beds_total,resources") == (
+        "occupancy.icu_beds_total",
+        "resources.oxygen",
+        "resources.staff_load",
+    )
+    with pytest.raises(ValueError):
+        hospital_views.parse_fields("id,beds")
+
+
+def test_projected_and_columnar_views_match_full_list() -> None:
+    full = client.get("/api/hospitals").json()
+
+    rows = client.get("/api/hospitals", params={"fields": "id,lat,lng,status,occupancy.icu_beds_used"})
+    assert rows.status_code == 200
+    assert rows.json() == [
+        {
+            "id": h["id"],
+            "lat": h["lat"],
+            "lng": h["lng"],
+            "occupancy": {"icu_beds_used": h["occupancy"]["icu_beds_used"]},
+            "status": h["status"],
+        }
+        for h in full
+    ]
+
+    cols = client.get("/api/hospitals", params={"fields": "id,status,occupancy.icu_beds_used", "format": "columns"})
+    assert cols.json() == {
+        "count": len(full),
+        "columns": {
+            "id": [h["id"] for h in full],
+            "occupancy.icu_beds_used": [h["occupancy"]["icu_beds_used"] for h in full],
+            "status": [h["status"] for h in full],
+        },
+    }
+    assert len(client.get("/api/hospitals", params={"format": "columns"}).json()["columns"]) == len(
+        hospital_views.FIELDS
+    )
+
+    assert rows.headers["etag"] != cols.headers["etag"]
+    again = client.get(
+        "/api/hospitals",
+        params={"fields": "status,id,occupancy.icu_beds_used", "format": "columns"},
+        headers={"If-None-Match": cols.headers["etag"]},
+    )
+    assert again.status_code == 304
+
+
+def test_views_are_cached_per_version_and_rebuilt_on_update() -> None:
+    hospital_service.invalidate()
+    fields = ("id", "occupancy.icu_beds_used")
+    view = hospital_service.get_view(fields, "columns")
+    assert hospital_service.get_view(fields, "columns") is view
+
+    first = view.data[0]
+    updated = first.model_copy(
+        update={"occupancy": first.occupancy.model_copy(update={"icu_beds_used": first.occupancy.icu_beds_total})}
+    )
+    try:
+        hospital_service.upsert_hospitals([updated])
+        fresh = hospital_service.get_view(fields, "columns")
+        assert fresh is not view
+        assert b'"occupancy.icu_beds_used":[%d' % first.occupancy.icu_beds_total in fresh.body
+    finally:
+        hospital_service.invalidate()
+
+
+def _unpack(data: bytes, pos: int = 0):
+    """
+    Minimal MessagePack decoder for the types the columns document uses.
+    Returns (value, next position).
+    """
+    tag = data[pos]
+    sized = {0xD9: ">B", 0xDA: ">H", 0xDB: ">I", 0xDC: ">H", 0xDD: ">I", 0xDE: ">H", 0xDF: ">I"}
+    numbers = {0xCB: ">d", 0xD2: ">i", 0xCE: ">I"}
+    if tag in numbers:
+        size = struct.calcsize(numbers[tag])
+        return struct.unpack_from(numbers[tag], data, pos + 1)[0], pos + 1 + size
+    if tag < 0x80:
+        return tag, pos + 1
+    if tag in sized:
+        n = struct.unpack_from(sized[tag], data, pos + 1)[0]
+        pos += 1 + struct.calcsize(sized[tag])
+        kind = "str" if tag <= 0xDB else "array" if tag <= 0xDD else "map"
+    else:
+        kind, n = ("map", tag & 0x0F) if tag < 0x90 else ("array", tag & 0x0F) if tag < 0xA0 else ("str", tag & 0x1F)
+        pos += 1
+    if kind == "str":
+        return data[pos : pos + n].decode(), pos + n
+    items = []
+    for _ in range(n * (2 if kind == "map" else 1)):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return (dict(zip(items[::2], items[1::2])) if kind == "map" else items), pos
+
+
+def test_msgpack_encodes_the_columns_document() -> None:
+    full = client.get("/api/hospitals", params={"format": "columns"}).json()
+    resp = client.get("/api/hospitals", params={"format": "msgpack"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/msgpack"
+    document, end = _unpack(resp.content)
+    assert end == len(resp.content)
+    assert document == full
+
+    # Long names and lists take the 8/16/32-bit headers.
+    nodes = _NODES.validate_python(datagen.hospitals(70_000, seed=4))
+    nodes[0] = nodes[0].model_copy(update={"name": "Ünïcode " * 40})
+    table = HospitalTable.from_nodes(nodes)
+    body = hospital_views.encode(table, ("id", "name", "lat", "status"), "msgpack")
+    assert _unpack(body)[0] == {"count": 70_000, "columns": table.columns(("id", "name", "lat", "status"))}
+
+
+def test_bad_fields_and_formats_are_rejected() -> None:
+    assert client.get("/api/hospitals", params={"fields": "nope"}).status_code == 400
+    assert client.get("/api/hospitals", params={"format": "xml"}).status_code == 422
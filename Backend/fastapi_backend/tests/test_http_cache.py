@@ -0,0 +1,77 @@
+import asyncio
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.http_cache import STREAM_CHUNK, STREAM_THRESHOLD, conditional_response, etag_matches
+from app.main import app
+from app.services.snapshot_cache import make_etag
+
+client = TestClient(app)
+
+
+def test_etag_matches_handles_lists_weak_and_wildcard() -> None:
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_hospitals_conditional_get_returns_304() -> None:
+    first = client.get("/api/hospitals")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    second = client.get("/api/hospitals", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_kpi_conditional_get_returns_304_and_full_body_on_mismatch() -> None:
+    first = client.get("/api/dashboard/kpi")
+    etag = first.headers["etag"]
+
+    not_modified = client.get("/api/dashboard/kpi", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    stale = client.get("/api/dashboard/kpi", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+def test_large_bodies_are_sent_in_chunks() -> None:
+    body = b"[" + b",".join(b'{"id":"%d"}' % i for i in range(400_000)) + b"]"
+    assert len(body) > STREAM_THRESHOLD
+
+    probe = FastAPI()
+
+    @probe.get("/big")
+    def big(request: Request):
+        return conditional_response(request, body, make_etag(body))
+
+    async def collect() -> list:
+        chunks = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message) -> None:
+            chunks.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/big", "headers": [], "query_string": b""}
+        await probe(scope, receive, send)
+        return chunks
+
+    start, *parts = asyncio.run(collect())
+    assert (b"content-length", str(len(body)).encode()) in start["headers"]
+    assert max(len(m["body"]) for m in parts) == STREAM_CHUNK
+    assert all(type(m["body"]) is bytes for m in parts)
+    assert b"".join(m["body"] for m in parts) == body
+
+    resp = TestClient(probe).get("/big")
+    assert resp.status_code == 200
+    assert resp.content == body
@@ -0,0 +1,135 @@
+import asyncio
+from dataclasses import replace
+from typing import Iterator, List
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.services import http_clients
+from app.services.http_clients import CircuitBreaker, CircuitOpenError, backoff
+from app.services.openai_client import OpenAIClient
+from app.services.twilio_client import TwilioClient
+
+
+@pytest.fixture
+def fast_policies() -> Iterator[None]:
+    # No real sleeping between retries, and a breaker that trips quickly.
+    for name in ("openai", "twilio"):
+        policy = http_clients.get_integration(name)
+        http_clients.set_integration(
+            name, replace(policy, backoff_base=0.0, max_retries=2, breaker_failures=3, breaker_reset=0.2)
+        )
+    yield
+    for name in ("openai", "twilio"):
+        http_clients.set_integration(name, None)
+
+
+def _flaky(statuses: List[int], seen: List[str]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        status = statuses.pop(0) if statuses else 200
+        if status == 0:
+            raise httpx.ConnectError("refused", request=request)
+        if status != 200:
+            return httpx.Response(status, json={"error": "busy"})
+        if "Messages.json" in request.url.path:
+            return httpx.Response(201, json={"sid": "SM1", "status": "queued"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "Stay indoors."}}]})
+
+    return httpx.MockTransport(handler)
+
+
+def _openai(http: httpx.AsyncClient) -> OpenAIClient:
+    client = OpenAIClient(http_client=http)
+    client.settings = Settings(openai_dry_run=False, openai_api_key="sk-test")
+    return client
+
+
+def _twilio(http: httpx.AsyncClient) -> TwilioClient:
+    client = TwilioClient(http_client=http)
+    client.settings = Settings(
+        twilio_dry_run=False, twilio_account_sid="AC1", twilio_auth_token="t", twilio_from_number="+15550000000"
+    )
+    return client
+
+
+def test_backoff_is_jittered_and_capped() -> None:
+    assert backoff(0, 0.2, 5.0, rand=lambda: 0.999) < 0.2
+    assert backoff(3, 0.2, 5.0, rand=lambda: 0.5) == pytest.approx(0.8)
+    assert backoff(10, 0.2, 5.0, rand=lambda: 1.0) == 5.0
+    assert backoff(2, 0.2, 5.0, rand=lambda: 0.0) == 0.0
+
+
+def test_openai_retries_transient_failures(fast_policies) -> None:
+    seen: List[str] = []
+
+    async def _run() -> str:
+        async with httpx.AsyncClient(transport=_flaky([503, 0], seen), base_url="http://openai.test") as http:
+            return await _openai(http).generate_advisory("Heat")
+
+    assert asyncio.run(_run()) == "Stay indoors."
+    assert len(seen) == 3
+    assert http_clients.get_breaker("openai").state == "closed"
+
+
+def test_twilio_never_resends_after_the_request_was_delivered(fast_policies) -> None:
+    seen: List[str] = []
+
+    async def _run(statuses: List[int]):
+        async with httpx.AsyncClient(transport=_flaky(statuses, seen), base_url="http://twilio.test") as http:
+            return await _twilio(http).send_message("+910000000001", "Surge alert")
+
+    # A 503 may have been processed: fail rather than risk a duplicate SMS.
+    assert asyncio.run(_run([503])).status == "FAILED"
+    assert len(seen) == 1
+    # A refused connection or 429 never reached Twilio: safe to retry.
+    seen.clear()
+    assert asyncio.run(_run([0, 429])).status == "queued"
+    assert len(seen) == 3
+
+
+def test_breaker_fails_fast_then_recovers_through_a_probe() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failures=2, reset_after=10.0, clock=lambda: now[0])
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("openai")
+
+    now[0] = 11.0
+    breaker.before_call()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # concurrent callers still fail fast
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 22.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_stops_calls_to_a_failing_provider(fast_policies) -> None:
+    seen: List[str] = []
+
+    async def _run():
+        async with httpx.AsyncClient(transport=_flaky([500] * 100, seen), base_url="http://openai.test") as http:
+            live = _openai(http)
+            with pytest.raises(httpx.HTTPStatusError):
+                await live.generate_advisory("Heat")  # 3 failed attempts open the breaker
+            for _ in range(20):
+                with pytest.raises(CircuitOpenError):
+                    await live.generate_advisory("Heat")
+            calls_while_open = len(seen)
+            await asyncio.sleep(0.25)
+            with pytest.raises(CircuitOpenError):
+                # One half-open probe; it fails, re-opening the breaker before any retry.
+                await live.generate_advisory("Heat")
+            return calls_while_open
+
+    assert asyncio.run(_run()) == 3
+    assert len(seen) == 4
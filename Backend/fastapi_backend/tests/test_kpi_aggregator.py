@@ -0,0 +1,90 @@
+import random
+
+import numpy as np
+
+from app.schemas import HospitalNode
+from app.schemas.hospital import HospitalOccupancy, HospitalResources
+from app.services import hospital_service, kpi_service
+from app.services.hospital_table import BEDS, HospitalTable
+from app.services.kpi_aggregator import KPIAggregator
+
+
+def _node(i: int, icu_used: int, status: str) -> HospitalNode:
+    return HospitalNode(
+        id=f"h-{i}",
+        name=f"Hospital {i}",
+        lat=19.0,
+        lng=72.8,
+        occupancy=HospitalOccupancy(
+            icu_beds_used=icu_used,
+            icu_beds_total=20,
+            ward_beds_used=icu_used * 3,
+            ward_beds_total=100,
+        ),
+        status=status,
+        resources=HospitalResources(oxygen="HIGH", staff_load="LOW"),
+    )
+
+
+def _recompute(nodes) -> tuple:
+    nodes = list(nodes)
+    return (
+        sum(n.occupancy.icu_beds_used for n in nodes),
+        sum(n.occupancy.icu_beds_total for n in nodes),
+        sum(n.occupancy.ward_beds_used for n in nodes),
+        sum(n.occupancy.ward_beds_total for n in nodes),
+        sum(n.status == "CRITICAL" for n in nodes),
+    )
+
+
+def _columns(nodes) -> tuple:
+    table = HospitalTable.from_nodes(nodes)
+    return np.stack([table.array(path) for path in BEDS], axis=1), table.array("status")
+
+
+def test_incremental_updates_match_full_recompute() -> None:
+    rng = random.Random(7)
+    statuses = ["NORMAL", "WARNING", "CRITICAL"]
+    current = {i: _node(i, rng.randint(0, 20), rng.choice(statuses)) for i in range(50)}
+    agg = KPIAggregator()
+    agg.load(HospitalTable.from_nodes(current.values()))
+
+    for _ in range(100):
+        changed = {i: _node(i, rng.randint(0, 20), rng.choice(statuses)) for i in rng.sample(range(50), 5)}
+        agg.add(*_columns(current[i] for i in changed), sign=-1)
+        agg.add(*_columns(changed.values()))
+        current.update(changed)
+
+    assert len(agg) == 50
+    assert (agg.icu_used, agg.icu_total, agg.ward_used, agg.ward_total, agg.status_counts["CRITICAL"]) == _recompute(
+        current.values()
+    )
+    metrics = agg.metrics(surge_confidence=0.5)
+    assert metrics.critical_hospital_count == agg.status_counts["CRITICAL"]
+    assert metrics.alert_count == agg.status_counts["WARNING"] + agg.status_counts["CRITICAL"]
+    assert metrics.total_patients == agg.icu_used + agg.ward_used
+
+
+def test_empty_network_has_zero_occupancy() -> None:
+    metrics = KPIAggregator().metrics(surge_confidence=0.1)
+    assert metrics.icu_occupancy == 0.0
+    assert metrics.total_patients == 0
+
+
+def test_kpi_service_tracks_hospital_updates() -> None:
+    try:
+        hospitals = hospital_service.list_hospitals()
+        icu_used, icu_total, _, _, critical = _recompute(hospitals)
+        before = kpi_service.get_kpi()
+        before_etag = kpi_service.get_snapshot().etag
+        assert before.icu_occupancy == icu_used / icu_total
+        assert before.critical_hospital_count == critical
+
+        changed = hospitals[0].model_copy(update={"status": "CRITICAL"})
+        hospital_service.upsert_hospitals([changed])
+        after = kpi_service.get_kpi()
+        assert after.critical_hospital_count == critical + (hospitals[0].status != "CRITICAL")
+        assert kpi_service.get_snapshot().etag != before_etag
+    finally:
+        hospital_service.invalidate()
+    assert kpi_service.get_kpi().critical_hospital_count == critical
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.config import Settings
+from app.main import app
+from app.services.openai_client import OpenAIClient
+from app.services.twilio_client import TwilioClient
+
+
+def test_exposition_format_and_lock_free_counting() -> None:
+    counter = metrics.Counter("test_events_total", "Test events", ("kind",))
+    histogram = metrics.Histogram("test_latency_seconds", "Test latency", buckets=(0.1, 1.0))
+    try:
+        child = counter.labels('a"b')
+
+        def work() -> None:
+            for _ in range(10_000):
+                child.inc()
+                histogram.labels().observe(0.5)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        text = metrics.render().decode()
+        assert "# TYPE test_events_total counter" in text
+        assert 'test_events_total{kind="a\\"b"} 80000' in text
+        assert 'test_latency_seconds_bucket{le="0.1"} 0' in text
+        assert 'test_latency_seconds_bucket{le="1"} 80000' in text
+        assert 'test_latency_seconds_bucket{le="+Inf"} 80000' in text
+        assert "test_latency_seconds_sum 40000" in text
+        assert "test_latency_seconds_count 80000" in text
+    finally:
+        metrics.REGISTRY.remove(counter)
+        metrics.REGISTRY.remove(histogram)
+
+
+def test_metrics_endpoint_reports_routes_by_template() -> None:
+    client = TestClient(app)
+    requests = metrics.HTTP_REQUESTS.labels("GET", "/api/hospitals", "200")
+    kpi_hits = metrics.CACHE_LOOKUPS.labels("kpi", "hit")
+    before, hits_before = requests.value, kpi_hits.value
+
+    client.get("/api/hospitals")
+    client.get("/api/dashboard/kpi")
+    client.get("/api/dashboard/kpi")
+    client.get("/no/such/route")
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert requests.value - before == 1
+    assert kpi_hits.value - hits_before >= 1
+    assert 'route="unmatched",status="404"' in resp.text
+    assert 'http_response_size_bytes_count{method="GET",route="/api/hospitals"}' in resp.text
+    assert metrics.HTTP_IN_FLIGHT.labels("GET").value == 0
+
+
+def test_outbound_integrations_record_outcomes_and_usage() -> None:
+    queued = metrics.TWILIO_MESSAGES.labels("QUEUED")
+    before = queued.value
+    asyncio.run(TwilioClient().send_message("+910000000000", "Dry run"))
+    assert queued.value - before == 1
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = {"choices": [{"message": {"content": "Stay indoors."}}], "usage": {"prompt_tokens": 12, "completion_tokens": 5}}
+        return httpx.Response(200, json=body)
+
+    async def _run() -> str:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://openai.test") as http:
+            live = OpenAIClient(http_client=http)
+            live.settings = Settings(openai_dry_run=False, openai_api_key="sk-test")
+            return await live.generate_advisory("Heat")
+
+    prompt, calls = metrics.OPENAI_TOKENS.labels("prompt"), metrics.OPENAI_LATENCY.labels("generate", "ok")
+    prompt_before, calls_before = prompt.value, calls.totals()[-1]
+    assert asyncio.run(_run()) == "Stay indoors."
+    assert prompt.value - prompt_before == 12
+    assert calls.totals()[-1] - calls_before == 1
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import Any, Dict
+from urllib.parse import parse_qs
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.config import Settings
+from app.services.notifier import TokenBucket, send_many
+from app.services.twilio_client import TwilioClient
+
+
+def _stub_twilio(stats: Dict[str, Any]) -> FastAPI:
+    """
+    Minimal stand-in for Twilio's Messages API that tracks concurrency.
+    """
+    stub = FastAPI()
+
+    @stub.post("/2010-04-01/Accounts/{sid}/Messages.json")
+    async def create_message(sid: str, request: Request) -> JSONResponse:
+        form = parse_qs((await request.body()).decode())
+        stats["inflight"] += 1
+        stats["max_inflight"] = max(stats["max_inflight"], stats["inflight"])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            stats["inflight"] -= 1
+        if form["To"][0].endswith("999"):
+            return JSONResponse({"message": "invalid number"}, status_code=400)
+        stats["sent"] += 1
+        return JSONResponse({"sid": f"SM{stats['sent']}", "status": "queued"}, status_code=201)
+
+    return stub
+
+
+def _live_client(http_client: httpx.AsyncClient) -> TwilioClient:
+    client = TwilioClient(http_client=http_client)
+    client.settings = Settings(
+        twilio_dry_run=False,
+        twilio_account_sid="AC123",
+        twilio_auth_token="token",
+        twilio_from_number="+15550000000",
+    )
+    return client
+
+
+def test_send_many_is_bounded_and_keeps_order() -> None:
+    stats = {"inflight": 0, "max_inflight": 0, "sent": 0}
+    recipients = [f"+9100000{i:03d}" for i in range(40)] + ["+91000000999"]
+
+    async def _run():
+        transport = httpx.ASGITransport(app=_stub_twilio(stats))
+        async with httpx.AsyncClient(transport=transport, base_url="http://twilio.test") as http:
+            return await send_many(
+                _live_client(http),
+                [(r, "Surge alert") for r in recipients],
+                max_concurrency=5,
+                bucket=TokenBucket(rate=10_000),
+            )
+
+    results = asyncio.run(_run())
+    assert [r.recipient for r in results] == recipients
+    assert [r.status for r in results] == ["queued"] * 40 + ["FAILED"]
+    # A 400 (bad number) can never succeed, so it is not retryable.
+    assert not results[-1].retryable
+    assert results[-1].error.startswith("HTTP 400")
+    assert 1 < stats["max_inflight"] <= 5
+
+
+def test_send_many_dry_run_queues_everything() -> None:
+    results = asyncio.run(send_many(TwilioClient(), [("+1", "hello"), ("+2", "hello"), ("+3", "hello")]))
+    assert [r.status for r in results] == ["QUEUED"] * 3
+
+
+def test_token_bucket_throttles_to_rate() -> None:
+    async def _run() -> float:
+        bucket = TokenBucket(rate=200, burst=1)
+        start = time.monotonic()
+        for _ in range(11):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 1 token available immediately, 10 more at 200/s => ~50ms.
+    assert asyncio.run(_run()) >= 0.045
+
+
+def test_app_lifespan_owns_pooled_twilio_client() -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services import http_clients
+
+    with TestClient(app):
+        pooled = http_clients.get_client("twilio")
+        assert isinstance(pooled, httpx.AsyncClient)
+    assert http_clients.get_client("twilio") is None
+    assert pooled.is_closed
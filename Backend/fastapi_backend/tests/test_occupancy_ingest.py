@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.schemas import HospitalOccupancyUpdate
+from app.services import hospital_service
+from app.services.occupancy_ingestor import IngestQueueFull, OccupancyIngestor, ingestor
+
+pytestmark = pytest.mark.usefixtures("fresh_hospitals")
+
+client = TestClient(app)
+
+
+def _update(hospital_id: str, icu_used: int, **extra) -> dict:
+    return {
+        "hospital_id": hospital_id,
+        "occupancy": {
+            "icu_beds_used": icu_used,
+            "icu_beds_total": 24,
+            "ward_beds_used": 100,
+            "ward_beds_total": 180,
+        },
+        **extra,
+    }
+
+
+def test_json_batch_updates_hospitals_and_kpi() -> None:
+    before = client.get("/api/dashboard/kpi").json()
+    resp = client.post(
+        "/api/hospitals/occupancy:batch",
+        json=[_update("hosp-1", 24, status="CRITICAL"), _update("hosp-404", 1)],
+    )
+    assert resp.status_code == 202
+    assert resp.json() == {"accepted": 2, "pending": 0}
+
+    node = hospital_service.get("hosp-1")
+    assert node.occupancy.icu_beds_used == 24
+    assert node.status == "CRITICAL"
+    assert hospital_service.get("hosp-404") is None
+
+    after = client.get("/api/dashboard/kpi").json()
+    assert after["critical_hospital_count"] == before["critical_hospital_count"] + 1
+
+
+def test_ndjson_batch() -> None:
+    body = "\n".join(json.dumps(_update(h, 3)) for h in ("hosp-1", "hosp-2")) + "\n\n"
+    resp = client.post(
+        "/api/hospitals/occupancy:batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 202
+    assert resp.json()["accepted"] == 2
+    assert hospital_service.get("hosp-2").occupancy.icu_beds_used == 3
+
+
+def test_invalid_payload_is_rejected() -> None:
+    resp = client.post("/api/hospitals/occupancy:batch", json=[{"hospital_id": "hosp-1"}])
+    assert resp.status_code == 422
+    resp = client.post(
+        "/api/hospitals/occupancy:batch",
+        content=b'{"hospital_id": "hosp-1"',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 422
+
+
+def test_batch_is_coalesced_into_one_version_bump() -> None:
+    start = hospital_service.version()
+    updates = [HospitalOccupancyUpdate.model_validate(_update("hosp-1", i)) for i in range(10)]
+    result = hospital_service.apply_occupancy_updates(updates)
+    assert result.applied == 1
+    assert hospital_service.get("hosp-1").occupancy.icu_beds_used == 9
+    file_version, _, store_version = start.rpartition(".")
+    assert hospital_service.version() == f"{file_version}.{int(store_version) + 1}"
+
+
+def test_background_ingestor_batches_and_pushes_back(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "ingest_max_pending", 5)
+    monkeypatch.setattr(get_settings(), "ingest_max_delay", 0.01)
+
+    async def scenario() -> OccupancyIngestor:
+        worker = OccupancyIngestor()
+        worker.start()
+        updates = [HospitalOccupancyUpdate.model_validate(_update("hosp-3", i)) for i in range(4)]
+        assert worker.submit(updates) == 4
+        assert worker.pending == 4
+        with pytest.raises(IngestQueueFull):
+            worker.submit(updates)
+        await asyncio.sleep(0.05)
+        assert worker.pending == 0
+        await worker.stop()
+        return worker
+
+    worker = asyncio.run(scenario())
+    assert worker.batches == 1
+    assert hospital_service.get("hosp-3").occupancy.icu_beds_used == 3
+
+
+def test_failed_batch_does_not_stop_the_ingestor(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "ingest_max_delay", 0.01)
+    apply = hospital_service.apply_occupancy_updates
+    calls = []
+
+    def flaky(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise OverflowError("boom")
+        return apply(batch)
+
+    monkeypatch.setattr(hospital_service, "apply_occupancy_updates", flaky)
+
+    async def scenario() -> OccupancyIngestor:
+        worker = OccupancyIngestor()
+        worker.start()
+        worker.submit([HospitalOccupancyUpdate.model_validate(_update("hosp-3", 1))])
+        await asyncio.sleep(0.05)
+        assert worker.running and worker.failed == 1
+
+        worker.submit([HospitalOccupancyUpdate.model_validate(_update("hosp-3", 2))])
+        await asyncio.sleep(0.05)
+        assert hospital_service.get("hosp-3").occupancy.icu_beds_used == 2
+
+        # A task that died anyway is restarted by the next submit.
+        worker._task.cancel()
+        await asyncio.sleep(0)
+        assert not worker.running
+        worker.submit([HospitalOccupancyUpdate.model_validate(_update("hosp-3", 3))])
+        assert worker.running and worker.pending == 1
+        await asyncio.sleep(0.05)
+        await worker.stop()
+        return worker
+
+    worker = asyncio.run(scenario())
+    assert calls == [1, 1, 1]
+    assert hospital_service.get("hosp-3").occupancy.icu_beds_used == 3
+
+
+def test_endpoint_returns_429_when_queue_is_full(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "ingest_max_pending", 1)
+    with TestClient(app) as live:
+        assert ingestor.running
+        resp = live.post(
+            "/api/hospitals/occupancy:batch",
+            json=[_update("hosp-1", 1), _update("hosp-2", 2)],
+        )
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+    assert not ingestor.running
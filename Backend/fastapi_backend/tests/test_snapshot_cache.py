@@ -0,0 +1,69 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from app.services import hospital_service, kpi_service
+from app.services.snapshot_cache import SnapshotCache
+
+
+def _make_cache(path: Path, calls: list) -> SnapshotCache:
+    def _parse(raw: bytes) -> list:
+        calls.append(raw)
+        return json.loads(raw)
+
+    return SnapshotCache(
+        path,
+        parse=_parse,
+        serialize=lambda data: json.dumps(data).encode("utf-8"),
+        missing_message="Test data file not found",
+    )
+
+
+def test_snapshot_cache_parses_once_until_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "data.json"
+    path.write_text("[1, 2]", encoding="utf-8")
+    calls: list = []
+    cache = _make_cache(path, calls)
+
+    first = cache.get()
+    second = cache.get()
+    assert first is second
+    assert first.data == [1, 2]
+    assert first.body == b"[1, 2]"
+    assert len(calls) == 1
+
+    path.write_text("[1, 2, 3]", encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    third = cache.get()
+    assert third.data == [1, 2, 3]
+    assert third.version != first.version
+    assert len(calls) == 2
+
+
+def test_snapshot_cache_invalidate_forces_reload(tmp_path: Path) -> None:
+    path = tmp_path / "data.json"
+    path.write_text("{}", encoding="utf-8")
+    calls: list = []
+    cache = _make_cache(path, calls)
+
+    cache.get()
+    cache.invalidate()
+    cache.get()
+    assert len(calls) == 2
+
+
+def test_snapshot_cache_missing_file_raises_runtime_error(tmp_path: Path) -> None:
+    cache = _make_cache(tmp_path / "missing.json", [])
+    with pytest.raises(RuntimeError, match="Test data file not found"):
+        cache.get()
+
+
+def test_services_reuse_validated_snapshots() -> None:
+    assert hospital_service.get_snapshot() is hospital_service.get_snapshot()
+    assert kpi_service.get_kpi() is kpi_service.get_kpi()
+    hospitals = hospital_service.list_hospitals()
+    assert json.loads(hospital_service.get_snapshot().body)[0]["id"] == hospitals[0].id
@@ -0,0 +1,159 @@
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import graph_service, hospital_service
+from app.services.kdtree import KDTree, chord_to_km, km_to_chord, unit_vectors
+from app.services.spatial_graph import SpatialGraph
+
+
+def _haversine_km(lat1, lng1, lat2, lng2):
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    dp, dl = p2 - p1, np.radians(lng2 - lng1)
+    a = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * 6371.0088 * np.arcsin(np.sqrt(a))
+
+
+def _cities(n: int, seed: int = 0):
+    # Clustered points (hospitals bunch up in cities) plus rural scatter.
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform([8, 68], [35, 97], (20, 2))
+    pick = centres[rng.integers(0, 20, n)]
+    points = pick + rng.normal(0, 0.3, (n, 2))
+    rural = rng.random(n) < 0.2
+    points[rural] = rng.uniform([8, 68], [35, 97], (int(rural.sum()), 2))
+    return points[:, 0], points[:, 1]
+
+
+def _edge_set(graph: SpatialGraph):
+    source, target, _ = graph.edges()
+    return set(zip(source.tolist(), target.tolist()))
+
+
+def test_kdtree_matches_brute_force_haversine() -> None:
+    lat, lng = _cities(2_000)
+    tree = KDTree(unit_vectors(lat, lng), leaf_size=16)
+    dist, idx = tree.query(tree.points, 5, exclude=np.arange(2_000))
+
+    full = _haversine_km(lat[:, None], lng[:, None], lat[None, :], lng[None, :])
+    np.fill_diagonal(full, np.inf)
+    expected = np.sort(full, axis=1)[:, :5]
+    assert np.allclose(chord_to_km(dist), expected, atol=1e-6)
+    assert np.allclose(full[np.arange(2_000)[:, None], idx], expected, atol=1e-6)
+
+    within = tree.query_radius(tree.points[0], km_to_chord(50.0))
+    assert set(within.tolist()) == set(np.flatnonzero(_haversine_km(lat[0], lng[0], lat, lng) <= 50.0).tolist())
+
+
+def test_graph_is_symmetric_sparse_knn() -> None:
+    lat, lng = _cities(1_000)
+    graph = SpatialGraph(lat, lng, k=6)
+    edges = _edge_set(graph)
+    assert all(s != t for s, t in edges)
+    assert np.all(graph.degree() >= 6)
+    # CSR rows hold both directions of every edge.
+    assert graph.indptr[-1] == 2 * len(edges)
+    rows = np.repeat(np.arange(1_000), np.diff(graph.indptr))
+    assert set(zip(rows.tolist(), graph.indices.tolist())) == edges | {(t, s) for s, t in edges}
+
+
+def test_incremental_add_matches_rebuild() -> None:
+    lat, lng = _cities(600)
+    graph = SpatialGraph(lat[:500], lng[:500], k=5)
+    for i in range(500, 560):
+        assert graph.add(lat[i], lng[i]) == i
+    full = SpatialGraph(lat[:560], lng[:560], k=5)
+
+    # Every edge of the rebuilt graph is present; the extras are edges that
+    # later hospitals displaced, kept until the next rebuild.
+    incremental = _edge_set(graph)
+    assert _edge_set(full) <= incremental
+    history = set().union(*(_edge_set(SpatialGraph(lat[:m], lng[:m], k=5)) for m in range(500, 561)))
+    assert incremental <= history
+
+    # Past the rebuild threshold (64 added) the graph is rebuilt from scratch.
+    for i in range(560, 566):
+        graph.add(lat[i], lng[i])
+    assert _edge_set(graph) == _edge_set(SpatialGraph(lat[:566], lng[:566], k=5))
+
+
+def test_diffusion_spreads_and_damps() -> None:
+    lat, lng = _cities(800)
+    graph = SpatialGraph(lat, lng, k=8)
+
+    flat, iterations = graph.diffuse(np.full(800, 0.3), alpha=0.5)
+    assert np.allclose(flat, 0.3) and iterations == 1
+
+    signal = np.zeros(800)
+    signal[0] = 1.0
+    scores, iterations = graph.diffuse(signal, alpha=0.5, tol=1e-8, max_iter=500)
+    assert iterations < 500
+    assert 0.5 <= scores[0] < 1.0
+    neighbours = graph.indices[graph.indptr[0] : graph.indptr[1]]
+    assert np.all(scores[neighbours] > 0)
+    far = np.argsort(_haversine_km(lat[0], lng[0], lat, lng))[-100:]
+    assert np.all(scores[far] < 1e-6)
+
+    with pytest.raises(ValueError):
+        graph.diffuse(np.zeros(3))
+
+
+def test_graph_scales_without_dense_matrix() -> None:
+    lat, lng = _cities(50_000, seed=1)
+    start = time.perf_counter()
+    graph = SpatialGraph(lat, lng, k=8)
+    scores, _ = graph.diffuse(np.random.default_rng(0).random(50_000))
+    elapsed = time.perf_counter() - start
+    assert scores.shape == (50_000,)
+    assert graph.indptr[-1] < 50_000 * 16
+    assert elapsed < 5.0
+
+
+def test_diffusion_endpoint(fresh_graph) -> None:
+    client = TestClient(app)
+    resp = client.get("/api/graph/diffusion")
+    assert resp.status_code == 200
+    body = resp.json()
+    hospitals = hospital_service.get_snapshot().data
+    assert [n["hospital_id"] for n in body["nodes"]] == [h.id for h in hospitals]
+    assert body["edges"] == []
+    assert client.get("/api/graph/diffusion", headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+    with_edges = client.get("/api/graph/diffusion", params={"include_edges": True}).json()
+    ids = {h.id for h in hospitals}
+    assert with_edges["edges"] and all(e["source"] in ids and e["target"] in ids for e in with_edges["edges"])
+
+    # A new hospital is inserted into the existing graph, not rebuilt.
+    graph = graph_service.get_graph()
+    node = hospitals[0]
+    hospital_service.upsert_hospitals([node.model_copy(update={"id": "hosp-new", "lat": node.lat + 0.01})])
+    body = client.get("/api/graph/diffusion").json()
+    assert graph_service.get_graph() is graph
+    assert len(graph) == len(hospitals) + 1
+    assert body["nodes"][-1]["hospital_id"] == "hosp-new"
+
+    # Occupancy-only changes keep the layout (and the graph) as is.
+    hospital_service.upsert_hospitals(
+        [node.model_copy(update={"occupancy": node.occupancy.model_copy(update={"icu_beds_used": 0})})]
+    )
+    client.get("/api/graph/diffusion")
+    assert graph_service.get_graph() is graph
+
+
+def test_snapshot_pairs_scores_with_the_graph_they_were_computed_on(fresh_graph, monkeypatch: pytest.MonkeyPatch) -> None:
+    diffusion = graph_service.get_diffusion()
+    # The live graph grows in place after the scores were computed, as a
+    # concurrent request adding a hospital would make it.
+    node = hospital_service.get_snapshot().data[0]
+    hospital_service.upsert_hospitals([node.model_copy(update={"id": "hosp-new", "lat": node.lat + 0.01})])
+    assert len(graph_service.get_graph()) == len(diffusion.hospital_ids) + 1
+
+    monkeypatch.setattr(graph_service, "get_diffusion", lambda: diffusion)
+    body = json.loads(graph_service.get_snapshot(include_edges=True).body)
+    ids = set(diffusion.hospital_ids)
+    assert [n["hospital_id"] for n in body["nodes"]] == diffusion.hospital_ids
+    assert body["edges"] and all(e["source"] in ids and e["target"] in ids for e in body["edges"])
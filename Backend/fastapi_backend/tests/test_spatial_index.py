@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas import HospitalNode
+from app.services import hospital_service
+from app.services.kdtree import unit_vectors
+from app.services.spatial_index import OXYGEN_LEVELS, HospitalIndex
+
+
+def _network(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    nodes = []
+    for i in range(n):
+        total = int(rng.integers(5, 40))
+        # Most hospitals are full, so ICU filters are selective.
+        used = total if rng.random() < 0.8 else int(rng.integers(0, total))
+        nodes.append(
+            HospitalNode(
+                id=f"h{i}",
+                name=f"Hospital {i}",
+                lat=float(rng.uniform(8, 35)),
+                lng=float(rng.uniform(68, 97)),
+                occupancy={"icu_beds_used": used, "icu_beds_total": total, "ward_beds_used": 0, "ward_beds_total": 50},
+                status="NORMAL",
+                resources={"oxygen": OXYGEN_LEVELS[int(rng.integers(0, 3))], "staff_load": "LOW"},
+            )
+        )
+    return nodes
+
+
+def _brute(nodes, lat, lng, k, min_free=0, min_oxygen=None, exclude=None):
+    floor = 0 if min_oxygen is None else OXYGEN_LEVELS.index(min_oxygen)
+    keep = [
+        n
+        for n in nodes
+        if n.occupancy.icu_beds_total - n.occupancy.icu_beds_used >= min_free
+        and OXYGEN_LEVELS.index(n.resources.oxygen) >= floor
+        and n.id != exclude
+    ]
+    if not keep:
+        return []
+    points = unit_vectors([n.lat for n in keep], [n.lng for n in keep])
+    dist = np.linalg.norm(points - unit_vectors([lat], [lng])[0], axis=1)
+    return [keep[i].id for i in np.argsort(dist, kind="stable")[:k]]
+
+
+def test_filtered_nearest_matches_brute_force() -> None:
+    nodes = _network(3_000)
+    index = HospitalIndex()
+    index.reset(nodes)
+    rng = np.random.default_rng(1)
+    for j in range(100):
+        lat, lng = float(rng.uniform(8, 35)), float(rng.uniform(68, 97))
+        min_free, min_oxygen = j % 4, (None, "MEDIUM", "HIGH")[j % 3]
+        hits = index.nearest(lat, lng, 5, min_free, min_oxygen)
+        assert [hid for hid, _ in hits] == _brute(nodes, lat, lng, 5, min_free, min_oxygen)
+        assert [km for _, km in hits] == sorted(km for _, km in hits)
+
+    # Nothing matches: empty, not an error.
+    assert index.nearest(20.0, 80.0, 5, min_icu_free=1_000) == []
+
+
+def test_index_follows_updates_moves_and_additions() -> None:
+    nodes = _network(500)
+    index = HospitalIndex()
+    index.reset(nodes)
+    by_id = {n.id: n for n in nodes}
+
+    def upsert(node):
+        by_id[node.id] = node
+        index.upsert(node)
+
+    rng = np.random.default_rng(2)
+    for step in range(300):
+        node = by_id[f"h{int(rng.integers(0, 500))}"]
+        kind = step % 3
+        if kind == 0:
+            # Occupancy change: the tree aggregates are updated in place.
+            used = int(rng.integers(0, node.occupancy.icu_beds_total + 1))
+            occ = node.occupancy.model_copy(update={"icu_beds_used": used})
+            upsert(node.model_copy(update={"occupancy": occ}))
+        elif kind == 1:
+            upsert(node.model_copy(update={"lat": float(rng.uniform(8, 35)), "lng": float(rng.uniform(68, 97))}))
+        else:
+            upsert(node.model_copy(update={"id": f"new{step}", "lng": node.lng + 0.01}))
+
+    assert len(index) == len(by_id)
+    for j in range(50):
+        lat, lng = float(rng.uniform(8, 35)), float(rng.uniform(68, 97))
+        hits = index.nearest(lat, lng, 5, 1, "MEDIUM", exclude="h3")
+        assert [hid for hid, _ in hits] == _brute(list(by_id.values()), lat, lng, 5, 1, "MEDIUM", exclude="h3")
+
+
+def test_nearest_p99_at_50k_hospitals() -> None:
+    index = HospitalIndex()
+    index.reset(_network(50_000, seed=3))
+    rng = np.random.default_rng(4)
+    timings = []
+    for j in range(1_000):
+        lat, lng = float(rng.uniform(8, 35)), float(rng.uniform(68, 97))
+        start = time.perf_counter()
+        index.nearest(lat, lng, 5, j % 3, (None, "MEDIUM")[j % 2])
+        timings.append(time.perf_counter() - start)
+    assert np.percentile(timings, 99) < 0.005
+
+
+def test_nearest_endpoint(fresh_hospitals) -> None:
+    client = TestClient(app)
+    resp = client.get("/api/hospitals/nearest", params={"lat": 19.1, "lng": 72.9, "k": 2})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert len(body) == 2
+    assert body[0]["distance_km"] <= body[1]["distance_km"]
+    first = body[0]["hospital"]
+    assert body[0]["icu_beds_free"] == first["occupancy"]["icu_beds_total"] - first["occupancy"]["icu_beds_used"]
+
+    # Live occupancy updates are visible to the index immediately.
+    node = hospital_service.get(first["id"])
+    full = node.occupancy.model_copy(update={"icu_beds_used": node.occupancy.icu_beds_total})
+    hospital_service.upsert_hospitals([node.model_copy(update={"occupancy": full})])
+    filtered = client.get(
+        "/api/hospitals/nearest", params={"lat": 19.1, "lng": 72.9, "min_icu_free": 1, "oxygen": "LOW"}
+    ).json()
+    assert first["id"] not in [h["hospital"]["id"] for h in filtered]
+    assert all(h["icu_beds_free"] >= 1 for h in filtered)
+
+    excluded = client.get("/api/hospitals/nearest", params={"lat": 19.1, "lng": 72.9, "exclude_id": first["id"]}).json()
+    assert first["id"] not in [h["hospital"]["id"] for h in excluded]
+    assert client.get("/api/hospitals/nearest", params={"lat": 91, "lng": 0}).status_code == 422
+    assert client.get("/api/hospitals/nearest", params={"lat": 0, "lng": 0, "oxygen": "NONE"}).status_code == 422
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from app.config import get_settings
+from app.schemas import ActionItem
+from app.services import actions_service, hospital_service
+from app.services.action_repository import SqliteActionRepository
+from app.services.hospital_table import HospitalTable
+from app.services.snapshot_cache import Snapshot
+from app.services.stream_service import StreamHub, diff_collection, flatten
+
+
+def _parse_frame(frame: bytes) -> Dict[str, Any]:
+    event = None
+    data: List[bytes] = []
+    for line in frame.split(b"\n"):
+        if line.startswith(b"event: "):
+            event = line[len(b"event: "):].decode()
+        elif line.startswith(b"data: "):
+            data.append(line[len(b"data: "):])
+    return {"event": event, "data": json.loads(b"\n".join(data))}
+
+
+def test_diff_collection_reports_field_level_changes() -> None:
+    old = {"h1": flatten({"occupancy": {"icu_beds_used": 1, "icu_beds_total": 5}})}
+    new = {
+        "h1": flatten({"occupancy": {"icu_beds_used": 2, "icu_beds_total": 5}}),
+        "h2": flatten({"occupancy": {"icu_beds_used": 0, "icu_beds_total": 3}}),
+    }
+    delta = diff_collection(old, new)
+    assert delta["changed"] == {"h1": {"occupancy.icu_beds_used": 2}}
+    assert len(delta["added"]) == 1
+    assert "removed" not in delta
+
+
+def test_stream_hub_sends_snapshot_then_single_delta_to_all(monkeypatch: pytest.MonkeyPatch) -> None:
+    base = hospital_service.get_snapshot()
+    changed_node = base.data[0].model_copy(
+        update={
+            "occupancy": base.data[0].occupancy.model_copy(
+                update={"icu_beds_used": base.data[0].occupancy.icu_beds_used - 1}
+            )
+        }
+    )
+    changed = Snapshot(
+        version=base.version + "-changed",
+        data=HospitalTable.from_nodes([changed_node, *base.data[1:]]),
+        body=b"",
+        etag='"changed"',
+    )
+    current = {"snapshot": base}
+    monkeypatch.setattr(hospital_service, "get_snapshot", lambda: current["snapshot"])
+
+    async def _run() -> List[Dict[str, Any]]:
+        hub = StreamHub()
+        streams = [hub.subscribe(), hub.subscribe()]
+        first = [await s.__anext__() for s in streams]
+        assert hub.subscriber_count == 2
+
+        current["snapshot"] = changed
+        assert hub.refresh() is True
+        assert hub.refresh() is False  # nothing new: no second diff/broadcast
+
+        second = [await asyncio.wait_for(s.__anext__(), timeout=1) for s in streams]
+        assert second[0] is second[1]  # encoded once, shared by subscribers
+        for s in streams:
+            await s.aclose()
+        assert hub.subscriber_count == 0
+        return [_parse_frame(first[0]), _parse_frame(second[0])]
+
+    snapshot, delta = asyncio.run(_run())
+    assert snapshot["event"] == "snapshot"
+    assert len(snapshot["data"]["hospitals"]) == len(base.data)
+    assert delta["event"] == "delta"
+    assert delta["data"]["hospitals"] == {
+        "changed": {changed_node.id: {"occupancy.icu_beds_used": changed_node.occupancy.icu_beds_used}}
+    }
+    assert delta["data"]["seq"] > snapshot["data"]["seq"]
+
+
+@pytest.fixture
+def pending_actions() -> Iterator[List[ActionItem]]:
+    previous = actions_service._repository
+    repo = SqliteActionRepository(":memory:")
+    base = datetime(2025, 11, 28, 18, 0, tzinfo=timezone.utc)
+    pending = [
+        ActionItem(
+            id=f"act-stream-{i}",
+            type="ADVISORY",
+            target="PUBLIC",
+            channel="SMS",
+            recipients=["+910000000000"],
+            message_template="Surge notice.",
+            status="PENDING",
+            created_at=base + timedelta(seconds=i),
+            updated_at=base + timedelta(seconds=i),
+        )
+        for i in range(2)
+    ]
+    repo.put_many(pending)
+    actions_service.set_repository(repo)
+    yield pending
+    actions_service.set_repository(previous)
+
+
+def test_stream_hub_publishes_action_changes(pending_actions: List[ActionItem]) -> None:
+    async def _run() -> bytes:
+        hub = StreamHub()
+        stream = hub.subscribe()
+        await stream.__anext__()
+        actions_service.reject(pending_actions[0].id)
+        hub.refresh()
+        frame = await asyncio.wait_for(stream.__anext__(), timeout=1)
+        await stream.aclose()
+        return frame
+
+    delta = _parse_frame(asyncio.run(_run()))
+    assert delta["data"]["pending_actions"] == {"removed": [pending_actions[0].id]}
+
+
+def test_action_changes_wake_the_watcher_instead_of_refreshing_inline(
+    pending_actions: List[ActionItem], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_settings(), "stream_poll_interval", 30.0)
+    hub = StreamHub()
+    monkeypatch.setattr(actions_service, "_listeners", [hub.wake])
+    refreshed_on = []
+    original = hub.refresh
+
+    def _refresh() -> bool:
+        refreshed_on.append(threading.get_ident())
+        return original()
+
+    monkeypatch.setattr(hub, "refresh", _refresh)
+
+    async def _run() -> bytes:
+        stream = hub.subscribe()
+        await stream.__anext__()
+        await asyncio.sleep(0.05)  # the watcher's first refresh
+        before = len(refreshed_on)
+        # Two changes in a row: neither refreshes inline, and the watcher
+        # reports both in one delta.
+        actions_service.reject(pending_actions[0].id)
+        actions_service.reject(pending_actions[1].id)
+        assert len(refreshed_on) == before
+        frame = await asyncio.wait_for(stream.__anext__(), timeout=1)
+        await stream.aclose()
+        return frame
+
+    delta = _parse_frame(asyncio.run(_run()))
+    assert sorted(delta["data"]["pending_actions"]["removed"]) == [a.id for a in pending_actions]
+    assert threading.get_ident() not in refreshed_on
@@ -1,5 +1,11 @@
 import asyncio
+from typing import Callable, Iterator
 
+import httpx
+import pytest
+
+from app.config import Settings, get_settings
+from app.services import http_clients
 from app.services.twilio_client import TwilioClient, TwilioSendResult
 
 
@@ -18,3 +24,60 @@ def test_twilio_client_dry_run_queues_without_error() -> None:
     result = asyncio.run(_run())
     assert isinstance(result, TwilioSendResult)
     assert result.status == "QUEUED"
+
+
+@pytest.fixture
+def single_attempt(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    # One HTTP attempt per send, and a fresh breaker for every test.
+    monkeypatch.setattr(get_settings(), "twilio_max_retries", 0)
+    http_clients.set_integration("twilio", None)
+    yield
+    http_clients.set_integration("twilio", None)
+
+
+def _send_with(handler: Callable[[httpx.Request], httpx.Response]) -> TwilioSendResult:
+    async def _run() -> TwilioSendResult:
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport, base_url="http://twilio.test") as http:
+            client = TwilioClient(http_client=http)
+            client.settings = Settings(
+                twilio_dry_run=False,
+                twilio_account_sid="AC123",
+                twilio_auth_token="token",
+                twilio_from_number="+15550000000",
+            )
+            return await client.send_message(to="+910000000000", body="Test message")
+
+    return asyncio.run(_run())
+
+
+@pytest.mark.parametrize(
+    "respond, retryable",
+    [
+        (lambda request: httpx.Response(400, json={"message": "invalid To number"}), False),
+        (lambda request: httpx.Response(401, json={"message": "authenticate"}), False),
+        (lambda request: httpx.Response(500), False),
+        (lambda request: httpx.Response(503), True),
+        (lambda request: httpx.Response(429), True),
+    ],
+)
+def test_failed_send_is_retryable_only_when_unsent(
+    respond: Callable[[httpx.Request], httpx.Response], retryable: bool, single_attempt: None
+) -> None:
+    result = _send_with(respond)
+    assert (result.status, result.retryable) == ("FAILED", retryable)
+    assert result.error.startswith("HTTP ")
+
+
+def test_read_timeout_is_not_retryable_but_connect_error_is(single_attempt: None) -> None:
+    def _timeout(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    def _refused(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    timed_out = _send_with(_timeout)
+    refused = _send_with(_refused)
+    # Twilio may have accepted a message whose response timed out.
+    assert (timed_out.status, timed_out.retryable) == ("FAILED", False)
+    assert (refused.status, refused.retryable) == ("FAILED", True)
@@ -98,6 +98,7 @@ function mapBackendActionItem(raw: any): ActionItem {
   const typeMap: Record<string, ActionItem['type']> = {
     STAFFING: 'staff',
     SUPPLY: 'resource',
+    TRANSFER: 'resource',
     ADVISORY: 'advisory',
   };
   const statusMap: Record<string, ActionItem['status']> = {